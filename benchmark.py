@@ -1,4 +1,6 @@
+import csv
 import docker
+import math
 import sys
 import os
 import json
@@ -10,8 +12,9 @@ from time import sleep
 import shutil
 import pathlib
 import openpyxl
-import pandas as pd
 from typing import Dict
+from ready_trader_go.match_analytics import MatchLog
+from ready_trader_go.types import Instrument
 
 TESTING_COMPETITORS = ["humming_trader"]
 MAX_NUMBER_PARAMETER_COMBINATIONS = 30 
@@ -91,6 +94,47 @@ def get_next_parameter_combination(parameters_file : str):
 def read_market_file_from_trader_parameters(file):
     return json.load(open(file, "r"))["Parameters"]["MarketDataFile"]
 
+def read_final_statuses(score_board_file):
+    statuses = {}
+    with open(score_board_file, "r", newline="") as file:
+        for row in csv.DictReader(file):
+            statuses[row["Team"]] = row["Status"]
+    return statuses
+
+def read_match_outcome(score_board_file):
+    # every figure comes from the match events file next to the score board,
+    # the score board is only needed for the final status of each team
+    instrument_settings = default_exchange_settings["Instrument"]
+    match_events_file = os.path.join(pathlib.Path(score_board_file).parent, "match_events.csv")
+    match_log = MatchLog.from_file(match_events_file, instrument_settings["EtfClamp"], instrument_settings["TickSize"])
+    statuses = read_final_statuses(score_board_file)
+
+    match_outcome = []
+    for team in match_log.teams:
+        analytics = match_log.team(team)
+        median_queue_time = analytics.median_queue_time
+        match_outcome.append({
+            "Team": team,
+            "BuyVolume": int(analytics.buy_volume[-1]),
+            "SellVolume": int(analytics.sell_volume[-1]),
+            "EtfPosition": int(analytics.etf_position[-1]),
+            "FuturePosition": int(analytics.future_position[-1]),
+            "EtfPrice": match_log.last_traded_prices[Instrument.ETF][-1] / 100,
+            "FuturePrice": match_log.last_traded_prices[Instrument.FUTURE][-1] / 100,
+            "TotalFees": analytics.total_fees[-1] / 100,
+            "AccountBalance": analytics.account_balance[-1] / 100,
+            "ProfitOrLoss": analytics.profit_or_loss[-1] / 100,
+            "MaxDrawdown": analytics.max_drawdown / 100,
+            "Fills": analytics.fill_count,
+            "MakerVolume": analytics.maker_volume,
+            "TakerVolume": analytics.taker_volume,
+            "SpreadCapture": analytics.spread_capture / 100,
+            "MedianQueueTime": None if math.isnan(median_queue_time) else round(median_queue_time, 3),
+            "Status": statuses.get(team, "OK"),
+        })
+    match_outcome.sort(key=lambda stats: -stats["ProfitOrLoss"])
+    return match_outcome
+
 def create_report(score_board_files, main_trader, parameters_for_each_match, report_path):
     open(report_path, "w").close()
     wb = openpyxl.Workbook()
@@ -106,7 +150,8 @@ def create_report(score_board_files, main_trader, parameters_for_each_match, rep
 
     columns = ['Team', 'BuyVolume', 'SellVolume', 'EtfPosition', 'FuturePosition',
        'EtfPrice', 'FuturePrice', 'TotalFees', 'AccountBalance',
-       'ProfitOrLoss', 'Status']
+       'ProfitOrLoss', 'MaxDrawdown', 'Fills', 'MakerVolume', 'TakerVolume',
+       'SpreadCapture', 'MedianQueueTime', 'Status']
 
     def write_match_outcome(row_start, outcome, main_trader="", market_file="", hex_code="", parameters={}) -> int:
         row_index = row_start
@@ -149,30 +194,20 @@ def create_report(score_board_files, main_trader, parameters_for_each_match, rep
     score_board_file_and_pnl = []
 
     for i in range(len(score_board_files)):
-        score_board = pd.read_csv(score_board_files[i])
-        main_trader_pnl = float(score_board[score_board["Team"]==main_trader].iloc[-1]["ProfitOrLoss"])
+        match_outcome = read_match_outcome(score_board_files[i])
+        main_trader_pnl = next(stats["ProfitOrLoss"] for stats in match_outcome if stats["Team"] == main_trader)
         print("PnL", main_trader_pnl)
-        score_board_file_and_pnl.append((main_trader_pnl, score_board_files[i], parameters_for_each_match[i]))
+        score_board_file_and_pnl.append((main_trader_pnl, score_board_files[i], parameters_for_each_match[i],
+                                         match_outcome))
 
     score_board_file_and_pnl = sorted(score_board_file_and_pnl, key=lambda x: -x[0])
 
     i = 1
-    for pnl, file, params in score_board_file_and_pnl:
-        score_board = pd.read_csv(file)
+    for pnl, file, params, match_outcome in score_board_file_and_pnl:
         print("Storing match #{0} information:".format(i+1))
-        print(score_board.tail())
-        traders = list(score_board["Team"].unique()) 
-        match_outcome = []
-        for trader in traders:
-            trader_outcome = score_board[score_board["Team"] == trader].iloc[-1]
-            trader_outcome["EtfPrice"] /= 100
-            trader_outcome["FuturePrice"] /= 100
-            trader_outcome["TotalFees"] /= 100
-            trader_outcome["AccountBalance"] /= 100
-            trader_outcome["ProfitOrLoss"] /= 100
-            match_outcome.append(trader_outcome) 
-        match_outcome.sort(key=lambda stats: -stats["ProfitOrLoss"])
-        
+        for stats in match_outcome:
+            print(stats)
+
         settings_path = os.path.join(pathlib.Path(file).parent, "{0}.json".format(main_trader))
         market_file = read_market_file_from_trader_parameters(settings_path)
         row_index = write_match_outcome(row_index, match_outcome, main_trader=main_trader, market_file=market_file, hex_code="#"+str(i+1), parameters=params)
@@ -0,0 +1,116 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Measure the rate at which a competitor can process insert messages."""
+import argparse
+import asyncio
+import time
+
+from typing import Callable, Dict
+
+from ready_trader_go.account import AccountFactory
+from ready_trader_go.competitor import Competitor
+from ready_trader_go.match_events import MatchEvents
+from ready_trader_go.order_book import OrderBook
+from ready_trader_go.timer import Timer
+from ready_trader_go.timer_wheel import TimerWheel
+from ready_trader_go.types import IExecutionConnection, Instrument, Lifespan, Side
+from ready_trader_go.unhedged_lots import UnhedgedLotsFactory
+
+TICK_SIZE = 100
+
+
+class NullExecutionConnection(IExecutionConnection):
+    """An execution connection that discards every message."""
+
+    def close(self):
+        """Close the execution channel."""
+
+    def send_error(self, client_order_id: int, error_message: bytes) -> None:
+        """Send an error message to the auto-trader."""
+
+    def send_order_filled(self, client_order_id: int, price: int, volume: int) -> None:
+        """Send an order filled message to the auto-trader."""
+
+    def send_order_status(self, client_order_id: int, fill_volume: int, remaining_volume: int, fees: int) -> None:
+        """Send an order status message to the auto-trader."""
+
+
+def create_competitor(order_count_limit: int, wheel: TimerWheel) -> Competitor:
+    """Return a competitor trading in an empty ETF order book."""
+    books = {Instrument.FUTURE: OrderBook(Instrument.FUTURE, 0.0, 0.0),
+             Instrument.ETF: OrderBook(Instrument.ETF, -0.0001, 0.0002)}
+    return Competitor("benchmark", NullExecutionConnection(), books,
+                      AccountFactory(0.002, TICK_SIZE / 100.0).create(), MatchEvents(), None, 100,
+                      order_count_limit, order_count_limit * 10, TICK_SIZE / 100.0,
+                      UnhedgedLotsFactory(Timer(1.0, wheel)), None)
+
+
+def good_for_day(competitor: Competitor, count: int) -> None:
+    """Insert resting orders on both sides, cancelling the oldest when at the order count limit."""
+    limit: int = competitor.order_count_limit
+    for i in range(count):
+        if len(competitor.orders) == limit:
+            competitor.on_cancel_message(1.0, i - limit)
+        if i & 1:
+            competitor.on_insert_message(1.0, i, Side.BUY, 10000 - (i % 20) * TICK_SIZE, 1, Lifespan.GOOD_FOR_DAY)
+        else:
+            competitor.on_insert_message(1.0, i, Side.SELL, 20000 + (i % 20) * TICK_SIZE, 1, Lifespan.GOOD_FOR_DAY)
+
+
+def fill_and_kill(competitor: Competitor, count: int) -> None:
+    """Insert fill-and-kill orders that find nothing to trade with."""
+    for i in range(count):
+        competitor.on_insert_message(1.0, i, Side.BUY if i & 1 else Side.SELL, 10000, 1, Lifespan.FILL_AND_KILL)
+
+
+def in_cross(competitor: Competitor, count: int) -> None:
+    """Insert orders that are rejected because they cross the competitor's own order."""
+    competitor.on_insert_message(1.0, 0, Side.SELL, 10000, 1, Lifespan.GOOD_FOR_DAY)
+    for i in range(1, count):
+        competitor.on_insert_message(1.0, i, Side.BUY, 10000, 1, Lifespan.GOOD_FOR_DAY)
+
+
+WORKLOADS: Dict[str, Callable[[Competitor, int], None]] = {
+    "good_for_day": good_for_day,
+    "fill_and_kill": fill_and_kill,
+    "in_cross": in_cross,
+}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark competitor insert message handling")
+    parser.add_argument("--count", type=int, default=200_000, help="number of insert messages (default 200000)")
+    parser.add_argument("--limit", type=int, default=10, help="ActiveOrderCountLimit (default 10)")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    wheel = TimerWheel(loop, 1.0)
+
+    print("%-14s %14s" % ("workload", "inserts/sec"))
+    for name, workload in WORKLOADS.items():
+        competitor = create_competitor(args.limit, wheel)
+        start: float = time.perf_counter()
+        workload(competitor, args.count)
+        print("%-14s %14.0f" % (name, args.count / (time.perf_counter() - start)))
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
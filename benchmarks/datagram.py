@@ -0,0 +1,136 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Measure the latency from publishing an order book message to the auto-trader's callback."""
+import argparse
+import asyncio
+import struct
+import time
+
+from typing import Callable, Dict, List, Tuple
+
+from ready_trader_go.base_auto_trader import BaseAutoTrader
+from ready_trader_go.messages import (BOOK_BODY, BOOK_PART, HEADER, HEADER_SIZE, ORDER_BOOK_HEADER,
+                                      ORDER_BOOK_HEADER_SIZE, ORDER_BOOK_MESSAGE_SIZE, MessageType, Subscription)
+from ready_trader_go.pubsub import BUFFER_SIZE, FRAME_HEADER_SIZE, FRAME_SIZE, FRAME_WRAP, Publisher
+from ready_trader_go.trader_state import LocalBook
+
+ADDRESS = ("127.0.0.1", 0)
+CONFIG = {"TeamName": "benchmark", "Secret": "secret", "Parameters": {}}
+
+
+class CopyingTrader(Subscription):
+    """Decodes order book messages the way BaseAutoTrader did before decoding in place."""
+
+    def on_datagram(self, typ: int, data: bytes, start: int, length: int) -> None:
+        """Decode an order book message into lists of levels."""
+        if typ == MessageType.ORDER_BOOK_UPDATE and length == ORDER_BOOK_MESSAGE_SIZE:
+            inst, seq = ORDER_BOOK_HEADER.unpack_from(data, start)
+            self.on_order_book_update_message(inst, seq, *BOOK_PART.iter_unpack(data[ORDER_BOOK_HEADER_SIZE:]))
+
+    def on_order_book_update_message(self, instrument: int, sequence_number: int, ask_prices: List[int],
+                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
+        """Called with each order book update."""
+
+
+class ListTrader(BaseAutoTrader):
+    """An auto-trader using the list-based order book callback."""
+
+    def on_order_book_update_message(self, instrument: int, sequence_number: int, ask_prices: List[int],
+                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
+        """Called with each order book update."""
+
+
+class LocalBookTrader(BaseAutoTrader):
+    """An auto-trader using the in-place order book callback."""
+
+    def on_local_order_book_update_message(self, instrument: int, sequence_number: int, book: LocalBook) -> None:
+        """Called with each order book update."""
+
+
+class NullProtocol(Subscription):
+    """Receives each frame but does nothing with it, to measure the cost of publishing alone."""
+
+    def frame_received(self, buffer: memoryview, start: int, length: int, address: Tuple[str, int]) -> None:
+        """Ignore the frame."""
+
+
+def copy_frame(trader: Subscription) -> Callable[[memoryview, int, int, Tuple[str, int]], None]:
+    """Return a frame handler that copies the frame, as the subscriber does for protocols without frame_received."""
+    datagram_received = trader.datagram_received
+    return lambda buffer, start, length, address: datagram_received(buffer[start:start + length], address)
+
+
+def run(frame_received: Callable[[memoryview, int, int, Tuple[str, int]], None], count: int) -> float:
+    """Publish count order book messages, passing each one to frame_received as the subscriber would, and return
+    the time taken per message in nanoseconds."""
+    buffer = memoryview(bytearray(BUFFER_SIZE))
+    publisher = Publisher(buffer, asyncio.BaseProtocol())
+    message = bytearray(ORDER_BOOK_MESSAGE_SIZE)
+    HEADER.pack_into(message, 0, ORDER_BOOK_MESSAGE_SIZE, MessageType.ORDER_BOOK_UPDATE)
+    levels = [100 * (1000 - i) for i in range(5)] + [10] * 5 + [100 * (999 - i) for i in range(5)] + [10] * 5
+    pack_into = BOOK_BODY.pack_into
+    unpack_from = struct.Struct("!I").unpack_from
+    mask: int = BUFFER_SIZE - 1
+    pos: int = 0
+    start_time: float = time.perf_counter()
+    for seq in range(1, count + 1):
+        pack_into(message, HEADER_SIZE, seq & 1, seq, *levels)
+        publisher.write(message)
+        if buffer[pos] == FRAME_WRAP:
+            pos = 0
+        length, = unpack_from(buffer, pos + 4)
+        start: int = pos + FRAME_HEADER_SIZE
+        frame_received(buffer, start, length, ADDRESS)
+        pos = (start + length + FRAME_SIZE - 1) & -FRAME_SIZE & mask
+    elapsed: float = time.perf_counter() - start_time
+    publisher.close()
+    return elapsed * 1e9 / count
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark order book message decoding")
+    parser.add_argument("--count", type=int, default=200_000, help="number of messages (default 200000)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs of each path (default 5)")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    # Runs of each path are interleaved and the best is reported to reduce noise
+    null_protocol = NullProtocol()
+    paths = {"copy, lists (before)": lambda: copy_frame(CopyingTrader()),
+             "copy, lists": lambda: copy_frame(ListTrader(loop, CONFIG)),
+             "in place, lists": lambda: ListTrader(loop, CONFIG).frame_received,
+             "in place, local book": lambda: LocalBookTrader(loop, CONFIG).frame_received}
+    best: Dict[str, float] = {name: float("inf") for name in paths}
+    publish: float = float("inf")
+    for _ in range(args.repeat):
+        publish = min(publish, run(null_protocol.frame_received, args.count))
+        for name, create in paths.items():
+            best[name] = min(best[name], run(create(), args.count))
+
+    print("%-24s %22s %12s" % ("path", "publish to callback ns", "decode ns"))
+    for name, elapsed in best.items():
+        print("%-24s %22.0f %12.0f" % (name, elapsed, elapsed - publish))
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Measure how long it takes to import the modules that start each process.
+
+Every match starts the exchange simulator and one process for each
+autotrader, so the time taken by their imports is paid many times over by
+sweeps that run thousands of matches. Each module is imported in a fresh
+interpreter run with "python -X importtime", and the import time of the
+module itself and of the slowest modules it imports are reported.
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from typing import Dict, List, Tuple
+
+MODULES = ("ready_trader_go", "ready_trader_go.exchange", "ready_trader_go.trader", "rtg")
+
+
+def import_time(module: str) -> Tuple[float, float, Dict[str, int]]:
+    """Import a module in a new interpreter and return the timings.
+
+    The timings are the wall-clock time of the interpreter and the time taken
+    by the import, both in milliseconds, and the time taken by each module
+    imported, excluding its own imports, in microseconds.
+    """
+    started: float = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module], capture_output=True,
+                            check=True, text=True)
+    wall_clock: float = (time.perf_counter() - started) * 1e3
+
+    self_times: Dict[str, int] = dict()
+    total: int = 0
+    for line in result.stderr.splitlines():
+        # Lines look like "import time:       297 |        614 |       ready_trader_go.lag_probe"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        self_times[name.strip()] = int(self_us)
+        if name.strip() == module:
+            total = int(cumulative_us)
+    return wall_clock, total / 1e3, self_times
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the Ready Trader Go processes")
+    parser.add_argument("--repeat", type=int, default=5, help="number of times to import each module (default 5)")
+    parser.add_argument("--top", type=int, default=5, help="number of slowest modules to list (default 5)")
+    parser.add_argument("module", nargs="*", default=MODULES, help="modules to import (default: %s)"
+                        % " ".join(MODULES))
+    args = parser.parse_args()
+
+    baseline: float = min(import_time("sys")[0] for _ in range(args.repeat))
+    print("interpreter start-up: %.1f ms" % baseline)
+    print("%-26s %12s %12s" % ("module", "import ms", "process ms"))
+    slowest: Dict[str, List[Tuple[int, str]]] = dict()
+    for module in args.module:
+        # Take the fastest of several runs, since it is the least disturbed by the rest of the system
+        wall_clock, total, self_times = min(import_time(module) for _ in range(args.repeat))
+        print("%-26s %12.1f %12.1f" % (module, total, wall_clock))
+        slowest[module] = sorted(((t, n) for n, t in self_times.items()), reverse=True)[:args.top]
+
+    for module, modules in slowest.items():
+        print("\nslowest imports of %s (us, excluding their own imports):" % module)
+        for t, name in modules:
+            print("  %8d %s" % (t, name))
+
+
+if __name__ == "__main__":
+    main()
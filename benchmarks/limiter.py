@@ -0,0 +1,88 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+"""Compare the frequency limiters at the MessageFrequencyLimit boundary."""
+import argparse
+import random
+import time
+
+from typing import Callable, Dict, List
+
+from ready_trader_go.limiter import FrequencyLimiter, RingFrequencyLimiter
+
+
+def at_limit(interval: float, limit: int, count: int) -> List[float]:
+    """Return evenly spaced event times at exactly the limit."""
+    return [i * interval / limit for i in range(count)]
+
+
+def over_limit(interval: float, limit: int, count: int) -> List[float]:
+    """Return evenly spaced event times at one event per interval over the limit."""
+    return [i * interval / (limit + 1) for i in range(count)]
+
+
+def bursts(interval: float, limit: int, count: int) -> List[float]:
+    """Return bursts of limit events separated by a pause of just over the interval."""
+    return [(i // limit) * interval * 1.01 + (i % limit) * 1e-6 for i in range(count)]
+
+
+def poisson(interval: float, limit: int, count: int) -> List[float]:
+    """Return event times with exponentially distributed gaps averaging the limit."""
+    rng = random.Random(42)
+    now: float = 0.0
+    times: List[float] = list()
+    for _ in range(count):
+        now += rng.expovariate(limit / interval)
+        times.append(now)
+    return times
+
+
+WORKLOADS: Dict[str, Callable[[float, int, int], List[float]]] = {
+    "at_limit": at_limit,
+    "over_limit": over_limit,
+    "bursts": bursts,
+    "poisson": poisson,
+}
+
+
+def run(limiter, times: List[float]) -> (float, List[bool]):
+    """Return the time taken per event in nanoseconds and the breach results."""
+    check_event = limiter.check_event
+    start: float = time.perf_counter()
+    results: List[bool] = [check_event(t) for t in times]
+    return (time.perf_counter() - start) * 1e9 / len(times), results
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the frequency limiters")
+    parser.add_argument("--count", type=int, default=1_000_000, help="number of events (default 1000000)")
+    parser.add_argument("--interval", type=float, default=1.0, help="MessageFrequencyInterval (default 1.0)")
+    parser.add_argument("--limit", type=int, default=50, help="MessageFrequencyLimit (default 50)")
+    args = parser.parse_args()
+
+    print("%-10s %12s %12s %10s %10s" % ("workload", "deque ns/ev", "ring ns/ev", "breaches", "mismatches"))
+    for name, workload in WORKLOADS.items():
+        times = workload(args.interval, args.limit, args.count)
+        deque_elapsed, expected = run(FrequencyLimiter(args.interval, args.limit), times)
+        ring_elapsed, actual = run(RingFrequencyLimiter(args.interval, args.limit), times)
+        mismatches = sum(a != e for a, e in zip(actual, expected))
+        print("%-10s %12.1f %12.1f %10d %10d" % (name, deque_elapsed, ring_elapsed, sum(expected), mismatches))
+
+
+if __name__ == "__main__":
+    main()
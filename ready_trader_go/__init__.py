@@ -15,9 +15,33 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
+import importlib
+
 __all__ = ["BaseAutoTrader", "Instrument", "Lifespan", "MAXIMUM_ASK", "MINIMUM_BID", "Side"]
 
-from .application import Application
-from .base_auto_trader import BaseAutoTrader
-from .order_book import MAXIMUM_ASK, MINIMUM_BID
-from .types import Instrument, Lifespan, Side
+# These names are imported when first used, so that a process which only
+# needs part of the package, such as the exchange simulator, does not pay
+# for importing the rest of it
+_EXPORTS = {
+    "Application": ".application",
+    "BaseAutoTrader": ".base_auto_trader",
+    "Instrument": ".types",
+    "Lifespan": ".types",
+    "MAXIMUM_ASK": ".order_book",
+    "MINIMUM_BID": ".order_book",
+    "Side": ".types",
+}
+
+
+def __getattr__(name: str):
+    """Import and return one of the names exported by this package."""
+    if name not in _EXPORTS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Return the names in this package, including those not yet imported."""
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -15,27 +15,45 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-from .types import Instrument, Side
+from typing import List, Optional
+
+from .types import Instrument, Side, etf_instrument, future_instrument
 
 
 class CompetitorAccount(object):
-    """A competitors account."""
+    """A competitors account.
+
+    The account holds a position in each instrument of each ETF/future pair,
+    indexed by instrument id, and is valued using the most recent prices
+    given for each pair. The etf_position and future_position attributes
+    refer to the first pair.
+    """
 
-    def __init__(self, tick_size: float, etf_clamp: float):
+    def __init__(self, tick_size: float, etf_clamp: float, pair_count: int = 1):
         """Initialise a new instance of the CompetitorAccount class."""
         self.account_balance: int = 0
         self.buy_volume: int = 0
         self.etf_clamp: float = etf_clamp
-        self.etf_position: int = 0
-        self.future_position: int = 0
         self.max_drawdown: int = 0
         self.max_profit: int = 0
+        self.positions: List[int] = [0] * (2 * pair_count)
+        self.prices: List[int] = [0] * (2 * pair_count)
         self.profit_or_loss: int = 0
         self.sell_volume: int = 0
         self.tick_size: int = int(tick_size * 100.0)
         self.total_fees: int = 0
 
-    def transact(self, instrument: Instrument, side: Side, price: float, volume: int, fee: int) -> None:
+    @property
+    def etf_position(self) -> int:
+        """Return the position in the ETF of the first pair."""
+        return self.positions[Instrument.ETF]
+
+    @property
+    def future_position(self) -> int:
+        """Return the position in the future of the first pair."""
+        return self.positions[Instrument.FUTURE]
+
+    def transact(self, instrument: int, side: Side, price: float, volume: int, fee: int) -> None:
         """Update this account with the specified transaction."""
         if side == Side.SELL:
             self.account_balance += round(price * volume)
@@ -45,27 +63,46 @@ class CompetitorAccount(object):
         self.account_balance -= fee
         self.total_fees += fee
 
-        if instrument == Instrument.FUTURE:
-            if side == Side.SELL:
-                self.future_position -= volume
-            else:
-                self.future_position += volume
+        if side == Side.SELL:
+            self.positions[instrument] -= volume
         else:
+            self.positions[instrument] += volume
+
+        # Buy and sell volumes only count ETF trades
+        if instrument & 1:
             if side == Side.SELL:
                 self.sell_volume += volume
-                self.etf_position -= volume
             else:
                 self.buy_volume += volume
-                self.etf_position += volume
-
-    def update(self, future_price: int, etf_price: int) -> None:
-        """Update this account using the specified prices."""
-        delta: int = round(self.etf_clamp * future_price)
-        delta -= delta % self.tick_size
-        min_price: int = future_price - delta
-        max_price: int = future_price + delta
-        clamped: int = min_price if etf_price < min_price else max_price if etf_price > max_price else etf_price
-        self.profit_or_loss = self.account_balance + self.future_position * future_price + self.etf_position * clamped
+
+    def update(self, future_price: int, etf_price: int, pair: int = 0) -> None:
+        """Update this account using the specified prices for the given pair."""
+        self.prices[future_instrument(pair)] = future_price
+        self.prices[etf_instrument(pair)] = etf_price
+        self.revalue()
+
+    def update_prices(self, prices: List[Optional[int]]) -> None:
+        """Update this account using the specified prices, indexed by instrument id."""
+        for i, price in enumerate(prices):
+            self.prices[i] = price or 0
+        self.revalue()
+
+    def revalue(self) -> None:
+        """Recalculate the profit or loss of this account using the most recent prices."""
+        profit_or_loss: int = self.account_balance
+        positions: List[int] = self.positions
+        prices: List[int] = self.prices
+        for future in range(0, len(positions), 2):
+            future_price: int = prices[future]
+            etf_price: int = prices[future + 1]
+            delta: int = round(self.etf_clamp * future_price)
+            delta -= delta % self.tick_size
+            min_price: int = future_price - delta
+            max_price: int = future_price + delta
+            clamped: int = min_price if etf_price < min_price else max_price if etf_price > max_price else etf_price
+            profit_or_loss += positions[future] * future_price + positions[future + 1] * clamped
+
+        self.profit_or_loss = profit_or_loss
         if self.profit_or_loss > self.max_profit:
             self.max_profit = self.profit_or_loss
         if self.max_profit - self.profit_or_loss > self.max_drawdown:
@@ -75,11 +112,12 @@ class CompetitorAccount(object):
 class AccountFactory:
     """A factory class for CompetitorAccounts."""
 
-    def __init__(self, etf_clamp: float, tick_size: float):
+    def __init__(self, etf_clamp: float, tick_size: float, pair_count: int = 1):
         """Initialise a new instance of the AccountFactory class."""
         self.etf_clamp: float = etf_clamp
+        self.pair_count: int = pair_count
         self.tick_size: float = tick_size
 
     def create(self) -> CompetitorAccount:
         """Return a new instance of the CompetitorAccount class."""
-        return CompetitorAccount(self.tick_size, self.etf_clamp)
+        return CompetitorAccount(self.tick_size, self.etf_clamp, self.pair_count)
@@ -24,26 +24,42 @@ import sys
 
 from typing import Callable, Optional
 
+from .lag_probe import LAG_PROBE_INTERVAL, LagProbe
+
+
+EVENT_LOOP_TYPES = ("asyncio", "uvloop")
+
+
+def _validate_event_loop_config(config) -> None:
+    """Raise an exception if the optional EventLoop configuration is invalid."""
+    if type(config) is not dict or "EventLoop" not in config:
+        return
+    event_loop = config["EventLoop"]
+    if type(event_loop) is not dict:
+        raise Exception("EventLoop configuration should be a JSON object")
+    if "Type" in event_loop and event_loop["Type"] not in EVENT_LOOP_TYPES:
+        raise Exception("Type in EventLoop configuration should be one of: %s" % ", ".join(EVENT_LOOP_TYPES))
+    if any(k in event_loop and (type(event_loop[k]) is not float or event_loop[k] <= 0.0)
+           for k in ("LagProbeInterval", "LagWarning")):
+        raise Exception("LagProbeInterval and LagWarning in EventLoop configuration should be positive numbers")
+
 
 class Application(object):
-    """Standard application setup."""
+    """Standard application setup.
+
+    The optional "EventLoop" section of the configuration selects the event
+    loop "Type" ("asyncio", the default, or "uvloop") and, if either
+    "LagProbeInterval" or "LagWarning" is given, starts a probe that measures
+    how late the event loop runs callbacks (see lag_probe.LagProbe).
+    """
 
     def __init__(self, name: str, config_validator: Optional[Callable] = None):
         """Initialise a new instance of the Application class."""
-        self.event_loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
+        self.lag_probe: Optional[LagProbe] = None
         self.logger = logging.getLogger("APP")
         self.name: str = name
 
-        # Turn on debugging if you're having trouble with the event loop
-        # self.event_loop.set_debug(True)
-
-        try:
-            self.event_loop.add_signal_handler(signal.SIGINT, self.on_signal, signal.SIGINT)
-            self.event_loop.add_signal_handler(signal.SIGTERM, self.on_signal, signal.SIGTERM)
-        except NotImplementedError:
-            # Signal handlers are only implemented on Unix
-            pass
-
+        # The configuration is read first because it determines the kind of event loop
         self.config = None
         config_path = pathlib.Path(name + ".json")
         if config_path.exists():
@@ -51,6 +67,7 @@ class Application(object):
                 self.config = json.load(config)
             if config_validator is not None and not config_validator(self.config):
                 raise Exception("configuration failed validation: %s" % config_path.resolve())
+            _validate_event_loop_config(self.config)
         elif config_validator is not None:
             raise Exception("configuration file does not exist: %s" % str(config_path))
 
@@ -61,6 +78,24 @@ class Application(object):
         if self.config is not None:
             self.logger.info("configuration=%s", json.dumps(self.config, separators=(',', ':')))
 
+        event_loop_config = self.config.get("EventLoop", {}) if type(self.config) is dict else {}
+        self.event_loop: asyncio.AbstractEventLoop = self.__new_event_loop(event_loop_config.get("Type", "asyncio"))
+        asyncio.set_event_loop(self.event_loop)
+
+        # Turn on debugging if you're having trouble with the event loop
+        # self.event_loop.set_debug(True)
+
+        try:
+            self.event_loop.add_signal_handler(signal.SIGINT, self.on_signal, signal.SIGINT)
+            self.event_loop.add_signal_handler(signal.SIGTERM, self.on_signal, signal.SIGTERM)
+        except NotImplementedError:
+            # Signal handlers are only implemented on Unix
+            pass
+
+        if "LagProbeInterval" in event_loop_config or "LagWarning" in event_loop_config:
+            self.lag_probe = LagProbe(self.event_loop, event_loop_config.get("LagProbeInterval", LAG_PROBE_INTERVAL),
+                                      event_loop_config.get("LagWarning"))
+
     def on_signal(self, signum: int) -> None:
         """Called when a signal is received."""
         sig_name = "SIGINT" if signum == signal.SIGINT else "SIGTERM"
@@ -71,14 +106,32 @@ class Application(object):
         """Start the application's event loop."""
         loop = self.event_loop
 
+        if self.lag_probe is not None:
+            self.lag_probe.start()
+
         try:
             loop.run_forever()
         except Exception as e:
             self.logger.error("application raised an exception:", exc_info=e)
             raise
         finally:
+            if self.lag_probe is not None:
+                self.lag_probe.stop()
+                self.logger.info("event loop lag statistics: %s", self.lag_probe.statistics())
             self.logger.info("closing event loop")
             try:
                 loop.run_until_complete(loop.shutdown_asyncgens())
             finally:
                 loop.close()
+
+    def __new_event_loop(self, loop_type: str) -> asyncio.AbstractEventLoop:
+        """Return a new event loop of the given type."""
+        if loop_type == "uvloop":
+            try:
+                import uvloop
+            except ImportError:
+                self.logger.warning("uvloop is not installed, so the default event loop will be used")
+            else:
+                self.logger.info("using uvloop version %s", uvloop.__version__)
+                return uvloop.new_event_loop()
+        return asyncio.new_event_loop()
@@ -17,22 +17,40 @@
 #     <https://www.gnu.org/licenses/>.
 import asyncio
 import logging
+import mmap
 
-from typing import List, Any, Optional, Dict
+from typing import List, Any, Optional, Dict, Tuple, Union
 
-from .messages import (AMEND_MESSAGE, AMEND_MESSAGE_SIZE, CANCEL_MESSAGE, CANCEL_MESSAGE_SIZE,
-                       ERROR_MESSAGE, ERROR_MESSAGE_SIZE, HEDGE_MESSAGE, HEDGE_MESSAGE_SIZE,
-                       HEDGE_FILLED_MESSAGE, HEDGE_FILLED_MESSAGE_SIZE, INSERT_MESSAGE, INSERT_MESSAGE_SIZE,
-                       LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, ORDER_BOOK_HEADER, ORDER_BOOK_HEADER_SIZE,
-                       ORDER_BOOK_MESSAGE_SIZE, BOOK_PART, ORDER_FILLED_MESSAGE, ORDER_FILLED_MESSAGE_SIZE,
-                       ORDER_STATUS_MESSAGE, ORDER_STATUS_MESSAGE_SIZE, TRADE_TICKS_HEADER,
-                       TRADE_TICKS_HEADER_SIZE, TRADE_TICKS_MESSAGE_SIZE, TICKS_PART,
-                       Connection, MessageType, Subscription)
-from .types import Lifespan, Side
+from .messages import (AMEND_MESSAGE, AMEND_MESSAGE_SIZE, BOOK_BODY, CANCEL_MESSAGE, CANCEL_MESSAGE_SIZE,
+                       DEEP_BOOK_HEADER, DEEP_BOOK_HEADER_SIZE, ERROR_MESSAGE, ERROR_MESSAGE_SIZE, HEADER, HEADER_SIZE,
+                       HEDGE_MESSAGE, HEDGE_MESSAGE_SIZE, HEDGE_V2_MESSAGE, HEDGE_V2_MESSAGE_SIZE, HEDGE_FILLED_MESSAGE,
+                       HEDGE_FILLED_MESSAGE_SIZE, INSERT_MESSAGE, INSERT_MESSAGE_SIZE, INSERT_V2_MESSAGE,
+                       INSERT_V2_MESSAGE_SIZE, LEVEL_CHANGE, LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, ORDER_BOOK_DELTA_HEADER,
+                       ORDER_BOOK_DELTA_HEADER_SIZE, ORDER_BOOK_MESSAGE_SIZE, ORDER_BOOK_SNAPSHOT_HEADER,
+                       ORDER_BOOK_SNAPSHOT_HEADER_SIZE, ORDER_EVENT, ORDER_FILLED_MESSAGE, ORDER_FILLED_MESSAGE_SIZE,
+                       ORDER_ID_MESSAGE, ORDER_ID_MESSAGE_SIZE, ORDER_STATUS_MESSAGE, ORDER_STATUS_MESSAGE_SIZE,
+                       TRADE_TICKS_MESSAGE_SIZE,
+                       Connection, MessageType, Subscription, deep_book_message_size, deep_book_part)
+from .book_builder import BookBuilder
+from .latency import LatencyRecorder
+from .mbo import MboBook
+from .order_book import TOP_LEVEL_COUNT
+from .trader_state import LocalBook, TraderState
+from .types import Instrument, Lifespan, Side
 
 
 class BaseAutoTrader(Connection, Subscription):
-    """Base class for an auto-trader."""
+    """Base class for an auto-trader.
+
+    The state attribute (see TraderState) is kept up to date with the best
+    levels of each order book, the auto-trader's orders and its positions
+    before each of the on_..._message methods is called.
+
+    If "RecordLatency" is true in the auto-trader's configuration, the
+    latency attribute records the time from the publication of each
+    information message to its receipt, the time taken to handle it and the
+    time from the latest receipt to each message sent to the exchange.
+    """
 
     # auto_trader = mod.AutoTrader(app.event_loop, app.config["TeamName"], app.config["Secret"])
     def __init__(self, loop: asyncio.AbstractEventLoop, team_name: str, secret: str):
@@ -41,7 +59,15 @@ class BaseAutoTrader(Connection, Subscription):
         Subscription.__init__(self)
 
         self.event_loop: asyncio.AbstractEventLoop = loop
+        self.delta_books: Dict[int, BookBuilder] = dict()
+        self.mbo_books: Dict[int, MboBook] = dict()
+        self.state: TraderState = TraderState()
+        self.__book_update_overridden: bool = (type(self).on_order_book_update_message
+                                               is not BaseAutoTrader.on_order_book_update_message)
+        self.__trade_ticks_overridden: bool = (type(self).on_trade_ticks_message
+                                               is not BaseAutoTrader.on_trade_ticks_message)
         self.logger = logging.getLogger("TRADER")
+        self.latency: Optional[LatencyRecorder] = None
         self.team_name: bytes = team_name.encode()
         self.secret: bytes = secret.encode()
         self.parameters = {}
@@ -52,11 +78,23 @@ class BaseAutoTrader(Connection, Subscription):
         Subscription.__init__(self)
 
         self.event_loop: asyncio.AbstractEventLoop = loop
+        self.delta_books: Dict[int, BookBuilder] = dict()
+        self.mbo_books: Dict[int, MboBook] = dict()
+        self.state: TraderState = TraderState()
+        self.__book_update_overridden: bool = (type(self).on_order_book_update_message
+                                               is not BaseAutoTrader.on_order_book_update_message)
+        self.__trade_ticks_overridden: bool = (type(self).on_trade_ticks_message
+                                               is not BaseAutoTrader.on_trade_ticks_message)
         self.logger = logging.getLogger("TRADER")
+        self.latency: Optional[LatencyRecorder] = LatencyRecorder() if config.get("RecordLatency", False) else None
         self.team_name: bytes = config["TeamName"].encode()
         self.secret: bytes = config["Secret"].encode()
         self.parameters: Dict = config["Parameters"]
 
+        # Messages go through the timing wrapper only when latency is being recorded
+        if self.latency is not None:
+            self.send_message = self.__send_message_timed
+
     def connection_made(self, transport: asyncio.BaseTransport) -> None:
         """Called twice, when the execution connection and the information channel are established."""
         if transport.get_extra_info("peername") is not None:
@@ -75,18 +113,130 @@ class BaseAutoTrader(Connection, Subscription):
             Connection.close(self)
         self.event_loop.stop()
 
+    def error_received(self, exc: Exception) -> None:
+        """Called when information messages have been lost.
+
+        Any of the lost messages may have been a delta or order events message
+        and the last message read may have been overwritten while it was
+        being read, so the rebuilt books wait for the next snapshot.
+        """
+        Subscription.error_received(self, exc)
+        for book in self.delta_books.values():
+            book.up_to_date = False
+        for mbo_book in self.mbo_books.values():
+            mbo_book.up_to_date = False
+
     def on_datagram(self, typ: int, data: bytes, start: int, length: int) -> None:
         """Called when an information message is received from the matching engine."""
+        # Order book and trade ticks messages are decoded with a single unpack, without copying the data, straight
+        # into the state's books. Stale messages are dropped without calling back. The lists of levels for the older
+        # callbacks are only made if they are overridden.
         if typ == MessageType.ORDER_BOOK_UPDATE and length == ORDER_BOOK_MESSAGE_SIZE:
-            inst, seq = ORDER_BOOK_HEADER.unpack_from(data, start)
-            self.on_order_book_update_message(inst, seq, *BOOK_PART.iter_unpack(data[ORDER_BOOK_HEADER_SIZE:]))
+            values = BOOK_BODY.unpack_from(data, start)
+            inst, seq = values[0], values[1]
+            book = self.state.book(inst)
+            if book.update_from(values):
+                self.on_local_order_book_update_message(inst, seq, book)
+                if self.__book_update_overridden:
+                    n = TOP_LEVEL_COUNT
+                    self.on_order_book_update_message(inst, seq, values[2:2 + n], values[2 + n:2 + 2 * n],
+                                                      values[2 + 2 * n:2 + 3 * n], values[2 + 3 * n:])
         elif typ == MessageType.TRADE_TICKS and length == TRADE_TICKS_MESSAGE_SIZE:
-            inst, seq = TRADE_TICKS_HEADER.unpack_from(data, start)
-            self.on_trade_ticks_message(inst, seq, *TICKS_PART.iter_unpack(data[TRADE_TICKS_HEADER_SIZE:]))
+            values = BOOK_BODY.unpack_from(data, start)
+            inst, seq = values[0], values[1]
+            book = self.state.book(inst)
+            if book.update_trades_from(values):
+                self.on_local_trade_ticks_message(inst, seq, book)
+                if self.__trade_ticks_overridden:
+                    n = TOP_LEVEL_COUNT
+                    self.on_trade_ticks_message(inst, seq, values[2:2 + n], values[2 + n:2 + 2 * n],
+                                                values[2 + 2 * n:2 + 3 * n], values[2 + 3 * n:])
+        elif ((typ == MessageType.DEEP_ORDER_BOOK_UPDATE or typ == MessageType.DEEP_TRADE_TICKS)
+              and length >= DEEP_BOOK_HEADER_SIZE):
+            inst, seq, depth = DEEP_BOOK_HEADER.unpack_from(data, start)
+            if length != deep_book_message_size(depth):
+                self.logger.error("received invalid information message: length=%d type=%d", length, typ)
+                self.event_loop.stop()
+                return
+            ask_prices, ask_volumes, bid_prices, bid_volumes = deep_book_part(depth).iter_unpack(
+                data[DEEP_BOOK_HEADER_SIZE:])
+            top = TOP_LEVEL_COUNT
+            if typ == MessageType.DEEP_ORDER_BOOK_UPDATE:
+                self.state.book(inst).update(seq, ask_prices[:top], ask_volumes[:top], bid_prices[:top],
+                                             bid_volumes[:top])
+                self.on_deep_order_book_update_message(inst, seq, ask_prices, ask_volumes, bid_prices, bid_volumes)
+            else:
+                self.state.book(inst).update_trades(seq, ask_prices[:top], ask_volumes[:top], bid_prices[:top],
+                                                    bid_volumes[:top])
+                self.on_deep_trade_ticks_message(inst, seq, ask_prices, ask_volumes, bid_prices, bid_volumes)
+        elif typ == MessageType.ORDER_BOOK_DELTA and length >= ORDER_BOOK_DELTA_HEADER_SIZE:
+            inst, seq, count = ORDER_BOOK_DELTA_HEADER.unpack_from(data, start)
+            if length != ORDER_BOOK_DELTA_HEADER_SIZE + count * LEVEL_CHANGE.size:
+                self.logger.error("received invalid information message: length=%d type=%d", length, typ)
+                self.event_loop.stop()
+                return
+            book = self.delta_books.get(inst)
+            if book is None:
+                book = self.delta_books[inst] = BookBuilder(inst)
+            was_up_to_date: bool = book.up_to_date
+            if book.apply_delta(seq, LEVEL_CHANGE.iter_unpack(data[ORDER_BOOK_DELTA_HEADER_SIZE:])):
+                self.on_order_book_delta_message(inst, seq, book)
+            elif was_up_to_date:
+                self.logger.warning("missed order book delta for instrument %d: sequence=%d expected=%d", inst, seq,
+                                    book.sequence_number + 1)
+        elif typ == MessageType.ORDER_BOOK_SNAPSHOT and length >= ORDER_BOOK_SNAPSHOT_HEADER_SIZE:
+            inst, seq, part, part_count, count = ORDER_BOOK_SNAPSHOT_HEADER.unpack_from(data, start)
+            if length != ORDER_BOOK_SNAPSHOT_HEADER_SIZE + count * LEVEL_CHANGE.size:
+                self.logger.error("received invalid information message: length=%d type=%d", length, typ)
+                self.event_loop.stop()
+                return
+            book = self.delta_books.get(inst)
+            if book is None:
+                book = self.delta_books[inst] = BookBuilder(inst)
+            if book.apply_snapshot(seq, part, part_count,
+                                   LEVEL_CHANGE.iter_unpack(data[ORDER_BOOK_SNAPSHOT_HEADER_SIZE:])):
+                self.on_order_book_delta_message(inst, book.sequence_number, book)
+        elif typ == MessageType.ORDER_EVENTS and length >= ORDER_BOOK_DELTA_HEADER_SIZE:
+            inst, seq, count = ORDER_BOOK_DELTA_HEADER.unpack_from(data, start)
+            if length != ORDER_BOOK_DELTA_HEADER_SIZE + count * ORDER_EVENT.size:
+                self.logger.error("received invalid information message: length=%d type=%d", length, typ)
+                self.event_loop.stop()
+                return
+            mbo_book = self.mbo_books.get(inst)
+            if mbo_book is None:
+                mbo_book = self.mbo_books[inst] = MboBook(inst)
+            was_up_to_date: bool = mbo_book.up_to_date
+            if mbo_book.apply_events(seq, ORDER_EVENT.iter_unpack(data[ORDER_BOOK_DELTA_HEADER_SIZE:])):
+                self.on_order_events_message(inst, seq, mbo_book)
+            elif was_up_to_date:
+                self.logger.warning("missed order events for instrument %d: sequence=%d expected=%d", inst, seq,
+                                    mbo_book.sequence_number + 1)
+        elif typ == MessageType.ORDER_EVENTS_SNAPSHOT and length >= ORDER_BOOK_SNAPSHOT_HEADER_SIZE:
+            inst, seq, part, part_count, count = ORDER_BOOK_SNAPSHOT_HEADER.unpack_from(data, start)
+            if length != ORDER_BOOK_SNAPSHOT_HEADER_SIZE + count * ORDER_EVENT.size:
+                self.logger.error("received invalid information message: length=%d type=%d", length, typ)
+                self.event_loop.stop()
+                return
+            mbo_book = self.mbo_books.get(inst)
+            if mbo_book is None:
+                mbo_book = self.mbo_books[inst] = MboBook(inst)
+            if mbo_book.apply_snapshot(seq, part, part_count,
+                                       ORDER_EVENT.iter_unpack(data[ORDER_BOOK_SNAPSHOT_HEADER_SIZE:])):
+                self.on_order_events_message(inst, mbo_book.sequence_number, mbo_book)
         else:
             self.logger.error("received invalid information message: length=%d type=%d", length, typ)
             self.event_loop.stop()
 
+    def frame_received(self, buffer: Union[mmap.mmap, memoryview], start: int, length: int,
+                       address: Tuple[str, int]) -> None:
+        """Called when an information message is received in place in shared memory."""
+        if length == ORDER_BOOK_MESSAGE_SIZE or length == TRADE_TICKS_MESSAGE_SIZE:
+            size, typ = HEADER.unpack_from(buffer, start)
+            if size == length and (typ == MessageType.ORDER_BOOK_UPDATE or typ == MessageType.TRADE_TICKS):
+                self.on_datagram(typ, buffer, start + HEADER_SIZE, length)
+                return
+        Subscription.frame_received(self, buffer, start, length, address)
+
     def on_hedge_filled_message(self, client_order_id: int, price: int, volume: int) -> None:
         """Called when one of your hedge orders is filled, partially or fully.
 
@@ -97,22 +247,90 @@ class BaseAutoTrader(Connection, Subscription):
 
     def on_message(self, typ: int, data: bytes, start: int, length: int) -> None:
         """Called when an execution message is received from the matching engine."""
+        # The state is updated before each callback but finished orders are only forgotten afterwards
         if typ == MessageType.ERROR and length == ERROR_MESSAGE_SIZE:
             client_order_id, error_message = ERROR_MESSAGE.unpack_from(data, start)
             self.on_error_message(client_order_id, error_message.rstrip(b"\x00"))
+            self.state.on_error(client_order_id)
         elif typ == MessageType.HEDGE_FILLED and length == HEDGE_FILLED_MESSAGE_SIZE:
-            self.on_hedge_filled_message(*HEDGE_FILLED_MESSAGE.unpack_from(data, start))
+            client_order_id, price, volume = HEDGE_FILLED_MESSAGE.unpack_from(data, start)
+            self.state.on_hedge_filled(client_order_id, price, volume)
+            self.on_hedge_filled_message(client_order_id, price, volume)
+            self.state.remove_finished(client_order_id)
         elif typ == MessageType.ORDER_FILLED and length == ORDER_FILLED_MESSAGE_SIZE:
-            self.on_order_filled_message(*ORDER_FILLED_MESSAGE.unpack_from(data, start))
+            client_order_id, price, volume = ORDER_FILLED_MESSAGE.unpack_from(data, start)
+            self.state.on_order_filled(client_order_id, price, volume)
+            self.on_order_filled_message(client_order_id, price, volume)
+        elif typ == MessageType.ORDER_ID and length == ORDER_ID_MESSAGE_SIZE:
+            self.state.on_order_id(*ORDER_ID_MESSAGE.unpack_from(data, start))
         elif typ == MessageType.ORDER_STATUS and length == ORDER_STATUS_MESSAGE_SIZE:
-            self.on_order_status_message(*ORDER_STATUS_MESSAGE.unpack_from(data, start))
+            client_order_id, fill_volume, remaining_volume, fees = ORDER_STATUS_MESSAGE.unpack_from(data, start)
+            self.state.on_order_status(client_order_id, fill_volume, remaining_volume, fees)
+            self.on_order_status_message(client_order_id, fill_volume, remaining_volume, fees)
+            self.state.remove_finished(client_order_id)
         else:
             self.logger.error("received invalid execution message: length=%d type=%d", length, typ)
             self.event_loop.stop()
 
+    def on_deep_order_book_update_message(self, instrument: int, sequence_number: int, ask_prices: List[int],
+                                          ask_volumes: List[int], bid_prices: List[int],
+                                          bid_volumes: List[int]) -> None:
+        """Called periodically to report the status of the order book when
+        subscribed to the deep information feed.
+
+        This is the same as on_order_book_update_message except that the
+        number of levels reported is set by the exchange's "Depth" setting.
+        By default the best five levels are passed on to
+        on_order_book_update_message.
+        """
+        self.on_order_book_update_message(instrument, sequence_number, ask_prices[:TOP_LEVEL_COUNT],
+                                          ask_volumes[:TOP_LEVEL_COUNT], bid_prices[:TOP_LEVEL_COUNT],
+                                          bid_volumes[:TOP_LEVEL_COUNT])
+
+    def on_deep_trade_ticks_message(self, instrument: int, sequence_number: int, ask_prices: List[int],
+                                    ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
+        """Called when there is trading activity on the market when
+        subscribed to the deep information feed.
+
+        This is the same as on_trade_ticks_message except that the number of
+        levels reported is set by the exchange's "Depth" setting. By default
+        the best five levels are passed on to on_trade_ticks_message.
+        """
+        self.on_trade_ticks_message(instrument, sequence_number, ask_prices[:TOP_LEVEL_COUNT],
+                                    ask_volumes[:TOP_LEVEL_COUNT], bid_prices[:TOP_LEVEL_COUNT],
+                                    bid_volumes[:TOP_LEVEL_COUNT])
+
     def on_error_message(self, client_order_id: int, error_message: bytes):
         """Called when the matching engine detects an error."""
 
+    def on_order_book_delta_message(self, instrument: int, sequence_number: int, book: BookBuilder) -> None:
+        """Called when an order book changes when subscribed to the delta
+        information feed.
+
+        The book holds the total volume at every price level of the
+        instrument's order book; book.top_levels() returns the best levels in
+        the same form as on_order_book_update_message. If a message is
+        missed, this is not called for that instrument again until the book
+        has been rebuilt from the next snapshot.
+        """
+
+    def on_local_order_book_update_message(self, instrument: int, sequence_number: int, book: LocalBook) -> None:
+        """Called periodically to report the status of the order book.
+
+        This is called just before on_order_book_update_message with the
+        instrument's book in the state attribute, which has just been updated
+        in place. Using this rather than on_order_book_update_message avoids
+        making new lists of prices and volumes for every message.
+        """
+
+    def on_local_trade_ticks_message(self, instrument: int, sequence_number: int, book: LocalBook) -> None:
+        """Called when there is trading activity on the market.
+
+        This is called just before on_trade_ticks_message with the
+        instrument's book in the state attribute, whose traded_... lists have
+        just been updated in place.
+        """
+
     def on_order_book_update_message(self, instrument: int, sequence_number: int, ask_prices: List[int],
                                      ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
         """Called periodically to report the status of the order book.
@@ -125,6 +343,18 @@ class BaseAutoTrader(Connection, Subscription):
         there are always five entries in each list.
         """
 
+    def on_order_events_message(self, instrument: int, sequence_number: int, book: MboBook) -> None:
+        """Called when orders in an order book change when subscribed to the
+        order events information feed.
+
+        The book holds every order in the instrument's order book by price
+        level in order of priority; book.queue_position() gives the number
+        of orders and volume ahead of an order and the queue_position method
+        of this class does the same for one of your own orders. If a message
+        is missed, this is not called for that instrument again until the
+        book has been rebuilt from the next snapshot.
+        """
+
     def on_order_filled_message(self, client_order_id: int, price: int, volume: int) -> None:
         """Called when one of your orders is filled, partially or fully.
 
@@ -155,6 +385,29 @@ class BaseAutoTrader(Connection, Subscription):
         lists on that side so that there are always five entries in each list.
         """
 
+    def queue_position(self, client_order_id: int) -> Optional[Tuple[int, int]]:
+        """Return the number of orders and the volume ahead of one of your
+        orders in its price level, or None if that is not known.
+
+        The exchange sends the id of each of your orders in the order events
+        feed when the order is placed in the order book, so this only works
+        for good-for-day orders while subscribed to that feed and while the
+        instrument's book is up to date.
+        """
+        order = self.state.orders.get(client_order_id)
+        if order is None or not order.order_id:
+            return None
+        book: Optional[MboBook] = self.mbo_books.get(order.instrument)
+        if book is None or not book.up_to_date:
+            return None
+        return book.queue_position(order.order_id)
+
+    def __send_message_timed(self, typ: int, data: bytes, length: int) -> None:
+        """Send a message, recording the time since information was last received."""
+        if self.latency.last_receive:
+            self.latency.record("send", self.latency.last_receive)
+        Connection.send_message(self, typ, data, length)
+
     def send_amend_order(self, client_order_id: int, volume: int) -> None:
         """Amend the specified order with an updated volume.
 
@@ -173,14 +426,28 @@ class BaseAutoTrader(Connection, Subscription):
         """
         self.send_message(MessageType.CANCEL_ORDER, CANCEL_MESSAGE.pack(client_order_id), CANCEL_MESSAGE_SIZE)
 
-    def send_hedge_order(self, client_order_id: int, side: Side, price: int, volume: int) -> None:
+    def send_hedge_order(self, client_order_id: int, side: Side, price: int, volume: int,
+                         instrument: int = Instrument.FUTURE) -> None:
         """Order lots in the future to hedge a position."""
-        self.send_message(MessageType.HEDGE_ORDER,
-                          HEDGE_MESSAGE.pack(client_order_id, side, price, volume),
-                          HEDGE_MESSAGE_SIZE)
+        self.state.on_hedge(client_order_id, instrument, side, price, volume)
+        if instrument == Instrument.FUTURE:
+            self.send_message(MessageType.HEDGE_ORDER,
+                              HEDGE_MESSAGE.pack(client_order_id, side, price, volume),
+                              HEDGE_MESSAGE_SIZE)
+        else:
+            self.send_message(MessageType.HEDGE_ORDER_V2,
+                              HEDGE_V2_MESSAGE.pack(client_order_id, instrument, side, price, volume),
+                              HEDGE_V2_MESSAGE_SIZE)
 
-    def send_insert_order(self, client_order_id: int, side: Side, price: int, volume: int, lifespan: Lifespan) -> None:
+    def send_insert_order(self, client_order_id: int, side: Side, price: int, volume: int, lifespan: Lifespan,
+                          instrument: int = Instrument.ETF) -> None:
         """Insert a new order into the market."""
-        self.send_message(MessageType.INSERT_ORDER,
-                          INSERT_MESSAGE.pack(client_order_id, side, price, volume, lifespan),
-                          INSERT_MESSAGE_SIZE)
+        self.state.on_insert(client_order_id, instrument, side, price, volume, lifespan)
+        if instrument == Instrument.ETF:
+            self.send_message(MessageType.INSERT_ORDER,
+                              INSERT_MESSAGE.pack(client_order_id, side, price, volume, lifespan),
+                              INSERT_MESSAGE_SIZE)
+        else:
+            self.send_message(MessageType.INSERT_ORDER_V2,
+                              INSERT_V2_MESSAGE.pack(client_order_id, instrument, side, price, volume, lifespan),
+                              INSERT_V2_MESSAGE_SIZE)
@@ -0,0 +1,137 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import heapq
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .order_book import TOP_LEVEL_COUNT
+from .types import Side
+
+
+class BookBuilder:
+    """An order book built from order book delta and snapshot messages.
+
+    The book starts empty and up to date, as the exchange's order books are
+    before the market opens. If a delta message is missed, the book is out
+    of date until the next complete snapshot arrives. The parts of a
+    snapshot may be spread out, so delta messages that arrive after its
+    first part are kept and applied once it is complete.
+    """
+
+    def __init__(self, instrument: int):
+        """Initialise a new instance of the BookBuilder class."""
+        self.ask_volumes: Dict[int, int] = dict()
+        self.bid_volumes: Dict[int, int] = dict()
+        self.instrument: int = instrument
+        self.sequence_number: int = 0
+        self.up_to_date: bool = True
+
+        self.__pending: List[Tuple[int, List[Tuple[int, int, int]]]] = list()
+        self.__snapshot: List[Tuple[int, int, int]] = list()
+        self.__snapshot_next_part: int = -1
+        self.__snapshot_sequence_number: int = 0
+
+    def apply_delta(self, sequence_number: int, changes: Iterable[Tuple[int, int, int]]) -> bool:
+        """Apply the (side, price, volume) level changes from a delta message.
+
+        Return True if the book is up to date afterwards.
+        """
+        if not self.up_to_date:
+            if self.__snapshot_next_part > 0 and sequence_number > self.__snapshot_sequence_number:
+                self.__pending.append((sequence_number, list(changes)))
+            return False
+
+        if sequence_number != self.sequence_number + 1:
+            self.up_to_date = False
+            return False
+
+        for side, price, volume in changes:
+            self.__set_level(side, price, volume)
+        self.sequence_number = sequence_number
+        return True
+
+    def apply_snapshot(self, sequence_number: int, part: int, part_count: int,
+                       levels: Iterable[Tuple[int, int, int]]) -> bool:
+        """Apply one part of a snapshot message.
+
+        Return True if the book was brought up to date by the last part of
+        the snapshot and the delta messages kept since its first part.
+        """
+        # A snapshot of a book that is already up to date tells us nothing new, unless it is ahead of the book
+        if self.up_to_date:
+            if sequence_number <= self.sequence_number:
+                return False
+            self.up_to_date = False
+
+        if part == 0:
+            self.__pending.clear()
+            self.__snapshot.clear()
+            self.__snapshot_next_part = 0
+            self.__snapshot_sequence_number = sequence_number
+        elif part != self.__snapshot_next_part or sequence_number != self.__snapshot_sequence_number:
+            self.__pending.clear()
+            self.__snapshot_next_part = -1  # Ignore the rest of this snapshot
+            return False
+
+        self.__snapshot.extend(levels)
+        self.__snapshot_next_part += 1
+        if self.__snapshot_next_part != part_count:
+            return False
+
+        self.__snapshot_next_part = -1
+        self.ask_volumes.clear()
+        self.bid_volumes.clear()
+        for side, price, volume in self.__snapshot:
+            self.__set_level(side, price, volume)
+        self.sequence_number = sequence_number
+        self.up_to_date = True
+
+        for sequence_number, changes in self.__pending:
+            if not self.apply_delta(sequence_number, changes):
+                break
+        self.__pending.clear()
+        return self.up_to_date
+
+    def best_ask(self) -> Optional[int]:
+        """Return the best ask price, or None if there are no asks."""
+        return min(self.ask_volumes) if self.ask_volumes else None
+
+    def best_bid(self) -> Optional[int]:
+        """Return the best bid price, or None if there are no bids."""
+        return max(self.bid_volumes) if self.bid_volumes else None
+
+    def top_levels(self, depth: int = TOP_LEVEL_COUNT) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """Return the ask prices, ask volumes, bid prices and bid volumes of
+        the given number of best levels, padded with zeros like the lists
+        passed to on_order_book_update_message.
+        """
+        ask_prices = heapq.nsmallest(depth, self.ask_volumes)
+        bid_prices = heapq.nlargest(depth, self.bid_volumes)
+        ask_volumes = [self.ask_volumes[p] for p in ask_prices]
+        bid_volumes = [self.bid_volumes[p] for p in bid_prices]
+        ask_padding = [0] * (depth - len(ask_prices))
+        bid_padding = [0] * (depth - len(bid_prices))
+        return ask_prices + ask_padding, ask_volumes + ask_padding, bid_prices + bid_padding, bid_volumes + bid_padding
+
+    def __set_level(self, side: int, price: int, volume: int) -> None:
+        """Set the total volume at the given price level."""
+        volumes = self.ask_volumes if side == Side.SELL else self.bid_volumes
+        if volume:
+            volumes[price] = volume
+        else:
+            volumes.pop(price, None)
@@ -15,37 +15,60 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-import bisect
+import functools
+import itertools
 import logging
 
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
 
 from .account import AccountFactory, CompetitorAccount
+from .latency import LatencyRecorder
 from .match_events import MatchEvents
+from .metrics import Metric, MetricsRegistry
 from .order_book import IOrderListener, Order, OrderBook, MINIMUM_BID, MAXIMUM_ASK
 from .score_board import ScoreBoardWriter
 from .timer import Timer
-from .types import ICompetitor, IController, IExecutionConnection, Instrument, Lifespan, Side
+from .types import ICompetitor, IController, IExecutionConnection, Instrument, Lifespan, Side, instrument_pair
 from .unhedged_lots import UnhedgedLots, UnhedgedLotsFactory
 
 
+# Values accepted for the side and lifespan of an insert message
+VALID_LIFESPANS = frozenset((Lifespan.FILL_AND_KILL, Lifespan.GOOD_FOR_DAY))
+VALID_SIDES = frozenset((Side.BUY, Side.SELL))
+
+
 class Competitor(ICompetitor, IOrderListener):
-    """A competitor in the Ready Trader Go competition."""
+    """A competitor in the Ready Trader Go competition.
+
+    Order books are keyed by instrument id (see types.Instrument). Orders may
+    be inserted in the ETF, and hedges placed in the future, of any ETF/future
+    pair; the position limit and unhedged lots are applied to each pair
+    separately.
+    """
 
-    def __init__(self, name: str, exec_channel: IExecutionConnection, etf_book: OrderBook, future_book: OrderBook,
+    def __init__(self, name: str, exec_channel: IExecutionConnection, books: Dict[int, OrderBook],
                  account: CompetitorAccount, match_events: MatchEvents, score_board: ScoreBoardWriter,
                  position_limit: int, order_count_limit: int, active_volume_limit: int, tick_size: float,
-                 unhedged_lots_factory: UnhedgedLotsFactory, controller: IController):
+                 unhedged_lots_factory: UnhedgedLotsFactory, controller: IController,
+                 latency: Optional[LatencyRecorder] = None, metrics: Optional[MetricsRegistry] = None):
         """Initialise a new instance of the Competitor class."""
         self.account: CompetitorAccount = account
         self.active_volume: int = 0
         self.active_volume_limit: int = active_volume_limit
+        self.books: Dict[int, OrderBook] = books
         self.controller: IController = controller
-        self.etf_book: OrderBook = etf_book
-        self.future_book: OrderBook = future_book
-        self.buy_prices: List[int] = list()
+        self.etf_book: OrderBook = books[Instrument.ETF]
+        self.etf_instruments: FrozenSet[int] = frozenset(i for i in books if i & 1)
+        self.future_book: OrderBook = books[Instrument.FUTURE]
+        self.future_instruments: FrozenSet[int] = frozenset(i for i in books if not i & 1)
+        self.best_asks: List[int] = [MAXIMUM_ASK + 1] * len(books)
+        self.best_bids: List[int] = [MINIMUM_BID - 1] * len(books)
+        self.buy_price_counts: List[Dict[int, int]] = [dict() for _ in books]
+        self.buy_prices: List[List[int]] = [list() for _ in books]
         self.exec_connection: IExecutionConnection = exec_channel
         self.last_client_order_id: int = -1
+        self.latency: Optional[LatencyRecorder] = latency
         self.logger: logging.Logger = logging.getLogger("COMPETITOR")
         self.match_events: MatchEvents = match_events
         self.order_count_limit: int = order_count_limit
@@ -53,10 +76,34 @@ class Competitor(ICompetitor, IOrderListener):
         self.orders: Dict[int, Order] = dict()
         self.position_limit: int = position_limit
         self.score_board: ScoreBoardWriter = score_board
-        self.sell_prices: List[int] = list()
+        self.sell_price_counts: List[Dict[int, int]] = [dict() for _ in books]
+        self.sell_prices: List[List[int]] = [list() for _ in books]
         self.status: str = "OK"
         self.tick_size: int = int(tick_size * 100.0)  # convert tick size to cents
-        self.unhedged_etf_lots: UnhedgedLots = unhedged_lots_factory.create(self.on_unhedged_lots_expiry)
+        # Membership of a range is a constant-time test of both the price limits and the tick size
+        self.valid_prices: range = range(-(-MINIMUM_BID // self.tick_size) * self.tick_size, MAXIMUM_ASK + 1,
+                                         self.tick_size)
+        self.unhedged_lots: List[UnhedgedLots] = [
+            unhedged_lots_factory.create(functools.partial(self.on_unhedged_lots_expiry, pair=pair))
+            for pair in range(len(books) // 2)]
+        self.unhedged_etf_lots: UnhedgedLots = self.unhedged_lots[0]
+
+        if metrics is None:
+            metrics = MetricsRegistry()
+        team: Dict[str, str] = {"team": name}
+        self.breach_count: Metric = metrics.counter("rtg_breaches_total", "Hard breaches by each competitor", team)
+        self.error_count: Metric = metrics.counter("rtg_errors_total", "Error messages sent to each competitor", team)
+        self.fill_count: Metric = metrics.counter("rtg_fills_total", "Order fills for each competitor", team)
+        self.insert_count: Metric = metrics.counter("rtg_orders_inserted_total", "Orders inserted by each competitor",
+                                                    team)
+        metrics.gauge("rtg_active_orders", "Active orders of each competitor", team, lambda: len(self.orders))
+        metrics.gauge("rtg_active_volume", "Active order volume of each competitor", team, lambda: self.active_volume)
+        metrics.gauge("rtg_profit_or_loss_cents", "Profit or loss of each competitor at the last tick", team,
+                      lambda: self.account.profit_or_loss)
+        for instrument in books:
+            metrics.gauge("rtg_position", "Position of each competitor in each instrument",
+                          {"team": name, "instrument": str(instrument)},
+                          functools.partial(self.account.positions.__getitem__, instrument))
 
     def disconnect(self, now: float) -> None:
         """Disconnect this competitor."""
@@ -67,6 +114,7 @@ class Competitor(ICompetitor, IOrderListener):
     def hard_breach(self, now: float, client_order_id: int, message: bytes) -> None:
         """Handle a hard breach by this competitor."""
         self.status = "BREACH"
+        self.breach_count.value += 1
         self.score_board.breach(now, self.name, self.account, self.etf_book.last_traded_price(),
                                 self.future_book.last_traded_price())
         if self.exec_connection is not None:
@@ -78,7 +126,7 @@ class Competitor(ICompetitor, IOrderListener):
         self.score_board.disconnect(now, self.name, self.account, self.etf_book.last_traded_price(),
                                     self.future_book.last_traded_price())
         for o in tuple(self.orders.values()):
-            self.etf_book.cancel(now, o)
+            self.books[o.instrument].cancel(now, o)
 
     # IOrderListener callbacks
     def on_order_amended(self, now: float, order: Order, volume_removed: int) -> None:
@@ -91,11 +139,7 @@ class Competitor(ICompetitor, IOrderListener):
         self.active_volume -= volume_removed
 
         if order.remaining_volume == 0:
-            del self.orders[order.client_order_id]
-            if order.side == Side.BUY:
-                self.buy_prices.pop(bisect.bisect(self.buy_prices, order.price) - 1)
-            else:
-                self.sell_prices.pop(bisect.bisect(self.sell_prices, -order.price) - 1)
+            self.remove_order(order)
 
     def on_order_cancelled(self, now: float, order: Order, volume_removed: int) -> None:
         """Called when an order is cancelled."""
@@ -106,51 +150,55 @@ class Competitor(ICompetitor, IOrderListener):
 
         self.active_volume -= volume_removed
 
-        del self.orders[order.client_order_id]
-        if order.side == Side.BUY:
-            self.buy_prices.pop(bisect.bisect(self.buy_prices, order.price) - 1)
-        else:
-            self.sell_prices.pop(bisect.bisect(self.sell_prices, -order.price) - 1)
+        self.remove_order(order)
 
     def on_order_placed(self, now: float, order: Order) -> None:
         """Called when a good-for-day order is placed in the order book."""
+        if self.exec_connection is None:
+            return
+
+        # The order events feed, if there is one, has just given the order an id that the auto-trader needs in
+        # order to find the order in the market-by-order book
+        if order.order_id:
+            self.exec_connection.send_order_id(order.client_order_id, order.order_id)
+
         # Only send an order status if the order has not partially filled
-        if order.volume == order.remaining_volume and self.exec_connection is not None:
+        if order.volume == order.remaining_volume:
             self.exec_connection.send_order_status(order.client_order_id, 0, order.remaining_volume, order.total_fees)
 
     def on_order_filled(self, now: float, order: Order, price: int, volume: int, fee: int) -> None:
         """Called when an order is partially or completely filled."""
+        self.fill_count.value += 1
         self.active_volume -= volume
 
         if order.remaining_volume == 0:
-            del self.orders[order.client_order_id]
-            if order.side == Side.BUY:
-                self.buy_prices.pop()
-            else:
-                self.sell_prices.pop()
+            self.remove_order(order)
 
-        self.unhedged_etf_lots.apply_position_delta(volume if order.side == Side.BUY else -volume)
+        pair: int = instrument_pair(order.instrument)
+        self.unhedged_lots[pair].apply_position_delta(now, volume if order.side == Side.BUY else -volume)
 
         self.match_events.fill(now, self.name, order.client_order_id, order.instrument, order.side, price, volume, fee)
-        last_traded: int = self.future_book.last_traded_price() or round(self.future_book.midpoint_price())
-        self.account.transact(Instrument.ETF, order.side, price, volume, fee)
-        self.account.update(last_traded, price)
+        future_book: OrderBook = self.books[order.instrument - 1]
+        last_traded: int = future_book.last_traded_price() or round(future_book.midpoint_price())
+        self.account.transact(order.instrument, order.side, price, volume, fee)
+        self.account.update(last_traded, price, pair)
 
         if self.exec_connection is not None:
             self.exec_connection.send_order_filled(order.client_order_id, price, volume)
             self.exec_connection.send_order_status(order.client_order_id, order.volume - order.remaining_volume,
                                                    order.remaining_volume, order.total_fees)
+            if self.latency is not None and self.latency.last_event:
+                self.latency.record("fill", self.latency.last_event)
 
-        if not (-self.position_limit <= self.account.etf_position <= self.position_limit):
+        if not (-self.position_limit <= self.account.positions[order.instrument] <= self.position_limit):
             self.hard_breach(now, order.client_order_id, b"ETF position limit breached")
 
-    def on_unhedged_lots_expiry(self):
+    def on_unhedged_lots_expiry(self, now: float, pair: int = 0):
         """Called when unhedged lots have been held for too long."""
-        self.logger.info("Unhedged lots timer expired for %s at etf=%d fut=%d rel=%d", self.name,
-                         self.account.etf_position, self.account.future_position,
-                         self.unhedged_etf_lots.relative_position)
+        self.logger.info("Unhedged lots timer expired for %s at pair=%d etf=%d fut=%d rel=%d", self.name, pair,
+                         self.account.positions[2 * pair + 1], self.account.positions[2 * pair],
+                         self.unhedged_lots[pair].relative_position)
 
-        now: float = self.controller.advance_time()
         self.hard_breach(now, 0, b"held unhedged lots for longer than the time limit")
 
     # Message callbacks
@@ -165,7 +213,7 @@ class Competitor(ICompetitor, IOrderListener):
             if volume > order.volume:
                 self.send_error(now, client_order_id, b"amend operation would increase order volume")
             else:
-                self.etf_book.amend(now, order, volume)
+                self.books[order.instrument].amend(now, order, volume)
 
     def on_cancel_message(self, now: float, client_order_id: int) -> None:
         """Called when a cancel order request is received from the competitor."""
@@ -174,9 +222,11 @@ class Competitor(ICompetitor, IOrderListener):
             return
 
         if client_order_id in self.orders:
-            self.etf_book.cancel(now, self.orders[client_order_id])
+            order = self.orders[client_order_id]
+            self.books[order.instrument].cancel(now, order)
 
-    def on_hedge_message(self, now: float, client_order_id: int, side: int, price: int, volume: int) -> None:
+    def on_hedge_message(self, now: float, client_order_id: int, side: int, price: int, volume: int,
+                         instrument: int = Instrument.FUTURE) -> None:
         """Called when a hedge order request is received from the competitor."""
         if client_order_id <= self.last_client_order_id:
             self.send_error(now, client_order_id, b"duplicate or out-of-order client_order_id")
@@ -184,6 +234,10 @@ class Competitor(ICompetitor, IOrderListener):
 
         self.last_client_order_id = client_order_id
 
+        if instrument not in self.future_instruments:
+            self.send_error(now, client_order_id, b"%d is not a valid instrument" % instrument)
+            return
+
         if side != Side.BUY and side != Side.SELL:
             self.send_error(now, client_order_id, b"%d is not a valid side" % side)
             return
@@ -205,12 +259,13 @@ class Competitor(ICompetitor, IOrderListener):
             return
 
         side_: Side = Side(side)
-        volume_traded, average_price = self.future_book.try_trade(side_, price, volume)
+        future_book: OrderBook = self.books[instrument]
+        volume_traded, average_price = future_book.try_trade(side_, price, volume)
         if volume_traded == 0:
             # The trade could have failed because there were no orders on the opposite side
-            best: Optional[int] = self.future_book.best_ask() if side_ == Side.BID else self.future_book.best_bid()
+            best: Optional[int] = future_book.best_ask() if side_ == Side.BID else future_book.best_bid()
             if best is None:
-                last_traded = self.future_book.last_traded_price()
+                last_traded = future_book.last_traded_price()
                 if last_traded is None:
                     self.send_error(now, client_order_id, b"order rejected: cannot determine future price")
                     return
@@ -222,28 +277,82 @@ class Competitor(ICompetitor, IOrderListener):
                 self.exec_connection.send_hedge_filled(client_order_id, 0, 0)
             return
 
-        self.unhedged_etf_lots.apply_position_delta(volume if side_ == Side.BID else -volume)
-        self.match_events.hedge(now, self.name, client_order_id, Instrument.FUTURE, side_, average_price,
-                                volume)
-        self.account.transact(Instrument.FUTURE, side_, average_price, volume, 0)
-        self.account.update(self.future_book.last_traded_price() or self.future_book.midpoint_price(),
-                            self.etf_book.last_traded_price() or self.etf_book.midpoint_price())
+        pair: int = instrument_pair(instrument)
+        etf_book: OrderBook = self.books[instrument + 1]
+        self.unhedged_lots[pair].apply_position_delta(now, volume if side_ == Side.BID else -volume)
+        self.match_events.hedge(now, self.name, client_order_id, instrument, side_, average_price, volume)
+        self.account.transact(instrument, side_, average_price, volume, 0)
+        self.account.update(future_book.last_traded_price() or future_book.midpoint_price(),
+                            etf_book.last_traded_price() or etf_book.midpoint_price(), pair)
 
         if self.exec_connection is not None:
             self.exec_connection.send_hedge_filled(client_order_id, average_price, volume)
 
-        if not (-self.position_limit <= self.account.future_position <= self.position_limit):
+        if not (-self.position_limit <= self.account.positions[instrument] <= self.position_limit):
             self.hard_breach(now, client_order_id, b"future position limit breached")
 
     def on_insert_message(self, now: float, client_order_id: int, side: int, price: int, volume: int,
-                          lifespan: int) -> None:
+                          lifespan: int, instrument: int = Instrument.ETF) -> None:
         """Called when an insert order request is received from the competitor."""
+        # Check everything at once for the common case of a valid order
+        if (client_order_id > self.last_client_order_id and instrument in self.etf_instruments
+                and side in VALID_SIDES and lifespan in VALID_LIFESPANS and price in self.valid_prices
+                and len(self.orders) < self.order_count_limit and volume >= 1
+                and self.active_volume + volume <= self.active_volume_limit and now != 0.0
+                and (price < self.best_asks[instrument] if side == Side.BUY else price > self.best_bids[instrument])):
+            self.last_client_order_id = client_order_id
+            order = self.orders[client_order_id] = Order(client_order_id, instrument, Lifespan(lifespan),
+                                                         Side(side), price, volume, self)
+            if side == Side.BUY:
+                counts = self.buy_price_counts[instrument]
+                if price in counts:
+                    counts[price] += 1
+                else:
+                    counts[price] = 1
+                    insort(self.buy_prices[instrument], price)
+                    if price > self.best_bids[instrument]:
+                        self.best_bids[instrument] = price
+            else:
+                counts = self.sell_price_counts[instrument]
+                if price in counts:
+                    counts[price] += 1
+                else:
+                    counts[price] = 1
+                    insort(self.sell_prices[instrument], -price)
+                    if price < self.best_asks[instrument]:
+                        self.best_asks[instrument] = price
+            self.match_events.insert(now, self.name, order.client_order_id, order.instrument, order.side,
+                                     order.volume, order.price, order.lifespan)
+            self.active_volume += volume
+            self.insert_count.value += 1
+            self.books[instrument].insert(now, order)
+            return
+
+        self.reject_insert_message(now, client_order_id, side, price, volume, lifespan, instrument)
+
+    def on_timer_tick(self, now: float, prices: List[Optional[int]]) -> None:
+        """Called on each timer tick to update the auto-trader.
+
+        The last traded prices are indexed by instrument id.
+        """
+        self.account.update_prices(prices)
+        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.account.etf_position, self.account.future_position))
+        self.score_board.tick(now, self.name, self.account, prices[Instrument.ETF], prices[Instrument.FUTURE],
+                              self.status)
+
+    def reject_insert_message(self, now: float, client_order_id: int, side: int, price: int, volume: int,
+                              lifespan: int, instrument: int = Instrument.ETF) -> None:
+        """Send the error message for the first check an insert order request fails."""
         if client_order_id <= self.last_client_order_id:
             self.send_error(now, client_order_id, b"duplicate or out-of-order client_order_id")
             return
 
         self.last_client_order_id = client_order_id
 
+        if instrument not in self.etf_instruments:
+            self.send_error(now, client_order_id, b"%d is not a valid instrument" % instrument)
+            return
+
         if side != Side.BUY and side != Side.SELL:
             self.send_error(now, client_order_id, b"%d is not a valid side" % side)
             return
@@ -265,7 +374,7 @@ class Competitor(ICompetitor, IOrderListener):
             return
 
         if volume < 1:
-            self.send_error(now, client_order_id, b"%d is not a valid volume")
+            self.send_error(now, client_order_id, b"%d is not a valid volume" % volume)
             return
 
         if self.active_volume + volume > self.active_volume_limit:
@@ -276,30 +385,46 @@ class Competitor(ICompetitor, IOrderListener):
             self.send_error(now, client_order_id, b"order rejected: market not yet open")
             return
 
-        if ((side == Side.BUY and self.sell_prices and price >= -self.sell_prices[-1])
-                or (side == Side.SELL and self.buy_prices and price <= self.buy_prices[-1])):
-            self.send_error(now, client_order_id, b"order rejected: in cross with an existing order")
-            return
+        self.send_error(now, client_order_id, b"order rejected: in cross with an existing order")
 
-        order = self.orders[client_order_id] = Order(client_order_id, Instrument.ETF, Lifespan(lifespan), Side(side),
-                                                     price, volume, self)
-        if side == Side.BUY:
-            bisect.insort(self.buy_prices, price)
+    def remove_order(self, order: Order) -> None:
+        """Forget an order that is no longer in the order book.
+
+        The distinct prices of this competitor's orders are kept sorted with
+        the best price last (ask prices are negated), so when the last order
+        at the best price goes the next best price is at the end of the list.
+        """
+        del self.orders[order.client_order_id]
+        instrument: int = order.instrument
+        price: int = order.price
+        if order.side == Side.BUY:
+            counts = self.buy_price_counts[instrument]
+            if counts[price] == 1:
+                del counts[price]
+                prices = self.buy_prices[instrument]
+                if price == self.best_bids[instrument]:
+                    prices.pop()
+                    self.best_bids[instrument] = prices[-1] if prices else MINIMUM_BID - 1
+                else:
+                    del prices[bisect_left(prices, price)]
+            else:
+                counts[price] -= 1
         else:
-            bisect.insort(self.sell_prices, -price)
-        self.match_events.insert(now, self.name, order.client_order_id, order.instrument, order.side, order.volume,
-                                 order.price, order.lifespan)
-        self.active_volume += volume
-        self.etf_book.insert(now, order)
-
-    def on_timer_tick(self, now: float, future_price: int, etf_price: int) -> None:
-        """Called on each timer tick to update the auto-trader."""
-        self.account.update(future_price or 0, etf_price or 0)
-        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.account.etf_position, self.account.future_position))
-        self.score_board.tick(now, self.name, self.account, etf_price, future_price, self.status)
+            counts = self.sell_price_counts[instrument]
+            if counts[price] == 1:
+                del counts[price]
+                prices = self.sell_prices[instrument]
+                if price == self.best_asks[instrument]:
+                    prices.pop()
+                    self.best_asks[instrument] = -prices[-1] if prices else MAXIMUM_ASK + 1
+                else:
+                    del prices[bisect_left(prices, -price)]
+            else:
+                counts[price] -= 1
 
     def send_error(self, now: float, client_order_id: int, message: bytes) -> None:
         """Send an error message to the auto-trader and shut down the match."""
+        self.error_count.value += 1
         self.exec_connection.send_error(client_order_id, message)
         self.logger.info("'%s' sent error message: time=%.6f client_order_id=%s message='%s'", self.name, now,
                          client_order_id, message.decode())
@@ -315,21 +440,32 @@ class CompetitorManager:
     """A manager of competitors."""
 
     def __init__(self, limits_config: Dict[str, Any], traders_config: Dict[str, str], account_factory: AccountFactory,
-                 etf_book: OrderBook, future_book: OrderBook, match_events: MatchEvents,
+                 books: Dict[int, OrderBook], match_events: MatchEvents,
                  score_board_writer: ScoreBoardWriter, tick_size: float, timer: Timer,
-                 unhedged_lots_factory: UnhedgedLotsFactory):
-        """Initialise a new instance of the CompetitorManager class."""
+                 unhedged_lots_factory: UnhedgedLotsFactory, tick_split: int = 1,
+                 latency: Optional[LatencyRecorder] = None, metrics: Optional[MetricsRegistry] = None):
+        """Initialise a new instance of the CompetitorManager class.
+
+        If tick_split is greater than one, each competitor is only updated on
+        one in every tick_split timer ticks, which spreads the work of
+        updating competitors' accounts and the score board across ticks. If
+        a latency recorder is given, each competitor records the time from
+        the event that caused each fill to the fill being sent. Competitors
+        register their metrics with the given metrics registry.
+        """
         self.__account_factory: AccountFactory = account_factory
         self.__active_volume_limit: int = limits_config["ActiveVolumeLimit"]
         self.__competitors: Dict[str, Competitor] = dict()
-        self.__etf_book: OrderBook = etf_book
-        self.__future_book: OrderBook = future_book
+        self.__books: Dict[int, OrderBook] = books
+        self.__latency: Optional[LatencyRecorder] = latency
         self.__logger: logging.Logger = logging.getLogger("COMPETITOR")
         self.__match_events: MatchEvents = match_events
+        self.__metrics: MetricsRegistry = metrics if metrics is not None else MetricsRegistry()
         self.__order_count_limit: int = limits_config["ActiveOrderCountLimit"]
         self.__position_limit: int = limits_config["PositionLimit"]
         self.__score_board_writer: ScoreBoardWriter = score_board_writer
         self.__start_time: float = 0.0
+        self.__tick_split: int = tick_split
         self.__traders: Dict[str, str] = traders_config
         self.__unhedged_lots_factory: UnhedgedLotsFactory = unhedged_lots_factory
         self.__tick_size: float = tick_size
@@ -342,6 +478,9 @@ class CompetitorManager:
         timer.timer_stopped.append(self.on_timer_stopped)
         timer.timer_ticked.append(self.on_timer_tick)
 
+        self.__metrics.gauge("rtg_connected_competitors", "Number of connected auto-traders",
+                             function=lambda: self.active_competitor_count)
+
     def get_competitors(self) -> Iterable[Competitor]:
         """Return an iterable of the competitors managed by this CompetitorManager."""
         return self.__competitors.values()
@@ -351,10 +490,11 @@ class CompetitorManager:
         if name in self.__competitors or name not in self.__traders or self.__traders[name] != secret:
             return None
 
-        competitor = Competitor(name, exec_channel, self.__etf_book, self.__future_book,
+        competitor = Competitor(name, exec_channel, self.__books,
                                 self.__account_factory.create(), self.__match_events, self.__score_board_writer,
                                 self.__position_limit, self.__order_count_limit, self.__active_volume_limit,
-                                self.__tick_size, self.__unhedged_lots_factory, self.controller)
+                                self.__tick_size, self.__unhedged_lots_factory, self.controller, self.__latency,
+                                self.__metrics)
         self.__competitors[name] = competitor
 
         if self.__start_time != 0.0:
@@ -382,12 +522,14 @@ class CompetitorManager:
         for competitor in self.__competitors.values():
             competitor.disconnect(end_time)
 
-    def on_timer_tick(self, timer: Timer, now: float, _: int) -> None:
+    def on_timer_tick(self, timer: Timer, now: float, tick_number: int) -> None:
         """Called on each timer tick."""
-        etf_price = self.__etf_book.last_traded_price()
-        future_price = self.__future_book.last_traded_price()
-        for competitor in self.__competitors.values():
-            competitor.on_timer_tick(now, future_price, etf_price)
+        prices: List[Optional[int]] = [book.last_traded_price() for book in self.__books.values()]
+        competitors: Iterable[Competitor] = self.__competitors.values()
+        if self.__tick_split > 1:
+            competitors = itertools.islice(competitors, tick_number % self.__tick_split, None, self.__tick_split)
+        for competitor in competitors:
+            competitor.on_timer_tick(now, prices)
 
         if self.active_competitor_count == 0:
             timer.shutdown(now, "no remaining competitors")
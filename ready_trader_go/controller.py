@@ -18,38 +18,56 @@
 import asyncio
 import logging
 
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, List, Optional, Set
 
 from .execution import ExecutionServer
 from .heads_up import HeadsUpDisplayServer
 from .information import InformationPublisher
+from .latency import LatencyRecorder
 from .market_events import MarketEventsReader
 from .match_events import MatchEventsWriter
+from .metrics import MetricsPublisher
 from .score_board import ScoreBoardWriter
 from .timer import Timer
 from .types import IController
 
 
 class Controller(IController):
-    """Controller for the Ready Trader Go matching engine."""
+    """Controller for the Ready Trader Go matching engine.
+
+    The market opens as soon as every named trader has logged in (and a
+    heads-up display has connected, if one is awaited) or, at the latest,
+    market_open_delay seconds after the servers start. If no traders are
+    named, the market opens after market_open_delay seconds.
+    """
 
     def __init__(self, market_open_delay: float, exec_server: ExecutionServer, info_publisher: InformationPublisher,
                  market_events_reader: MarketEventsReader, match_events_writer: MatchEventsWriter,
-                 score_board_writer: ScoreBoardWriter, market_timer: Timer, tick_timer: Timer):
+                 score_board_writer: ScoreBoardWriter, market_timer: Timer, tick_timer: Timer,
+                 latency: Optional[LatencyRecorder] = None, trader_names: Iterable[str] = ()):
         """Initialise a new instance of the Controller class."""
+        self.awaiting_heads_up_display: bool = False
         self.heads_up_display_server: Optional[HeadsUpDisplayServer] = None
+        self.metrics_publisher: Optional[MetricsPublisher] = None
 
+        self.__awaited_traders: Set[str] = set(trader_names)
         self.__done: bool = False
+        self.__everyone_arrived: asyncio.Event = asyncio.Event()
         self.__execution_server: ExecutionServer = exec_server
         self.__information_publisher: InformationPublisher = info_publisher
+        self.__latency: Optional[LatencyRecorder] = latency
         self.__logger: logging.Logger = logging.getLogger("CONTROLLER")
         self.__market_events_reader = market_events_reader
         self.__market_open_delay: float = market_open_delay
         self.__market_timer: Timer = market_timer
         self.__match_events_writer = match_events_writer
         self.__score_board_writer = score_board_writer
+        self.__skipped_tick_count: int = 0
         self.__tick_timer: Timer = tick_timer
 
+        # Signals
+        self.servers_started: List[Callable[[], None]] = list()
+
         # Connect signals
         self.__match_events_writer.task_complete.append(self.on_task_complete)
         self.__market_events_reader.task_complete.append(self.on_task_complete)
@@ -72,6 +90,16 @@ class Controller(IController):
         if self.__score_board_writer:
             self.__score_board_writer.finish()
 
+    def on_competitor_logged_in(self, name: str) -> None:
+        """Called when a competitor logs in."""
+        self.__awaited_traders.discard(name)
+        self.__check_arrivals()
+
+    def on_heads_up_display_connected(self) -> None:
+        """Called when a heads-up display connects."""
+        self.awaiting_heads_up_display = False
+        self.__check_arrivals()
+
     def on_market_timer_ticked(self, timer: Timer, now: float, _: int):
         """Called when it is time to process market events."""
         self.__market_events_reader.process_market_events(now)
@@ -90,11 +118,25 @@ class Controller(IController):
 
     def on_tick_timer_stopped(self, timer: Timer, now: float) -> None:
         """Shut down the match."""
+        self.__logger.info("market timer statistics: %s", self.__market_timer.statistics())
+        self.__logger.info("tick timer statistics: %s", self.__tick_timer.statistics())
+        if self.__latency is not None:
+            self.__logger.info("latency statistics:\n%s", self.__latency.statistics())
+        if self.metrics_publisher:
+            self.metrics_publisher.close()
+        if self.__market_timer.skipped_tick_count or self.__tick_timer.skipped_tick_count:
+            self.__logger.warning("the simulator fell behind real time: skipped_market_ticks=%d skipped_ticks=%d",
+                                  self.__market_timer.skipped_tick_count, self.__tick_timer.skipped_tick_count)
         self.__match_events_writer.finish()
         self.__score_board_writer.finish()
 
     def on_tick_timer_ticked(self, timer: Timer, now: float, _: int) -> None:
         """Called when it is time to send an order book update and trade ticks."""
+        if timer.skipped_tick_count != self.__skipped_tick_count:
+            self.__logger.warning("tick timer is behind real time: time=%.6f skipped_ticks=%d", now,
+                                  timer.skipped_tick_count - self.__skipped_tick_count)
+            self.__skipped_tick_count = timer.skipped_tick_count
+
         if self.__done:
             timer.shutdown(now, "match complete")
             return
@@ -107,15 +149,33 @@ class Controller(IController):
         await self.__information_publisher.start()
         if self.heads_up_display_server:
             await self.heads_up_display_server.start()
+        if self.metrics_publisher:
+            await self.metrics_publisher.start()
 
         self.__market_events_reader.start()
         self.__match_events_writer.start()
         self.__score_board_writer.start()
 
-        # Give the auto-traders time to start up and connect
-        await asyncio.sleep(self.__market_open_delay)
+        for callback in self.servers_started:
+            callback()
+
+        # Give the auto-traders time to start up and connect, but no longer than it takes them all to log in
+        if self.__awaited_traders or self.awaiting_heads_up_display:
+            try:
+                await asyncio.wait_for(self.__everyone_arrived.wait(), self.__market_open_delay)
+            except asyncio.TimeoutError:
+                self.__logger.warning("opening the market before everyone arrived: missing_traders=%s"
+                                      " missing_heads_up_display=%s", ",".join(sorted(self.__awaited_traders)),
+                                      self.awaiting_heads_up_display)
+        else:
+            await asyncio.sleep(self.__market_open_delay)
         # self.__execution_server.close()
 
         self.__logger.info("market open")
         self.__market_timer.start()
         self.__tick_timer.start()
+
+    def __check_arrivals(self) -> None:
+        """Allow the market to open if everyone who is awaited has arrived."""
+        if not self.__awaited_traders and not self.awaiting_heads_up_display:
+            self.__everyone_arrived.set()
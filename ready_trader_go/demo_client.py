@@ -175,6 +175,8 @@ class DemoClient:
             self.__on_order_filled_message(*ORDER_FILLED_MESSAGE.unpack_from(data, start))
         elif typ == MessageType.ORDER_STATUS and length == ORDER_STATUS_MESSAGE_SIZE:
             self.__on_order_status_message(*ORDER_STATUS_MESSAGE.unpack_from(data, start))
+        elif typ == MessageType.ORDER_ID and length == ORDER_ID_MESSAGE_SIZE:
+            pass  # Only of use with the order events feed
         else:
             print("received invalid message: length=%d type=%d", length, typ)
 
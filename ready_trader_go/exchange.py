@@ -15,24 +15,35 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
+import logging
+import os
+import random
 import socket
 
+from typing import Any, Dict, Optional
+
 from .account import AccountFactory
 from .application import Application
 from .competitor import CompetitorManager
 from .controller import Controller
 from .execution import ExecutionServer
 from .heads_up import HeadsUpDisplayServer
-from .information import InformationPublisher
+from .information import SNAPSHOT_INTERVAL, InformationPublisher
+from .lag_probe import LAG_WARNING_FRACTION
+from .latency import LatencyRecorder
 from .limiter import FrequencyLimiterFactory
 from .market_events import MarketEventsReader
 from .match_events import MatchEvents, MatchEventsWriter
-from .order_book import OrderBook
+from .messages import MAXIMUM_DEEP_LEVEL_COUNT
+from .metrics import METRICS_INTERVAL, MetricsPublisher, MetricsRegistry
+from .order_book import DEEP_LEVEL_COUNT, TOP_LEVEL_COUNT, OrderBook
+from .profiling import PROFILERS, Profiler
 from .pubsub import PublisherFactory
 from .score_board import ScoreBoardWriter
 from .timer import Timer
-from .types import Instrument
-from .unhedged_lots import UnhedgedLotsFactory
+from .timer_wheel import TimerWheel
+from .types import Side, etf_instrument, future_instrument
+from .unhedged_lots import MAX_UNHEDGED_LOTS, UNHEDGED_LOTS_TIME_LIMIT, UnhedgedLotsFactory
 
 
 def __validate_hostname(config, section, key):
@@ -70,6 +81,63 @@ def __exchange_config_validator(config):
                                          "MessageFrequencyLimit", "PositionLimit"), (int, int, float, int, int))
     __validate_hostname(config, "Execution", "Host")
 
+    engine = config["Engine"]
+    if "Seed" in engine and type(engine["Seed"]) is not int:
+        raise Exception("Element of inappropriate type in Engine configuration")
+    if "Deterministic" in engine and type(engine["Deterministic"]) is not bool:
+        raise Exception("Element of inappropriate type in Engine configuration")
+    if "RecordLatency" in engine and type(engine["RecordLatency"]) is not bool:
+        raise Exception("Element of inappropriate type in Engine configuration")
+    if "Profile" in engine and engine["Profile"] not in PROFILERS:
+        raise Exception("Profile in Engine configuration should be one of: %s" % ", ".join(PROFILERS))
+    if "TickSplit" in engine and (type(engine["TickSplit"]) is not int or engine["TickSplit"] < 1):
+        raise Exception("TickSplit in Engine configuration should be a positive integer")
+
+    info = config["Information"]
+    if "DeepName" in info and type(info["DeepName"]) is not str:
+        raise Exception("Element of inappropriate type in Information configuration")
+    if "Depth" in info and ("DeepName" not in info or type(info["Depth"]) is not int
+                            or not TOP_LEVEL_COUNT <= info["Depth"] <= MAXIMUM_DEEP_LEVEL_COUNT):
+        raise Exception("Depth in Information configuration requires a DeepName and should be an integer from %d to %d"
+                        % (TOP_LEVEL_COUNT, MAXIMUM_DEEP_LEVEL_COUNT))
+    if "DeltaName" in info and type(info["DeltaName"]) is not str:
+        raise Exception("Element of inappropriate type in Information configuration")
+    if "OrderEventsName" in info and type(info["OrderEventsName"]) is not str:
+        raise Exception("Element of inappropriate type in Information configuration")
+    if "SnapshotInterval" in info and (("DeltaName" not in info and "OrderEventsName" not in info)
+                                       or type(info["SnapshotInterval"]) is not int
+                                       or info["SnapshotInterval"] < 1):
+        raise Exception("SnapshotInterval in Information configuration requires a DeltaName or OrderEventsName and"
+                        " should be a positive integer")
+
+    instrument = config["Instrument"]
+    if "PairCount" in instrument and (type(instrument["PairCount"]) is not int or instrument["PairCount"] < 1):
+        raise Exception("PairCount in Instrument configuration should be a positive integer")
+
+    limits = config["Limits"]
+    if "MessageFrequencyRing" in limits and type(limits["MessageFrequencyRing"]) is not bool:
+        raise Exception("Element of inappropriate type in Limits configuration")
+    if "UnhedgedLotsLimit" in limits and (type(limits["UnhedgedLotsLimit"]) is not int
+                                          or limits["UnhedgedLotsLimit"] < 0):
+        raise Exception("UnhedgedLotsLimit in Limits configuration should be a non-negative integer")
+    if "UnhedgedLotsTimeLimit" in limits and (type(limits["UnhedgedLotsTimeLimit"]) is not float
+                                              or limits["UnhedgedLotsTimeLimit"] <= 0.0):
+        raise Exception("UnhedgedLotsTimeLimit in Limits configuration should be a positive number")
+
+    if "Metrics" in config:
+        metrics = config["Metrics"]
+        if type(metrics) is not dict:
+            raise Exception("Metrics configuration should be a JSON object")
+        if any(k in metrics and type(metrics[k]) is not t
+               for k, t in (("File", str), ("Interval", float), ("Host", str), ("Port", int))):
+            raise Exception("Element of inappropriate type in Metrics configuration")
+        if "File" not in metrics and "Port" not in metrics:
+            raise Exception("Metrics configuration requires a File or a Port")
+        if "Interval" in metrics and metrics["Interval"] <= 0.0:
+            raise Exception("Interval in Metrics configuration should be a positive number")
+        if "Host" in metrics:
+            __validate_hostname(config, "Metrics", "Host")
+
     if "Hud" in config:
         __validate_object(config, "Hud", ("Host", "Port"), (str, int))
         __validate_hostname(config, "Hud", "Host")
@@ -84,53 +152,138 @@ def __exchange_config_validator(config):
     return True
 
 
-def setup(app: Application) -> Controller:
-    """Setup the exchange simulator."""
+def setup(app: Application, profiler: Optional[Profiler] = None,
+          wait_for_heads_up_display: bool = False) -> Controller:
+    """Setup the exchange simulator, timing the callbacks of its main signals if a profiler is given.
+
+    The market opens when every trader has logged in and, if there is a
+    heads-up display server and wait_for_heads_up_display is True, a
+    heads-up display has connected, or after the market open delay.
+    """
     engine = app.config["Engine"]
     exec_ = app.config["Execution"]
     info = app.config["Information"]
     instrument = app.config["Instrument"]
     limits = app.config["Limits"]
 
-    future_book = OrderBook(Instrument.FUTURE, 0.0, 0.0)
-    etf_book = OrderBook(Instrument.ETF, app.config["Fees"]["Maker"], app.config["Fees"]["Taker"])
+    # Every source of randomness is derived from a single seed so that a match can be replayed
+    seed: int = engine["Seed"] if "Seed" in engine else random.SystemRandom().getrandbits(32)
+    deterministic: bool = engine.get("Deterministic", False)
+    logging.getLogger("EXCHANGE").info("random seed=%d deterministic=%s", seed, deterministic)
+    seeds = random.Random(seed)
+
+    # Books are keyed, and inserted in order of, instrument id. Fees are only charged on ETF trades
+    pair_count: int = instrument.get("PairCount", 1)
+    books: Dict[int, OrderBook] = dict()
+    for pair in range(pair_count):
+        books[future_instrument(pair)] = OrderBook(future_instrument(pair), 0.0, 0.0)
+        books[etf_instrument(pair)] = OrderBook(etf_instrument(pair), app.config["Fees"]["Maker"],
+                                                app.config["Fees"]["Taker"])
+
+    latency: Optional[LatencyRecorder] = LatencyRecorder() if engine.get("RecordLatency", False) else None
+
+    # Metrics are always kept, since updating one is no dearer than incrementing an attribute, but are
+    # only published if there is a Metrics configuration
+    metrics = MetricsRegistry()
+    for i, book in books.items():
+        for side, name in ((Side.ASK, "ask"), (Side.BID, "bid")):
+            metrics.gauge("rtg_book_levels", "Number of price levels on each side of each order book",
+                          {"instrument": str(i), "side": name}, lambda b=book, s=side: len(b.levels(s)))
+
+    # Warn when the event loop is so late that it is getting close to missing a tick
+    if app.lag_probe is not None:
+        if app.lag_probe.threshold is None:
+            app.lag_probe.threshold = LAG_WARNING_FRACTION * engine["TickInterval"] / engine["Speed"]
+        metrics.histogram("rtg_event_loop_lag_microseconds", "How late the event loop runs callbacks",
+                          histogram=app.lag_probe.lag)
 
     match_events = MatchEvents()
-    match_events_writer = MatchEventsWriter(match_events, engine["MatchEventsFile"], app.event_loop)
-    market_events_reader = MarketEventsReader(engine["MarketDataFile"], app.event_loop, future_book, etf_book,
-                                              match_events)
-    score_board_writer = ScoreBoardWriter(engine["ScoreBoardFile"], app.event_loop)
-
-    tick_timer = Timer(engine["TickInterval"], engine["Speed"])
-    account_factory = AccountFactory(instrument["EtfClamp"], instrument["TickSize"])
-    unhedged_lots_factory = UnhedgedLotsFactory()
-    competitor_manager = CompetitorManager(app.config["Limits"], app.config["Traders"], account_factory, etf_book,
-                                           future_book, match_events, score_board_writer, instrument["TickSize"],
-                                           tick_timer, unhedged_lots_factory)
+    match_events_writer = MatchEventsWriter(match_events, engine["MatchEventsFile"], app.event_loop, metrics)
+    market_events_reader = MarketEventsReader(engine["MarketDataFile"], app.event_loop, books, match_events, latency,
+                                              metrics)
+    score_board_writer = ScoreBoardWriter(engine["ScoreBoardFile"], app.event_loop, metrics)
+
+    wheel = TimerWheel(app.event_loop, engine["Speed"])
+    tick_timer = Timer(engine["TickInterval"], wheel, seeds.getrandbits(32), deterministic, metrics, "tick")
+    market_timer = Timer(engine["MarketEventInterval"], wheel, seeds.getrandbits(32), deterministic, metrics,
+                         "market")
+
+    if profiler is not None:
+        for book in books.values():
+            book.trade_occurred = profiler.timed_signal("OrderBook.trade_occurred", book.trade_occurred)
+        match_events.event_occurred = profiler.timed_signal("MatchEvents.event_occurred", match_events.event_occurred)
+        tick_timer.timer_ticked = profiler.timed_signal("Timer.timer_ticked(tick)", tick_timer.timer_ticked)
+        market_timer.timer_ticked = profiler.timed_signal("Timer.timer_ticked(market)", market_timer.timer_ticked)
+    account_factory = AccountFactory(instrument["EtfClamp"], instrument["TickSize"], pair_count)
+    unhedged_lots_factory = UnhedgedLotsFactory(market_timer, limits.get("UnhedgedLotsLimit", MAX_UNHEDGED_LOTS),
+                                                limits.get("UnhedgedLotsTimeLimit", UNHEDGED_LOTS_TIME_LIMIT))
+    competitor_manager = CompetitorManager(app.config["Limits"], app.config["Traders"], account_factory, books,
+                                           match_events, score_board_writer, instrument["TickSize"],
+                                           tick_timer, unhedged_lots_factory, engine.get("TickSplit", 1), latency,
+                                           metrics)
 
     limiter_factory = FrequencyLimiterFactory(limits["MessageFrequencyInterval"] / engine["Speed"],
-                                              limits["MessageFrequencyLimit"])
-    exec_server = ExecutionServer(exec_["Host"], exec_["Port"], competitor_manager, limiter_factory)
-    info_publisher = InformationPublisher(app.event_loop, PublisherFactory(info["Type"], info["Name"]),
-                                          (future_book, etf_book), tick_timer)
+                                              limits["MessageFrequencyLimit"],
+                                              limits.get("MessageFrequencyRing", False))
+    exec_server = ExecutionServer(exec_["Host"], exec_["Port"], competitor_manager, limiter_factory, wheel, latency,
+                                  metrics)
+    deep_publisher_factory = PublisherFactory(info["Type"], info["DeepName"]) if "DeepName" in info else None
+    delta_publisher_factory = PublisherFactory(info["Type"], info["DeltaName"]) if "DeltaName" in info else None
+    order_event_publisher_factory = (PublisherFactory(info["Type"], info["OrderEventsName"])
+                                     if "OrderEventsName" in info else None)
+    info_publisher = InformationPublisher(wheel, PublisherFactory(info["Type"], info["Name"]),
+                                          books.values(), tick_timer, engine.get("TickSplit", 1),
+                                          deep_publisher_factory, info.get("Depth", DEEP_LEVEL_COUNT),
+                                          delta_publisher_factory, info.get("SnapshotInterval", SNAPSHOT_INTERVAL),
+                                          order_event_publisher_factory, latency)
 
-    market_timer = Timer(engine["MarketEventInterval"], engine["Speed"])
     controller = Controller(engine["MarketOpenDelay"], exec_server, info_publisher, market_events_reader,
-                            match_events_writer, score_board_writer, market_timer, tick_timer)
+                            match_events_writer, score_board_writer, market_timer, tick_timer, latency,
+                            app.config["Traders"].keys())
     competitor_manager.controller = controller
+    competitor_manager.competitor_logged_in.append(controller.on_competitor_logged_in)
     exec_server.controller = controller
 
     if "Hud" in app.config:
         hud_server = HeadsUpDisplayServer(app.config["Hud"]["Host"], app.config["Hud"]["Port"], match_events,
                                           competitor_manager, controller)
         controller.heads_up_display_server = hud_server
+        if wait_for_heads_up_display:
+            controller.awaiting_heads_up_display = True
+            hud_server.connected.append(controller.on_heads_up_display_connected)
+
+    if "Metrics" in app.config:
+        metrics_config = app.config["Metrics"]
+        controller.metrics_publisher = MetricsPublisher(metrics, app.event_loop, metrics_config.get("File"),
+                                                        metrics_config.get("Interval", METRICS_INTERVAL),
+                                                        metrics_config.get("Host", "127.0.0.1"),
+                                                        metrics_config.get("Port"))
 
     app.event_loop.create_task(controller.start())
     return controller
 
 
-def main():
+def main(profile: Optional[str] = None, ready: Optional[Any] = None, wait_for_heads_up_display: bool = False):
+    """Run the exchange simulator.
+
+    If given, ready is an event (such as a multiprocessing Event) that is set
+    when the simulator is accepting connections.
+    """
     app = Application("exchange", __exchange_config_validator)
-    controller: Controller = setup(app)
+    engine = app.config["Engine"]
+
+    # The profile artefacts are written next to the match events file
+    profile = profile or engine.get("Profile")
+    profiler: Optional[Profiler] = None
+    if profile:
+        profiler = Profiler(profile, os.path.join(os.path.dirname(engine["MatchEventsFile"]), "exchange_profile"))
+
+    controller: Controller = setup(app, profiler, wait_for_heads_up_display)
+    if ready is not None:
+        controller.servers_started.append(ready.set)
+    if profiler is not None:
+        profiler.start()
     app.run()
+    if profiler is not None:
+        profiler.stop()
     controller.cleanup()
@@ -18,43 +18,65 @@
 import asyncio
 import logging
 
-from typing import Optional
+from typing import Optional, Union
 
 from .competitor import Competitor, CompetitorManager
-from .limiter import FrequencyLimiter, FrequencyLimiterFactory
+from .latency import LatencyRecorder, clock_ns
+from .limiter import FrequencyLimiter, FrequencyLimiterFactory, RingFrequencyLimiter
+from .metrics import Metric, MetricsRegistry
 from .messages import (AMEND_MESSAGE, AMEND_MESSAGE_SIZE, CANCEL_MESSAGE, CANCEL_MESSAGE_SIZE,
                        ERROR_MESSAGE, ERROR_MESSAGE_SIZE, HEADER, HEADER_SIZE, HEDGE_FILLED_MESSAGE,
-                       HEDGE_FILLED_MESSAGE_SIZE, HEDGE_MESSAGE, HEDGE_MESSAGE_SIZE, INSERT_MESSAGE,
-                       INSERT_MESSAGE_SIZE, LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, ORDER_FILLED_MESSAGE,
-                       ORDER_FILLED_MESSAGE_SIZE, ORDER_STATUS_MESSAGE, ORDER_STATUS_MESSAGE_SIZE,
-                       Connection, MessageType)
+                       HEDGE_FILLED_MESSAGE_SIZE, HEDGE_MESSAGE, HEDGE_MESSAGE_SIZE, HEDGE_V2_MESSAGE,
+                       HEDGE_V2_MESSAGE_SIZE, INSERT_MESSAGE, INSERT_MESSAGE_SIZE, INSERT_V2_MESSAGE,
+                       INSERT_V2_MESSAGE_SIZE, LOGIN_MESSAGE, LOGIN_MESSAGE_SIZE, ORDER_FILLED_MESSAGE,
+                       ORDER_FILLED_MESSAGE_SIZE, ORDER_ID_MESSAGE, ORDER_ID_MESSAGE_SIZE, ORDER_STATUS_MESSAGE,
+                       ORDER_STATUS_MESSAGE_SIZE, Connection, MessageType)
+from .timer_wheel import TimerWheel, TimerWheelHandle
 from .types import IController, IExecutionConnection
 
 
 class ExecutionConnection(Connection, IExecutionConnection):
-    def __init__(self, competitor_manager: CompetitorManager, frequency_limiter: FrequencyLimiter,
-                 controller: IController):
-        """Initialise a new instance of the ExecutionChannel class."""
+    def __init__(self, competitor_manager: CompetitorManager,
+                 frequency_limiter: Union[FrequencyLimiter, RingFrequencyLimiter], controller: IController,
+                 wheel: TimerWheel, latency: Optional[LatencyRecorder] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """Initialise a new instance of the ExecutionChannel class.
+
+        If a latency recorder is given, the time from the last information
+        publication to the arrival of each message and the time taken to
+        handle it are recorded. Messages from each competitor are counted in
+        the given metrics registry.
+        """
         Connection.__init__(self)
 
         self.competitor: Optional[Competitor] = None
         self.competitor_manager: CompetitorManager = competitor_manager
         self.controller: IController = controller
         self.closing: bool = False
-        self.frequency_limiter: FrequencyLimiter = frequency_limiter
+        self.frequency_limiter: Union[FrequencyLimiter, RingFrequencyLimiter] = frequency_limiter
+        self.latency: Optional[LatencyRecorder] = latency
         self.logger: logging.Logger = logging.getLogger("EXECUTION")
-        self.login_timeout: asyncio.Handle = asyncio.get_running_loop().call_later(1.0, self.close)
+        self.metrics: MetricsRegistry = metrics if metrics is not None else MetricsRegistry()
+        self.messages_received: Optional[Metric] = None
+        # Allow one second of wall-clock time to log in, whatever the simulation speed
+        self.login_timeout: TimerWheelHandle = wheel.call_later(1.0 * wheel.speed, self.close)
 
         self.__error_message = bytearray(ERROR_MESSAGE_SIZE)
         self.__hedge_filled_message = bytearray(HEDGE_FILLED_MESSAGE_SIZE)
+        self.__order_id_message = bytearray(ORDER_ID_MESSAGE_SIZE)
         self.__order_status_message = bytearray(ORDER_STATUS_MESSAGE_SIZE)
         self.__order_filled_message = bytearray(ORDER_FILLED_MESSAGE_SIZE)
 
         HEADER.pack_into(self.__error_message, 0, ERROR_MESSAGE_SIZE, MessageType.ERROR)
         HEADER.pack_into(self.__hedge_filled_message, 0, HEDGE_FILLED_MESSAGE_SIZE, MessageType.HEDGE_FILLED)
+        HEADER.pack_into(self.__order_id_message, 0, ORDER_ID_MESSAGE_SIZE, MessageType.ORDER_ID)
         HEADER.pack_into(self.__order_status_message, 0, ORDER_STATUS_MESSAGE_SIZE, MessageType.ORDER_STATUS)
         HEADER.pack_into(self.__order_filled_message, 0, ORDER_FILLED_MESSAGE_SIZE, MessageType.ORDER_FILLED)
 
+        # Only pay for timing messages when it is wanted
+        if latency is not None:
+            self.on_message = self.__on_message_timed
+
     def __del__(self):
         """Clean up this instance of the ExecutionChannel class."""
         self.login_timeout.cancel()
@@ -105,6 +127,8 @@ class ExecutionConnection(Connection, IExecutionConnection):
                 self.close()
             return
 
+        self.messages_received.value += 1
+
         if typ == MessageType.AMEND_ORDER and length == AMEND_MESSAGE_SIZE:
             self.competitor.on_amend_message(now, *AMEND_MESSAGE.unpack_from(data, start))
         elif typ == MessageType.CANCEL_ORDER and length == CANCEL_MESSAGE_SIZE:
@@ -113,6 +137,12 @@ class ExecutionConnection(Connection, IExecutionConnection):
             self.competitor.on_hedge_message(now, *HEDGE_MESSAGE.unpack_from(data, start))
         elif typ == MessageType.INSERT_ORDER and length == INSERT_MESSAGE_SIZE:
             self.competitor.on_insert_message(now, *INSERT_MESSAGE.unpack_from(data, start))
+        elif typ == MessageType.HEDGE_ORDER_V2 and length == HEDGE_V2_MESSAGE_SIZE:
+            client_order_id, instrument, side, price, volume = HEDGE_V2_MESSAGE.unpack_from(data, start)
+            self.competitor.on_hedge_message(now, client_order_id, side, price, volume, instrument)
+        elif typ == MessageType.INSERT_ORDER_V2 and length == INSERT_V2_MESSAGE_SIZE:
+            client_order_id, instrument, side, price, volume, lifespan = INSERT_V2_MESSAGE.unpack_from(data, start)
+            self.competitor.on_insert_message(now, client_order_id, side, price, volume, lifespan, instrument)
         else:
             if typ == MessageType.LOGIN:
                 self.logger.info("fd=%d received second login message: time=%.6f name='%s'", self._file_number,
@@ -122,6 +152,14 @@ class ExecutionConnection(Connection, IExecutionConnection):
                                  self._file_number, self.competitor.name, now, length, typ)
             self.close()
 
+    def __on_message_timed(self, typ: int, data: bytes, start: int, length: int) -> None:
+        """Called instead of on_message, to time it, when there is a latency recorder."""
+        latency: LatencyRecorder = self.latency
+        received: int = latency.record("order_arrival", latency.last_publish) if latency.last_publish else clock_ns()
+        latency.last_event = received
+        ExecutionConnection.on_message(self, typ, data, start, length)
+        latency.record("execution", received)
+
     def on_login(self, name: str, secret: str) -> None:
         """Called when a login message is received."""
         self.login_timeout.cancel()
@@ -132,6 +170,8 @@ class ExecutionConnection(Connection, IExecutionConnection):
             self.close()
             return
 
+        self.messages_received = self.metrics.counter("rtg_messages_received_total",
+                                                      "Messages received from each competitor", {"team": name})
         self.logger.info("fd=%d '%s' is ready!", self._file_number, name)
 
     def send_error(self, client_order_id: int, error_message: bytes) -> None:
@@ -150,6 +190,11 @@ class ExecutionConnection(Connection, IExecutionConnection):
         ORDER_FILLED_MESSAGE.pack_into(self.__order_filled_message, HEADER_SIZE, client_order_id, price, volume)
         self._connection_transport.write(self.__order_filled_message)
 
+    def send_order_id(self, client_order_id: int, order_id: int) -> None:
+        """Send an order id message to the auto-trader."""
+        ORDER_ID_MESSAGE.pack_into(self.__order_id_message, HEADER_SIZE, client_order_id, order_id)
+        self._connection_transport.write(self.__order_id_message)
+
     def send_order_status(self, client_order_id: int, fill_volume: int, remaining_volume: int, fees: int) -> None:
         """Send an order status message to the auto-trader."""
         ORDER_STATUS_MESSAGE.pack_into(self.__order_status_message, HEADER_SIZE, client_order_id, fill_volume,
@@ -160,16 +205,22 @@ class ExecutionConnection(Connection, IExecutionConnection):
 class ExecutionServer:
     """A server for execution connections."""
     def __init__(self, host: str, port: int, competitor_manager: CompetitorManager,
-                 limiter_factory: FrequencyLimiterFactory):
+                 limiter_factory: FrequencyLimiterFactory, wheel: TimerWheel,
+                 latency: Optional[LatencyRecorder] = None, metrics: Optional[MetricsRegistry] = None):
         """Initialise a new instance of the ExecutionServer class."""
         self.controller: Optional[IController] = None
         self.host: str = host
         self.port: int = port
+        self.latency: Optional[LatencyRecorder] = latency
+        self.metrics: MetricsRegistry = metrics if metrics is not None else MetricsRegistry()
+        self.connection_count: Metric = self.metrics.counter("rtg_connections_total",
+                                                             "Connections accepted from auto-traders")
 
         self.__competitor_manager: CompetitorManager = competitor_manager
         self.__limiter_factory: FrequencyLimiterFactory = limiter_factory
         self.__logger = logging.getLogger("EXECUTION")
         self.__server: Optional[asyncio.AbstractServer] = None
+        self.__wheel: TimerWheel = wheel
 
     def close(self):
         """Close the server without affecting existing connections."""
@@ -177,7 +228,9 @@ class ExecutionServer:
 
     def __on_new_connection(self) -> ExecutionConnection:
         """Callback for when a new connection is accepted."""
-        return ExecutionConnection(self.__competitor_manager, self.__limiter_factory.create(), self.controller)
+        self.connection_count.value += 1
+        return ExecutionConnection(self.__competitor_manager, self.__limiter_factory.create(), self.controller,
+                                   self.__wheel, self.latency, self.metrics)
 
     async def start(self) -> None:
         """Start the server."""
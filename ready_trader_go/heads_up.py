@@ -18,7 +18,7 @@
 import asyncio
 import logging
 
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 
 from .competitor import CompetitorManager
 from .match_events import MatchEvent, MatchEventOperation, MatchEvents
@@ -124,7 +124,7 @@ class HudConnection(Connection, IExecutionConnection):
         elif event.operation == MatchEventOperation.INSERT:
             INSERT_EVENT_MESSAGE.pack_into(self.__insert_event_message, HEADER_SIZE, event.time,
                                            self.__competitor_ids[event.competitor], event.order_id,
-                                           event.instrument.value, event.side.value, event.volume, event.price,
+                                           event.instrument, event.side.value, event.volume, event.price,
                                            event.lifespan.value)
             self._connection_transport.write(self.__insert_event_message)
         elif event.operation == MatchEventOperation.HEDGE:
@@ -171,8 +171,13 @@ class HeadsUpDisplayServer:
         self.__match_events: MatchEvents = match_events
         self.__server: Optional[asyncio.AbstractServer] = None
 
+        # Signals
+        self.connected: List[Callable[[], None]] = list()
+
     def __on_new_connection(self):
         """Called when a new connection is established."""
+        for callback in self.connected:
+            callback()
         return HudConnection(self.__match_events, self.__competitor_manager, self.__controller)
 
     async def start(self):
@@ -0,0 +1,124 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+from typing import Dict, List, Tuple
+
+# Number of significant bits kept for each recorded value. Sixteen sub-buckets
+# per power of two gives a worst-case relative error of about 6%.
+SIGNIFICANT_BITS = 4
+_HALF_BUCKET_COUNT = 1 << (SIGNIFICANT_BITS - 1)
+_LINEAR_LIMIT = 1 << SIGNIFICANT_BITS
+
+
+class Histogram(object):
+    """A histogram of non-negative integer values with log-linear buckets.
+
+    Values below 2**SIGNIFICANT_BITS are counted exactly; larger values are
+    counted in buckets whose width grows with the magnitude of the value, as
+    in an HDR histogram, so that recording a value is O(1) and the memory
+    used does not depend on the number of values recorded.
+    """
+    __slots__ = ("count", "counts", "maximum", "minimum", "total")
+
+    def __init__(self):
+        """Initialise a new instance of the Histogram class."""
+        self.count: int = 0
+        self.counts: List[int] = list()
+        self.maximum: int = 0
+        self.minimum: int = 0
+        self.total: int = 0
+
+    @staticmethod
+    def bucket_index(value: int) -> int:
+        """Return the index of the bucket for the given value."""
+        if value < _LINEAR_LIMIT:
+            return value
+        shift: int = value.bit_length() - SIGNIFICANT_BITS
+        return shift * _HALF_BUCKET_COUNT + (value >> shift)
+
+    @staticmethod
+    def bucket_limit(index: int) -> int:
+        """Return the largest value that is counted in the given bucket."""
+        if index < _LINEAR_LIMIT:
+            return index
+        shift: int = index // _HALF_BUCKET_COUNT - 1
+        return ((index - shift * _HALF_BUCKET_COUNT + 1) << shift) - 1
+
+    def mean(self) -> float:
+        """Return the mean of the recorded values."""
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the values recorded by another histogram to this one."""
+        if other.count == 0:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        if self.count == 0 or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if other.maximum > self.maximum:
+            self.maximum = other.maximum
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percentile: float) -> int:
+        """Return an upper bound for the given percentile of the recorded values."""
+        if self.count == 0:
+            return 0
+        target: float = self.count * percentile / 100.0
+        running: int = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if c and running >= target:
+                limit: int = Histogram.bucket_limit(i)
+                return limit if limit < self.maximum else self.maximum
+        return self.maximum
+
+    def record(self, value: int) -> None:
+        """Record a value."""
+        if value < 0:
+            value = 0
+        index: int = Histogram.bucket_index(value)
+        counts: List[int] = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        if self.count == 0 or value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self.count += 1
+        self.total += value
+
+    def reset(self) -> None:
+        """Discard all recorded values."""
+        self.count = self.maximum = self.minimum = self.total = 0
+        self.counts.clear()
+
+    def summary(self, percentiles: Tuple[float, ...] = (50.0, 90.0, 99.0, 99.9)) -> Dict[str, float]:
+        """Return a dictionary summarising the recorded values."""
+        result: Dict[str, float] = {"count": self.count, "min": self.minimum, "mean": round(self.mean(), 3)}
+        for p in percentiles:
+            result["p%g" % p] = self.percentile(p)
+        result["max"] = self.maximum
+        return result
+
+    def __str__(self):
+        """Return a string summarising the recorded values."""
+        return " ".join("%s=%s" % item for item in self.summary().items())
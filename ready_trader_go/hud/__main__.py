@@ -103,8 +103,7 @@ def replay(path: pathlib.Path):
     splash = __show_splash()
     splash.showMessage("Processing %s..." % str(path), Qt.AlignBottom, QtGui.QColor("#F0F0F0"))
     etf_clamp, tick_size = __read_exchange_config()
-    with path.open("r", newline="") as csv_file:
-        event_source = RecordedEventSource.from_csv(csv_file, etf_clamp, tick_size)
+    event_source = RecordedEventSource.from_file(str(path), etf_clamp, tick_size)
     window = __show_main_window(splash, event_source)
     return app.exec_()
 
@@ -16,9 +16,9 @@
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
 import collections
-import sys
+import math
 
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6 import QtCharts
@@ -29,8 +29,76 @@ from ready_trader_go.types import Instrument
 CHART_DURATION: float = 60.0
 
 
+def decimate(points: Deque[Tuple[float, float]], start: float, end: float, bucket_count: int) -> List[QtCore.QPointF]:
+    """Return the given points reduced to at most two per bucket.
+
+    The range from start to end is divided into bucket_count equal buckets
+    (normally one per pixel of the plot area) and only the points with the
+    lowest and highest values in each bucket are kept, in time order, so
+    that the shape of the line is preserved.
+    """
+    if len(points) <= 2 * bucket_count or end <= start:
+        return [QtCore.QPointF(x, y) for x, y in points]
+
+    scale: float = bucket_count / (end - start)
+    result: List[QtCore.QPointF] = list()
+    bucket: int = int((points[0][0] - start) * scale)
+    low = high = points[0]
+    for point in points:
+        b = int((point[0] - start) * scale)
+        if b != bucket:
+            result.extend(QtCore.QPointF(*p) for p in ((low,) if low is high else sorted((low, high))))
+            bucket = b
+            low = high = point
+        elif point[1] < low[1]:
+            low = point
+        elif point[1] > high[1]:
+            high = point
+    result.extend(QtCore.QPointF(*p) for p in ((low,) if low is high else sorted((low, high))))
+    return result
+
+
+class SeriesBuffer:
+    """The points of a chart series that fall within the visible time window.
+
+    Points are appended as they arrive and copied to the series, in a single
+    replace call, when the chart is next updated.
+    """
+    __slots__ = ("changed", "points", "series")
+
+    def __init__(self, series: QtCharts.QXYSeries):
+        """Initialise a new instance of the class."""
+        self.changed: bool = False
+        self.points: Deque[Tuple[float, float]] = collections.deque()
+        self.series: QtCharts.QXYSeries = series
+
+    def append(self, time: float, value: float) -> None:
+        """Append a point."""
+        self.points.append((time, value))
+        self.changed = True
+
+    def clear(self) -> None:
+        """Remove all points."""
+        self.points.clear()
+        self.series.clear()
+        self.changed = False
+
+    def trim(self, start: float) -> None:
+        """Drop points before the given time, keeping one so that the line reaches the edge of the chart."""
+        points = self.points
+        while len(points) > 1 and points[1][0] <= start:
+            points.popleft()
+            self.changed = True
+
+
 class BaseChartGadget(QtWidgets.QWidget):
-    """A generic chart widget."""
+    """A generic chart widget.
+
+    Points are buffered by SeriesBuffer instances and the chart is only
+    redrawn when update_chart is called, normally once per frame. Only the
+    points in the last CHART_DURATION seconds are kept, so the cost of
+    drawing the chart does not grow as the match goes on.
+    """
 
     def __init__(self, parent: Optional[QtWidgets.QWidget] = None, flags: Qt.WindowFlags = Qt.Widget):
         """Initialise a new instance of the class."""
@@ -62,10 +130,24 @@ class BaseChartGadget(QtWidgets.QWidget):
         self.chart.addAxis(y_axis, QtCore.Qt.AlignLeft)
         self._style_axes()
 
-        self._largest_y_value: float = 0.0
-        self._smallest_y_value: float = sys.float_info.max
+        self._buffers: List[SeriesBuffer] = list()
         self.__x_axis_maximum: float = 0.0
 
+    def _add_series(self, series: QtCharts.QXYSeries) -> SeriesBuffer:
+        """Add a series to the chart and return its buffer."""
+        self.chart.addSeries(series)
+        series.attachAxis(self.chart.axisX())
+        series.attachAxis(self.chart.axisY())
+        buffer = SeriesBuffer(series)
+        self._buffers.append(buffer)
+        return buffer
+
+    def _append(self, buffer: SeriesBuffer, time: float, value: float) -> None:
+        """Append a point to a series."""
+        buffer.append(time, value)
+        if time > self.__x_axis_maximum:
+            self.__x_axis_maximum = time
+
     def _style_axes(self):
         """Apply the common style elements to the chart axes."""
         chart: QtCharts.QChart = self.chart
@@ -74,21 +156,37 @@ class BaseChartGadget(QtWidgets.QWidget):
         chart.axisY().setLabelFormat("%.2f")
         chart.axisY().setLabelsColor(chart.legend().labelColor())
 
-    def _scroll_x_axis(self, time: float) -> None:
-        """Scroll the the x-axis to the given time."""
-        if time > self.__x_axis_maximum:
-            scroll_distance: float = time - self.__x_axis_maximum
-            self.__x_axis_maximum += scroll_distance
-            self.chart.scroll(scroll_distance * self.chart.plotArea().width() / CHART_DURATION, 0)
-
-    def _update_y_axis(self, new_value: float) -> None:
-        """Ensure the y-axis range is large enough for the given value."""
-        if new_value < self._smallest_y_value:
-            self.chart.axisY().setMin(new_value - 0.01)
-            self._smallest_y_value = new_value
-        if new_value > self._largest_y_value:
-            self.chart.axisY().setMax(new_value + 0.01)
-            self._largest_y_value = new_value
+    def reset(self, time: float) -> None:
+        """Remove all points and move the x-axis so that it ends at the given time."""
+        for buffer in self._buffers:
+            buffer.clear()
+        self.__x_axis_maximum = time
+        self.chart.axisX().setRange(time - CHART_DURATION, time)
+
+    def update_chart(self) -> None:
+        """Redraw the chart if any points have been added since it was last drawn."""
+        if not any(buffer.changed for buffer in self._buffers):
+            return
+
+        end: float = self.__x_axis_maximum
+        start: float = end - CHART_DURATION
+        bucket_count: int = max(1, int(self.chart.plotArea().width()))
+        smallest: float = math.inf
+        largest: float = -math.inf
+        for buffer in self._buffers:
+            buffer.trim(start)
+            if buffer.points:
+                values = [y for _, y in buffer.points]
+                smallest = min(smallest, min(values))
+                largest = max(largest, max(values))
+            if buffer.changed:
+                buffer.series.replace(decimate(buffer.points, start, end, bucket_count))
+                buffer.changed = False
+
+        self.chart.axisX().setRange(start, end)
+        if smallest <= largest:
+            margin: float = max(0.05 * (largest - smallest), 0.01)
+            self.chart.axisY().setRange(smallest - margin, largest + margin)
 
 
 class MidpointChartGadget(BaseChartGadget):
@@ -102,38 +200,16 @@ class MidpointChartGadget(BaseChartGadget):
 
         self.setWindowTitle("Midpoint Prices")
 
-        self.instrument_series: List[QtCharts.QSplineSeries] = [QtCharts.QSplineSeries() for _ in Instrument]
-        for i, line_series in enumerate(self.instrument_series):
-            line_series.setName(Instrument(i).name)
-            self.chart.addSeries(line_series)
-            line_series.attachAxis(self.chart.axisX())
-            line_series.attachAxis(self.chart.axisY())
+        self.instrument_series: List[SeriesBuffer] = list()
+        for i in Instrument:
+            line_series = QtCharts.QSplineSeries()
+            line_series.setName(i.name)
             line_series.setColor(self._COLOURS[i])
-
-        self.__last_price: Optional[float] = None
-        self.__timer = QtCore.QTimer(self)
-        self.__timer.timeout.connect(self.__on_timer_tick)
-
-    def __on_timer_tick(self) -> None:
-        delta: float = (self._largest_y_value - self._smallest_y_value) // 8
-        if delta:
-            high_distance: float = self._largest_y_value - self.__last_price
-            low_distance: float = self.__last_price - self._smallest_y_value
-            if high_distance > low_distance:
-                self._largest_y_value -= delta
-            else:
-                self._smallest_y_value += delta
-            self.chart.axisY().setRange(self._smallest_y_value, self._largest_y_value)
+            self.instrument_series.append(self._add_series(line_series))
 
     def on_midpoint_price_changed(self, instrument: Instrument, time: float, mid_price: float) -> None:
         """Callback when the midpoint price of an instrument changes."""
-        self._scroll_x_axis(time)
-        price = mid_price / 100.0
-        self._update_y_axis(price)
-        self.instrument_series[instrument].append(time, price)
-        self.__last_price = price
-        if not self.__timer.isActive():
-            self.__timer.start(6000)
+        self._append(self.instrument_series[instrument], time, mid_price / 100.0)
 
 
 class ProfitLossChartGadget(BaseChartGadget):
@@ -146,20 +222,18 @@ class ProfitLossChartGadget(BaseChartGadget):
         super().__init__(parent)
 
         self.setWindowTitle("All Teams Profit or Loss")
-        self.team_series: Dict[str, QtCharts.QSplineSeries] = collections.defaultdict(QtCharts.QSplineSeries)
+        self.team_series: Dict[str, SeriesBuffer] = dict()
 
     def on_login_occurred(self, team: str) -> None:
         """Callback when a team logs in to the exchange."""
-        line_series: QtCharts.QSplineSeries = self.team_series[team]
-        self.chart.addSeries(line_series)
-        line_series.attachAxis(self.chart.axisX())
-        line_series.attachAxis(self.chart.axisY())
-        line_series.setName(team)
-        line_series.setColor(self._COLOURS[(len(self.team_series) - 1) % len(self._COLOURS)])
+        if team not in self.team_series:
+            line_series = QtCharts.QSplineSeries()
+            line_series.setName(team)
+            line_series.setColor(self._COLOURS[len(self.team_series) % len(self._COLOURS)])
+            self.team_series[team] = self._add_series(line_series)
 
     def on_profit_loss_changed(self, team: str, time: float, profit: float, etf_position: int,
                                account_balance: float, total_fees: float) -> None:
         """Callback when the profit of a team changes."""
-        self._update_y_axis(profit)
-        self.team_series[team].append(time, profit)
-        self._scroll_x_axis(time)
+        if team in self.team_series:
+            self._append(self.team_series[team], time, profit)
@@ -15,17 +15,20 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-import collections
+import bisect
 import csv
-import itertools
+import math
+import pickle
 
-from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
+from operator import attrgetter
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple
 
 from PySide6 import QtCore,  QtNetwork
 
 from ready_trader_go.account import AccountFactory, CompetitorAccount
+from ready_trader_go.match_analytics import MatchLog, TeamAnalytics
 from ready_trader_go.messages import (AMEND_EVENT_MESSAGE, AMEND_EVENT_MESSAGE_SIZE, CANCEL_EVENT_MESSAGE,
-                                      CANCEL_EVENT_MESSAGE_SIZE, ERROR_MESSAGE, ERROR_MESSAGE_SIZE, HEADER_SIZE,
+                                      CANCEL_EVENT_MESSAGE_SIZE, ERROR_MESSAGE, ERROR_MESSAGE_SIZE, HEADER, HEADER_SIZE,
                                       HEDGE_EVENT_MESSAGE, HEDGE_EVENT_MESSAGE_SIZE, INSERT_EVENT_MESSAGE,
                                       INSERT_EVENT_MESSAGE_SIZE, LOGIN_EVENT_MESSAGE, LOGIN_EVENT_MESSAGE_SIZE,
                                       TRADE_EVENT_MESSAGE, TRADE_EVENT_MESSAGE_SIZE, MessageType)
@@ -33,11 +36,15 @@ from ready_trader_go.order_book import TOP_LEVEL_COUNT, Order, OrderBook
 from ready_trader_go.types import Instrument, Lifespan, Side
 
 
-__all__ = ("EventSource", "LiveEventSource", "RecordedEventSource")
+__all__ = ("EventSource", "LiveEventSource", "LiveEventWorker", "RecordedEventSource")
 
 
-TICK_INTERVAL_MILLISECONDS = 500 
+FRAME_INTERVAL_MILLISECONDS = 50
+TICK_INTERVAL_MILLISECONDS = 500
 TICK_INTERVAL_SECONDS = TICK_INTERVAL_MILLISECONDS / 1000.0
+CHECKPOINT_INTERVAL_SECONDS = 10.0
+MINIMUM_TIMER_INTERVAL_MILLISECONDS = 25
+REPLAY_SPEEDS: Tuple[float, ...] = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
 
 
 class EventSource(QtCore.QObject):
@@ -86,18 +93,31 @@ class EventSource(QtCore.QObject):
         raise NotImplementedError()
 
 
-class LiveEventSource(EventSource):
-    """An event source that receives events from an exchange simulator."""
+class LiveEventWorker(QtCore.QObject):
+    """Receive and decode events from an exchange simulator.
 
-    def __init__(self, host: str, port: int, etf_clamp: float, tick_size: float,
-                 parent: Optional[QtCore.QObject] = None):
+    The worker lives in its own thread, so that the exchange's socket is
+    read promptly however busy the GUI thread is. It keeps its own copies of
+    the order books and accounts, and every FRAME_INTERVAL_MILLISECONDS it
+    posts the events that have occurred since the last frame, as a list of
+    (signal name, arguments) pairs, to the GUI thread.
+    """
+
+    # Signals
+
+    events_ready = QtCore.Signal(object)  # list of (signal name, arguments) pairs
+
+    def __init__(self, host: str, port: int, etf_clamp: float, tick_size: float):
         """Initialise a new instance of the class."""
-        super().__init__(etf_clamp, tick_size, parent)
+        super().__init__()
 
         self.host: str = host
         self.port: int = port
 
+        self.__account_factory: AccountFactory = AccountFactory(etf_clamp, tick_size)
         self.__accounts: Dict[int, CompetitorAccount] = dict()
+        self.__buffer: bytearray = bytearray()
+        self.__events: List[Tuple[str, tuple]] = list()
         self.__now: float = 0.0
         self.__order_books: List[OrderBook] = list(OrderBook(i, 0.0, 0.0) for i in Instrument)
         self.__orders: Dict[int, Dict[int, Order]] = {0: dict()}
@@ -109,20 +129,14 @@ class LiveEventSource(EventSource):
         self.__bid_prices: List[int] = [0] * TOP_LEVEL_COUNT
         self.__bid_volumes: List[int] = [0] * TOP_LEVEL_COUNT
 
-        self.__socket = QtNetwork.QTcpSocket(self)
-        self.__socket.connected.connect(self.on_connected)
-        self.__socket.disconnected.connect(self.on_disconnected)
-        self.__socket.errorOccurred.connect(self.on_error_occurred)
-        self.__socket.readyRead.connect(self.on_data_received)
-        self.__stream = QtCore.QDataStream(self.__socket)
-
-    def __del__(self) -> None:
-        """Destructor."""
-        self.__socket.close()
+        # These are created in start() so that they belong to the worker thread
+        self.__frame_timer: Optional[QtCore.QTimer] = None
+        self.__socket: Optional[QtNetwork.QTcpSocket] = None
+        self.__tick_timer: Optional[QtCore.QTimer] = None
 
     def on_connected(self) -> None:
         """Callback when a connection to the exchange is established."""
-        self._timer.start(TICK_INTERVAL_MILLISECONDS)
+        self.__tick_timer.start(TICK_INTERVAL_MILLISECONDS)
 
     def on_disconnected(self) -> None:
         """Callback when the connection to the exchange is lost."""
@@ -131,18 +145,27 @@ class LiveEventSource(EventSource):
     def on_error_occurred(self, error: QtNetwork.QAbstractSocket.SocketError) -> None:
         """Callback when there is a problem with the exchange connection."""
         if error != QtNetwork.QAbstractSocket.SocketError.RemoteHostClosedError:
-            self.event_source_error_occurred.emit(self.__socket.errorString())
+            self.__events.append(("event_source_error_occurred", (self.__socket.errorString(),)))
 
     def on_data_received(self) -> None:
         """Callback when data is received from the exchange simulator."""
-        while True:
-            self.__stream.startTransaction()
-            length: int = self.__stream.readUInt16()
-            typ: int = self.__stream.readUInt8()
-            data: bytes = self.__stream.readRawData(length - HEADER_SIZE)
-            if not self.__stream.commitTransaction():
-                return
-            self.on_message(typ, data, length)
+        buffer = self.__buffer
+        buffer += self.__socket.readAll().data()
+        start: int = 0
+        end: int = len(buffer)
+        while end - start >= HEADER_SIZE:
+            length, typ = HEADER.unpack_from(buffer, start)
+            if end - start < length:
+                break
+            self.on_message(typ, bytes(buffer[start + HEADER_SIZE:start + length]), length)
+            start += length
+        del buffer[:start]
+
+    def on_frame_timer_tick(self) -> None:
+        """Callback when the frame timer ticks to post the events since the last frame."""
+        if self.__events:
+            self.events_ready.emit(self.__events)
+            self.__events = list()
 
     def on_message(self, typ: int, data: bytes, length: int):
         """Process a message."""
@@ -163,7 +186,8 @@ class LiveEventSource(EventSource):
             client_order_id, error_message = ERROR_MESSAGE.unpack_from(data)
             self.on_error_message(client_order_id, error_message.rstrip(b"\x00"))
         else:
-            self.event_source_error_occurred.emit("received invalid message: length=%d type=%d" % (length, typ))
+            self.__events.append(("event_source_error_occurred",
+                                  ("received invalid message: length=%d type=%d" % (length, typ),)))
 
     def on_error_message(self, client_order_id: int, error_message: bytes):
         """Callback when an error message is received."""
@@ -177,7 +201,7 @@ class LiveEventSource(EventSource):
             if order.remaining_volume == 0:
                 del self.__orders[competitor_id][order_id]
         if competitor_id != 0:
-            self.order_amended.emit(self.__teams[competitor_id], now, order_id, volume_delta)
+            self.__events.append(("order_amended", (self.__teams[competitor_id], now, order_id, volume_delta)))
 
     def on_cancel_event_message(self, now: float, competitor_id: int, order_id: int) -> None:
         """Callback when an cancel event message is received."""
@@ -186,45 +210,50 @@ class LiveEventSource(EventSource):
         if order is not None:
             self.__order_books[order.instrument].cancel(now, order)
         if competitor_id != 0:
-            self.order_cancelled.emit(self.__teams[competitor_id], now, order_id)
+            self.__events.append(("order_cancelled", (self.__teams[competitor_id], now, order_id)))
 
     def on_insert_event_message(self, now: float, competitor_id: int, order_id: int, instrument: int, side: int,
                                 volume: int, price: int, lifespan: int) -> None:
         """Callback when an insert event message is received."""
         self.__now = now
+        if instrument > Instrument.ETF:
+            return  # only the first ETF/future pair is displayed
         order = Order(order_id, Instrument(instrument), Lifespan(lifespan), Side(side), price, volume)
         self.__orders[competitor_id][order_id] = order
         self.__order_books[instrument].insert(now, order)
         if competitor_id != 0:
-            self.order_inserted.emit(self.__teams[competitor_id], now, order_id, Instrument(instrument),
-                                     Side(side), volume, price, Lifespan(lifespan))
+            self.__events.append(("order_inserted", (self.__teams[competitor_id], now, order_id, order.instrument,
+                                                     order.side, volume, price, order.lifespan)))
 
     def on_hedge_event_message(self, now: float, competitor_id: int, side: int, instrument: int, volume: int,
                                price: float) -> None:
         """Callback when an hedge event message is received."""
         self.__now = now
+        if instrument > Instrument.ETF:
+            return
         self.__accounts[competitor_id].transact(Instrument(instrument), Side(side), price, volume, 0)
 
     def on_login_event_message(self, name: str, competitor_id: int) -> None:
         """Callback when an login event message is received."""
-        self.__accounts[competitor_id] = self._account_factory.create()
+        self.__accounts[competitor_id] = self.__account_factory.create()
         self.__teams[competitor_id] = name
         self.__orders[competitor_id] = dict()
-        self.login_occurred.emit(name)
+        self.__events.append(("login_occurred", (name,)))
 
-    def _on_timer_tick(self):
-        """Callback when the timer ticks."""
+    def on_tick_timer_tick(self):
+        """Callback when the tick timer ticks to take a snapshot of the order books and accounts."""
         if self.__now <= 0.0:
             return
 
         for i in Instrument:
             midpoint_price: float = self.__order_books[i].midpoint_price()
             if midpoint_price is not None:
-                self.midpoint_price_changed.emit(i, self.__now, midpoint_price)
+                self.__events.append(("midpoint_price_changed", (i, self.__now, midpoint_price)))
                 self.__order_books[i].top_levels(self.__ask_prices, self.__ask_volumes, self.__bid_prices,
                                                  self.__bid_volumes)
-                self.order_book_changed.emit(i, self.__now, self.__ask_prices, self.__ask_volumes,
-                                             self.__bid_prices, self.__bid_volumes)
+                self.__events.append(("order_book_changed", (i, self.__now, list(self.__ask_prices),
+                                                             list(self.__ask_volumes), list(self.__bid_prices),
+                                                             list(self.__bid_volumes))))
 
         future_price: int = self.__order_books[Instrument.FUTURE].last_traded_price()
         etf_price: int = self.__order_books[Instrument.ETF].last_traded_price()
@@ -233,180 +262,410 @@ class LiveEventSource(EventSource):
         if future_price is not None and etf_price is not None:
             for competitor_id, account in self.__accounts.items():
                 account.update(future_price, etf_price)
-                self.profit_loss_changed.emit(self.__teams[competitor_id], self.__now,
-                                              account.profit_or_loss / 100.0, account.etf_position,
-                                              account.future_position, account.account_balance / 100.0,
-                                              account.total_fees / 100.0)
+                self.__events.append(("profit_loss_changed",
+                                      (self.__teams[competitor_id], self.__now, account.profit_or_loss / 100.0,
+                                       account.etf_position, account.future_position,
+                                       account.account_balance / 100.0, account.total_fees / 100.0)))
 
         if self.__stop_later:
-            self._timer.stop()
-            self.match_over.emit()
+            self.__tick_timer.stop()
+            self.__events.append(("match_over", ()))
 
     def on_trade_event_message(self, now: float, competitor_id: int, order_id: int, side: int, instrument: int,
                                volume: int, price: int, fee: int) -> None:
         """Callback when an trade event message is received."""
         self.__now = now
+        if instrument > Instrument.ETF:
+            return
         self.__accounts[competitor_id].transact(Instrument(instrument), Side(side), price, volume, fee)
-        self.trade_occurred.emit(self.__teams[competitor_id], now, order_id, Side(side), volume, price, fee)
+        self.__events.append(("trade_occurred", (self.__teams[competitor_id], now, order_id, Side(side), volume,
+                                                 price, fee)))
 
         order = self.__orders[competitor_id].get(order_id)
         if order and order.remaining_volume == 0:
             del self.__orders[competitor_id][order_id]
 
     def start(self) -> None:
-        """Start this live event source."""
+        """Connect to the exchange simulator. Called in the worker thread."""
+        self.__frame_timer = QtCore.QTimer(self)
+        self.__frame_timer.timeout.connect(self.on_frame_timer_tick)
+        self.__frame_timer.start(FRAME_INTERVAL_MILLISECONDS)
+        self.__tick_timer = QtCore.QTimer(self)
+        self.__tick_timer.timeout.connect(self.on_tick_timer_tick)
+
+        self.__socket = QtNetwork.QTcpSocket(self)
+        self.__socket.connected.connect(self.on_connected)
+        self.__socket.disconnected.connect(self.on_disconnected)
+        self.__socket.errorOccurred.connect(self.on_error_occurred)
+        self.__socket.readyRead.connect(self.on_data_received)
         self.__socket.connectToHost(self.host, self.port)
 
+    @QtCore.Slot()
+    def stop(self) -> None:
+        """Close the connection to the exchange simulator. Called in the worker thread."""
+        if self.__socket is not None:
+            self.__socket.close()
+        if self.__frame_timer is not None:
+            self.__frame_timer.stop()
+        if self.__tick_timer is not None:
+            self.__tick_timer.stop()
 
-class Event(NamedTuple):
-    """A recorded event."""
-    when: float
-    emitter: Callable
-    args: Tuple
 
+class LiveEventSource(EventSource):
+    """An event source that receives events from an exchange simulator.
 
-class RecordedEventSource(EventSource):
-    """A source of events taken from a recording of a match."""
+    Messages are received and decoded by a LiveEventWorker in a separate
+    thread and the events it posts are emitted from the GUI thread.
+    """
 
-    def __init__(self, etf_clamp: float, tick_size: float, parent: Optional[QtCore.QObject] = None):
+    def __init__(self, host: str, port: int, etf_clamp: float, tick_size: float,
+                 parent: Optional[QtCore.QObject] = None):
         """Initialise a new instance of the class."""
         super().__init__(etf_clamp, tick_size, parent)
 
-        self.__teams: Set[str] = set()
-        self.__end_time: float = 0.0
-        self.__events: List[Event] = list()
-        self.__event_iter: Optional[Iterator] = None
-        self.__next_event: Optional[Event] = None
-        self.__now: float = 0.0
-        self.__order_books: Tuple[List[int], ...] = tuple(list() for _ in Instrument)
+        self.host: str = host
+        self.port: int = port
+
+        self.__thread = QtCore.QThread(self)
+        self.__worker = LiveEventWorker(host, port, etf_clamp, tick_size)
+        self.__worker.moveToThread(self.__thread)
+        self.__worker.events_ready.connect(self.on_events_ready)
+        self.__thread.started.connect(self.__worker.start)
+        self.__thread.finished.connect(self.__worker.deleteLater)
+
+        self.__signals: Dict[str, QtCore.SignalInstance] = {
+            name: getattr(self, name) for name in ("event_source_error_occurred", "login_occurred", "match_over",
+                                                   "midpoint_price_changed", "order_amended", "order_book_changed",
+                                                   "order_cancelled", "order_inserted", "profit_loss_changed",
+                                                   "trade_occurred")}
+
+    def on_events_ready(self, events: List[Tuple[str, tuple]]) -> None:
+        """Callback when the worker posts the events from the last frame."""
+        signals = self.__signals
+        for name, args in events:
+            signals[name].emit(*args)
+
+    def start(self) -> None:
+        """Start this live event source."""
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(self.stop)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Disconnect from the exchange simulator and wait for the worker thread to finish."""
+        if self.__thread.isRunning():
+            QtCore.QMetaObject.invokeMethod(self.__worker, "stop", QtCore.Qt.BlockingQueuedConnection)
+            self.__thread.quit()
+            self.__thread.wait()
+
+
+class Checkpoint(NamedTuple):
+    """The state of a recorded match at the end of a tick."""
+    tick: int  # number of ticks since the start of the match
+    offset: int  # file offset of the first event after the tick
+    state: bytes  # pickled resting orders
+
+
+class _TimedOrder(Order):
+    """An order together with the time at which it was inserted."""
+    __slots__ = ("time",)
+
+    def __init__(self, time: float, client_order_id: int, instrument: Instrument, lifespan: Lifespan, side: Side,
+                 price: int, volume: int):
+        """Initialise a new instance of the _TimedOrder class."""
+        super().__init__(client_order_id, instrument, lifespan, side, price, volume)
+        self.time: float = time
+
+
+class RecordedEventSource(EventSource):
+    """A source of events taken from a recording of a match.
+
+    The recording is indexed once when the source is created, keeping a
+    checkpoint of the order books and orders every CHECKPOINT_INTERVAL_SECONDS.
+    Events are then decoded from the file as the replay advances, and seeking
+    restores the nearest earlier checkpoint and replays the remaining events
+    without emitting them. The profit or loss of each team is taken from the
+    analytics of the match log rather than replayed.
+
+    The replay can be paused, stepped one tick at a time and played at any
+    of the REPLAY_SPEEDS. At high speeds several ticks are replayed each
+    time the timer fires, so that the timer interval never falls below
+    MINIMUM_TIMER_INTERVAL_MILLISECONDS.
+    """
+
+    # Signals
+
+    position_changed = QtCore.Signal(float)  # time
+
+    # Emitted after a seek, before the state at the new time is emitted
+    replay_reset = QtCore.Signal(float)  # time
+
+    def __init__(self, file_object: BinaryIO, match_log: MatchLog, parent: Optional[QtCore.QObject] = None):
+        """Initialise a new instance of the class."""
+        super().__init__(match_log.etf_clamp, match_log.tick_size, parent)
+
+        self.__checkpoints: List[Checkpoint] = list()
+        self.__end_tick: int = len(match_log.tick_times) - 1
+        self.__file: BinaryIO = file_object
+        self.__match_log: MatchLog = match_log
+        self.__next_row: Optional[List[str]] = None
+        self.__next_time: float = 0.0
+        self.__order_books: Tuple[OrderBook, ...] = tuple(OrderBook(i, 0.0, 0.0) for i in Instrument)
+        self.__orders: Dict[str, Dict[int, _TimedOrder]] = dict()
+        self.__paused: bool = False
+        self.__speed: float = 1.0
+        self.__teams: Dict[str, TeamAnalytics] = {team: match_log.team(team) for team in match_log.teams}
+        self.__tick: int = 0
+        self.__ticks_per_timeout: int = 1
+
+        self.__ask_prices: List[int] = [0] * TOP_LEVEL_COUNT
+        self.__ask_volumes: List[int] = [0] * TOP_LEVEL_COUNT
+        self.__bid_prices: List[int] = [0] * TOP_LEVEL_COUNT
+        self.__bid_volumes: List[int] = [0] * TOP_LEVEL_COUNT
+
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.__build_index()
+
+    def __del__(self) -> None:
+        """Destructor."""
+        self.__file.close()
+
+    def __apply(self, row: List[str], now: float, emit: bool) -> None:
+        """Apply an event to the order books and orders."""
+        team: str = row[1]
+        operation: str = row[2]
+        order_id: int = int(row[3])
+        emit = emit and bool(team)
+
+        if operation in ("Insert", "Hedge", "Trade") and int(row[4]) > Instrument.ETF:
+            return  # only the first ETF/future pair is displayed
+
+        orders = self.__orders.get(team)
+        if orders is None:
+            orders = self.__orders[team] = dict()
+
+        if operation == "Insert":
+            order = _TimedOrder(now, order_id, Instrument(int(row[4])), Lifespan[row[8]], Side[row[5]], int(row[7]),
+                                int(row[6]))
+            self.__order_books[order.instrument].insert(now, order)
+            if order.remaining_volume > 0:
+                orders[order_id] = order
+            if emit:
+                self.order_inserted.emit(team, now, order_id, order.instrument, order.side, order.volume, order.price,
+                                         order.lifespan)
+        elif operation == "Amend":
+            order = orders.get(order_id)
+            if order is None:
+                return
+            volume_delta = int(row[6])
+            self.__order_books[order.instrument].amend(now, order, order.volume + volume_delta)
+            if order.remaining_volume == 0:
+                del orders[order_id]
+            if emit:
+                self.order_amended.emit(team, now, order_id, volume_delta)
+        elif operation == "Cancel":
+            order = orders.pop(order_id, None)
+            if order is not None:
+                self.__order_books[order.instrument].cancel(now, order)
+            if emit:
+                self.order_cancelled.emit(team, now, order_id)
+        elif operation == "Trade" and team:
+            order = orders.get(order_id)
+            if order is not None and order.remaining_volume == 0:
+                del orders[order_id]
+            if emit:
+                self.trade_occurred.emit(team, now, order_id, Side[row[5]], int(row[6]), int(row[7]),
+                                         int(row[9]) if row[9] else 0)
+
+    def __build_index(self) -> None:
+        """Read the recording once, taking a checkpoint every CHECKPOINT_INTERVAL_SECONDS."""
+        self.__file.readline()  # Skip header
+        ticks_per_checkpoint: int = max(1, round(CHECKPOINT_INTERVAL_SECONDS / TICK_INTERVAL_SECONDS))
+        self.__checkpoints.append(Checkpoint(0, self.__file.tell(), self.__save_state()))
+
+        tick: int = 1
+        offset: int = self.__file.tell()
+        row = self.__read_row()
+        while row is not None:
+            tm = float(row[0])
+            while tm > tick * TICK_INTERVAL_SECONDS:
+                if tick % ticks_per_checkpoint == 0:
+                    self.__checkpoints.append(Checkpoint(tick, offset, self.__save_state()))
+                tick += 1
+            self.__apply(row, tm, False)
+            offset = self.__file.tell()
+            row = self.__read_row()
+
+    def __read_row(self) -> Optional[List[str]]:
+        """Read the next event from the recording, or return None at the end of the file."""
+        line: bytes = self.__file.readline()
+        if not line:
+            return None
+        if b'"' in line:
+            return next(csv.reader((line.decode(),)))
+        return line.decode().rstrip("\r\n").split(",")
+
+    def __restore_state(self, state: bytes) -> None:
+        """Rebuild the order books and orders from a checkpoint."""
+        resting = pickle.loads(state)
+        self.__order_books = tuple(OrderBook(i, 0.0, 0.0) for i in Instrument)
+        self.__orders = dict()
+        for team, time, order_id, instrument, side, price, volume, remaining_volume, lifespan in resting:
+            order = _TimedOrder(time, order_id, Instrument(instrument), Lifespan(lifespan), Side(side), price, volume)
+            order.remaining_volume = remaining_volume
+            self.__order_books[instrument].place(0.0, order)
+            orders = self.__orders.get(team)
+            if orders is None:
+                orders = self.__orders[team] = dict()
+            orders[order_id] = order
+
+    def __save_state(self) -> bytes:
+        """Return the pickled resting orders.
+
+        Resting orders are saved as plain tuples, in order of priority, which
+        is much quicker to pickle than the order books themselves. Orders that
+        were filled passively are also dropped from the orders of each team.
+        """
+        self.__orders = {team: {i: o for i, o in orders.items() if o.remaining_volume > 0}
+                         for team, orders in self.__orders.items()}
+        owners: Dict[int, str] = {id(o): team for team, orders in self.__orders.items() for o in orders.values()}
+        resting = [(owners.get(id(o), ""), o.time, o.client_order_id, int(o.instrument), int(o.side), o.price,
+                    o.volume, o.remaining_volume, int(o.lifespan))
+                   for book in self.__order_books for side in (Side.ASK, Side.BID) for o in book.orders(side)]
+        return pickle.dumps(resting, pickle.HIGHEST_PROTOCOL)
+
+    def __advance(self, tick: int, emit: bool) -> None:
+        """Apply all events up to the end of the given tick."""
+        now: float = tick * TICK_INTERVAL_SECONDS
+        row = self.__next_row
+        while row is not None and self.__next_time <= now:
+            self.__apply(row, self.__next_time, emit)
+            row = self.__next_row = self.__read_row()
+            if row is not None:
+                self.__next_time = float(row[0])
+        self.__tick = tick
+
+    def __take_snapshot(self) -> None:
+        """Emit the order books and profit or loss of each team at the current time."""
+        now: float = self.__tick * TICK_INTERVAL_SECONDS
+        for i in Instrument:
+            midpoint_price: Optional[float] = self.__order_books[i].midpoint_price()
+            if midpoint_price is not None:
+                self.midpoint_price_changed.emit(i, now, midpoint_price)
+            self.__order_books[i].top_levels(self.__ask_prices, self.__ask_volumes, self.__bid_prices,
+                                             self.__bid_volumes)
+            self.order_book_changed.emit(i, now, self.__ask_prices, self.__ask_volumes, self.__bid_prices,
+                                         self.__bid_volumes)
+
+        tick: int = self.__tick
+        if self.__match_log.valued[tick]:
+            for team, analytics in self.__teams.items():
+                self.profit_loss_changed.emit(team, now, analytics.profit_or_loss[tick] / 100.0,
+                                              int(analytics.etf_position[tick]), int(analytics.future_position[tick]),
+                                              analytics.account_balance[tick] / 100.0,
+                                              analytics.total_fees[tick] / 100.0)
+
+    def __step(self) -> None:
+        """Replay the next tick."""
+        self.__advance(self.__tick + 1, True)
+        self.__take_snapshot()
+        self.position_changed.emit(self.__tick * TICK_INTERVAL_SECONDS)
 
     def _on_timer_tick(self):
         """Callback when the timer ticks."""
-        now = self.__now = self.__now + TICK_INTERVAL_SECONDS
-
-        # target_team = "Shedneryan_223251"
-        # target_team_found = False
-
-        if self.__next_event.when <= now:
-            # if self.__next_event.args[0] == target_team:
-            #     target_team_found = True
-            self.__next_event.emitter(*self.__next_event.args)
-            event: Optional[Event] = None
-            for event in self.__event_iter:
-                # if event.args[0] == target_team:
-                #     target_team_found = True
-                if event.when > now:
-                    break
-                event.emitter(*event.args)
-            self.__next_event = event
-
-        tick = int(now // TICK_INTERVAL_SECONDS)
-        for i in Instrument:
-            if len(self.__order_books[i]) >= (tick + 1) * 4 * TOP_LEVEL_COUNT:
-                data = (self.__order_books[i][j * TOP_LEVEL_COUNT:(j + 1) * TOP_LEVEL_COUNT]
-                        for j in range(tick * 4, (tick + 1) * 4))
-                self.order_book_changed.emit(i, now, *data)
-
-        if self.__now >= self.__end_time:
-            self._timer.stop()
-            self.match_over.emit()
-        # else:
-        #     if target_team_found == False and self.__next_event.args[0] != target_team:
-        #         self._on_timer_tick()
+        for _ in range(self.__ticks_per_timeout):
+            self.__step()
+            if self.__tick >= self.__end_tick:
+                self._timer.stop()
+                self.match_over.emit()
+                break
+
+    @property
+    def duration(self) -> float:
+        """The length of the recorded match in seconds."""
+        return self.__end_tick * TICK_INTERVAL_SECONDS
+
+    @property
+    def now(self) -> float:
+        """The current replay time in seconds."""
+        return self.__tick * TICK_INTERVAL_SECONDS
+
+    @property
+    def paused(self) -> bool:
+        """True if the replay has been paused."""
+        return self.__paused
+
+    @property
+    def speed(self) -> float:
+        """The replay speed as a multiple of real time."""
+        return self.__speed
 
     @staticmethod
-    def from_csv(file_object: TextIO, etf_clamp: float, tick_size: float,
-                 parent: Optional[QtCore.QObject] = None):
+    def from_file(path: str, etf_clamp: float, tick_size: float, parent: Optional[QtCore.QObject] = None):
         """Create a new RecordedEventSource instance from a CSV file."""
-        source = RecordedEventSource(etf_clamp, tick_size, parent)
-        events = source.__events
-
-        reader = csv.reader(file_object)
-        next(reader)  # Skip header
-
-        accounts: Dict[str, CompetitorAccount] = collections.defaultdict(source._account_factory.create)
-        books: Tuple[OrderBook, ...] = tuple(OrderBook(i, 0.0, 0.0) for i in Instrument)
-        orders: Dict[str, Dict[int, Order]] = collections.defaultdict(dict)
-
-        ask_prices = [0] * TOP_LEVEL_COUNT
-        ask_volumes = [0] * TOP_LEVEL_COUNT
-        bid_prices = [0] * TOP_LEVEL_COUNT
-        bid_volumes = [0] * TOP_LEVEL_COUNT
-
-        def take_snapshot(when: float):
-            for i in Instrument:
-                events.append(Event(when, source.midpoint_price_changed.emit, (i, when, books[i].midpoint_price())))
-                books[i].top_levels(ask_prices, ask_volumes, bid_prices, bid_volumes)
-                source.__order_books[i].extend(itertools.chain(ask_prices, ask_volumes, bid_prices, bid_volumes))
-
-            future_price: int = books[Instrument.FUTURE].last_traded_price()
-            etf_price: int = books[Instrument.ETF].last_traded_price()
-            if future_price is not None and etf_price is not None:
-                for team, account in accounts.items():
-                    account.update(future_price, etf_price)
-                    events.append(Event(when, source.profit_loss_changed.emit,
-                                        (team, when, account.profit_or_loss / 100.0, account.etf_position,
-                                         account.future_position, account.account_balance / 100.0,
-                                         account.total_fees / 100.0)))
-
-        now: float = TICK_INTERVAL_SECONDS
-        for row in reader:
-            tm = float(row[0])
-
-            if tm > now:
-                take_snapshot(now)
-                now += TICK_INTERVAL_SECONDS
-
-            team: str = row[1]
-            order_id: int = int(row[3])
-            operation: str = row[2]
-
-            if team and team not in source.__teams:
-                source.__teams.add(team)
-
-            if operation == "Insert":
-                order = Order(order_id, Instrument(int(row[4])), Lifespan[row[8]], Side[row[5]],
-                              int(row[7]), int(row[6]))
-                books[order.instrument].insert(tm, order)
-                orders[team][order_id] = order
-                events.append(Event(tm, source.order_inserted.emit, (team, tm, order_id, order.instrument,
-                                                                     order.side, order.volume, order.price,
-                                                                     order.lifespan)))
-            elif operation == "Amend":
-                order = orders[team][order_id]
-                volume_delta = int(row[6])
-                books[order.instrument].amend(tm, order, order.volume + volume_delta)
-                if order.remaining_volume == 0:
-                    del orders[team][order_id]
-                events.append(Event(tm, source.order_amended.emit, (team, tm, order_id, volume_delta)))
-            elif operation == "Cancel":
-                order = orders[team].pop(order_id, None)
-                if order:
-                    books[order.instrument].cancel(tm, order)
-                events.append(Event(tm, source.order_cancelled.emit, (team, tm, order_id)))
-            else:  # operation is "Hedge" or "Trade"
-                instrument = Instrument(int(row[4]))
-                side = Side[row[5]]
-                volume = int(row[6])
-                price = float(row[7]) if operation == "Hedge" else int(row[7])
-                fee = int(row[9]) if row[9] else 0
-                accounts[team].transact(instrument, side, price, volume, fee)
-                if operation == "Trade":
-                    if order_id in orders[team] and orders[team][order_id].remaining_volume == 0:
-                        del orders[team][order_id]
-                    events.append(Event(tm, source.trade_occurred.emit, (team, tm, order_id, side, volume, price,
-                                                                         fee)))
-
-        take_snapshot(now)
-        source.__end_time = now
-
-        return source
+        match_log = MatchLog.from_file(path, etf_clamp, tick_size, TICK_INTERVAL_SECONDS)
+        return RecordedEventSource(open(path, "rb"), match_log, parent)
+
+    def seek(self, when: float) -> None:
+        """Move the replay to the given time.
+
+        The state is restored from the last checkpoint at or before the given
+        time and the events that follow it are applied without being emitted.
+        """
+        tick: int = min(max(0, int(when / TICK_INTERVAL_SECONDS)), self.__end_tick)
+        checkpoint = self.__checkpoints[bisect.bisect_right(self.__checkpoints, tick, key=attrgetter("tick")) - 1]
+        self.__restore_state(checkpoint.state)
+        self.__file.seek(checkpoint.offset)
+        self.__next_row = self.__read_row()
+        if self.__next_row is not None:
+            self.__next_time = float(self.__next_row[0])
+        for t in range(checkpoint.tick, tick):
+            self.__advance(t + 1, False)
+        self.__tick = tick
+
+        now: float = tick * TICK_INTERVAL_SECONDS
+        self.replay_reset.emit(now)
+        resting = sorted(((team, o) for team, orders in self.__orders.items() if team
+                          for o in orders.values() if o.remaining_volume > 0), key=lambda t: t[1].time)
+        for team, order in resting:
+            self.order_inserted.emit(team, order.time, order.client_order_id, order.instrument, order.side,
+                                     order.remaining_volume, order.price, order.lifespan)
+        self.__take_snapshot()
+        self.position_changed.emit(now)
+
+        if tick < self.__end_tick and not self.__paused and not self._timer.isActive():
+            self._timer.start()
+
+    def pause(self) -> None:
+        """Pause the replay."""
+        self.__paused = True
+        self._timer.stop()
+
+    def resume(self) -> None:
+        """Resume a paused replay."""
+        self.__paused = False
+        if self.__tick < self.__end_tick:
+            self._timer.start()
+
+    def set_speed(self, speed: float) -> None:
+        """Set the replay speed as a multiple of real time."""
+        if not REPLAY_SPEEDS[0] <= speed <= REPLAY_SPEEDS[-1]:
+            raise ValueError("replay speed must be between %gx and %gx" % (REPLAY_SPEEDS[0], REPLAY_SPEEDS[-1]))
+        self.__speed = speed
+        self.__ticks_per_timeout = max(1, math.ceil(MINIMUM_TIMER_INTERVAL_MILLISECONDS * speed
+                                                    / TICK_INTERVAL_MILLISECONDS))
+        self._timer.setInterval(round(TICK_INTERVAL_MILLISECONDS * self.__ticks_per_timeout / speed))
 
     def start(self) -> None:
         """Start this recorded event source."""
-        self.__now = 0.0
-        self._timer.start(TICK_INTERVAL_MILLISECONDS)
-        self.__event_iter = iter(self.__events)
-        self.__next_event = next(self.__event_iter, None)
         for competitor in sorted(self.__teams):
             self.login_occurred.emit(competitor)
+        self.set_speed(self.__speed)
+        self.seek(0.0)
+
+    def step(self) -> None:
+        """Pause the replay and advance it by a single tick."""
+        self.pause()
+        if self.__tick < self.__end_tick:
+            self.__step()
+            if self.__tick >= self.__end_tick:
+                self.match_over.emit()
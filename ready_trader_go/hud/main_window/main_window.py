@@ -19,14 +19,15 @@ from typing import Callable, Dict, Optional
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
-from ready_trader_go.types import Instrument
+from ready_trader_go.types import Instrument, Lifespan, Side
 
 from ready_trader_go.hud.table_gadget import BasicPriceLadderGadget, PerTeamTableGadget, ProfitLossTableGadget
 from ready_trader_go.hud.table_model import (ActiveOrderTableModel, BasicPriceLadderModel,
                                              ProfitLossTableModel, TradeHistoryTableModel, PriceLadderModel,
                                              TeamLadderVolumes)
-from ready_trader_go.hud.event_source import EventSource
+from ready_trader_go.hud.event_source import FRAME_INTERVAL_MILLISECONDS, EventSource, RecordedEventSource
 from ready_trader_go.hud.chart import MidpointChartGadget, ProfitLossChartGadget
+from ready_trader_go.hud.playback import PlaybackToolBar
 
 from .ui_main_window import Ui_main_window
 
@@ -69,6 +70,10 @@ class MainWindow(Ui_main_window, QtWidgets.QMainWindow):
         event_source.event_source_error_occurred.connect(self.__on_event_source_error_occurred)
         event_source.login_occurred.connect(self.__on_login_occurred)
         event_source.match_over.connect(self.__on_match_over)
+        event_source.order_amended.connect(self.__on_order_amended)
+        event_source.order_cancelled.connect(self.__on_order_cancelled)
+        event_source.order_inserted.connect(self.__on_order_inserted)
+        event_source.trade_occurred.connect(self.__on_trade_occurred)
 
         self.__icon: QtGui.QIcon = icon
         self.__team_active_orders: Dict[str, ActiveOrderTableModel] = dict()
@@ -78,6 +83,13 @@ class MainWindow(Ui_main_window, QtWidgets.QMainWindow):
 
         self.__setup_models()
 
+        self.__frame_timer = QtCore.QTimer(self)
+        self.__frame_timer.timeout.connect(self.__on_frame_timer_tick)
+
+        if isinstance(event_source, RecordedEventSource):
+            event_source.replay_reset.connect(self.__on_replay_reset)
+            self.addToolBar(QtCore.Qt.BottomToolBarArea, PlaybackToolBar(event_source, self))
+
     def __on_event_source_error_occurred(self, error_message: str) -> None:
         """Callback when an error occurs with the event source."""
         error_dialog = QtWidgets.QMessageBox(self)
@@ -87,25 +99,24 @@ class MainWindow(Ui_main_window, QtWidgets.QMainWindow):
         error_dialog.setText("Error")
         error_dialog.show()
 
+    def __on_frame_timer_tick(self) -> None:
+        """Callback when the frame timer ticks to update the per-team models and charts."""
+        for model in self.__team_active_orders.values():
+            model.flush()
+        for model in self.__team_trades.values():
+            model.flush()
+        for volumes in self.__team_volumes.values():
+            volumes.flush()
+        if self.__mcg:
+            self.__mcg.update_chart()
+        if self.__pnl_chart:
+            self.__pnl_chart.update_chart()
+
     def __on_login_occurred(self, competitor: str) -> None:
         """Callback when a login occurs."""
-        aov_model = ActiveOrderTableModel(competitor)
-        self.event_source.order_amended.connect(aov_model.on_order_amended)
-        self.event_source.order_cancelled.connect(aov_model.on_order_cancelled)
-        self.event_source.order_inserted.connect(aov_model.on_order_inserted)
-        self.event_source.trade_occurred.connect(aov_model.on_trade_occurred)
-        self.__team_active_orders[competitor] = aov_model
-
-        competitor_volumes = TeamLadderVolumes(competitor)
-        self.event_source.order_amended.connect(competitor_volumes.on_order_amended)
-        self.event_source.order_cancelled.connect(competitor_volumes.on_order_cancelled)
-        self.event_source.order_inserted.connect(competitor_volumes.on_order_inserted)
-        self.event_source.trade_occurred.connect(competitor_volumes.on_trade_occurred)
-        self.__team_volumes[competitor] = competitor_volumes
-
-        tv_model = TradeHistoryTableModel(competitor)
-        self.event_source.trade_occurred.connect(tv_model.on_trade_occurred)
-        self.__team_trades[competitor] = tv_model
+        self.__team_active_orders[competitor] = ActiveOrderTableModel(competitor)
+        self.__team_volumes[competitor] = TeamLadderVolumes(competitor)
+        self.__team_trades[competitor] = TradeHistoryTableModel(competitor)
 
     def __on_match_over(self) -> None:
         """Callback when the Ready Trader Go match is over."""
@@ -116,6 +127,48 @@ class MainWindow(Ui_main_window, QtWidgets.QMainWindow):
         message_dialog.setText("Simulation Complete")
         message_dialog.show()
 
+    def __on_order_amended(self, team: str, now: float, order_id: int, volume_delta: int) -> None:
+        """Callback when an order is amended."""
+        if team in self.__team_active_orders:
+            self.__team_active_orders[team].on_order_amended(team, now, order_id, volume_delta)
+            self.__team_volumes[team].on_order_amended(team, now, order_id, volume_delta)
+
+    def __on_order_cancelled(self, team: str, now: float, order_id: int) -> None:
+        """Callback when an order is cancelled."""
+        if team in self.__team_active_orders:
+            self.__team_active_orders[team].on_order_cancelled(team, now, order_id)
+            self.__team_volumes[team].on_order_cancelled(team, now, order_id)
+
+    def __on_order_inserted(self, team: str, now: float, order_id: int, instrument: Instrument, side: Side,
+                            volume: int, price: int, lifespan: Lifespan) -> None:
+        """Callback when an order is inserted."""
+        if team in self.__team_active_orders:
+            self.__team_active_orders[team].on_order_inserted(team, now, order_id, instrument, side, volume, price,
+                                                              lifespan)
+            self.__team_volumes[team].on_order_inserted(team, now, order_id, instrument, side, volume, price,
+                                                        lifespan)
+
+    def __on_replay_reset(self, now: float) -> None:
+        """Callback when a replay moves to a different time."""
+        for model in self.__team_active_orders.values():
+            model.clear()
+        for model in self.__team_trades.values():
+            model.clear()
+        for volumes in self.__team_volumes.values():
+            volumes.clear()
+        if self.__mcg:
+            self.__mcg.reset(now)
+        if self.__pnl_chart:
+            self.__pnl_chart.reset(now)
+
+    def __on_trade_occurred(self, team: str, now: float, order_id: int, side: Side, volume: int, price: int,
+                            fee: int) -> None:
+        """Callback when a trade occurs."""
+        if team in self.__team_active_orders:
+            self.__team_active_orders[team].on_trade_occurred(team, now, order_id, side, volume, price, fee)
+            self.__team_volumes[team].on_trade_occurred(team, now, order_id, side, volume, price, fee)
+            self.__team_trades[team].on_trade_occurred(team, now, order_id, side, volume, price, fee)
+
     def __on_selected_competitor_changed(self, team: str) -> None:
         """Callback when the selected competitor changes."""
         if team and team != self.__selected_team:
@@ -283,4 +336,5 @@ class MainWindow(Ui_main_window, QtWidgets.QMainWindow):
         self.__show_team_trade_history_table()
         self.__show_profit_loss_chart()
 
+        self.__frame_timer.start(FRAME_INTERVAL_MILLISECONDS)
         self.event_source.start()
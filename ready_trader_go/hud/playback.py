@@ -0,0 +1,115 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+from typing import Optional
+
+from PySide6 import QtCore, QtGui, QtWidgets
+from PySide6.QtCore import Qt
+
+from ready_trader_go.hud.event_source import REPLAY_SPEEDS, TICK_INTERVAL_SECONDS, RecordedEventSource
+
+
+def _format_time(seconds: float) -> str:
+    """Return a time as minutes and seconds."""
+    return "%d:%02d" % divmod(int(seconds), 60)
+
+
+class PlaybackToolBar(QtWidgets.QToolBar):
+    """Controls for the speed and position of a replay."""
+
+    def __init__(self, event_source: RecordedEventSource, parent: Optional[QtWidgets.QWidget] = None):
+        """Initialise a new instance of the class."""
+        super().__init__("Playback", parent)
+
+        self.setObjectName("playback_toolbar")
+        self.event_source: RecordedEventSource = event_source
+        event_source.match_over.connect(self.__on_match_over)
+        event_source.position_changed.connect(self.__on_position_changed)
+
+        self.play_action = QtGui.QAction("Pause", self)
+        self.play_action.setShortcut(Qt.Key_Space)
+        self.play_action.setStatusTip("Pause or resume the replay")
+        self.play_action.triggered.connect(self.__on_play_triggered)
+        self.addAction(self.play_action)
+
+        self.step_action = QtGui.QAction("Step", self)
+        self.step_action.setShortcut(Qt.Key_Period)
+        self.step_action.setStatusTip("Pause the replay and advance it by %g seconds" % TICK_INTERVAL_SECONDS)
+        self.step_action.triggered.connect(self.__on_step_triggered)
+        self.addAction(self.step_action)
+
+        self.speed_combo_box = QtWidgets.QComboBox(self)
+        self.speed_combo_box.setStatusTip("Replay speed")
+        for speed in REPLAY_SPEEDS:
+            self.speed_combo_box.addItem("%gx" % speed, speed)
+        self.speed_combo_box.setCurrentIndex(REPLAY_SPEEDS.index(event_source.speed))
+        self.speed_combo_box.currentIndexChanged.connect(self.__on_speed_changed)
+        self.addWidget(self.speed_combo_box)
+
+        self.position_slider = QtWidgets.QSlider(Qt.Horizontal, self)
+        self.position_slider.setRange(0, round(event_source.duration / TICK_INTERVAL_SECONDS))
+        self.position_slider.setPageStep(round(10.0 / TICK_INTERVAL_SECONDS))
+        self.position_slider.setStatusTip("Drag to move the replay to a different time")
+        self.position_slider.setTracking(False)
+        self.position_slider.sliderMoved.connect(self.__on_slider_moved)
+        self.position_slider.valueChanged.connect(self.__on_slider_value_changed)
+        self.addWidget(self.position_slider)
+
+        self.position_label = QtWidgets.QLabel(self)
+        self.addWidget(self.position_label)
+        self.__on_position_changed(event_source.now)
+
+    def __on_match_over(self) -> None:
+        """Callback when the end of the replay is reached."""
+        self.play_action.setText("Play")
+
+    def __on_play_triggered(self) -> None:
+        """Callback when the play, or pause, button is pressed."""
+        if self.event_source.paused or self.event_source.now >= self.event_source.duration:
+            if self.event_source.now >= self.event_source.duration:
+                self.event_source.seek(0.0)
+            self.event_source.resume()
+            self.play_action.setText("Pause")
+        else:
+            self.event_source.pause()
+            self.play_action.setText("Play")
+
+    def __on_position_changed(self, now: float) -> None:
+        """Callback when the replay time changes."""
+        if not self.position_slider.isSliderDown():
+            blocker = QtCore.QSignalBlocker(self.position_slider)
+            self.position_slider.setValue(round(now / TICK_INTERVAL_SECONDS))
+            blocker.unblock()
+            self.position_label.setText("%s / %s" % (_format_time(now), _format_time(self.event_source.duration)))
+
+    def __on_slider_moved(self, value: int) -> None:
+        """Callback when the slider is dragged."""
+        self.position_label.setText("%s / %s" % (_format_time(value * TICK_INTERVAL_SECONDS),
+                                                 _format_time(self.event_source.duration)))
+
+    def __on_slider_value_changed(self, value: int) -> None:
+        """Callback when the slider is released or clicked."""
+        self.event_source.seek(value * TICK_INTERVAL_SECONDS)
+
+    def __on_speed_changed(self, index: int) -> None:
+        """Callback when a different replay speed is selected."""
+        self.event_source.set_speed(self.speed_combo_box.itemData(index))
+
+    def __on_step_triggered(self) -> None:
+        """Callback when the step button is pressed."""
+        self.event_source.step()
+        self.play_action.setText("Play")
@@ -67,7 +67,12 @@ class BaseTableModel(QtCore.QAbstractTableModel):
 
 
 class ActiveOrderTableModel(BaseTableModel):
-    """Data model for the per-team active orders table."""
+    """Data model for the per-team active orders table.
+
+    Order events update the orders immediately, but the table is only told
+    about the changes when flush is called, so that a burst of events
+    causes at most one model reset per frame.
+    """
 
     _COLUMN_NAMES = ("Time", "OrderId", "Inst.", "Side", "Volume", "Price")
     _COLUMN_ALIGNMENTS = (_ALIGN_CENTER_RIGHT, _ALIGN_CENTER_RIGHT, Qt.AlignCenter, Qt.AlignCenter,
@@ -78,36 +83,50 @@ class ActiveOrderTableModel(BaseTableModel):
                         "The side of the order (either buy or sell)",
                         "The volume of the order (i.e. the number of lots to trade)",
                         "The limit price of the order (i.e. the worst price at which it can trade)")
-    _ORDER_ID_COLUMN = _COLUMN_NAMES.index("OrderId")
     _VOLUME_COLUMN = _COLUMN_NAMES.index("Volume")
 
     def __init__(self, team: str, parent: Optional[QtCore.QObject] = None):
         """Initialise a new instance of the class."""
         super().__init__(parent)
         self.team: str = team
-        self.__orders: List[List[str, int, str, str, int, str]] = list()
+        self.__orders: Dict[int, List[str, int, str, str, int, str]] = dict()  # in order of insertion
+        self.__rows: List[List[str, int, str, str, int, str]] = list()  # newest first
+        self.__rows_stale: bool = False
+        self.__volumes_changed: bool = False
 
     def data(self, index: QtCore.QModelIndex, role: int = Qt.DisplayRole) -> Any:
         """Return information about a specified table cell."""
         if role == Qt.DisplayRole:
-            return self.__orders[self._row_count - index.row() - 1][index.column()]
+            return self.__rows[index.row()][index.column()]
         return super().data(index, role)
 
-    def __remove_row(self, row: int) -> None:
-        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
-        self._row_count -= 1
-        self.__orders.pop(row)
-        self.endRemoveRows()
-
     def __update_order_volume(self, order_id: int, volume_delta: int) -> None:
-        row = next((i for i in range(self._row_count) if self.__orders[i][self._ORDER_ID_COLUMN] == order_id), None)
-        if row is not None:
-            self.__orders[row][self._VOLUME_COLUMN] += volume_delta
-            if self.__orders[row][self._VOLUME_COLUMN] <= 0:
-                self.__remove_row(row)
+        order = self.__orders.get(order_id)
+        if order is not None:
+            order[self._VOLUME_COLUMN] += volume_delta
+            if order[self._VOLUME_COLUMN] <= 0:
+                del self.__orders[order_id]
+                self.__rows_stale = True
             else:
-                self.dataChanged.emit(self.createIndex(row, self._VOLUME_COLUMN),
-                                      self.createIndex(row, self._VOLUME_COLUMN))
+                self.__volumes_changed = True
+
+    def clear(self) -> None:
+        """Remove all orders from this model."""
+        self.__orders.clear()
+        self.__rows_stale = True
+
+    def flush(self) -> None:
+        """Tell any attached views about the changes since the last flush."""
+        if self.__rows_stale:
+            self.beginResetModel()
+            self.__rows = list(reversed(self.__orders.values()))
+            self._row_count = len(self.__rows)
+            self.__rows_stale = self.__volumes_changed = False
+            self.endResetModel()
+        elif self.__volumes_changed:
+            self.__volumes_changed = False
+            self.dataChanged.emit(self.createIndex(0, self._VOLUME_COLUMN),
+                                  self.createIndex(self._row_count - 1, self._VOLUME_COLUMN))
 
     def on_order_amended(self, team: str, _: float, order_id: int, volume_delta: int) -> None:
         """Callback when an order is amended."""
@@ -116,20 +135,16 @@ class ActiveOrderTableModel(BaseTableModel):
 
     def on_order_cancelled(self, team: str, now: float, order_id: int) -> None:
         """Callback when an order is cancelled."""
-        if team == self.team:
-            row = next((i for i in range(self._row_count) if self.__orders[i][self._ORDER_ID_COLUMN] == order_id), None)
-            if row is not None:
-                self.__remove_row(row)
+        if team == self.team and self.__orders.pop(order_id, None) is not None:
+            self.__rows_stale = True
 
     def on_order_inserted(self, team: str, now: float, order_id: int, instrument: Instrument, side: Side,
                           volume: int, price: int, _: Lifespan) -> None:
         """Callback when an order is inserted."""
         if team == self.team:
-            self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
-            self._row_count += 1
-            self.__orders.append(["%.3f" % now, order_id, instrument.name, side.name.capitalize(), volume,
-                                  "%.2f" % (price / 100.0)])
-            self.endInsertRows()
+            self.__orders[order_id] = ["%.3f" % now, order_id, instrument.name, side.name.capitalize(), volume,
+                                       "%.2f" % (price / 100.0)]
+            self.__rows_stale = True
 
     def on_trade_occurred(self, team: str, now: float, order_id: int, side: Side, volume: int, price: int,
                           fee: int) -> None:
@@ -296,14 +311,17 @@ class PriceLadderModel(BasicPriceLadderModel):
 
         return super().data(index, role)
 
-    def set_competitor_model(self, team_volumes):
-        self.__team_volumes = team_volumes
-        self.createIndex(0, self.TEAM_BID_COLUMN)
+    def refresh_team_volumes(self) -> None:
+        """Redraw the team volume columns."""
         self.dataChanged.emit(self.createIndex(0, self.TEAM_BID_COLUMN),
                               self.createIndex(self._row_count, self.TEAM_BID_COLUMN))
         self.dataChanged.emit(self.createIndex(0, self.TEAM_ASK_COLUMN),
                               self.createIndex(self._row_count, self.TEAM_ASK_COLUMN))
 
+    def set_competitor_model(self, team_volumes):
+        self.__team_volumes = team_volumes
+        self.refresh_team_volumes()
+
 
 class TeamLadderVolumes:
     """A team's ask and bid volumes for each price level."""
@@ -318,12 +336,27 @@ class TeamLadderVolumes:
 
         self.__ask_orders: Dict[int, _Order] = dict()
         self.__bid_orders: Dict[int, _Order] = dict()
+        self.__changed: bool = False
         self.__model: Optional[PriceLadderModel] = None
 
+    def clear(self) -> None:
+        """Remove all orders."""
+        self.team_ask_volumes.clear()
+        self.team_bid_volumes.clear()
+        self.__ask_orders.clear()
+        self.__bid_orders.clear()
+        self.__changed = True
+
     def clear_model(self) -> None:
         """Clear the price ladder model."""
         self.__model = None
 
+    def flush(self) -> None:
+        """Redraw the team volumes of the price ladder model if they have changed since the last flush."""
+        if self.__changed and self.__model:
+            self.__model.refresh_team_volumes()
+        self.__changed = False
+
     def set_model(self, model: PriceLadderModel) -> None:
         """Set the price ladder model."""
         self.__model = model
@@ -348,11 +381,7 @@ class TeamLadderVolumes:
         else:
             return
 
-        if self.__model:
-            column: int = (self.__model.TEAM_ASK_COLUMN if order_id in self.__ask_orders
-                           else self.__model.TEAM_BID_COLUMN)
-            index = self.__model.createIndex(self.__model.get_row(order.price), column)
-            self.__model.dataChanged.emit(index, index)
+        self.__changed = True
 
     def on_order_amended(self, team: str, now: float, order_id: int, volume_delta: int) -> None:
         """Callback when an order is amended."""
@@ -377,11 +406,7 @@ class TeamLadderVolumes:
             else:
                 self.__bid_orders[order_id] = _Order(price, volume)
                 self.team_bid_volumes[price] += volume
-
-            if self.__model:
-                column: int = self.__model.TEAM_ASK_COLUMN if side == Side.SELL else self.__model.TEAM_BID_COLUMN
-                index = self.__model.createIndex(self.__model.get_row(price), column)
-                self.__model.dataChanged.emit(index, index)
+            self.__changed = True
 
     def on_trade_occurred(self, team: str, now: float, order_id: int, side: Side, volume: int, price: int,
                           fee: int) -> None:
@@ -466,7 +491,10 @@ class ProfitLossTableModel(BaseTableModel):
 
 
 class TradeHistoryTableModel(BaseTableModel):
-    """Data model for the per-team trade history table."""
+    """Data model for the per-team trade history table.
+
+    New trades are added to the table when flush is called.
+    """
 
     _COLUMN_NAMES = ("Time", "OrderId", "Side", "Volume", "Price", "Fee")
     _COLUMN_ALIGNMENTS = (_ALIGN_CENTER_RIGHT, _ALIGN_CENTER_RIGHT, Qt.AlignCenter, _ALIGN_CENTER_RIGHT,
@@ -484,6 +512,21 @@ class TradeHistoryTableModel(BaseTableModel):
         self.team: str = team
         self.__trades: List[Tuple[str, int, str, int, str, str]] = list()
 
+    def clear(self) -> None:
+        """Remove all trades from this model."""
+        self.beginResetModel()
+        self._row_count = 0
+        self.__trades.clear()
+        self.endResetModel()
+
+    def flush(self) -> None:
+        """Add the trades that occurred since the last flush to the table."""
+        count: int = len(self.__trades) - self._row_count
+        if count > 0:
+            self.beginInsertRows(QtCore.QModelIndex(), 0, count - 1)
+            self._row_count += count
+            self.endInsertRows()
+
     def data(self, index: QtCore.QModelIndex, role: int = Qt.DisplayRole) -> Any:
         """Return information about the specified table cell."""
         if role == Qt.DisplayRole:
@@ -494,8 +537,5 @@ class TradeHistoryTableModel(BaseTableModel):
                           fee: int) -> None:
         """Callback when a trade occurs."""
         if team == self.team:
-            self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
-            self._row_count += 1
             self.__trades.append(("%.3f" % now, order_id, ("Sell", "Buy")[side], volume, "%.2f" % (price / 100.0),
                                   "%.2f" % (-fee / 100.0)))
-            self.endInsertRows()
@@ -16,33 +16,339 @@
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
 import asyncio
+import itertools
 import logging
+import struct
 
-from typing import Iterable, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from .messages import (HEADER, HEADER_SIZE, ORDER_BOOK_HEADER, ORDER_BOOK_HEADER_SIZE,
-                       ORDER_BOOK_MESSAGE, ORDER_BOOK_MESSAGE_SIZE, TRADE_TICKS_HEADER, TRADE_TICKS_HEADER_SIZE,
-                       TRADE_TICKS_MESSAGE, TRADE_TICKS_MESSAGE_SIZE, MessageType)
-from .order_book import TOP_LEVEL_COUNT, OrderBook
-from .pubsub import PublisherFactory
+from .latency import LatencyRecorder, clock_ns
+from .messages import (DEEP_BOOK_HEADER, DEEP_BOOK_HEADER_SIZE, HEADER, HEADER_SIZE, LEVEL_CHANGE,
+                       MAXIMUM_LEVEL_CHANGES, MAXIMUM_ORDER_EVENTS, ORDER_BOOK_DELTA_HEADER, ORDER_BOOK_HEADER,
+                       ORDER_BOOK_HEADER_SIZE, ORDER_BOOK_MESSAGE, ORDER_BOOK_MESSAGE_SIZE, ORDER_BOOK_SNAPSHOT_HEADER,
+                       ORDER_BOOK_SNAPSHOT_HEADER_SIZE, ORDER_EVENT, TRADE_TICKS_HEADER, TRADE_TICKS_HEADER_SIZE, TRADE_TICKS_MESSAGE,
+                       TRADE_TICKS_MESSAGE_SIZE, MessageType, deep_book_message_size)
+from .order_book import TOP_LEVEL_COUNT, Order, OrderBook
+from .pubsub import BUFFER_SIZE, MAXIMUM_PAYLOAD_LENGTH, PublisherFactory
 from .timer import Timer
-from .types import Instrument
+from .timer_wheel import TimerWheel, TimerWheelHandle
+from .types import OrderEvent, Side
+
+# Number of timer ticks between order book snapshots on the delta feed
+SNAPSHOT_INTERVAL = 20
+
+# Most bytes of snapshot messages written to a feed each timer tick, a small part of the shared buffer so that
+# subscribers can read them, and the messages written in between, before they are overwritten
+SNAPSHOT_BYTES_PER_TICK = BUFFER_SIZE // 4
+
+
+def write_records(transport: asyncio.WriteTransport, message: bytearray, typ: MessageType, header: struct.Struct,
+                  record: struct.Struct, records: Sequence[Tuple[int, ...]], *header_values: int) -> None:
+    """Write a message made up of the given header values and records using the given buffer."""
+    header.pack_into(message, HEADER_SIZE, *header_values)
+    offset: int = HEADER_SIZE + header.size
+    for values in records:
+        record.pack_into(message, offset, *values)
+        offset += record.size
+    HEADER.pack_into(message, 0, offset, typ)
+    transport.write(memoryview(message)[:offset])
+
+
+class SnapshotWriter:
+    """Writes snapshots of order books a few parts at a time.
+
+    A snapshot of each order book is taken with take_snapshot, which
+    returns the sequence number it carries and its records, just before
+    its first part is written, so that subscribers see the messages that
+    follow the snapshot after its first part. Each call to write_parts
+    writes at most SNAPSHOT_BYTES_PER_TICK bytes of parts.
+    """
+
+    def __init__(self, typ: MessageType, record: struct.Struct,
+                 take_snapshot: Callable[[OrderBook], Tuple[int, List[Tuple[int, ...]]]]):
+        """Initialise a new instance of the SnapshotWriter class."""
+        self.__books: List[OrderBook] = list()
+        self.__instrument: int = 0
+        self.__message = bytearray(SNAPSHOT_BYTES_PER_TICK)
+        self.__next_part: int = 0
+        self.__part_count: int = 0
+        self.__part_length: int = (SNAPSHOT_BYTES_PER_TICK - ORDER_BOOK_SNAPSHOT_HEADER_SIZE) // record.size
+        self.__record: struct.Struct = record
+        self.__records: List[Tuple[int, ...]] = list()
+        self.__sequence: int = 0
+        self.__take_snapshot: Callable[[OrderBook], Tuple[int, List[Tuple[int, ...]]]] = take_snapshot
+        self.__typ: MessageType = typ
+
+    def busy(self) -> bool:
+        """Return True if parts of a snapshot remain to be written."""
+        return bool(self.__books) or self.__next_part < self.__part_count
+
+    def start(self, order_books: Iterable[OrderBook]) -> None:
+        """Start a snapshot of the given order books."""
+        self.__books.extend(order_books)
+
+    def write_parts(self, transport: asyncio.WriteTransport) -> None:
+        """Write as many of the remaining parts as the per-tick limit allows."""
+        budget: int = SNAPSHOT_BYTES_PER_TICK
+        while self.__next_part < self.__part_count or self.__books:
+            if self.__next_part == self.__part_count:
+                # The snapshot is taken again next time if its first part can't be written now
+                book = self.__books[0]
+                sequence, records = self.__take_snapshot(book)
+                first_part_length: int = min(len(records), self.__part_length)
+                if ORDER_BOOK_SNAPSHOT_HEADER_SIZE + first_part_length * self.__record.size > budget:
+                    return
+                del self.__books[0]
+                self.__instrument = book.instrument
+                self.__sequence = sequence
+                self.__records = records
+                self.__next_part = 0
+                self.__part_count = max(1, -(-len(records) // self.__part_length))
+
+            start: int = self.__next_part * self.__part_length
+            chunk = self.__records[start:start + self.__part_length]
+            size: int = ORDER_BOOK_SNAPSHOT_HEADER_SIZE + len(chunk) * self.__record.size
+            if size > budget:
+                return
+            budget -= size
+            write_records(transport, self.__message, self.__typ, ORDER_BOOK_SNAPSHOT_HEADER, self.__record, chunk,
+                          self.__instrument, self.__sequence, self.__next_part, self.__part_count, len(chunk))
+            self.__next_part += 1
+
+
+class DeltaPublisher:
+    """A publisher of incremental order book information.
+
+    Each change to the total volume at a price level is published as a level
+    change record soon after it happens; changes made to the same level
+    before the records are sent are combined. Each order book delta message
+    has a sequence number, one higher than the last for that instrument.
+
+    A snapshot of every level of each order book is started when at least
+    snapshot_interval timer ticks have passed since the last one started
+    and it has been written. Its parts are spread over as many ticks as
+    needed (see SnapshotWriter) and each book's parts carry the sequence
+    number of the last delta message it includes, so subscribers apply the
+    delta messages that follow once they have every part.
+    """
+
+    def __init__(self, wheel: TimerWheel, publisher_factory: PublisherFactory, order_books: Sequence[OrderBook],
+                 timer: Timer, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        """Initialise a new instance of the DeltaPublisher class."""
+        self.__changes: List[Dict[Tuple[int, int], int]] = [dict() for _ in order_books]
+        self.__last_snapshot_tick: int = 0
+        self.__logger: logging.Logger = logging.getLogger("INFORMATION")
+        self.__message = bytearray(MAXIMUM_PAYLOAD_LENGTH)
+        self.__order_books: Sequence[OrderBook] = order_books
+        self.__publisher_factory: PublisherFactory = publisher_factory
+        self.__send_handle: Optional[TimerWheelHandle] = None
+        self.__sequences: List[int] = [0 for _ in order_books]
+        self.__snapshot_interval: int = snapshot_interval
+        self.__snapshot_writer: SnapshotWriter = SnapshotWriter(MessageType.ORDER_BOOK_SNAPSHOT, LEVEL_CHANGE,
+                                                                self.__take_snapshot)
+        self.__transport: Optional[asyncio.WriteTransport] = None
+        self.__wheel: TimerWheel = wheel
+
+        # Connect signals
+        for book in order_books:
+            book.level_changed.append(self.on_level_changed)
+        timer.timer_ticked.append(self.on_timer_tick)
+
+    def on_level_changed(self, book: OrderBook, side: Side, price: int, volume: int) -> None:
+        """Called when the total volume at a price level of an order book changes."""
+        if self.__transport is not None:
+            self.__changes[book.instrument][(side, price)] = volume
+            if self.__send_handle is None:
+                self.__send_handle = self.__wheel.call_soon(self.__send_deltas)
+
+    def on_timer_tick(self, timer: Timer, now: float, tick_number: int) -> None:
+        """Called each time the timer ticks."""
+        if self.__transport is None:
+            return
+
+        # Ticks may be skipped, so count the ticks since the last snapshot started
+        if (not self.__snapshot_writer.busy()
+                and tick_number - self.__last_snapshot_tick >= self.__snapshot_interval):
+            self.__last_snapshot_tick = tick_number
+            self.__snapshot_writer.start(self.__order_books)
+        self.__snapshot_writer.write_parts(self.__transport)
+
+    def __send_deltas(self) -> None:
+        """Send the level changes accumulated since the last delta messages were sent."""
+        self.__send_handle = None
+        for instrument, changes in enumerate(self.__changes):
+            if changes:
+                records = [(side, price, volume) for (side, price), volume in changes.items()]
+                changes.clear()
+                for start in range(0, len(records), MAXIMUM_LEVEL_CHANGES):
+                    chunk = records[start:start + MAXIMUM_LEVEL_CHANGES]
+                    self.__sequences[instrument] += 1
+                    write_records(self.__transport, self.__message, MessageType.ORDER_BOOK_DELTA,
+                                  ORDER_BOOK_DELTA_HEADER, LEVEL_CHANGE, chunk, instrument,
+                                  self.__sequences[instrument], len(chunk))
+
+    def __take_snapshot(self, book: OrderBook) -> Tuple[int, List[Tuple[int, ...]]]:
+        """Return the sequence number and level change records of a snapshot of the given order book."""
+        # Pending changes must be sent first so the snapshot's sequence number includes them
+        if self.__send_handle is not None:
+            self.__send_handle.cancel()
+            self.__send_deltas()
+
+        levels: List[Tuple[int, ...]] = [(Side.SELL, p, v) for p, v in book.levels(Side.SELL)]
+        levels.extend((Side.BUY, p, v) for p, v in book.levels(Side.BUY))
+        return self.__sequences[book.instrument], levels
+
+    def start(self) -> None:
+        """Start this publisher."""
+        self.__logger.info("starting delta information publisher: type=%s name=%s snapshot_interval=%d",
+                           self.__publisher_factory.typ, self.__publisher_factory.name, self.__snapshot_interval)
+        # No protocol callbacks are needed so the base protocol is good enough
+        self.__transport = self.__publisher_factory.create(asyncio.BaseProtocol())
+
+
+class OrderEventPublisher:
+    """A publisher of market-by-order information.
+
+    Every change to an order resting in an order book is published as an
+    order event record soon after it happens. Orders are identified by an
+    order id, assigned by this publisher when the order is added to the
+    book, so that subscribers can follow each order's place in the queue.
+    Messages are numbered and a snapshot of every order in each order book,
+    in order of priority, is published at least snapshot_interval timer
+    ticks apart and spread over ticks in the same way as DeltaPublisher.
+
+    The order books' signals are only connected when this publisher starts.
+    """
+
+    def __init__(self, wheel: TimerWheel, publisher_factory: PublisherFactory, order_books: Sequence[OrderBook],
+                 timer: Timer, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        """Initialise a new instance of the OrderEventPublisher class."""
+        self.__events: List[List[Tuple[int, int, int, int, int]]] = [list() for _ in order_books]
+        self.__last_snapshot_tick: int = 0
+        self.__logger: logging.Logger = logging.getLogger("INFORMATION")
+        self.__message = bytearray(MAXIMUM_PAYLOAD_LENGTH)
+        self.__next_order_id: int = 1
+        self.__order_books: Sequence[OrderBook] = order_books
+        self.__order_ids: Dict[Order, int] = dict()
+        self.__publisher_factory: PublisherFactory = publisher_factory
+        self.__send_handle: Optional[TimerWheelHandle] = None
+        self.__sequences: List[int] = [0 for _ in order_books]
+        self.__snapshot_interval: int = snapshot_interval
+        self.__snapshot_writer: SnapshotWriter = SnapshotWriter(MessageType.ORDER_EVENTS_SNAPSHOT, ORDER_EVENT,
+                                                                self.__take_snapshot)
+        self.__timer: Timer = timer
+        self.__transport: Optional[asyncio.WriteTransport] = None
+        self.__wheel: TimerWheel = wheel
+
+    def on_order_changed(self, book: OrderBook, event: OrderEvent, order: Order, volume: int) -> None:
+        """Called when an order in an order book changes."""
+        if event == OrderEvent.ADD:
+            order_id = order.order_id = self.__order_ids[order] = self.__next_order_id
+            self.__next_order_id += 1
+        elif event == OrderEvent.MODIFY or (event == OrderEvent.EXECUTE and order.remaining_volume > 0):
+            order_id = self.__order_ids.get(order)
+        else:
+            order_id = self.__order_ids.pop(order, None)
+
+        if order_id is not None:
+            self.__events[book.instrument].append((event, order_id, order.side, order.price, volume))
+            if self.__send_handle is None:
+                self.__send_handle = self.__wheel.call_soon(self.__send_events)
+
+    def on_timer_tick(self, timer: Timer, now: float, tick_number: int) -> None:
+        """Called each time the timer ticks."""
+        # Ticks may be skipped, so count the ticks since the last snapshot started
+        if (not self.__snapshot_writer.busy()
+                and tick_number - self.__last_snapshot_tick >= self.__snapshot_interval):
+            self.__last_snapshot_tick = tick_number
+            self.__snapshot_writer.start(self.__order_books)
+        self.__snapshot_writer.write_parts(self.__transport)
+
+    def __send_events(self) -> None:
+        """Send the order events accumulated since the last order events messages were sent."""
+        self.__send_handle = None
+        for instrument, events in enumerate(self.__events):
+            if events:
+                for start in range(0, len(events), MAXIMUM_ORDER_EVENTS):
+                    chunk = events[start:start + MAXIMUM_ORDER_EVENTS]
+                    self.__sequences[instrument] += 1
+                    write_records(self.__transport, self.__message, MessageType.ORDER_EVENTS,
+                                  ORDER_BOOK_DELTA_HEADER, ORDER_EVENT, chunk, instrument,
+                                  self.__sequences[instrument], len(chunk))
+                events.clear()
+
+    def __take_snapshot(self, book: OrderBook) -> Tuple[int, List[Tuple[int, ...]]]:
+        """Return the sequence number and order event records of a snapshot of the given order book."""
+        # Pending events must be sent first so the snapshot's sequence number includes them
+        if self.__send_handle is not None:
+            self.__send_handle.cancel()
+            self.__send_events()
+
+        order_ids: Dict[Order, int] = self.__order_ids
+        records: List[Tuple[int, ...]] = [(OrderEvent.ADD, order_ids[o], o.side, o.price, o.remaining_volume)
+                                          for side in (Side.SELL, Side.BUY) for o in book.orders(side)
+                                          if o in order_ids]
+        return self.__sequences[book.instrument], records
+
+    def start(self) -> None:
+        """Start this publisher."""
+        self.__logger.info("starting order events information publisher: type=%s name=%s snapshot_interval=%d",
+                           self.__publisher_factory.typ, self.__publisher_factory.name, self.__snapshot_interval)
+        # No protocol callbacks are needed so the base protocol is good enough
+        self.__transport = self.__publisher_factory.create(asyncio.BaseProtocol())
+
+        # Connect signals
+        for book in self.__order_books:
+            book.order_changed.append(self.on_order_changed)
+        self.__timer.timer_ticked.append(self.on_timer_tick)
 
 
 class InformationPublisher(asyncio.DatagramProtocol):
     """A publisher of exchange information."""
 
-    def __init__(self, loop: asyncio.AbstractEventLoop, publisher_factory: PublisherFactory,
-                 order_books: Iterable[OrderBook], timer: Timer):
-        """Initialize a new instance of the InformationChannel class."""
-        self.__event_loop: asyncio.AbstractEventLoop = loop
+    def __init__(self, wheel: TimerWheel, publisher_factory: PublisherFactory, order_books: Iterable[OrderBook],
+                 timer: Timer, tick_split: int = 1, deep_publisher_factory: Optional[PublisherFactory] = None,
+                 depth: int = TOP_LEVEL_COUNT, delta_publisher_factory: Optional[PublisherFactory] = None,
+                 snapshot_interval: int = SNAPSHOT_INTERVAL,
+                 order_event_publisher_factory: Optional[PublisherFactory] = None,
+                 latency: Optional[LatencyRecorder] = None):
+        """Initialize a new instance of the InformationChannel class.
+
+        If tick_split is greater than one, each order book is only published
+        on one in every tick_split timer ticks. If a deep publisher factory
+        is given, every order book and trade ticks message is also published
+        with the given number of levels using that factory. If a delta
+        publisher factory is given, order book changes are also published
+        as they happen using that factory (see DeltaPublisher), and likewise
+        for changes to individual orders if an order event publisher factory
+        is given (see OrderEventPublisher). If a latency recorder is given,
+        the time taken to publish the order books on each tick and the time
+        from the event that caused a trade to the trade ticks being published
+        are recorded.
+        """
+        self.__deep_publisher_factory: Optional[PublisherFactory] = deep_publisher_factory
+        self.__deep_transport: Optional[asyncio.WriteTransport] = None
+        self.__depth: int = depth if deep_publisher_factory is not None else TOP_LEVEL_COUNT
         self.__file_number: int = 0
+        self.__latency: Optional[LatencyRecorder] = latency
         self.__logger: logging.Logger = logging.getLogger("INFORMATION")
         self.__order_books: Tuple[OrderBook] = tuple(order_books)
         self.__publisher_factory: PublisherFactory = publisher_factory
-        self.__send_ticks_handles: List[Optional[asyncio.Handle]] = [None for _ in Instrument]
-        self.__trade_ticks_sequences: List[int] = [1 for _ in Instrument]
+        self.__tick_split: int = tick_split
+        # Instrument ids are numbered from zero, so they index these lists
+        self.__send_ticks_handles: List[Optional[TimerWheelHandle]] = [None for _ in self.__order_books]
+        self.__trade_ticks_sequences: List[int] = [1 for _ in self.__order_books]
         self.__transport: Optional[asyncio.WriteTransport] = None
+        self.__wheel: TimerWheel = wheel
+
+        self.__delta_publisher: Optional[DeltaPublisher] = None
+        if delta_publisher_factory is not None:
+            self.__delta_publisher = DeltaPublisher(wheel, delta_publisher_factory, self.__order_books, timer,
+                                                    snapshot_interval)
+        self.__order_event_publisher: Optional[OrderEventPublisher] = None
+        if order_event_publisher_factory is not None:
+            self.__order_event_publisher = OrderEventPublisher(wheel, order_event_publisher_factory,
+                                                               self.__order_books, timer, snapshot_interval)
 
         # Connect signals
         for book in self.__order_books:
@@ -50,10 +356,10 @@ class InformationPublisher(asyncio.DatagramProtocol):
         timer.timer_ticked.append(self.on_timer_tick)
 
         # Store book data for dissemination to competitors.
-        self.__ask_prices: List[int] = [0] * TOP_LEVEL_COUNT
-        self.__ask_volumes: List[int] = [0] * TOP_LEVEL_COUNT
-        self.__bid_prices: List[int] = [0] * TOP_LEVEL_COUNT
-        self.__bid_volumes: List[int] = [0] * TOP_LEVEL_COUNT
+        self.__ask_prices: List[int] = [0] * self.__depth
+        self.__ask_volumes: List[int] = [0] * self.__depth
+        self.__bid_prices: List[int] = [0] * self.__depth
+        self.__bid_volumes: List[int] = [0] * self.__depth
 
         # Message buffers
         self.__book_message = bytearray(ORDER_BOOK_MESSAGE_SIZE)
@@ -61,6 +367,13 @@ class InformationPublisher(asyncio.DatagramProtocol):
         HEADER.pack_into(self.__book_message, 0, ORDER_BOOK_MESSAGE_SIZE, MessageType.ORDER_BOOK_UPDATE)
         HEADER.pack_into(self.__ticks_message, 0, TRADE_TICKS_MESSAGE_SIZE, MessageType.TRADE_TICKS)
 
+        deep_size: int = deep_book_message_size(self.__depth)
+        self.__deep_book_message = bytearray(deep_size)
+        self.__deep_ticks_message = bytearray(deep_size)
+        self.__deep_levels: struct.Struct = struct.Struct("!%dI" % (4 * self.__depth))
+        HEADER.pack_into(self.__deep_book_message, 0, deep_size, MessageType.DEEP_ORDER_BOOK_UPDATE)
+        HEADER.pack_into(self.__deep_ticks_message, 0, deep_size, MessageType.DEEP_TRADE_TICKS)
+
     def connection_made(self, transport: asyncio.WriteTransport) -> None:
         """Called when the datagram endpoint is created."""
         self.__logger.info("information channel established")
@@ -68,17 +381,29 @@ class InformationPublisher(asyncio.DatagramProtocol):
 
     def on_timer_tick(self, timer: Timer, now: float, tick_number: int) -> None:
         """Called each time the timer ticks."""
-        for book in self.__order_books:
+        started: int = clock_ns() if self.__latency is not None else 0
+        books: Iterable[OrderBook] = self.__order_books
+        if self.__tick_split > 1:
+            books = itertools.islice(books, tick_number % self.__tick_split, None, self.__tick_split)
+        for book in books:
             book.top_levels(self.__ask_prices, self.__ask_volumes, self.__bid_prices, self.__bid_volumes)
             ORDER_BOOK_HEADER.pack_into(self.__book_message, HEADER_SIZE, book.instrument, tick_number)
-            ORDER_BOOK_MESSAGE.pack_into(self.__book_message, ORDER_BOOK_HEADER_SIZE, *self.__ask_prices,
-                                         *self.__ask_volumes, *self.__bid_prices, *self.__bid_volumes)
+            self.__pack_top_levels(ORDER_BOOK_MESSAGE, self.__book_message, ORDER_BOOK_HEADER_SIZE)
             self.__transport.write(self.__book_message)
+            if self.__deep_transport is not None:
+                DEEP_BOOK_HEADER.pack_into(self.__deep_book_message, HEADER_SIZE, book.instrument, tick_number,
+                                           self.__depth)
+                self.__deep_levels.pack_into(self.__deep_book_message, DEEP_BOOK_HEADER_SIZE, *self.__ask_prices,
+                                             *self.__ask_volumes, *self.__bid_prices, *self.__bid_volumes)
+                self.__deep_transport.write(self.__deep_book_message)
+
+        if started:
+            self.__latency.last_publish = self.__latency.record("publish", started)
 
     def on_trade(self, book: OrderBook) -> None:
         """Called when a trade occurs in one of the order books."""
         if self.__send_ticks_handles[book.instrument] is None:
-            self.__send_ticks_handles[book.instrument] = self.__event_loop.call_soon(self.__send_trade_ticks, book)
+            self.__send_ticks_handles[book.instrument] = self.__wheel.call_soon(self.__send_trade_ticks, book)
 
     def __send_trade_ticks(self, order_book: OrderBook) -> None:
         """Prepare and send trade ticks for the given order book."""
@@ -86,11 +411,29 @@ class InformationPublisher(asyncio.DatagramProtocol):
 
         if order_book.trade_ticks(self.__ask_prices, self.__ask_volumes, self.__bid_prices, self.__bid_volumes):
             self.__trade_ticks_sequences[order_book.instrument] += 1
-            TRADE_TICKS_HEADER.pack_into(self.__ticks_message, HEADER_SIZE, order_book.instrument,
-                                         self.__trade_ticks_sequences[order_book.instrument])
-            TRADE_TICKS_MESSAGE.pack_into(self.__ticks_message, TRADE_TICKS_HEADER_SIZE, *self.__ask_prices,
-                                          *self.__ask_volumes, *self.__bid_prices, *self.__bid_volumes)
+            sequence: int = self.__trade_ticks_sequences[order_book.instrument]
+            TRADE_TICKS_HEADER.pack_into(self.__ticks_message, HEADER_SIZE, order_book.instrument, sequence)
+            self.__pack_top_levels(TRADE_TICKS_MESSAGE, self.__ticks_message, TRADE_TICKS_HEADER_SIZE)
             self.__transport.write(self.__ticks_message)
+            if self.__deep_transport is not None:
+                DEEP_BOOK_HEADER.pack_into(self.__deep_ticks_message, HEADER_SIZE, order_book.instrument, sequence,
+                                           self.__depth)
+                self.__deep_levels.pack_into(self.__deep_ticks_message, DEEP_BOOK_HEADER_SIZE, *self.__ask_prices,
+                                             *self.__ask_volumes, *self.__bid_prices, *self.__bid_volumes)
+                self.__deep_transport.write(self.__deep_ticks_message)
+
+            if self.__latency is not None and self.__latency.last_event:
+                self.__latency.last_publish = self.__latency.record("trade_ticks", self.__latency.last_event)
+
+    def __pack_top_levels(self, message: struct.Struct, buffer: bytearray, offset: int) -> None:
+        """Pack the top five levels of the stored book data into the given buffer."""
+        if self.__depth == TOP_LEVEL_COUNT:
+            message.pack_into(buffer, offset, *self.__ask_prices, *self.__ask_volumes, *self.__bid_prices,
+                              *self.__bid_volumes)
+        else:
+            message.pack_into(buffer, offset, *self.__ask_prices[:TOP_LEVEL_COUNT],
+                              *self.__ask_volumes[:TOP_LEVEL_COUNT], *self.__bid_prices[:TOP_LEVEL_COUNT],
+                              *self.__bid_volumes[:TOP_LEVEL_COUNT])
 
     async def start(self) -> None:
         """Start this publisher."""
@@ -98,3 +441,14 @@ class InformationPublisher(asyncio.DatagramProtocol):
         name = self.__publisher_factory.name
         self.__logger.info("starting information publisher: type=%s name=%s", typ, name)
         self.__publisher_factory.create(self)
+
+        if self.__deep_publisher_factory is not None:
+            self.__logger.info("starting deep information publisher: type=%s name=%s depth=%d",
+                               self.__deep_publisher_factory.typ, self.__deep_publisher_factory.name, self.__depth)
+            # The deep publisher needs no protocol callbacks so the base protocol is good enough
+            self.__deep_transport = self.__deep_publisher_factory.create(asyncio.BaseProtocol())
+
+        if self.__delta_publisher is not None:
+            self.__delta_publisher.start()
+        if self.__order_event_publisher is not None:
+            self.__order_event_publisher.start()
@@ -0,0 +1,87 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import logging
+import time
+
+from typing import Optional
+
+from .histogram import Histogram
+
+LAG_PROBE_INTERVAL: float = 0.1
+# Fraction of the interval between ticks at which lag is worth a warning
+LAG_WARNING_FRACTION: float = 0.5
+WARNING_INTERVAL: float = 10.0
+
+
+class LagProbe:
+    """Measures how late the event loop runs callbacks.
+
+    Every interval the probe schedules a callback and records, in
+    microseconds, how long after its due time it actually ran. The lag is
+    measured with time.perf_counter, since some event loops (e.g. uvloop)
+    have a clock with a resolution of only a millisecond. If a warning
+    threshold (in seconds) is set, a warning is logged when the lag exceeds
+    it, at most once every WARNING_INTERVAL seconds.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = LAG_PROBE_INTERVAL,
+                 threshold: Optional[float] = None):
+        """Initialise a new instance of the LagProbe class."""
+        self.interval: float = interval
+        self.lag: Histogram = Histogram()
+        self.threshold: Optional[float] = threshold
+
+        self.__due_time: float = 0.0
+        self.__event_loop: asyncio.AbstractEventLoop = loop
+        self.__handle: Optional[asyncio.TimerHandle] = None
+        self.__last_warning: float = 0.0
+        self.__logger: logging.Logger = logging.getLogger("LAG_PROBE")
+        self.__slow_count: int = 0
+
+    def start(self) -> None:
+        """Start probing."""
+        self.__due_time = time.perf_counter() + self.interval
+        self.__handle = self.__event_loop.call_later(self.interval, self.__on_probe)
+
+    def statistics(self) -> str:
+        """Return a description of the measured lag."""
+        return "lag_us={%s}" % self.lag
+
+    def stop(self) -> None:
+        """Stop probing."""
+        if self.__handle is not None:
+            self.__handle.cancel()
+            self.__handle = None
+
+    def __on_probe(self) -> None:
+        """Record the lag of this callback and schedule the next one."""
+        now: float = time.perf_counter()
+        lag: float = now - self.__due_time
+        self.lag.record(int(lag * 1e6))
+
+        if self.threshold is not None and lag > self.threshold:
+            self.__slow_count += 1
+            if now - self.__last_warning >= WARNING_INTERVAL:
+                self.__logger.warning("event loop is running late: lag=%.6f threshold=%.6f count=%d", lag,
+                                      self.threshold, self.__slow_count)
+                self.__last_warning = now
+                self.__slow_count = 0
+
+        self.__due_time = now + self.interval
+        self.__handle = self.__event_loop.call_later(self.interval, self.__on_probe)
@@ -0,0 +1,59 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import time
+
+from typing import Dict
+
+from .histogram import Histogram
+
+# On Linux and Windows this clock is shared by every process on the machine,
+# so a time taken by the exchange can be compared with one taken by an
+# auto-trader
+clock_ns = time.perf_counter_ns
+
+
+class LatencyRecorder:
+    """Histograms of the time in nanoseconds between points on the path of
+    market data and orders through the exchange or an auto-trader.
+
+    A recorder also remembers the time of the most recent event of each kind
+    that later points measure from: last_event is when the exchange began
+    processing the market events or execution message now being handled,
+    last_publish is when the exchange last published information and
+    last_receive is when an auto-trader last received information.
+    """
+
+    def __init__(self):
+        """Initialise a new instance of the LatencyRecorder class."""
+        self.histograms: Dict[str, Histogram] = dict()
+        self.last_event: int = 0
+        self.last_publish: int = 0
+        self.last_receive: int = 0
+
+    def record(self, name: str, start: int) -> int:
+        """Record the time since start in the named histogram and return the current time."""
+        now: int = clock_ns()
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(now - start)
+        return now
+
+    def statistics(self) -> str:
+        """Return a description of the recorded latencies."""
+        return "\n".join("  %s_ns={%s}" % item for item in self.histograms.items())
@@ -18,7 +18,7 @@
 import collections
 import sys
 
-from typing import Deque
+from typing import Deque, List, Union
 
 
 class FrequencyLimiter(object):
@@ -52,14 +52,70 @@ class FrequencyLimiter(object):
         return self.value > self.limit
 
 
+class RingFrequencyLimiter(object):
+    """Limit the frequency of events using a fixed-size ring of event times.
+
+    Only the times of the most recent 'limit' events are kept, so the memory
+    used is fixed when the limiter is created and each event costs the same
+    amount of work however many events arrive in the interval. A new event
+    breaches the limit exactly when the event 'limit' events before it is
+    still inside the interval, which gives the same results as the
+    FrequencyLimiter.
+    """
+
+    def __init__(self, interval: float, limit: int):
+        """Initialise a new instance of the RingFrequencyLimiter class."""
+        if limit < 1:
+            raise ValueError("limit must be at least one")
+        self.breached: bool = False
+        self.events: List[float] = [-sys.float_info.max] * limit
+        self.index: int = 0
+        self.interval: float = interval
+        self.limit: int = limit
+
+    @property
+    def value(self) -> int:
+        """Return the number of events in the interval ending with the most recent event.
+
+        Only the most recent 'limit' events are kept, so if the most recent
+        event breached the limit, this is limit + 1.
+        """
+        epsilon: float = sys.float_info.epsilon
+        window_start: float = self.events[self.index - 1] - self.interval
+        return self.breached + sum(1 for e in self.events if (e - window_start) > max(e, window_start) * epsilon)
+
+    def check_event(self, now: float) -> bool:
+        """Return True if the new event breaches the limit, False otherwise.
+
+        This method should be called with a monotonically increasing sequence
+        of times.
+        """
+        index: int = self.index
+        oldest: float = self.events[index]
+        self.events[index] = now
+        self.index = index + 1 if index + 1 < self.limit else 0
+
+        window_start: float = now - self.interval
+        self.breached = (oldest - window_start) > ((oldest if oldest > window_start else window_start)
+                                                   * sys.float_info.epsilon)
+        return self.breached
+
+
 class FrequencyLimiterFactory:
     """A factory class for FrequencyLimiters."""
 
-    def __init__(self, interval: float, limit: int):
-        """Initialise a new instance of the FrequencyLimiterFactory class."""
+    def __init__(self, interval: float, limit: int, ring: bool = False):
+        """Initialise a new instance of the FrequencyLimiterFactory class.
+
+        If ring is True (and the limit is at least one) the factory creates
+        RingFrequencyLimiters rather than FrequencyLimiters.
+        """
         self.frequency_limit_interval: float = interval
         self.frequency_limit: int = limit
+        self.ring: bool = ring and limit >= 1
 
-    def create(self) -> FrequencyLimiter:
-        """Return a new FrequencyLimiter instance."""
+    def create(self) -> Union[FrequencyLimiter, RingFrequencyLimiter]:
+        """Return a new frequency limiter instance."""
+        if self.ring:
+            return RingFrequencyLimiter(self.frequency_limit_interval, self.frequency_limit)
         return FrequencyLimiter(self.frequency_limit_interval, self.frequency_limit)
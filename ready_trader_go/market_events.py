@@ -24,7 +24,9 @@ import threading
 
 from typing import Callable, Dict, List, Optional, TextIO
 
+from .latency import LatencyRecorder, clock_ns
 from .match_events import MatchEvents
+from .metrics import Metric, MetricsRegistry
 from .order_book import IOrderListener, Order, OrderBook
 from .types import Instrument, Lifespan, Side
 
@@ -45,11 +47,11 @@ class MarketEvent(object):
     """A market event."""
     __slots__ = ("time", "instrument", "operation", "order_id", "side", "volume", "price", "lifespan")
 
-    def __init__(self, time: float, instrument: Instrument, operation: MarketEventOperation, order_id: int,
+    def __init__(self, time: float, instrument: int, operation: MarketEventOperation, order_id: int,
                  side: Optional[Side], volume: int, price: int, lifespan: Optional[Lifespan]):
         """Initialise a new instance of the MarketEvent class."""
         self.time: float = time
-        self.instrument: Instrument = instrument
+        self.instrument: int = instrument
         self.operation: MarketEventOperation = operation
         self.order_id: int = order_id
         self.side: Optional[Side] = side
@@ -61,21 +63,31 @@ class MarketEvent(object):
 class MarketEventsReader(IOrderListener):
     """A processor of market events read from a file."""
 
-    def __init__(self, filename: str, loop: asyncio.AbstractEventLoop, future_book: OrderBook, etf_book: OrderBook,
-                 match_events: MatchEvents):
+    def __init__(self, filename: str, loop: asyncio.AbstractEventLoop, books: Dict[int, OrderBook],
+                 match_events: MatchEvents, latency: Optional[LatencyRecorder] = None,
+                 metrics: Optional[MetricsRegistry] = None):
         """Initialise a new instance of the MarketEvents class.
+
+        Order books are keyed by instrument id. Market events for any other
+        instrument are skipped. If a latency recorder is given, the time
+        taken to process each batch of market events is recorded.
         """
-        self.etf_book: OrderBook = etf_book
-        self.etf_orders: Dict[int, Order] = dict()
+        self.books: Dict[int, OrderBook] = books
         self.event_loop: asyncio.AbstractEventLoop = loop
         self.filename: str = filename
-        self.future_book: OrderBook = future_book
-        self.future_orders: Dict[int, Order] = dict()
+        self.latency: Optional[LatencyRecorder] = latency
         self.logger: logging.Logger = logging.getLogger("MARKET_EVENTS")
         self.match_events: MatchEvents = match_events
+        self.orders: Dict[int, Dict[int, Order]] = {i: dict() for i in books}
         self.queue: queue.Queue = queue.Queue(MARKET_EVENT_QUEUE_SIZE)
         self.reader_task: Optional[threading.Thread] = None
 
+        if metrics is None:
+            metrics = MetricsRegistry()
+        self.event_count: Metric = metrics.counter("rtg_market_events_total", "Market events processed")
+        metrics.gauge("rtg_market_event_queue_size", "Market events read but not yet processed",
+                      function=self.queue.qsize)
+
         # Prime the event pump with a no-op event
         self.next_event: Optional[MarketEvent] = MarketEvent(0.0, Instrument.FUTURE, MarketEventOperation.CANCEL, 0,
                                                              Side.BUY, 0, 0, Lifespan.FILL_AND_KILL)
@@ -89,33 +101,21 @@ class MarketEventsReader(IOrderListener):
         """Called when the order is amended."""
         self.match_events.amend(now, "", order.client_order_id, -volume_removed)
         if order.remaining_volume == 0:
-            if order.instrument == Instrument.FUTURE:
-                del self.future_orders[order.client_order_id]
-            elif order.instrument == Instrument.ETF:
-                del self.etf_orders[order.client_order_id]
+            del self.orders[order.instrument][order.client_order_id]
 
     def on_order_cancelled(self, now: float, order: Order, volume_removed: int) -> None:
         """Called when the order is cancelled."""
         self.match_events.cancel(now, "", order.client_order_id, -volume_removed)
-        if order.instrument == Instrument.FUTURE and order.client_order_id in self.future_orders:
-            del self.future_orders[order.client_order_id]
-        elif order.instrument == Instrument.ETF and order.client_order_id in self.etf_orders:
-            del self.etf_orders[order.client_order_id]
+        self.orders[order.instrument].pop(order.client_order_id, None)
 
     def on_order_placed(self, now: float, order: Order) -> None:
         """Called when a good-for-day order is placed in the order book."""
-        if order.instrument == Instrument.FUTURE:
-            self.future_orders[order.client_order_id] = order
-        elif order.instrument == Instrument.ETF:
-            self.etf_orders[order.client_order_id] = order
+        self.orders[order.instrument][order.client_order_id] = order
 
     def on_order_filled(self, now: float, order: Order, price: int, volume: int, fee: int) -> None:
         """Called when the order is partially or completely filled."""
         if order.remaining_volume == 0:
-            if order.instrument == Instrument.FUTURE and order.client_order_id in self.future_orders:
-                del self.future_orders[order.client_order_id]
-            elif order.instrument == Instrument.ETF and order.client_order_id in self.etf_orders:
-                del self.etf_orders[order.client_order_id]
+            self.orders[order.instrument].pop(order.client_order_id, None)
 
     def on_reader_done(self, num_events: int) -> None:
         """Called when the market data reader thread is done."""
@@ -125,13 +125,14 @@ class MarketEventsReader(IOrderListener):
         """Process market events from the queue."""
         evt: MarketEvent = self.next_event
 
+        started: int = 0
+        if self.latency is not None and evt and evt.time < elapsed_time:
+            started = self.latency.last_event = clock_ns()
+
         while evt and evt.time < elapsed_time:
-            if evt.instrument == Instrument.FUTURE:
-                orders = self.future_orders
-                book = self.future_book
-            else:
-                orders = self.etf_orders
-                book = self.etf_book
+            self.event_count.value += 1
+            orders = self.orders[evt.instrument]
+            book = self.books[evt.instrument]
 
             if evt.operation == MarketEventOperation.INSERT:
                 order = Order(evt.order_id, evt.instrument, evt.lifespan, evt.side, evt.price, evt.volume, self)
@@ -149,6 +150,8 @@ class MarketEventsReader(IOrderListener):
             evt = self.queue.get()
 
         self.next_event = evt
+        if started:
+            self.latency.record("market_events", started)
         if evt is None:
             for c in self.task_complete:
                 c(self)
@@ -156,18 +159,27 @@ class MarketEventsReader(IOrderListener):
     def reader(self, market_data: TextIO) -> None:
         """Read the market data file and place order events in the queue."""
         fifo = self.queue
+        books = self.books
+        skipped: int = 0
 
         with market_data:
             csv_reader = csv.reader(market_data)
             next(csv_reader)  # Skip header row
             for row in csv_reader:
                 # time, instrument, operation, order_id, side, volume, price, lifespan
-                fifo.put(MarketEvent(float(row[0]), Instrument(int(row[1])), MarketEventOperation[row[2]],
+                instrument: int = int(row[1])
+                if instrument not in books:
+                    skipped += 1
+                    continue
+                fifo.put(MarketEvent(float(row[0]), instrument, MarketEventOperation[row[2]],
                                      int(row[3]), Side[row[4]] if row[4] else None,
                                      int(float(row[5])) if row[5] else 0, int(float(row[6]) * INPUT_SCALING) if row[6] else 0,
                                      Lifespan[row[7]] if row[7] else None))
             fifo.put(None)
 
+        if skipped:
+            self.logger.warning("skipped %d market events for unknown instruments", skipped)
+
         self.event_loop.call_soon_threadsafe(self.on_reader_done, csv_reader.line_num - 1)
 
     def start(self):
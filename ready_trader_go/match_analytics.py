@@ -0,0 +1,295 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import csv
+import itertools
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from .match_events import MatchEvent, MatchEventOperation
+from .order_book import Order, OrderBook
+from .types import Instrument, Lifespan, Side
+
+
+__all__ = ("Fills", "MatchLog", "TeamAnalytics")
+
+
+TICK_INTERVAL_SECONDS = 0.5
+
+_COLUMN_NAMES = ("Time", "Competitor", "Operation", "OrderId", "Instrument", "Side", "Volume", "Price", "Lifespan",
+                 "Fee")
+_LIFESPANS: Dict[str, int] = {"F": Lifespan.FILL_AND_KILL, "G": Lifespan.GOOD_FOR_DAY}
+_OPERATIONS: Dict[str, int] = {name: operation for operation, name in MatchEvent.OPERATION_NAMES.items()}
+_SIDES: Dict[str, int] = {"A": Side.SELL, "B": Side.BUY}
+
+
+class Fills(NamedTuple):
+    """The trades of a team, holding one element in each array per trade."""
+    time: np.ndarray
+    order_id: np.ndarray
+    instrument: np.ndarray
+    side: np.ndarray
+    volume: np.ndarray
+    price: np.ndarray  # in cents
+    fee: np.ndarray  # in cents
+    position: np.ndarray  # position in the instrument after the trade
+    edge: np.ndarray  # in cents, against the midpoint price at the end of the previous tick
+    queue_time: np.ndarray  # seconds from the insertion of the order to the trade
+
+
+class TeamAnalytics:
+    """The account, fills and trading statistics of one team in a match.
+
+    Account values are in cents and hold one element per tick of the match
+    log. Like the HUD, only the first ETF/future pair is taken into account.
+    """
+
+    def __init__(self, log: "MatchLog", name: str, team_id: int):
+        """Initialise a new instance of the TeamAnalytics class."""
+        self.name: str = name
+
+        operations: np.ndarray = log.operations
+        team_rows: np.ndarray = log.team_ids == team_id
+        rows: np.ndarray = np.flatnonzero(team_rows & (log.instruments <= Instrument.ETF)
+                                          & ((operations == MatchEventOperation.TRADE)
+                                             | (operations == MatchEventOperation.HEDGE)))
+        times: np.ndarray = log.times[rows]
+        instruments: np.ndarray = log.instruments[rows]
+        sides: np.ndarray = log.sides[rows]
+        volumes: np.ndarray = log.volumes[rows]
+        fees: np.ndarray = log.fees[rows]
+        signs: np.ndarray = np.where(sides == Side.BUY, 1, -1)
+        is_etf: np.ndarray = instruments == Instrument.ETF
+        etf_moves: np.ndarray = np.where(is_etf, signs * volumes, 0)
+        future_moves: np.ndarray = np.where(is_etf, 0, signs * volumes)
+        cash: np.ndarray = -signs * np.round(log.prices[rows] * volumes).astype(np.int64) - fees
+
+        at_tick: np.ndarray = np.searchsorted(times, log.tick_times, side="right")
+
+        def cumulative(values: np.ndarray) -> np.ndarray:
+            return np.concatenate(([0], np.cumsum(values, dtype=np.int64)))[at_tick]
+
+        self.account_balance: np.ndarray = cumulative(cash)
+        self.buy_volume: np.ndarray = cumulative(np.where(is_etf & (sides == Side.BUY), volumes, 0))
+        self.etf_position: np.ndarray = cumulative(etf_moves)
+        self.future_position: np.ndarray = cumulative(future_moves)
+        self.sell_volume: np.ndarray = cumulative(np.where(is_etf & (sides == Side.SELL), volumes, 0))
+        self.total_fees: np.ndarray = cumulative(fees)
+        self.profit_or_loss: np.ndarray = (self.account_balance + self.future_position * log.future_prices
+                                           + self.etf_position * log.etf_prices)
+
+        valued: np.ndarray = self.profit_or_loss[log.valued]
+        peaks: np.ndarray = np.maximum.accumulate(np.maximum(valued, 0)) if valued.size else valued
+        self.max_profit: int = int(peaks[-1]) if peaks.size else 0
+        self.max_drawdown: int = int(np.max(peaks - valued, initial=0))
+
+        trades: np.ndarray = log.operations[rows] == MatchEventOperation.TRADE
+        self.hedged_volume: int = int(volumes[~trades].sum())
+
+        fill_times: np.ndarray = times[trades]
+        fill_instruments: np.ndarray = instruments[trades]
+        fill_prices: np.ndarray = log.prices[rows[trades]].astype(np.int64)
+        fill_volumes: np.ndarray = volumes[trades]
+        fill_order_ids: np.ndarray = log.order_ids[rows[trades]]
+
+        previous_tick: np.ndarray = np.searchsorted(log.tick_times, fill_times, side="left") - 1
+        midpoints: np.ndarray = np.where(previous_tick >= 0,
+                                         log.midpoint_prices[fill_instruments, np.maximum(previous_tick, 0)], np.nan)
+
+        queue_times: np.ndarray = np.full(fill_times.size, np.nan)
+        inserts: np.ndarray = np.flatnonzero(team_rows & (operations == MatchEventOperation.INSERT))
+        if inserts.size:
+            by_order_id: np.ndarray = np.argsort(log.order_ids[inserts], kind="stable")
+            order_ids: np.ndarray = log.order_ids[inserts][by_order_id]
+            index: np.ndarray = np.minimum(np.searchsorted(order_ids, fill_order_ids), order_ids.size - 1)
+            found: np.ndarray = order_ids[index] == fill_order_ids
+            queue_times[found] = fill_times[found] - log.times[inserts][by_order_id][index[found]]
+
+        self.fills: Fills = Fills(fill_times, fill_order_ids, fill_instruments, sides[trades], fill_volumes,
+                                  fill_prices, fees[trades],
+                                  np.where(is_etf, np.cumsum(etf_moves), np.cumsum(future_moves))[trades],
+                                  signs[trades] * (midpoints - fill_prices) * fill_volumes, queue_times)
+
+    @property
+    def fill_count(self) -> int:
+        """The number of trades made by this team."""
+        return self.fills.time.size
+
+    @property
+    def maker_volume(self) -> int:
+        """The volume traded by orders that rested in the book before they traded."""
+        return int(self.fills.volume[self.fills.queue_time > 0.0].sum())
+
+    @property
+    def median_queue_time(self) -> float:
+        """The median time, in seconds, that passive orders waited in the book before trading."""
+        queue_times = self.fills.queue_time[self.fills.queue_time > 0.0]
+        return float(np.median(queue_times)) if queue_times.size else float("nan")
+
+    @property
+    def spread_capture(self) -> float:
+        """The total edge, in cents, of this team's trades against the midpoint price."""
+        return float(np.nansum(self.fills.edge))
+
+    @property
+    def taker_volume(self) -> int:
+        """The volume traded by orders that traded as soon as they were inserted."""
+        return int(self.fills.volume[self.fills.queue_time == 0.0].sum())
+
+
+class MatchLog:
+    """A match events file held in columnar arrays, with one element per event.
+
+    Loading the file replays the order books of the first ETF/future pair
+    once, to record the last traded and midpoint prices at the end of each
+    tick. Everything else is computed from the arrays, and the analytics for
+    each team are cached the first time they are asked for.
+    """
+
+    def __init__(self, columns: Sequence[Sequence[str]], etf_clamp: float, tick_size: float,
+                 tick_interval: float = TICK_INTERVAL_SECONDS):
+        """Initialise a new instance of the MatchLog class from the columns of a match events file."""
+        self.etf_clamp: float = etf_clamp
+        self.tick_interval: float = tick_interval
+        self.tick_size: float = tick_size
+
+        team_ids: Dict[str, int] = {"": 0}  # the market
+        self.team_ids: np.ndarray = _parse(columns[1], lambda f: team_ids.setdefault(f, len(team_ids)), 0, np.int64)
+        self.team_names: Tuple[str, ...] = tuple(team_ids)
+
+        self.times: np.ndarray = _parse(columns[0], float, 0.0, np.float64)
+        self.operations: np.ndarray = _parse(columns[2], _OPERATIONS.__getitem__, -1, np.int8)
+        self.order_ids: np.ndarray = _parse(columns[3], int, 0, np.int64)
+        self.instruments: np.ndarray = _parse(columns[4], int, -1, np.int64)
+        self.sides: np.ndarray = _parse(columns[5], _SIDES.__getitem__, -1, np.int8)
+        self.volumes: np.ndarray = _parse(columns[6], int, 0, np.int64)
+        self.prices: np.ndarray = _parse(columns[7], float, 0.0, np.float64)
+        self.lifespans: np.ndarray = _parse(columns[8], _LIFESPANS.__getitem__, -1, np.int8)
+        self.fees: np.ndarray = _parse(columns[9], int, 0, np.int64)
+
+        self.__team_analytics: Dict[str, TeamAnalytics] = dict()
+        self.__replay()
+
+        # ETF positions are valued at the clamped price, as in CompetitorAccount.revalue
+        delta: np.ndarray = np.round(etf_clamp * self.future_prices).astype(np.int64)
+        delta -= delta % int(tick_size * 100.0)
+        self.etf_prices: np.ndarray = np.clip(self.etf_prices, self.future_prices - delta, self.future_prices + delta)
+
+    def __replay(self) -> None:
+        """Replay the order books, recording the prices used to value each account at the end of each tick."""
+        books: Tuple[OrderBook, ...] = tuple(OrderBook(i, 0.0, 0.0) for i in Instrument)
+        orders: Dict[Tuple[int, int], Order] = dict()
+        last_traded_prices: Tuple[List[int], ...] = tuple(list() for _ in Instrument)
+        midpoint_prices: Tuple[List[float], ...] = tuple(list() for _ in Instrument)
+
+        end_tick: int = 1
+        if self.times.size:
+            end_tick = max(1, int(np.ceil(self.times[-1] / self.tick_interval)))
+            if end_tick * self.tick_interval < self.times[-1]:
+                end_tick += 1
+        self.tick_times: np.ndarray = np.arange(end_tick + 1) * self.tick_interval
+
+        instruments: Tuple[Instrument, ...] = tuple(Instrument)
+        lifespans: Tuple[Lifespan, ...] = (Lifespan.FILL_AND_KILL, Lifespan.GOOD_FOR_DAY)
+        sides: Tuple[Side, ...] = (Side.SELL, Side.BUY)
+        columns = zip(self.times.tolist(), self.team_ids.tolist(), self.operations.tolist(), self.order_ids.tolist(),
+                      self.instruments.tolist(), self.sides.tolist(), self.volumes.tolist(), self.prices.tolist(),
+                      self.lifespans.tolist())
+
+        # Events at or before the end of a tick are applied before its snapshot is taken
+        start: int = 0
+        for end in np.searchsorted(self.times, self.tick_times, side="right").tolist():
+            for tm, team_id, operation, order_id, instrument, side, volume, price, lifespan \
+                    in itertools.islice(columns, end - start):
+                if operation == MatchEventOperation.INSERT:
+                    if instrument <= Instrument.ETF:
+                        order = Order(order_id, instruments[instrument], lifespans[lifespan], sides[side],
+                                      int(price), volume)
+                        books[instrument].insert(tm, order)
+                        if order.remaining_volume > 0:
+                            orders[(team_id, order_id)] = order
+                elif operation == MatchEventOperation.AMEND:
+                    order = orders.get((team_id, order_id))
+                    if order is not None:
+                        books[order.instrument].amend(tm, order, order.volume + volume)
+                        if order.remaining_volume == 0:
+                            del orders[(team_id, order_id)]
+                elif operation == MatchEventOperation.CANCEL:
+                    order = orders.pop((team_id, order_id), None)
+                    if order is not None:
+                        books[order.instrument].cancel(tm, order)
+                elif operation == MatchEventOperation.TRADE:
+                    order = orders.get((team_id, order_id))
+                    if order is not None and order.remaining_volume == 0:
+                        del orders[(team_id, order_id)]
+            start = end
+
+            for i in Instrument:
+                last_traded_prices[i].append(books[i].last_traded_price() or 0)
+                midpoint_price: Optional[float] = books[i].midpoint_price()
+                midpoint_prices[i].append(float("nan") if midpoint_price is None else midpoint_price)
+
+        self.last_traded_prices: np.ndarray = np.array(last_traded_prices, dtype=np.int64)
+        self.midpoint_prices: np.ndarray = np.array(midpoint_prices, dtype=np.float64)
+
+        # Accounts are only revalued once both instruments have traded
+        self.valued: np.ndarray = (self.last_traded_prices[Instrument.FUTURE] > 0) \
+            & (self.last_traded_prices[Instrument.ETF] > 0)
+        self.future_prices: np.ndarray = np.where(self.valued, self.last_traded_prices[Instrument.FUTURE], 0)
+        self.etf_prices: np.ndarray = np.where(self.valued, self.last_traded_prices[Instrument.ETF], 0)
+
+    @property
+    def duration(self) -> float:
+        """The length of the match in seconds, rounded up to a whole tick."""
+        return float(self.tick_times[-1])
+
+    @property
+    def teams(self) -> Tuple[str, ...]:
+        """The names of the teams that took part in the match, in alphabetical order."""
+        return tuple(sorted(name for name in self.team_names if name))
+
+    @staticmethod
+    def from_csv(file_object: TextIO, etf_clamp: float, tick_size: float,
+                 tick_interval: float = TICK_INTERVAL_SECONDS) -> "MatchLog":
+        """Create a new MatchLog instance from a CSV file."""
+        reader = csv.reader(file_object)
+        width: int = len(next(reader, _COLUMN_NAMES))
+        fields: List[str] = list(itertools.chain.from_iterable(reader))
+        return MatchLog(tuple(fields[i::width] for i in range(width)), etf_clamp, tick_size, tick_interval)
+
+    @staticmethod
+    def from_file(path: str, etf_clamp: float, tick_size: float,
+                  tick_interval: float = TICK_INTERVAL_SECONDS) -> "MatchLog":
+        """Create a new MatchLog instance from the named match events file."""
+        with open(path, "r", newline="") as csv_file:
+            return MatchLog.from_csv(csv_file, etf_clamp, tick_size, tick_interval)
+
+    def team(self, name: str) -> TeamAnalytics:
+        """Return the analytics for the named team."""
+        analytics: Optional[TeamAnalytics] = self.__team_analytics.get(name)
+        if analytics is None:
+            if not name or name not in self.team_names:
+                raise ValueError("no team named '%s' took part in the match" % name)
+            analytics = self.__team_analytics[name] = TeamAnalytics(self, name, self.team_names.index(name))
+        return analytics
+
+
+def _parse(column: Sequence[str], convert: Callable[[str], Any], missing: Any, dtype: type) -> np.ndarray:
+    """Return an array holding each field of the column converted to a value, or the missing value if it is empty."""
+    return np.fromiter((convert(f) if f else missing for f in column), dtype, len(column))
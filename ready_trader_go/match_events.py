@@ -25,6 +25,7 @@ import time
 
 from typing import Any, Callable, List, Optional, TextIO, Union
 
+from .metrics import Metric, MetricsRegistry
 from .types import Instrument, Lifespan, Side
 
 
@@ -43,13 +44,13 @@ class MatchEvent:
     OPERATION_NAMES = {o: o.name.capitalize() for o in MatchEventOperation}
 
     def __init__(self, time: float, competitor: str, operation: MatchEventOperation, order_id: int,
-                 instrument: Optional[Instrument], side: Optional[Side], volume: int,
+                 instrument: Optional[int], side: Optional[Side], volume: int,
                  price: Optional[Union[int, float]], lifespan: Optional[Lifespan], fee: Optional[int]):
         self.time: float = time
         self.competitor: str = competitor
         self.operation: MatchEventOperation = operation
         self.order_id: int = order_id
-        self.instrument: Optional[Instrument] = instrument
+        self.instrument: Optional[int] = instrument
         self.side: Optional[Side] = side
         self.volume: int = volume
         self.price: Optional[Union[int, float]] = price
@@ -61,7 +62,7 @@ class MatchEvent:
                      self.competitor,
                      MatchEvent.OPERATION_NAMES[self.operation],
                      self.order_id,
-                     self.instrument.value if self.instrument is not None else None,
+                     int(self.instrument) if self.instrument is not None else None,
                      "AB"[self.side.value] if self.side is not None else None,
                      self.volume,
                      self.price if self.price is not None else None,
@@ -117,7 +118,8 @@ class MatchEvents:
 class MatchEventsWriter:
     """A processor of match events that it writes to a file."""
 
-    def __init__(self, match_events: MatchEvents, filename: str, loop: asyncio.AbstractEventLoop):
+    def __init__(self, match_events: MatchEvents, filename: str, loop: asyncio.AbstractEventLoop,
+                 metrics: Optional[MetricsRegistry] = None):
         """Initialise a new instance of the MatchEvents class."""
         self.event_loop: asyncio.AbstractEventLoop = loop
         self.filename: str = filename
@@ -130,6 +132,11 @@ class MatchEventsWriter:
 
         match_events.event_occurred.append(self.queue.put)
 
+        if metrics is None:
+            metrics = MetricsRegistry()
+        self.written_count: Metric = metrics.counter("rtg_match_events_written_total", "Match events written")
+        metrics.gauge("rtg_match_event_queue_size", "Match events waiting to be written", function=self.queue.qsize)
+
         # Callbacks
         self.task_complete: List[Callable[[Any], None]] = list()
 
@@ -175,6 +182,7 @@ class MatchEventsWriter:
         """Fetch match events from a queue and write them to a file"""
         count = 0
         fifo = self.queue
+        written: Metric = self.written_count
 
         try:
             with match_events_file:
@@ -186,6 +194,7 @@ class MatchEventsWriter:
                 while evt is not None:
                     count += 1
                     csv_writer.writerow(evt)
+                    written.value += 1
                     evt = fifo.get()
         finally:
             if not self.event_loop.is_closed():
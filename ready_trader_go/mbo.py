@@ -0,0 +1,157 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .types import OrderEvent, Side
+
+
+class MboBook:
+    """A market-by-order book built from order events messages.
+
+    Each price level holds the ids and volumes of its orders in order of
+    priority, so the volume queued ahead of any order can be found. Like a
+    BookBuilder, the book starts empty and up to date, if a message is
+    missed, is out of date until the next complete snapshot arrives, and
+    keeps the messages that arrive during a snapshot to apply after it.
+
+    Order ids are assigned by the exchange and are not the client order ids
+    used by autotraders. When one of an autotrader's orders is placed in the
+    order book, the exchange sends it an order id message linking the two,
+    which BaseAutoTrader keeps in the order's entry in its state, so that
+    BaseAutoTrader.queue_position can look the order up here.
+    """
+
+    def __init__(self, instrument: int):
+        """Initialise a new instance of the MboBook class."""
+        self.asks: Dict[int, Dict[int, int]] = dict()
+        self.bids: Dict[int, Dict[int, int]] = dict()
+        self.instrument: int = instrument
+        self.orders: Dict[int, Tuple[int, int]] = dict()
+        self.sequence_number: int = 0
+        self.up_to_date: bool = True
+
+        self.__pending: List[Tuple[int, List[Tuple[int, int, int, int, int]]]] = list()
+        self.__snapshot: List[Tuple[int, int, int, int, int]] = list()
+        self.__snapshot_next_part: int = -1
+        self.__snapshot_sequence_number: int = 0
+
+    def apply_events(self, sequence_number: int, events: Iterable[Tuple[int, int, int, int, int]]) -> bool:
+        """Apply the (event, order id, side, price, volume) records from an
+        order events message.
+
+        Return True if the book is up to date afterwards.
+        """
+        if not self.up_to_date:
+            if self.__snapshot_next_part > 0 and sequence_number > self.__snapshot_sequence_number:
+                self.__pending.append((sequence_number, list(events)))
+            return False
+
+        if sequence_number != self.sequence_number + 1:
+            self.up_to_date = False
+            return False
+
+        for event in events:
+            self.__apply_event(*event)
+        self.sequence_number = sequence_number
+        return True
+
+    def apply_snapshot(self, sequence_number: int, part: int, part_count: int,
+                       events: Iterable[Tuple[int, int, int, int, int]]) -> bool:
+        """Apply one part of an order events snapshot message.
+
+        Return True if the book was brought up to date by the last part of
+        the snapshot and the order events messages kept since its first part.
+        """
+        # A snapshot of a book that is already up to date tells us nothing new, unless it is ahead of the book
+        if self.up_to_date:
+            if sequence_number <= self.sequence_number:
+                return False
+            self.up_to_date = False
+
+        if part == 0:
+            self.__pending.clear()
+            self.__snapshot.clear()
+            self.__snapshot_next_part = 0
+            self.__snapshot_sequence_number = sequence_number
+        elif part != self.__snapshot_next_part or sequence_number != self.__snapshot_sequence_number:
+            self.__pending.clear()
+            self.__snapshot_next_part = -1  # Ignore the rest of this snapshot
+            return False
+
+        self.__snapshot.extend(events)
+        self.__snapshot_next_part += 1
+        if self.__snapshot_next_part != part_count:
+            return False
+
+        self.__snapshot_next_part = -1
+        self.asks.clear()
+        self.bids.clear()
+        self.orders.clear()
+        for event in self.__snapshot:
+            self.__apply_event(*event)
+        self.sequence_number = sequence_number
+        self.up_to_date = True
+
+        for sequence_number, events in self.__pending:
+            if not self.apply_events(sequence_number, events):
+                break
+        self.__pending.clear()
+        return self.up_to_date
+
+    def level(self, side: Side, price: int) -> Dict[int, int]:
+        """Return the order ids and volumes at the given price level in order of priority."""
+        return (self.asks if side == Side.SELL else self.bids).get(price, {})
+
+    def queue_position(self, order_id: int) -> Optional[Tuple[int, int]]:
+        """Return the number of orders and the volume ahead of the given
+        order at its price level, or None if the order is not in the book.
+        """
+        if order_id not in self.orders:
+            return None
+
+        side, price = self.orders[order_id]
+        count: int = 0
+        volume: int = 0
+        for other_id, other_volume in self.level(side, price).items():
+            if other_id == order_id:
+                break
+            count += 1
+            volume += other_volume
+        return count, volume
+
+    def __apply_event(self, event: int, order_id: int, side: int, price: int, volume: int) -> None:
+        """Apply a single order event."""
+        levels = self.asks if side == Side.SELL else self.bids
+        if event == OrderEvent.ADD:
+            levels.setdefault(price, dict())[order_id] = volume
+            self.orders[order_id] = (side, price)
+            return
+
+        level = levels.get(price)
+        if level is None or order_id not in level:
+            return
+
+        if event == OrderEvent.MODIFY:
+            level[order_id] = volume
+        elif event == OrderEvent.EXECUTE and level[order_id] > volume:
+            level[order_id] -= volume
+        else:
+            del level[order_id]
+            del self.orders[order_id]
+            if not level:
+                del levels[price]
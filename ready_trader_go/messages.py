@@ -17,12 +17,15 @@
 #     <https://www.gnu.org/licenses/>.
 import asyncio
 import enum
+import functools
 import logging
+import mmap
 import struct
 
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import ready_trader_go.order_book as order_book
+from ready_trader_go.pubsub import MAXIMUM_PAYLOAD_LENGTH
 
 
 @enum.unique
@@ -42,6 +45,25 @@ class MessageType(enum.IntEnum):
     ORDER_BOOK_UPDATE = 10
     TRADE_TICKS = 11
 
+    # Execution messages naming an instrument
+    INSERT_ORDER_V2 = 12
+    HEDGE_ORDER_V2 = 13
+
+    # Information messages with a configurable number of price levels
+    DEEP_ORDER_BOOK_UPDATE = 14
+    DEEP_TRADE_TICKS = 15
+
+    # Incremental order book information messages
+    ORDER_BOOK_DELTA = 16
+    ORDER_BOOK_SNAPSHOT = 17
+
+    # Market-by-order information messages
+    ORDER_EVENTS = 18
+    ORDER_EVENTS_SNAPSHOT = 19
+
+    # Execution message linking an order to the market-by-order feed
+    ORDER_ID = 20
+
     # Heads Up Display messages
     AMEND_EVENT = 100
     CANCEL_EVENT = 101
@@ -58,7 +80,9 @@ HEADER = struct.Struct("!HB")  # Length, message type
 AMEND_MESSAGE = struct.Struct("!II")  # Client order id and new volume
 CANCEL_MESSAGE = struct.Struct("!I")  # Client order id
 HEDGE_MESSAGE = struct.Struct("!IBII")  # Client order id, side, price, volume
+HEDGE_V2_MESSAGE = struct.Struct("!IBBII")  # Client order id, instrument, side, price, volume
 INSERT_MESSAGE = struct.Struct("!IBIIB")  # Client order id, side, price, volume and lifespan
+INSERT_V2_MESSAGE = struct.Struct("!IBBIIB")  # Client order id, instrument, side, price, volume and lifespan
 LOGIN_MESSAGE = struct.Struct("!50s50s")  # Name, secret
 
 # Matching engine to auto-trader messages
@@ -67,13 +91,27 @@ HEDGE_FILLED_MESSAGE = struct.Struct("!III")  # Client order id, price, volume
 ORDER_BOOK_HEADER = struct.Struct("!BI")  # Instrument and sequence number
 ORDER_BOOK_MESSAGE = struct.Struct("!%dI" % (4 * order_book.TOP_LEVEL_COUNT))  # Prices & volumes for best bids & asks
 ORDER_FILLED_MESSAGE = struct.Struct("!III")  # Client order id, price, volume
+ORDER_ID_MESSAGE = struct.Struct("!II")  # Client order id and order events order id
 ORDER_STATUS_MESSAGE = struct.Struct("!IIIi")  # Client order id, fill volume, remaining volume and fees
 TRADE_TICKS_HEADER = struct.Struct("!BI")  # Instrument and sequence number
 TRADE_TICKS_MESSAGE = struct.Struct("!%dI" % (4 * order_book.TOP_LEVEL_COUNT))  # Prices & volumes for best bids & asks
 
+# Deep order book and trade ticks messages are followed by the prices & volumes for the given number of levels
+DEEP_BOOK_HEADER = struct.Struct("!BIB")  # Instrument, sequence number and number of levels
+MAXIMUM_DEEP_LEVEL_COUNT = 100
+
+# Order book delta and snapshot messages are followed by the given number of level changes
+ORDER_BOOK_DELTA_HEADER = struct.Struct("!BIH")  # Instrument, sequence number and number of changes
+ORDER_BOOK_SNAPSHOT_HEADER = struct.Struct("!BIBBH")  # Instrument, sequence number, part, part count and levels
+LEVEL_CHANGE = struct.Struct("!BII")  # Side, price and new total volume
+
+# Order events and order events snapshot messages have the same headers as order book delta and snapshot messages
+ORDER_EVENT = struct.Struct("!BIBII")  # Event type, order id, side, price and volume
+
 # Helpers for decoding order book and trade ticks messages
 BOOK_PART = struct.Struct("!%dI" % order_book.TOP_LEVEL_COUNT)
 TICKS_PART = struct.Struct("!%dI" % order_book.TOP_LEVEL_COUNT)
+BOOK_BODY = struct.Struct("!BI%dI" % (4 * order_book.TOP_LEVEL_COUNT))  # Header, prices & volumes in one call
 
 # Matching engine to HUD messages
 AMEND_EVENT_MESSAGE = struct.Struct("!dIIi")  # Time, team id, order id, volume delta
@@ -89,7 +127,9 @@ HEADER_SIZE: int = HEADER.size
 AMEND_MESSAGE_SIZE: int = HEADER.size + AMEND_MESSAGE.size
 CANCEL_MESSAGE_SIZE: int = HEADER.size + CANCEL_MESSAGE.size
 HEDGE_MESSAGE_SIZE: int = HEADER.size + HEDGE_MESSAGE.size
+HEDGE_V2_MESSAGE_SIZE: int = HEADER.size + HEDGE_V2_MESSAGE.size
 INSERT_MESSAGE_SIZE: int = HEADER.size + INSERT_MESSAGE.size
+INSERT_V2_MESSAGE_SIZE: int = HEADER.size + INSERT_V2_MESSAGE.size
 LOGIN_MESSAGE_SIZE: int = HEADER.size + LOGIN_MESSAGE.size
 
 ERROR_MESSAGE_SIZE: int = HEADER.size + ERROR_MESSAGE.size
@@ -97,9 +137,17 @@ HEDGE_FILLED_MESSAGE_SIZE: int = HEADER.size + HEDGE_FILLED_MESSAGE.size
 ORDER_BOOK_HEADER_SIZE: int = HEADER.size + ORDER_BOOK_HEADER.size
 ORDER_BOOK_MESSAGE_SIZE: int = ORDER_BOOK_HEADER_SIZE + ORDER_BOOK_MESSAGE.size
 ORDER_FILLED_MESSAGE_SIZE: int = HEADER.size + ORDER_FILLED_MESSAGE.size
+ORDER_ID_MESSAGE_SIZE: int = HEADER.size + ORDER_ID_MESSAGE.size
 ORDER_STATUS_MESSAGE_SIZE: int = HEADER.size + ORDER_STATUS_MESSAGE.size
 TRADE_TICKS_HEADER_SIZE: int = HEADER.size + TRADE_TICKS_HEADER.size
 TRADE_TICKS_MESSAGE_SIZE: int = TRADE_TICKS_HEADER_SIZE + TRADE_TICKS_MESSAGE.size
+DEEP_BOOK_HEADER_SIZE: int = HEADER.size + DEEP_BOOK_HEADER.size
+ORDER_BOOK_DELTA_HEADER_SIZE: int = HEADER.size + ORDER_BOOK_DELTA_HEADER.size
+ORDER_BOOK_SNAPSHOT_HEADER_SIZE: int = HEADER.size + ORDER_BOOK_SNAPSHOT_HEADER.size
+
+# The most level changes or order events that fit in one message
+MAXIMUM_LEVEL_CHANGES: int = (MAXIMUM_PAYLOAD_LENGTH - ORDER_BOOK_SNAPSHOT_HEADER_SIZE) // LEVEL_CHANGE.size
+MAXIMUM_ORDER_EVENTS: int = (MAXIMUM_PAYLOAD_LENGTH - ORDER_BOOK_SNAPSHOT_HEADER_SIZE) // ORDER_EVENT.size
 
 AMEND_EVENT_MESSAGE_SIZE: int = HEADER.size + AMEND_EVENT_MESSAGE.size
 CANCEL_EVENT_MESSAGE_SIZE: int = HEADER.size + CANCEL_EVENT_MESSAGE.size
@@ -109,6 +157,17 @@ TRADE_EVENT_MESSAGE_SIZE: int = HEADER.size + TRADE_EVENT_MESSAGE.size
 LOGIN_EVENT_MESSAGE_SIZE: int = HEADER.size + LOGIN_EVENT_MESSAGE.size
 
 
+@functools.lru_cache(maxsize=None)
+def deep_book_part(level_count: int) -> struct.Struct:
+    """Return a struct for the prices or volumes of one side of a deep order book or trade ticks message."""
+    return struct.Struct("!%dI" % level_count)
+
+
+def deep_book_message_size(level_count: int) -> int:
+    """Return the size of a deep order book or trade ticks message with the given number of levels."""
+    return DEEP_BOOK_HEADER_SIZE + 4 * deep_book_part(level_count).size
+
+
 class Connection(asyncio.Protocol):
     """A stream-based network connection."""
 
@@ -197,6 +256,19 @@ class Subscription(asyncio.DatagramProtocol):
         """Callback when the datagram receiver is established."""
         self._receiver_transport = transport
 
+    def error_received(self, exc: Exception) -> None:
+        """Callback when the datagram receiver has lost datagrams, for example when the publisher overran it."""
+        self.__logger.warning("datagrams lost: %s", exc)
+
+    def frame_received(self, buffer: Union[mmap.mmap, memoryview], start: int, length: int,
+                       address: Tuple[str, int]) -> None:
+        """Callback when a datagram is received in place in a shared memory buffer.
+
+        The datagram is only valid until this callback returns. By default it
+        is copied and passed to datagram_received.
+        """
+        self.datagram_received(buffer[start:start + length], address)
+
     def datagram_received(self, data: bytes, address: Tuple[str, int]) -> None:
         """Callback when a datagram is received."""
         if len(data) < HEADER_SIZE:
@@ -0,0 +1,219 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import json
+import logging
+import os
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .histogram import Histogram
+
+METRICS_INTERVAL: float = 5.0
+QUANTILES: Tuple[float, ...] = (50.0, 90.0, 99.0, 99.9)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metric:
+    """A counter or gauge.
+
+    Updating a metric is a single attribute update, e.g. metric.value += 1.
+    Alternatively, a metric may be given a function which is called to get
+    its value whenever a snapshot is taken, which costs nothing in between.
+    """
+    __slots__ = ("function", "value")
+
+    def __init__(self, function: Optional[Callable[[], Union[int, float]]] = None):
+        """Initialise a new instance of the Metric class."""
+        self.function: Optional[Callable[[], Union[int, float]]] = function
+        self.value: Union[int, float] = 0
+
+    def get(self) -> Union[int, float]:
+        """Return the current value of this metric."""
+        return self.function() if self.function is not None else self.value
+
+
+class MetricFamily:
+    """The metrics of one name and kind, one for each set of labels."""
+    __slots__ = ("help", "kind", "metrics", "name")
+
+    def __init__(self, name: str, kind: str, help_: str):
+        """Initialise a new instance of the MetricFamily class."""
+        self.help: str = help_
+        self.kind: str = kind
+        self.metrics: Dict[Labels, Union[Metric, Histogram]] = dict()
+        self.name: str = name
+
+
+class MetricsRegistry:
+    """A registry of counters, gauges and histograms.
+
+    Metric names follow the Prometheus conventions: counters end in _total
+    and names end in the unit of the value, if it has one. Histograms are
+    exported as summaries, i.e. as quantiles, a sum and a count.
+    """
+
+    def __init__(self):
+        """Initialise a new instance of the MetricsRegistry class."""
+        self.__families: Dict[str, MetricFamily] = dict()
+
+    def counter(self, name: str, help_: str, labels: Optional[Dict[str, str]] = None,
+                function: Optional[Callable[[], int]] = None) -> Metric:
+        """Return the counter with the given name and labels, creating it if necessary."""
+        return self.__get(name, "counter", help_, labels, lambda: Metric(function))
+
+    def gauge(self, name: str, help_: str, labels: Optional[Dict[str, str]] = None,
+              function: Optional[Callable[[], Union[int, float]]] = None) -> Metric:
+        """Return the gauge with the given name and labels, creating it if necessary."""
+        return self.__get(name, "gauge", help_, labels, lambda: Metric(function))
+
+    def histogram(self, name: str, help_: str, labels: Optional[Dict[str, str]] = None,
+                  histogram: Optional[Histogram] = None) -> Histogram:
+        """Return the histogram with the given name and labels, registering the given one if necessary."""
+        return self.__get(name, "summary", help_, labels, lambda: histogram if histogram is not None else Histogram())
+
+    def prometheus(self) -> str:
+        """Return the current value of every metric in the Prometheus text exposition format."""
+        lines: List[str] = list()
+        for family in self.__families.values():
+            lines.append("# HELP %s %s" % (family.name, family.help.replace("\\", "\\\\").replace("\n", "\\n")))
+            lines.append("# TYPE %s %s" % (family.name, family.kind))
+            for labels, metric in family.metrics.items():
+                if isinstance(metric, Histogram):
+                    for q in QUANTILES:
+                        quantile: Labels = labels + (("quantile", "%g" % (q / 100.0)),)
+                        lines.append("%s%s %d" % (family.name, _format_labels(quantile), metric.percentile(q)))
+                    lines.append("%s_sum%s %d" % (family.name, _format_labels(labels), metric.total))
+                    lines.append("%s_count%s %d" % (family.name, _format_labels(labels), metric.count))
+                else:
+                    lines.append("%s%s %s" % (family.name, _format_labels(labels), metric.get()))
+        lines.append("")
+        return "\n".join(lines)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a dictionary of the current value of every metric, suitable for conversion to JSON."""
+        result: Dict[str, Any] = {"time": time.time()}
+        for family in self.__families.values():
+            values: List[Dict[str, Any]] = list()
+            for labels, metric in family.metrics.items():
+                value = metric.summary(QUANTILES) if isinstance(metric, Histogram) else metric.get()
+                values.append({"labels": dict(labels), "value": value})
+            result[family.name] = {"type": family.kind, "help": family.help, "values": values}
+        return result
+
+    def __get(self, name: str, kind: str, help_: str, labels: Optional[Dict[str, str]],
+              factory: Callable[[], Union[Metric, Histogram]]) -> Any:
+        """Return the metric with the given name and labels, creating it if necessary."""
+        family: Optional[MetricFamily] = self.__families.get(name)
+        if family is None:
+            family = self.__families[name] = MetricFamily(name, kind, help_)
+        elif family.kind != kind:
+            raise ValueError("metric '%s' is a %s, not a %s" % (name, family.kind, kind))
+        key: Labels = tuple(sorted(labels.items())) if labels else ()
+        if key not in family.metrics:
+            family.metrics[key] = factory()
+        return family.metrics[key]
+
+
+def _format_labels(labels: Labels) -> str:
+    """Return the given labels in the Prometheus text exposition format."""
+    if not labels:
+        return ""
+    return "{%s}" % ",".join('%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                             for k, v in labels)
+
+
+class MetricsPublisher:
+    """Periodically writes a JSON snapshot of a metrics registry to a file and
+    optionally serves the metrics over HTTP.
+
+    The HTTP server answers a request for /metrics with the Prometheus text
+    exposition format and any other request with the JSON snapshot.
+    """
+
+    def __init__(self, registry: MetricsRegistry, loop: asyncio.AbstractEventLoop, filename: Optional[str] = None,
+                 interval: float = METRICS_INTERVAL, host: Optional[str] = None, port: Optional[int] = None):
+        """Initialise a new instance of the MetricsPublisher class."""
+        self.filename: Optional[str] = filename
+        self.host: Optional[str] = host
+        self.interval: float = interval
+        self.port: Optional[int] = port
+        self.registry: MetricsRegistry = registry
+
+        self.__event_loop: asyncio.AbstractEventLoop = loop
+        self.__handle: Optional[asyncio.TimerHandle] = None
+        self.__logger: logging.Logger = logging.getLogger("METRICS")
+        self.__server: Optional[asyncio.AbstractServer] = None
+
+    def close(self) -> None:
+        """Write a final snapshot and stop publishing."""
+        if self.__handle is not None:
+            self.__handle.cancel()
+            self.__handle = None
+        if self.__server is not None:
+            self.__server.close()
+            self.__server = None
+        if self.filename:
+            self.write_snapshot()
+
+    async def start(self) -> None:
+        """Start publishing."""
+        if self.port is not None:
+            self.__logger.info("starting metrics server: host=%s port=%d", self.host, self.port)
+            self.__server = await asyncio.start_server(self.__on_client, self.host, self.port)
+        if self.filename:
+            self.__on_interval()
+
+    def write_snapshot(self) -> None:
+        """Write a JSON snapshot of the metrics to the file, replacing any previous snapshot."""
+        temporary: str = self.filename + ".tmp"
+        try:
+            with open(temporary, "w") as output:
+                json.dump(self.registry.snapshot(), output, indent=1)
+            os.replace(temporary, self.filename)
+        except OSError as e:
+            self.__logger.error("failed to write metrics file: filename=%s", self.filename, exc_info=e)
+
+    def __on_interval(self) -> None:
+        """Write a snapshot and schedule the next one."""
+        self.write_snapshot()
+        self.__handle = self.__event_loop.call_later(self.interval, self.__on_interval)
+
+    async def __on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer a single HTTP request."""
+        try:
+            request: bytes = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts: List[bytes] = request.split()
+            if len(parts) > 1 and parts[1].split(b"?")[0] == b"/metrics":
+                body: bytes = self.registry.prometheus().encode()
+                content_type: bytes = b"text/plain; version=0.0.4"
+            else:
+                body = json.dumps(self.registry.snapshot()).encode()
+                content_type = b"application/json"
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+                         % (content_type, len(body)))
+            writer.write(body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -15,17 +15,19 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-from bisect import bisect, insort_left
+from bisect import bisect, bisect_left, insort_left
 import collections
+import itertools
 
-from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 
-from .types import Instrument, Lifespan, Side
+from .types import Instrument, Lifespan, OrderEvent, Side
 
 
 MINIMUM_BID = 1
 MAXIMUM_ASK = 2 ** 31 - 1
 TOP_LEVEL_COUNT = 5
+DEEP_LEVEL_COUNT = 20
 
 
 class IOrderListener(object):
@@ -48,8 +50,8 @@ class IOrderListener(object):
 
 class Order(object):
     """A request to buy or sell at a given price."""
-    __slots__ = ("client_order_id", "instrument", "lifespan", "listener", "price", "remaining_volume", "side",
-                 "total_fees", "volume")
+    __slots__ = ("client_order_id", "instrument", "lifespan", "listener", "order_id", "price", "remaining_volume",
+                 "side", "total_fees", "volume")
 
     def __init__(self, client_order_id: int, instrument: Instrument, lifespan: Lifespan, side: Side, price: int,
                  volume: int, listener: Optional[IOrderListener] = None):
@@ -57,6 +59,7 @@ class Order(object):
         self.client_order_id: int = client_order_id
         self.instrument: Instrument = instrument
         self.lifespan: Lifespan = lifespan
+        self.order_id: int = 0  # Assigned when the order is added to the order events feed
         self.side: Side = side
         self.price: int = price
         self.remaining_volume: int = volume
@@ -73,7 +76,12 @@ class Order(object):
         return s % args
 
 class OrderBook(object):
-    """A collection of orders arranged by the price-time priority principle."""
+    """A collection of orders arranged by the price-time priority principle.
+
+    For each side of the book, the cumulative volume and value of the price
+    levels, starting from the best price, are calculated the first time they
+    are needed after that side of the book changes (see cumulative_depth).
+    """
 
     def __init__(self, instrument: Instrument, maker_fee: float, taker_fee: float):
         """Initialise a new instance of the OrderBook class."""
@@ -81,8 +89,12 @@ class OrderBook(object):
         self.maker_fee: float = maker_fee
         self.taker_fee: float = taker_fee
 
+        self.__ask_depth: Tuple[List[int], List[int], List[int]] = ([], [], [])
+        self.__ask_depth_stale: bool = False
         self.__ask_prices: List[int] = []
         self.__ask_ticks: Dict[int, int] = collections.defaultdict(int)
+        self.__bid_depth: Tuple[List[int], List[int], List[int]] = ([], [], [])
+        self.__bid_depth_stale: bool = False
         self.__bid_prices: List[int] = []
         self.__bid_ticks: Dict[int, int] = collections.defaultdict(int)
         self.__last_traded_price: Optional[int] = None
@@ -90,6 +102,8 @@ class OrderBook(object):
         self.__total_volumes: Dict[int, int] = {}
 
         # Signals
+        self.level_changed: List[Callable[[Any, Side, int, int], None]] = list()
+        self.order_changed: List[Callable[[Any, OrderEvent, Order, int], None]] = list()
         self.trade_occurred: List[Callable[[Any], None]] = list()
 
     def __str__(self):
@@ -111,6 +125,11 @@ class OrderBook(object):
             self.remove_volume_from_level(order.price, diff, order.side)
             order.volume -= diff
             order.remaining_volume -= diff
+            for callback in self.order_changed:
+                if order.remaining_volume:
+                    callback(self, OrderEvent.MODIFY, order, order.remaining_volume)
+                else:
+                    callback(self, OrderEvent.DELETE, order, 0)
             if order.listener:
                 order.listener.on_order_amended(now, order, diff)
 
@@ -128,9 +147,37 @@ class OrderBook(object):
             self.remove_volume_from_level(order.price, order.remaining_volume, order.side)
             remaining = order.remaining_volume
             order.remaining_volume = 0
+            for callback in self.order_changed:
+                callback(self, OrderEvent.DELETE, order, 0)
             if order.listener:
                 order.listener.on_order_cancelled(now, order, remaining)
 
+    def cumulative_depth(self, side: Side) -> Tuple[List[int], List[int], List[int]]:
+        """Return the prices, cumulative volumes and cumulative values of the
+        price levels on the given side of this order book.
+
+        Levels are ordered from the best price outwards, so that the i-th
+        cumulative volume and value are the total volume and value of the
+        best i + 1 price levels. The lists are owned by the order book and
+        must not be modified; they are replaced when the book next changes.
+        """
+        if side == Side.BID:
+            if self.__bid_depth_stale:
+                prices = self.__bid_prices[::-1]
+                volumes = [self.__total_volumes[p] for p in prices]
+                self.__bid_depth = (prices, list(itertools.accumulate(volumes)),
+                                    list(itertools.accumulate(map(int.__mul__, prices, volumes))))
+                self.__bid_depth_stale = False
+            return self.__bid_depth
+
+        if self.__ask_depth_stale:
+            prices = [-p for p in reversed(self.__ask_prices)]
+            volumes = [self.__total_volumes[p] for p in prices]
+            self.__ask_depth = (prices, list(itertools.accumulate(volumes)),
+                                list(itertools.accumulate(map(int.__mul__, prices, volumes))))
+            self.__ask_depth_stale = False
+        return self.__ask_depth
+
     def insert(self, now: float, order: Order) -> None:
         """Insert a new order into this order book."""
         if order.side == Side.SELL and self.__bid_prices and order.price <= self.__bid_prices[-1]:
@@ -151,12 +198,33 @@ class OrderBook(object):
         """Return the last traded price."""
         return self.__last_traded_price
 
+    def levels(self, side: Side) -> List[Tuple[int, int]]:
+        """Return the price and total volume of every price level on the given
+        side of this order book, from the best price outwards.
+        """
+        if side == Side.BID:
+            return [(p, self.__total_volumes[p]) for p in reversed(self.__bid_prices)]
+        return [(-p, self.__total_volumes[-p]) for p in reversed(self.__ask_prices)]
+
     def midpoint_price(self) -> Optional[float]:
         """Return the midpoint price."""
         if self.__bid_prices and self.__ask_prices:
             return (self.__bid_prices[-1] + -self.__ask_prices[-1]) / 2.0
         return None
 
+    def orders(self, side: Side) -> Iterator[Order]:
+        """Return an iterator over the orders on the given side of this order
+        book in order of priority, from the best price outwards.
+        """
+        if side == Side.BID:
+            prices = reversed(self.__bid_prices)
+        else:
+            prices = (-p for p in reversed(self.__ask_prices))
+        for price in prices:
+            for order in self.__levels[price]:
+                if order.remaining_volume > 0:
+                    yield order
+
     def place(self, now: float, order: Order) -> None:
         """Place an order that does not match any existing order in this order book."""
         price = order.price
@@ -172,11 +240,27 @@ class OrderBook(object):
         self.__levels[price].append(order)
         self.__total_volumes[price] += order.remaining_volume
 
+        if order.side == Side.SELL:
+            self.__ask_depth_stale = True
+        else:
+            self.__bid_depth_stale = True
+
+        for callback in self.level_changed:
+            callback(self, order.side, price, self.__total_volumes[price])
+        for callback in self.order_changed:
+            callback(self, OrderEvent.ADD, order, order.remaining_volume)
+
         if order.listener:
             order.listener.on_order_placed(now, order)
 
     def remove_volume_from_level(self, price: int, volume: int, side: Side) -> None:
-        if self.__total_volumes[price] == volume:
+        if side == Side.SELL:
+            self.__ask_depth_stale = True
+        else:
+            self.__bid_depth_stale = True
+
+        new_volume: int = self.__total_volumes[price] - volume
+        if new_volume == 0:
             del self.__levels[price]
             del self.__total_volumes[price]
             if side == Side.SELL:
@@ -184,30 +268,37 @@ class OrderBook(object):
             elif side == Side.BUY:
                 self.__bid_prices.pop(bisect(self.__bid_prices, price) - 1)
         else:
-            self.__total_volumes[price] -= volume
+            self.__total_volumes[price] = new_volume
+
+        for callback in self.level_changed:
+            callback(self, side, price, new_volume)
 
     def top_levels(self, ask_prices: List[int], ask_volumes: List[int], bid_prices: List[int],
                    bid_volumes: List[int]) -> None:
-        """Populate the supplied lists with the top levels for this book."""
+        """Populate the supplied lists with the top levels for this book.
+
+        The number of levels is given by the length of the lists.
+        """
+        depth: int = len(ask_prices)
         i = 0
         j = len(self.__ask_prices) - 1
-        while i < TOP_LEVEL_COUNT and j >= 0:
+        while i < depth and j >= 0:
             ask_prices[i] = -self.__ask_prices[j]
             ask_volumes[i] = self.__total_volumes[ask_prices[i]]
             i += 1
             j -= 1
-        while i < TOP_LEVEL_COUNT:
+        while i < depth:
             ask_prices[i] = ask_volumes[i] = 0
             i += 1
 
         i = 0
         j = len(self.__bid_prices) - 1
-        while i < TOP_LEVEL_COUNT and j >= 0:
+        while i < depth and j >= 0:
             bid_prices[i] = self.__bid_prices[j]
             bid_volumes[i] = self.__total_volumes[bid_prices[i]]
             i += 1
             j -= 1
-        while i < TOP_LEVEL_COUNT:
+        while i < depth:
             bid_prices[i] = bid_volumes[i] = 0
             i += 1
 
@@ -255,6 +346,8 @@ class OrderBook(object):
             remaining -= volume
             passive.remaining_volume -= volume
             passive.total_fees += fee
+            for callback in self.order_changed:
+                callback(self, OrderEvent.EXECUTE, passive, volume)
             if passive.listener:
                 passive.listener.on_order_filled(now, passive, best_price, volume, fee)
 
@@ -262,10 +355,15 @@ class OrderBook(object):
         traded_volume_at_this_level: int = order.remaining_volume - remaining
 
         if order.side == Side.BUY:
+            self.__ask_depth_stale = True
             self.__ask_ticks[best_price] += traded_volume_at_this_level
         else:
+            self.__bid_depth_stale = True
             self.__bid_ticks[best_price] += traded_volume_at_this_level
 
+        for callback in self.level_changed:
+            callback(self, Side.SELL if order.side == Side.BUY else Side.BUY, best_price, total_volume)
+
         fee: int = round(best_price * traded_volume_at_this_level * self.taker_fee)
         order.remaining_volume = remaining
         order.total_fees += fee
@@ -278,17 +376,21 @@ class OrderBook(object):
 
     def trade_ticks(self, ask_prices: List[int], ask_volumes: List[int], bid_prices: List[int],
                     bid_volumes: List[int]) -> bool:
-        """Return True and populate the lists if there have been trades."""
+        """Return True and populate the lists if there have been trades.
+
+        The number of levels is given by the length of the lists.
+        """
         if self.__ask_ticks or self.__bid_ticks:
-            prices = sorted(self.__ask_ticks.keys())[:TOP_LEVEL_COUNT]
+            depth: int = len(ask_prices)
+            prices = sorted(self.__ask_ticks.keys())[:depth]
             volumes = tuple(self.__ask_ticks[p] for p in prices)
-            ask_prices[:] = prices + [0] * (TOP_LEVEL_COUNT - len(prices))
-            ask_volumes[:] = volumes + (0,) * (TOP_LEVEL_COUNT - len(volumes))
+            ask_prices[:] = prices + [0] * (depth - len(prices))
+            ask_volumes[:] = volumes + (0,) * (depth - len(volumes))
 
-            prices = sorted(self.__bid_ticks.keys(), reverse=True)[:TOP_LEVEL_COUNT]
+            prices = sorted(self.__bid_ticks.keys(), reverse=True)[:depth]
             volumes = tuple(self.__bid_ticks[p] for p in prices)
-            bid_prices[:] = prices + [0] * (TOP_LEVEL_COUNT - len(prices))
-            bid_volumes[:] = volumes + (0,) * (TOP_LEVEL_COUNT - len(volumes))
+            bid_prices[:] = prices + [0] * (depth - len(prices))
+            bid_volumes[:] = volumes + (0,) * (depth - len(volumes))
 
             self.__ask_ticks.clear()
             self.__bid_ticks.clear()
@@ -301,28 +403,23 @@ class OrderBook(object):
         """Return the volume that would trade and the average price per lot for
         the requested trade without changing the order book.
         """
-        total_volume: int = 0
-        total_value: int = 0
-
         if side == Side.ASK:
-            i = len(self.__bid_prices) - 1
-            while total_volume < volume and i >= 0 and self.__bid_prices[i] and self.__bid_prices[i] >= limit_price:
-                price: int = self.__bid_prices[i]
-                available: int = self.__total_volumes[price]
-                required: int = volume - total_volume
-                weight: int = required if required <= available else available
-                total_volume += weight
-                total_value += weight * price
-                i -= 1
+            prices, volumes, values = self.cumulative_depth(Side.BID) if self.__bid_depth_stale else self.__bid_depth
+            # Bid prices are held in ascending order, so count those at or above the limit price
+            level_count: int = len(self.__bid_prices) - bisect_left(self.__bid_prices, limit_price)
         else:
-            i = len(self.__ask_prices) - 1
-            while total_volume < volume and i >= 0 and -self.__ask_prices[i] and -self.__ask_prices[i] <= limit_price:
-                price: int = -self.__ask_prices[i]
-                available: int = self.__total_volumes[price]
-                required: int = volume - total_volume
-                weight: int = required if required <= available else available
-                total_volume += weight
-                total_value += weight * price
-                i -= 1
-
-        return total_volume, total_value // total_volume if total_volume > 0 else 0
+            prices, volumes, values = self.cumulative_depth(Side.ASK) if self.__ask_depth_stale else self.__ask_depth
+            level_count: int = len(self.__ask_prices) - bisect_left(self.__ask_prices, -limit_price)
+
+        if level_count == 0 or volume < 1:
+            return 0, 0
+
+        # Find the first level at which the requested volume is reached
+        i: int = bisect_left(volumes, volume, 0, level_count)
+        if i == level_count:
+            return volumes[i - 1], values[i - 1] // volumes[i - 1]
+
+        if i == 0:
+            return volume, prices[0]
+
+        return volume, (values[i - 1] + (volume - volumes[i - 1]) * prices[i]) // volume
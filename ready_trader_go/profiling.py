@@ -0,0 +1,174 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import collections
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+
+from typing import Any, Callable, Counter, Dict, Iterable, List, Optional
+
+from .histogram import Histogram
+
+PROFILERS = ("cprofile", "sample")
+SAMPLE_INTERVAL: float = 0.001
+
+
+class TimedCallback:
+    """A callback that records how long each call takes.
+
+    A timed callback compares equal to the callback it wraps, so it can be
+    removed from a signal list using the original callback.
+    """
+    __slots__ = ("callback", "durations")
+
+    def __init__(self, callback: Callable, durations: Histogram):
+        """Initialise a new instance of the TimedCallback class."""
+        self.callback: Callable = callback
+        self.durations: Histogram = durations
+
+    def __call__(self, *args: Any) -> Any:
+        started: int = time.perf_counter_ns()
+        try:
+            return self.callback(*args)
+        finally:
+            self.durations.record(time.perf_counter_ns() - started)
+
+    def __eq__(self, other: Any) -> bool:
+        return self.callback == (other.callback if isinstance(other, TimedCallback) else other)
+
+    def __hash__(self) -> int:
+        return hash(self.callback)
+
+    def __repr__(self) -> str:
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+
+
+class TimedSignal(list):
+    """A signal list whose callbacks, including those appended later, are timed."""
+
+    def __init__(self, name: str, callbacks: Iterable[Callable], durations: Dict[str, Histogram]):
+        """Initialise a new instance of the TimedSignal class."""
+        super().__init__()
+        self.__durations: Dict[str, Histogram] = durations
+        self.__name: str = name
+        for callback in callbacks:
+            self.append(callback)
+
+    def append(self, callback: Callable) -> None:
+        """Append a timed version of the callback."""
+        name: str = "%s -> %s" % (self.__name, getattr(callback, "__qualname__", repr(callback)))
+        if name not in self.__durations:
+            self.__durations[name] = Histogram()
+        super().append(TimedCallback(callback, self.__durations[name]))
+
+
+class StackSampler:
+    """Periodically records the call stack of a thread from a background thread."""
+
+    def __init__(self, thread: threading.Thread, interval: float = SAMPLE_INTERVAL):
+        """Initialise a new instance of the StackSampler class."""
+        self.interval: float = interval
+        self.samples: Counter[str] = collections.Counter()
+        self.__stopped: threading.Event = threading.Event()
+        self.__target_id: int = thread.ident
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self.__thread = threading.Thread(target=self.__run, name="StackSampler", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def write(self, filename: str) -> None:
+        """Write the samples in the 'folded' format read by flame graph tools."""
+        with open(filename, "w") as output:
+            for stack, count in self.samples.most_common():
+                output.write("%s %d\n" % (stack, count))
+
+    def __run(self) -> None:
+        """Take samples until stopped."""
+        while not self.__stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.__target_id)
+            stack: List[str] = list()
+            while frame is not None:
+                code = frame.f_code
+                stack.append("%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class Profiler:
+    """Profiles the exchange for the duration of a match.
+
+    The kind of profiler is either "cprofile", which writes a pstats file
+    ending in .prof, or "sample", which samples the main thread's stack and
+    writes a file of folded stacks ending in .folded. In both cases the
+    duration of each callback connected to the signals passed to
+    timed_signal is written to a file ending in .callbacks.txt.
+    """
+
+    def __init__(self, kind: str, filename_base: str):
+        """Initialise a new instance of the Profiler class."""
+        if kind not in PROFILERS:
+            raise ValueError("profiler must be one of: %s" % ", ".join(PROFILERS))
+        self.callback_durations: Dict[str, Histogram] = dict()
+        self.filename_base: str = filename_base
+        self.kind: str = kind
+        self.logger: logging.Logger = logging.getLogger("PROFILER")
+        self.__profile: Optional[cProfile.Profile] = None
+        self.__sampler: Optional[StackSampler] = None
+
+    def start(self) -> None:
+        """Start profiling the current thread."""
+        self.logger.info("starting %s profiler", self.kind)
+        if self.kind == "cprofile":
+            self.__profile = cProfile.Profile()
+            self.__profile.enable()
+        else:
+            self.__sampler = StackSampler(threading.current_thread())
+            self.__sampler.start()
+
+    def stop(self) -> None:
+        """Stop profiling and write the results."""
+        if self.__profile is not None:
+            self.__profile.disable()
+            self.__profile.dump_stats(self.filename_base + ".prof")
+            self.logger.info("profile written to %s.prof", self.filename_base)
+        if self.__sampler is not None:
+            self.__sampler.stop()
+            self.__sampler.write(self.filename_base + ".folded")
+            self.logger.info("%d stack samples written to %s.folded", sum(self.__sampler.samples.values()),
+                             self.filename_base)
+
+        with open(self.filename_base + ".callbacks.txt", "w") as output:
+            for name, durations in sorted(self.callback_durations.items(), key=lambda item: -item[1].total):
+                output.write("%s duration_ns={%s}\n" % (name, durations))
+        self.logger.info("callback durations written to %s.callbacks.txt", self.filename_base)
+
+    def timed_signal(self, name: str, callbacks: List[Callable]) -> List[Callable]:
+        """Return a signal list, to replace the given one, whose callbacks are timed."""
+        return TimedSignal(name, callbacks, self.callback_durations)
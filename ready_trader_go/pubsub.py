@@ -22,10 +22,30 @@ import struct
 
 from typing import Coroutine, Optional, Tuple, Union
 
+from .latency import LatencyRecorder, clock_ns
+
 BUFFER_SIZE = 8192
 FRAME_HEADER_SIZE = 8
 FRAME_SIZE = 128
-MAXIMUM_PAYLOAD_LENGTH = FRAME_SIZE - FRAME_HEADER_SIZE
+MAXIMUM_PAYLOAD_LENGTH = BUFFER_SIZE // 2 - FRAME_HEADER_SIZE
+
+# The time each frame was published (see latency.clock_ns) follows the buffer
+TIMESTAMP = struct.Struct("!Q")
+
+# The total number of bytes the publisher has advanced through the buffer, counting the bytes skipped when it wraps,
+# follows the timestamps
+CURSOR = struct.Struct("!Q")
+CURSOR_OFFSET = BUFFER_SIZE + BUFFER_SIZE // FRAME_SIZE * TIMESTAMP.size
+MAPPED_SIZE = CURSOR_OFFSET + CURSOR.size
+
+# Values of the first byte of a frame
+FRAME_EMPTY = 0
+FRAME_READY = 1
+FRAME_WRAP = 2  # The next frame is at the start of the buffer
+
+
+class SubscriberOverrunError(OSError):
+    """Passed to a subscriber's protocol when the publisher has overwritten frames it had not read."""
 
 
 class Publisher(asyncio.WriteTransport):
@@ -34,17 +54,30 @@ class Publisher(asyncio.WriteTransport):
     Transport is achieved through the use of memory mapped files or shared
     memory blocks. There must be an interval between writes to permit
     subscribers to read the data before it is overwritten.
+
+    A payload of up to 120 bytes fills one 128-byte frame. Longer payloads
+    fill as many consecutive frames as they need and if there are not enough
+    frames before the end of the buffer, a wrap marker tells subscribers to
+    continue from the start.
+
+    If the buffer is at least MAPPED_SIZE bytes long, the time at which each
+    payload is published is written to the slot following the buffer that
+    corresponds to its first frame, and the cursor after the timestamps is
+    advanced before each write so that subscribers can tell when they have
+    fallen a whole buffer behind.
     """
-    __slots__ = ("__pack_into", "_buffer", "_closed", "_pos")
+    __slots__ = ("__cursor", "__pack_into", "__stamped", "_buffer", "_closed", "_pos")
 
     def __init__(self, buffer: Union[mmap.mmap, memoryview], protocol: asyncio.BaseProtocol):
         super().__init__()
         self._buffer: Optional[Union[mmap.mmap, memoryview]] = buffer
         self._closed: bool = False
         self._pos: int = 0
+        self.__cursor: int = 0
         asyncio.get_event_loop().call_soon(protocol.connection_made, self)
 
         self.__pack_into = struct.Struct("!I").pack_into
+        self.__stamped: bool = len(buffer) >= MAPPED_SIZE
 
     def __del__(self):
         if not self._closed:
@@ -71,14 +104,28 @@ class Publisher(asyncio.WriteTransport):
             return
 
         # Each frame contains a spinlock (4 bytes), payload length (4 bytes)
-        # and payload (up to 120 bytes).
+        # and payload (up to 120 bytes), continued in the following frames
+        # for longer payloads.
         pos = self._pos
+        size: int = (FRAME_HEADER_SIZE + len(data) + FRAME_SIZE - 1) & -FRAME_SIZE
+        wrap: int = -1
+        if pos + size > BUFFER_SIZE:
+            wrap = pos
+            pos = 0
+            self.__cursor += BUFFER_SIZE - wrap
+        self._pos = (pos + size) & (BUFFER_SIZE - 1)
+        self._buffer[self._pos] = FRAME_EMPTY
+        self.__cursor += size
+        if self.__stamped:
+            CURSOR.pack_into(self._buffer, CURSOR_OFFSET, self.__cursor)
         self.__pack_into(self._buffer, pos + 4, len(data))
         start: int = pos + FRAME_HEADER_SIZE
         self._buffer[start:start + len(data)] = bytes(data)
-        self._pos = (pos + FRAME_SIZE) & (BUFFER_SIZE - 1)
-        self._buffer[self._pos] = 0
-        self._buffer[pos] = 1
+        if self.__stamped:
+            TIMESTAMP.pack_into(self._buffer, BUFFER_SIZE + pos // FRAME_SIZE * TIMESTAMP.size, clock_ns())
+        self._buffer[pos] = FRAME_READY
+        if wrap >= 0:
+            self._buffer[wrap] = FRAME_WRAP
 
 
 class MmapPublisher(Publisher):
@@ -107,34 +154,90 @@ class Subscriber(asyncio.DatagramTransport):
     memory blocks. An interval between writes gives subscribers time to read
     the data before it is overwritten and the subscriber polls the shared
     memory in order to pick up changes as soon as possible.
+
+    If the protocol has a frame_received(buffer, start, length, addr)
+    method, it is given each datagram in place in the shared memory rather
+    than a copy passed to datagram_received.
+
+    If a latency recorder is given, the time taken by the protocol to handle
+    each datagram and, if the publisher wrote timestamps, the time from
+    publication to receipt are recorded.
+
+    If the publisher writes a cursor, a subscriber that falls a whole buffer
+    behind, or whose datagram is overwritten while it is being read, skips
+    to the publisher's latest frame and passes a SubscriberOverrunError to
+    the protocol's error_received method rather than reading frames that
+    have been overwritten. The datagram given to frame_received may have
+    been overwritten in that case; copied datagrams are checked before they
+    are passed to datagram_received.
     """
     __slots__ = ("_task", "_closed", "_protocol")
 
     def __init__(self, buffer: Union[mmap.mmap, memoryview], from_addr: Tuple[str, int],
-                 protocol: asyncio.DatagramProtocol):
+                 protocol: asyncio.DatagramProtocol, latency: Optional[LatencyRecorder] = None):
         super().__init__()
         self._closed: bool = False
         self._protocol: asyncio.DatagramProtocol = protocol
 
-        coro: Coroutine = self._subscribe_worker(buffer, from_addr, protocol)
+        coro: Coroutine = self._subscribe_worker(buffer, from_addr, protocol, latency)
         self._task: asyncio.Task = asyncio.ensure_future(coro)
 
     async def _subscribe_worker(self, buffer: Union[mmap.mmap, memoryview],
                                 from_addr: Tuple[str, int],
-                                protocol: asyncio.DatagramProtocol) -> None:
+                                protocol: asyncio.DatagramProtocol,
+                                latency: Optional[LatencyRecorder] = None) -> None:
         mask: int = BUFFER_SIZE - 1
         unpack_from = struct.Struct("!I").unpack_from
+        stamped: bool = len(buffer) >= MAPPED_SIZE
+        cursor_from = CURSOR.unpack_from
+        frame_received = getattr(protocol, "frame_received", None)
+        if frame_received is None:
+            def frame_received(buf, s, n, addr):
+                data = buf[s:s + n]
+                if not stamped or cursor_from(buf, CURSOR_OFFSET)[0] - offset < BUFFER_SIZE:
+                    protocol.datagram_received(data, addr)
         protocol.connection_made(self)
 
         try:
-            pos: int = 0
+            # The offset counts bytes in the same way as the publisher's cursor. A subscriber that joins after the
+            # publisher has filled the buffer starts at the publisher's latest frame.
+            offset: int = 0
+            if stamped:
+                offset, = cursor_from(buffer, CURSOR_OFFSET)
+                if offset < BUFFER_SIZE:
+                    offset = 0
+            pos: int = offset & mask
             while not self._closed:
-                while buffer[pos] == 0:
+                while buffer[pos] == FRAME_EMPTY:
                     await asyncio.sleep(0.0)
+                    if stamped and cursor_from(buffer, CURSOR_OFFSET)[0] - offset >= BUFFER_SIZE:
+                        break
+                if stamped and cursor_from(buffer, CURSOR_OFFSET)[0] - offset >= BUFFER_SIZE:
+                    offset, = cursor_from(buffer, CURSOR_OFFSET)
+                    pos = offset & mask
+                    protocol.error_received(SubscriberOverrunError("subscriber was overrun by the publisher"))
+                    continue
+                if buffer[pos] == FRAME_WRAP:
+                    offset += BUFFER_SIZE - pos
+                    pos = 0
+                    continue
                 length, = unpack_from(buffer, pos + 4)
                 start: int = pos + FRAME_HEADER_SIZE
-                protocol.datagram_received(buffer[start:start + length], from_addr)
-                pos = (pos + FRAME_SIZE) & mask
+                if latency is None:
+                    frame_received(buffer, start, length, from_addr)
+                else:
+                    if stamped:
+                        published, = TIMESTAMP.unpack_from(buffer, BUFFER_SIZE + pos // FRAME_SIZE * TIMESTAMP.size)
+                        latency.last_receive = latency.record("receive", published)
+                    else:
+                        latency.last_receive = clock_ns()
+                    frame_received(buffer, start, length, from_addr)
+                    latency.record("callback", latency.last_receive)
+                if stamped and cursor_from(buffer, CURSOR_OFFSET)[0] - offset >= BUFFER_SIZE:
+                    continue
+                end: int = (start + length + FRAME_SIZE - 1) & -FRAME_SIZE
+                offset += end - pos
+                pos = end & mask
         except asyncio.CancelledError:
             self._protocol.connection_lost(None)
         except Exception as e:
@@ -169,8 +272,8 @@ class MmapSubscriber(Subscriber):
     __slots__ = ("__fileno", "__mmap")
 
     def __init__(self, fileno: int, buffer: mmap.mmap, from_addr: Tuple[str, int],
-                 protocol: Optional[asyncio.DatagramProtocol] = None):
-        super().__init__(buffer, from_addr, protocol)
+                 protocol: Optional[asyncio.DatagramProtocol] = None, latency: Optional[LatencyRecorder] = None):
+        super().__init__(buffer, from_addr, protocol, latency)
         self.__fileno: Optional[int] = fileno
         self.__mmap: Optional[mmap.mmap] = buffer
         self._task.add_done_callback(lambda _: self.__close_mmap())
@@ -209,8 +312,8 @@ class PublisherFactory:
         """Create a new Publisher instance."""
         if self.__typ == "mmap":
             fileno = os.open(self.__name, os.O_CREAT | os.O_RDWR)
-            os.write(fileno, b"\x00" * BUFFER_SIZE)
-            buffer = mmap.mmap(fileno, BUFFER_SIZE, access=mmap.ACCESS_WRITE)
+            os.write(fileno, b"\x00" * MAPPED_SIZE)
+            buffer = mmap.mmap(fileno, MAPPED_SIZE, access=mmap.ACCESS_WRITE)
             return MmapPublisher(fileno, buffer, protocol)
         raise RuntimeError("PublisherFactory type was not 'mmap'")
 
@@ -233,10 +336,13 @@ class SubscriberFactory:
         """Return the type for this subscriber factory."""
         return self.__typ
 
-    def create(self, protocol: Optional[asyncio.DatagramProtocol] = None) -> Subscriber:
+    def create(self, protocol: Optional[asyncio.DatagramProtocol] = None,
+               latency: Optional[LatencyRecorder] = None) -> Subscriber:
         """Return a new Subscriber instance."""
         if self.__typ == "mmap":
             fileno = os.open(self.__name, os.O_RDONLY)
-            mm = mmap.mmap(fileno, BUFFER_SIZE, access=mmap.ACCESS_READ)
-            return MmapSubscriber(fileno, mm, (self.__name, fileno), protocol)
+            # Files written by older publishers have no timestamps
+            size: int = MAPPED_SIZE if os.fstat(fileno).st_size >= MAPPED_SIZE else BUFFER_SIZE
+            mm = mmap.mmap(fileno, size, access=mmap.ACCESS_READ)
+            return MmapSubscriber(fileno, mm, (self.__name, fileno), protocol, latency)
         raise RuntimeError("SubscriberFactory type was not 'mmap'")
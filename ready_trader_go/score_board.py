@@ -24,6 +24,7 @@ import threading
 from typing import Callable, List, Optional, TextIO
 
 from .account import CompetitorAccount
+from .metrics import Metric, MetricsRegistry
 
 
 class ScoreRecord:
@@ -66,7 +67,7 @@ class ScoreRecord:
 class ScoreBoardWriter:
     """A processor of score records that it writes to a file."""
 
-    def __init__(self, filename: str, loop: asyncio.AbstractEventLoop):
+    def __init__(self, filename: str, loop: asyncio.AbstractEventLoop, metrics: Optional[MetricsRegistry] = None):
         """Initialise a new instance of the MatchEvents class."""
         self.event_loop: asyncio.AbstractEventLoop = loop
         self.filename: str = filename
@@ -75,6 +76,11 @@ class ScoreBoardWriter:
         self.queue: queue.Queue = queue.Queue()
         self.writer_task: Optional[threading.Thread] = None
 
+        if metrics is None:
+            metrics = MetricsRegistry()
+        self.written_count: Metric = metrics.counter("rtg_score_records_written_total", "Score records written")
+        metrics.gauge("rtg_score_record_queue_size", "Score records waiting to be written", function=self.queue.qsize)
+
         self.task_complete: List[Callable] = list()
 
     def __del__(self):
@@ -135,6 +141,7 @@ class ScoreBoardWriter:
         """Fetch score records from a queue and write them to a file"""
         count = 0
         fifo = self.queue
+        written: Metric = self.written_count
 
         try:
             with score_records_file:
@@ -147,6 +154,7 @@ class ScoreBoardWriter:
                 while evt is not None:
                     count += 1
                     csv_writer.writerow(evt)
+                    written.value += 1
                     evt = fifo.get()
         finally:
             if not self.event_loop.is_closed():
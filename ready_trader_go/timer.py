@@ -15,65 +15,126 @@
 #     You should have received a copy of the GNU Affero General Public
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
-import asyncio
 import logging
 import time
 import random
 
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from .histogram import Histogram
+from .metrics import MetricsRegistry
+from .timer_wheel import TimerWheel, TimerWheelHandle
 
 
 class Timer:
-    """A timer."""
+    """A timer.
+
+    Each timer has its own random number generator for tick jitter, so a
+    timer created with a given seed produces the same sequence of tick times
+    on every run. In deterministic mode the timer never skips ticks, each
+    tick is reported at its scheduled simulated time and the current time is
+    the simulated time of the next tick, rather than the wall-clock time.
+
+    Ticks are scheduled on a TimerWheel and times reported by the timer are
+    measured in simulation time from the moment the timer is started.
+
+    The timer also keeps statistics about its own scheduling: how late each
+    tick was (in wall-clock microseconds), how many ticks were skipped
+    because the previous tick overran and how long (in microseconds) each
+    timer_ticked callback took. If a metrics registry is given, the tick
+    counts and lateness are registered with it, labelled with the timer's
+    name.
+    """
 
-    def __init__(self, tick_interval: float, speed: float):
+    def __init__(self, tick_interval: float, wheel: TimerWheel, seed: Optional[int] = None,
+                 deterministic: bool = False, metrics: Optional[MetricsRegistry] = None, name: str = "timer"):
         """Initialise a new instance of the timer class."""
-        self.__event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__deterministic: bool = deterministic
         self.__logger: logging.Logger = logging.getLogger("TIMER")
-        self.__speed: float = speed
+        self.__next_tick_time: float = 0.0
+        self.__random: random.Random = random.Random(seed)
+        self.__started: bool = False
         self.__start_time: float = 0.0
-        self.__tick_timer_handle: Optional[asyncio.TimerHandle] = None
+        self.__stopped: bool = False
+        self.__tick_timer_handle: Optional[TimerWheelHandle] = None
         self.__tick_interval: float = tick_interval
+        self.__wheel: TimerWheel = wheel
+
+        # Scheduling statistics
+        self.callback_durations: Dict[Callable, Histogram] = dict()
+        self.skipped_tick_count: int = 0
+        self.tick_count: int = 0
+        self.tick_lateness: Histogram = Histogram()
+
+        if metrics is not None:
+            labels: Dict[str, str] = {"timer": name}
+            metrics.counter("rtg_timer_ticks_total", "Timer ticks", labels, lambda: self.tick_count)
+            metrics.counter("rtg_timer_skipped_ticks_total", "Timer ticks skipped because the previous tick overran",
+                            labels, lambda: self.skipped_tick_count)
+            metrics.histogram("rtg_timer_lateness_microseconds", "Wall-clock lateness of each timer tick", labels,
+                              self.tick_lateness)
 
         # Signals
         self.timer_started: List[Callable[[Any, float], None]] = list()
         self.timer_stopped: List[Callable[[Any, float], None]] = list()
         self.timer_ticked: List[Callable[[Any, float, int], None]] = list()
 
+    @property
+    def deterministic(self) -> bool:
+        """Return True if this timer runs on simulated, rather than wall-clock, time."""
+        return self.__deterministic
+
     def advance(self) -> float:
         """Advance the timer."""
-        if self.__start_time:
-            now = (time.monotonic() - self.__start_time) * self.__speed
-            return now
+        if self.__started:
+            if self.__deterministic:
+                return self.__next_tick_time
+            return self.__wheel.time() - self.__start_time
         return 0.0
 
     def __on_timer_tick(self, tick_time: float, tick_number: int):
         """Called on each timer tick."""
-        now = (time.monotonic() - self.__start_time) * self.__speed
+        since_start: float = self.__wheel.time() - self.__start_time
+        self.tick_lateness.record(int((since_start - self.__next_tick_time) / self.__wheel.speed * 1e6))
+        self.tick_count += 1
 
-        # There may have been a delay, so work out which tick this really is
-        # We also need to prevent "skipping" ticks backwards due to negative random jitter
-        skipped_ticks: float = max(0, (now - tick_time) // self.__tick_interval)
-        if skipped_ticks:
-            tick_time += self.__tick_interval * skipped_ticks
-            tick_number += int(skipped_ticks)
+        if self.__deterministic:
+            now = self.__next_tick_time
+        else:
+            now = since_start
 
-        for callback in self.timer_ticked:
-            callback(self, now, tick_number)
+            # There may have been a delay, so work out which tick this really is
+            # We also need to prevent "skipping" ticks backwards due to negative random jitter
+            skipped_ticks: float = max(0, (now - tick_time) // self.__tick_interval)
+            if skipped_ticks:
+                tick_time += self.__tick_interval * skipped_ticks
+                tick_number += int(skipped_ticks)
+                self.skipped_tick_count += int(skipped_ticks)
 
         tick_time += self.__tick_interval
 
         # Generate random jitter, which can be +/- 20% of standard tick interval
         limit = self.__tick_interval * 0.2
-        jitter = random.uniform(-limit, +limit) / self.__speed
+        self.__next_tick_time = tick_time + self.__random.uniform(-limit, +limit)
+
+        durations: Dict[Callable, Histogram] = self.callback_durations
+        for callback in self.timer_ticked:
+            started: float = time.perf_counter()
+            callback(self, now, tick_number)
+            elapsed: int = int((time.perf_counter() - started) * 1e6)
+            if callback not in durations:
+                durations[callback] = Histogram()
+            durations[callback].record(elapsed)
 
-        self.__tick_timer_handle = self.__event_loop.call_at(self.__start_time + jitter + tick_time/self.__speed,
-                                                             self.__on_timer_tick, tick_time, tick_number + 1)
+        # One of the callbacks may have shut this timer down
+        if not self.__stopped:
+            self.__tick_timer_handle = self.__wheel.call_at(self.__start_time + self.__next_tick_time,
+                                                            self.__on_timer_tick, tick_time, tick_number + 1)
 
     def start(self) -> None:
         """Start this timer."""
-        self.__event_loop = asyncio.get_running_loop()
-        self.__start_time = time.monotonic()
+        self.__started = True
+        self.__start_time = self.__wheel.time()
         for callback in self.timer_started:
             callback(self, self.__start_time)
         self.__on_timer_tick(0.0, 1)
@@ -81,7 +142,16 @@ class Timer:
     def shutdown(self, now: float, reason: str) -> None:
         """Shut down this timer."""
         self.__logger.info("shutting down the match: time=%.6f reason='%s'", now, reason)
+        self.__stopped = True
         if self.__tick_timer_handle:
             self.__tick_timer_handle.cancel()
         for callback in self.timer_stopped:
             callback(self, now)
+
+    def statistics(self) -> str:
+        """Return a description of this timer's scheduling statistics."""
+        lines = ["ticks=%d skipped_ticks=%d lateness_us={%s}" % (self.tick_count, self.skipped_tick_count,
+                                                                 self.tick_lateness)]
+        for callback, durations in self.callback_durations.items():
+            lines.append("  %s duration_us={%s}" % (getattr(callback, "__qualname__", repr(callback)), durations))
+        return "\n".join(lines)
@@ -0,0 +1,241 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import logging
+import math
+import time
+
+from typing import Any, Callable, Dict, List, Optional
+
+# Each level of the wheel has 2 ** SLOT_BITS slots
+SLOT_BITS: int = 6
+SLOT_COUNT: int = 1 << SLOT_BITS
+SLOT_MASK: int = SLOT_COUNT - 1
+LEVEL_COUNT: int = 4
+
+
+class TimerWheelHandle(object):
+    """A callback scheduled on a TimerWheel."""
+    __slots__ = ("args", "callback", "cancelled", "counts", "deadline", "level", "slot")
+
+    def __init__(self, callback: Callable[..., Any], args: tuple, deadline: int):
+        """Initialise a new instance of the TimerWheelHandle class."""
+        self.args: tuple = args
+        self.callback: Callable[..., Any] = callback
+        self.cancelled: bool = False
+        self.counts: Optional[List[int]] = None
+        self.deadline: int = deadline
+        self.level: int = 0
+        self.slot: Optional[Dict["TimerWheelHandle", None]] = None
+
+    def cancel(self) -> None:
+        """Cancel this callback if it has not already been called."""
+        self.cancelled = True
+        if self.slot is not None:
+            del self.slot[self]
+            self.counts[self.level] -= 1
+            self.slot = None
+
+
+class TimerWheel(object):
+    """A hierarchical timer wheel driven by the simulation clock.
+
+    Simulation time starts at zero when the wheel is created and runs at
+    'speed' times wall-clock time. Deadlines are rounded up to a whole number
+    of ticks, each 'resolution' seconds of simulation time long. Each level
+    of the wheel has SLOT_COUNT slots, and each slot of a level spans all of
+    the slots of the level below it; callbacks move down a level as their
+    deadline approaches. Inserting and cancelling a callback both take
+    constant time.
+
+    The wheel keeps a single event loop handle, armed for the next tick that
+    has something to do. Callbacks scheduled with call_soon, or with a
+    deadline that has already passed, are run together from a single
+    call_soon handle.
+    """
+
+    def __init__(self, event_loop: asyncio.AbstractEventLoop, speed: float, resolution: float = 0.001):
+        """Initialise a new instance of the TimerWheel class."""
+        self.__counts: List[int] = [0] * (LEVEL_COUNT + 1)
+        self.__current: int = 0
+        self.__epoch: float = time.monotonic()
+        self.__event_loop: asyncio.AbstractEventLoop = event_loop
+        self.__logger: logging.Logger = logging.getLogger("TIMER_WHEEL")
+        self.__overflow: Dict[TimerWheelHandle, None] = dict()
+        self.__ready: List[TimerWheelHandle] = list()
+        self.__ready_handle: Optional[asyncio.Handle] = None
+        self.__slots: List[List[Dict[TimerWheelHandle, None]]] = [[dict() for _ in range(SLOT_COUNT)]
+                                                                   for _ in range(LEVEL_COUNT)]
+        self.__wake_handle: Optional[asyncio.TimerHandle] = None
+        self.__wake_tick: int = 0
+
+        self.resolution: float = resolution
+        self.speed: float = speed
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> TimerWheelHandle:
+        """Arrange for the callback to be called at the given simulation time."""
+        handle = TimerWheelHandle(callback, args, math.ceil(when / self.resolution))
+        if handle.deadline <= self.__current:
+            self.__make_ready(handle)
+        else:
+            self.__insert(handle)
+            if self.__wake_handle is None or handle.deadline < self.__wake_tick:
+                self.__arm(handle.deadline)
+        return handle
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> TimerWheelHandle:
+        """Arrange for the callback to be called after the given delay in simulation time."""
+        return self.call_at(self.time() + delay, callback, *args)
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> TimerWheelHandle:
+        """Arrange for the callback to be called as soon as possible."""
+        handle = TimerWheelHandle(callback, args, self.__current)
+        self.__make_ready(handle)
+        return handle
+
+    def time(self) -> float:
+        """Return the current simulation time."""
+        return (time.monotonic() - self.__epoch) * self.speed
+
+    def __arm(self, tick: int) -> None:
+        """Arrange for the wheel to wake up at the given tick."""
+        if self.__wake_handle is not None:
+            self.__wake_handle.cancel()
+        self.__wake_tick = tick
+        self.__wake_handle = self.__event_loop.call_at(self.__epoch + tick * self.resolution / self.speed,
+                                                       self.__on_wake)
+
+    def __advance(self, target: int) -> None:
+        """Run every callback with a deadline up to and including the target tick."""
+        counts = self.__counts
+        slots = self.__slots[0]
+        while self.__current < target:
+            tick: int = self.__current + 1
+            self.__current = tick
+            if tick & SLOT_MASK == 0:
+                self.__cascade(tick)
+
+            slot = slots[tick & SLOT_MASK]
+            if slot:
+                handles = list(slot)
+                slot.clear()
+                counts[0] -= len(handles)
+                for handle in handles:
+                    handle.slot = None
+                # A callback may cancel another that is due at the same tick
+                for handle in handles:
+                    if not handle.cancelled:
+                        self.__run(handle)
+
+            # Jump over the ticks in which there is nothing to do
+            level: int = 0
+            while level < LEVEL_COUNT and counts[level] == 0:
+                level += 1
+            if level:
+                self.__current = min(target, tick | ((1 << (SLOT_BITS * level)) - 1))
+
+    def __cascade(self, tick: int) -> None:
+        """Move callbacks down from the higher levels whose slot starts at the given tick."""
+        level: int = 1
+        while level < LEVEL_COUNT and (tick >> (SLOT_BITS * (level - 1))) & SLOT_MASK == 0:
+            level += 1
+
+        # Work down from the highest level so that callbacks can move more than one level
+        if level == LEVEL_COUNT and tick & ((1 << (SLOT_BITS * LEVEL_COUNT)) - 1) == 0:
+            self.__redistribute(self.__overflow, LEVEL_COUNT)
+        for lvl in range(level - 1, 0, -1):
+            self.__redistribute(self.__slots[lvl][(tick >> (SLOT_BITS * lvl)) & SLOT_MASK], lvl)
+
+    def __insert(self, handle: TimerWheelHandle) -> None:
+        """Insert a handle whose deadline is after the current tick into the wheel."""
+        deadline: int = handle.deadline
+        current: int = self.__current
+        level: int = 0
+        while level < LEVEL_COUNT and (deadline >> (SLOT_BITS * (level + 1))) != (current >> (SLOT_BITS * (level + 1))):
+            level += 1
+        if level == LEVEL_COUNT:
+            slot = self.__overflow
+        else:
+            slot = self.__slots[level][(deadline >> (SLOT_BITS * level)) & SLOT_MASK]
+        slot[handle] = None
+        handle.counts = self.__counts
+        handle.level = level
+        handle.slot = slot
+        self.__counts[level] += 1
+
+    def __make_ready(self, handle: TimerWheelHandle) -> None:
+        """Add a handle to the callbacks to be run as soon as possible."""
+        self.__ready.append(handle)
+        if self.__ready_handle is None:
+            self.__ready_handle = self.__event_loop.call_soon(self.__run_ready)
+
+    def __next_tick(self) -> Optional[int]:
+        """Return the next tick at which the wheel has something to do, or None."""
+        current: int = self.__current
+        slots = self.__slots[0]
+        if self.__counts[0]:
+            for tick in range(current + 1, (current | SLOT_MASK) + 1):
+                if slots[tick & SLOT_MASK]:
+                    return tick
+
+        for level in range(1, LEVEL_COUNT):
+            if self.__counts[level]:
+                for index in range(((current >> (SLOT_BITS * level)) & SLOT_MASK) + 1, SLOT_COUNT):
+                    slot = self.__slots[level][index]
+                    if slot:
+                        return min(handle.deadline for handle in slot)
+
+        if self.__counts[LEVEL_COUNT]:
+            return min(handle.deadline for handle in self.__overflow)
+
+        return None
+
+    def __on_wake(self) -> None:
+        """Called by the event loop when the next tick with something to do is due."""
+        self.__wake_handle = None
+        # The event loop may call this a little early, so always reach the tick the wheel was armed for
+        self.__advance(max(self.__wake_tick, int(self.time() / self.resolution)))
+        # Callbacks may already have armed the wheel for a later tick
+        tick: Optional[int] = self.__next_tick()
+        if tick is not None and (self.__wake_handle is None or tick < self.__wake_tick):
+            self.__arm(tick)
+
+    def __redistribute(self, slot: Dict[TimerWheelHandle, None], level: int) -> None:
+        """Reinsert the handles in a slot relative to the current tick."""
+        if slot:
+            handles = list(slot)
+            slot.clear()
+            self.__counts[level] -= len(handles)
+            for handle in handles:
+                self.__insert(handle)
+
+    def __run(self, handle: TimerWheelHandle) -> None:
+        """Run the callback for a handle."""
+        try:
+            handle.callback(*handle.args)
+        except Exception:
+            self.__logger.exception("exception in timer wheel callback %r", handle.callback)
+
+    def __run_ready(self) -> None:
+        """Run the callbacks that are ready to run."""
+        self.__ready_handle = None
+        ready = self.__ready
+        self.__ready = list()
+        for handle in ready:
+            if not handle.cancelled:
+                self.__run(handle)
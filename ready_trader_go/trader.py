@@ -63,6 +63,9 @@ def __config_validator(config):
 
     __validate_hostname(config, "Execution", "Host")
 
+    if "RecordLatency" in config and type(config["RecordLatency"]) is not bool:
+        raise Exception("RecordLatency has inappropriate type")
+
     if type(config["TeamName"]) is not str:
         raise Exception("TeamName has inappropriate type")
     if len(config["TeamName"]) < 1 or len(config["TeamName"]) > 50:
@@ -91,7 +94,7 @@ async def __start_autotrader(auto_trader: BaseAutoTrader, config: Dict[str, Any]
 
     info = config["Information"]
     sub_factory = SubscriberFactory(info["Type"], info["Name"])
-    sub_factory.create(auto_trader)
+    sub_factory.create(auto_trader, auto_trader.latency)
 
 
 def main(name: str = "autotrader") -> None:
@@ -104,3 +107,6 @@ def main(name: str = "autotrader") -> None:
 
     app.event_loop.create_task(__start_autotrader(auto_trader, app.config, app.event_loop))
     app.run()
+
+    if auto_trader.latency is not None:
+        logging.getLogger("TRADER").info("latency statistics:\n%s", auto_trader.latency.statistics())
@@ -0,0 +1,338 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .order_book import TOP_LEVEL_COUNT
+from .types import Instrument, Lifespan, Side
+
+
+# Indices of the first level of each part of LocalBook.levels and LocalBook.trades, which are laid out like the
+# body of an order book message: instrument, sequence number, ask prices, ask volumes, bid prices and bid volumes
+SEQUENCE_NUMBER: int = 1
+ASK_PRICES: int = 2
+ASK_VOLUMES: int = ASK_PRICES + TOP_LEVEL_COUNT
+BID_PRICES: int = ASK_VOLUMES + TOP_LEVEL_COUNT
+BID_VOLUMES: int = BID_PRICES + TOP_LEVEL_COUNT
+
+
+class LocalBook:
+    """The best price levels of an instrument's order book and the most
+    recent trade ticks.
+
+    The levels and trades lists are overwritten in place by each message, so
+    reading them, e.g. book.levels[BID_PRICES + 1] for the second best bid
+    price, makes no new objects. The ask_prices, ask_volumes, etc.
+    properties return copies.
+    """
+
+    def __init__(self, instrument: int):
+        """Initialise a new instance of the LocalBook class."""
+        self.instrument: int = instrument
+        self.levels: List[int] = [0] * (BID_VOLUMES + TOP_LEVEL_COUNT)
+        self.trades: List[int] = [0] * (BID_VOLUMES + TOP_LEVEL_COUNT)
+        self.levels[0] = self.trades[0] = instrument
+
+    @property
+    def sequence_number(self) -> int:
+        """Return the sequence number of the last order book update applied."""
+        return self.levels[SEQUENCE_NUMBER]
+
+    @property
+    def trade_sequence_number(self) -> int:
+        """Return the sequence number of the last trade ticks message applied."""
+        return self.trades[SEQUENCE_NUMBER]
+
+    @property
+    def ask_prices(self) -> List[int]:
+        """Return the best ask prices."""
+        return self.levels[ASK_PRICES:ASK_VOLUMES]
+
+    @property
+    def ask_volumes(self) -> List[int]:
+        """Return the volumes at the best ask prices."""
+        return self.levels[ASK_VOLUMES:BID_PRICES]
+
+    @property
+    def bid_prices(self) -> List[int]:
+        """Return the best bid prices."""
+        return self.levels[BID_PRICES:BID_VOLUMES]
+
+    @property
+    def bid_volumes(self) -> List[int]:
+        """Return the volumes at the best bid prices."""
+        return self.levels[BID_VOLUMES:]
+
+    @property
+    def traded_ask_prices(self) -> List[int]:
+        """Return the ask prices traded in the last trade ticks message."""
+        return self.trades[ASK_PRICES:ASK_VOLUMES]
+
+    @property
+    def traded_ask_volumes(self) -> List[int]:
+        """Return the volumes traded at the ask prices in the last trade ticks message."""
+        return self.trades[ASK_VOLUMES:BID_PRICES]
+
+    @property
+    def traded_bid_prices(self) -> List[int]:
+        """Return the bid prices traded in the last trade ticks message."""
+        return self.trades[BID_PRICES:BID_VOLUMES]
+
+    @property
+    def traded_bid_volumes(self) -> List[int]:
+        """Return the volumes traded at the bid prices in the last trade ticks message."""
+        return self.trades[BID_VOLUMES:]
+
+    @property
+    def best_ask(self) -> Optional[int]:
+        """Return the best ask price or None if there are no asks."""
+        return self.levels[ASK_PRICES] or None
+
+    @property
+    def best_bid(self) -> Optional[int]:
+        """Return the best bid price or None if there are no bids."""
+        return self.levels[BID_PRICES] or None
+
+    @property
+    def midpoint(self) -> Optional[int]:
+        """Return the midpoint of the best ask and bid prices or None if either side is empty."""
+        ask: int = self.levels[ASK_PRICES]
+        bid: int = self.levels[BID_PRICES]
+        return (ask + bid) // 2 if ask and bid else None
+
+    def update(self, sequence_number: int, ask_prices: Iterable[int], ask_volumes: Iterable[int],
+               bid_prices: Iterable[int], bid_volumes: Iterable[int]) -> bool:
+        """Copy the levels from an order book update into this book.
+
+        Return False, leaving the book unchanged, if the update is older than
+        the last one applied.
+        """
+        return self.__copy(self.levels, sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
+
+    def update_from(self, values: Sequence[int]) -> bool:
+        """Copy the decoded body of an order book update into this book.
+
+        Return False, leaving the book unchanged, if the update is older than
+        the last one applied.
+        """
+        if values[SEQUENCE_NUMBER] <= self.levels[SEQUENCE_NUMBER]:
+            return False
+        self.levels[:] = values
+        return True
+
+    def update_trades(self, sequence_number: int, ask_prices: Iterable[int], ask_volumes: Iterable[int],
+                      bid_prices: Iterable[int], bid_volumes: Iterable[int]) -> bool:
+        """Copy the levels from a trade ticks message into this book.
+
+        Return False, leaving the book unchanged, if the message is older
+        than the last one applied.
+        """
+        return self.__copy(self.trades, sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
+
+    def update_trades_from(self, values: Sequence[int]) -> bool:
+        """Copy the decoded body of a trade ticks message into this book.
+
+        Return False, leaving the book unchanged, if the message is older
+        than the last one applied.
+        """
+        if values[SEQUENCE_NUMBER] <= self.trades[SEQUENCE_NUMBER]:
+            return False
+        self.trades[:] = values
+        return True
+
+    @staticmethod
+    def __copy(target: List[int], sequence_number: int, ask_prices: Iterable[int], ask_volumes: Iterable[int],
+               bid_prices: Iterable[int], bid_volumes: Iterable[int]) -> bool:
+        """Copy separate lists of levels into the given levels or trades list."""
+        if sequence_number <= target[SEQUENCE_NUMBER]:
+            return False
+        target[SEQUENCE_NUMBER] = sequence_number
+        target[ASK_PRICES:ASK_VOLUMES] = ask_prices
+        target[ASK_VOLUMES:BID_PRICES] = ask_volumes
+        target[BID_PRICES:BID_VOLUMES] = bid_prices
+        target[BID_VOLUMES:] = bid_volumes
+        return True
+
+
+class TrackedOrder:
+    """An order or hedge order sent by an autotrader."""
+
+    __slots__ = ("client_order_id", "instrument", "side", "price", "volume", "lifespan", "is_hedge", "acknowledged",
+                 "fill_volume", "remaining_volume", "fees", "order_id")
+
+    def __init__(self, client_order_id: int, instrument: int, side: Side, price: int, volume: int,
+                 lifespan: Optional[Lifespan], is_hedge: bool = False):
+        """Initialise a new instance of the TrackedOrder class."""
+        self.client_order_id: int = client_order_id
+        self.instrument: int = instrument
+        self.side: Side = side
+        self.price: int = price
+        self.volume: int = volume
+        self.lifespan: Optional[Lifespan] = lifespan
+        self.is_hedge: bool = is_hedge
+        self.acknowledged: bool = False
+        self.fill_volume: int = 0
+        self.remaining_volume: int = volume
+        self.fees: int = 0
+        self.order_id: int = 0
+
+
+class TraderState:
+    """An autotrader's view of the market and of its own orders and account.
+
+    Books and positions are held in lists indexed by instrument id, which
+    grow if an instrument beyond the first ETF/future pair is seen. Orders
+    are held in a dictionary keyed by client order id from the time they
+    are sent until they are filled, cancelled or rejected. Cash and fees
+    are in cents, like prices, and are accumulated in the same way as the
+    exchange's account for the autotrader, except that the profit or loss
+    is valued at the midpoint of each book without clamping the ETF price.
+    """
+
+    def __init__(self, instrument_count: int = 2):
+        """Initialise a new instance of the TraderState class."""
+        self.books: List[LocalBook] = [LocalBook(i) for i in range(instrument_count)]
+        self.buy_volume: int = 0
+        self.cash: int = 0
+        self.orders: Dict[int, TrackedOrder] = dict()
+        self.positions: List[int] = [0] * instrument_count
+        self.sell_volume: int = 0
+        self.total_fees: int = 0
+
+    @property
+    def etf_position(self) -> int:
+        """Return the position in the ETF of the first pair."""
+        return self.positions[Instrument.ETF]
+
+    @property
+    def future_position(self) -> int:
+        """Return the position in the future of the first pair."""
+        return self.positions[Instrument.FUTURE]
+
+    def book(self, instrument: int) -> LocalBook:
+        """Return the book for the given instrument."""
+        if instrument >= len(self.books):
+            self.__grow(instrument)
+        return self.books[instrument]
+
+    def active_volume(self, instrument: int, side: Side) -> int:
+        """Return the remaining volume of the live orders on one side of an instrument."""
+        return sum(o.remaining_volume for o in self.orders.values()
+                   if o.instrument == instrument and o.side == side and not o.is_hedge)
+
+    def profit_or_loss(self) -> int:
+        """Return the cash balance plus the positions valued at the midpoint of each book.
+
+        Instruments whose book has an empty side are valued at zero.
+        """
+        profit_or_loss: int = self.cash
+        for book, position in zip(self.books, self.positions):
+            if position:
+                profit_or_loss += position * (book.midpoint or 0)
+        return profit_or_loss
+
+    def on_error(self, client_order_id: int) -> Optional[TrackedOrder]:
+        """Forget an order that the exchange rejected.
+
+        Errors for orders that the exchange has already accepted, such as a
+        rejected amend, leave the order in place. Return the removed order.
+        """
+        order: Optional[TrackedOrder] = self.orders.get(client_order_id)
+        if order is not None and not order.acknowledged:
+            del self.orders[client_order_id]
+            return order
+        return None
+
+    def on_hedge(self, client_order_id: int, instrument: int, side: Side, price: int, volume: int) -> None:
+        """Record a hedge order that is being sent."""
+        self.orders[client_order_id] = TrackedOrder(client_order_id, instrument, side, price, volume, None, True)
+
+    def on_hedge_filled(self, client_order_id: int, price: int, volume: int) -> None:
+        """Apply a hedge filled message.
+
+        Hedge orders are filled immediately or not at all, so the hedge order
+        is finished and will be forgotten when remove_finished is called.
+        """
+        order: Optional[TrackedOrder] = self.orders.get(client_order_id)
+        if order is not None:
+            order.acknowledged = True
+            order.fill_volume = volume
+            order.remaining_volume = 0
+            if volume:
+                self.__transact(order.instrument, order.side, price, volume)
+
+    def on_insert(self, client_order_id: int, instrument: int, side: Side, price: int, volume: int,
+                  lifespan: Lifespan) -> None:
+        """Record an order that is being inserted."""
+        self.orders[client_order_id] = TrackedOrder(client_order_id, instrument, side, price, volume, lifespan)
+
+    def on_order_filled(self, client_order_id: int, price: int, volume: int) -> None:
+        """Apply an order filled message."""
+        order: Optional[TrackedOrder] = self.orders.get(client_order_id)
+        if order is not None:
+            self.__transact(order.instrument, order.side, price, volume)
+
+    def on_order_id(self, client_order_id: int, order_id: int) -> None:
+        """Record the id given to an order by the exchange's order events feed."""
+        order: Optional[TrackedOrder] = self.orders.get(client_order_id)
+        if order is not None:
+            order.order_id = order_id
+
+    def on_order_status(self, client_order_id: int, fill_volume: int, remaining_volume: int, fees: int) -> None:
+        """Apply an order status message.
+
+        The order stays in the order table, with no remaining volume, until
+        remove_finished is called.
+        """
+        order: Optional[TrackedOrder] = self.orders.get(client_order_id)
+        if order is not None:
+            order.acknowledged = True
+            order.fill_volume = fill_volume
+            order.remaining_volume = remaining_volume
+            self.cash -= fees - order.fees
+            self.total_fees += fees - order.fees
+            order.fees = fees
+
+    def remove_finished(self, client_order_id: int) -> None:
+        """Forget an order if it has no remaining volume."""
+        order: Optional[TrackedOrder] = self.orders.get(client_order_id)
+        if order is not None and order.acknowledged and order.remaining_volume == 0:
+            del self.orders[client_order_id]
+
+    def __grow(self, instrument: int) -> None:
+        """Extend the books and positions to cover the given instrument."""
+        for i in range(len(self.books), instrument + 1):
+            self.books.append(LocalBook(i))
+            self.positions.append(0)
+
+    def __transact(self, instrument: int, side: Side, price: int, volume: int) -> None:
+        """Update the cash balance and positions with a trade."""
+        if instrument >= len(self.positions):
+            self.__grow(instrument)
+        if side == Side.SELL:
+            self.cash += price * volume
+            self.positions[instrument] -= volume
+        else:
+            self.cash -= price * volume
+            self.positions[instrument] += volume
+
+        # Buy and sell volumes only count ETF trades, as they do in the exchange's account
+        if instrument & 1:
+            if side == Side.SELL:
+                self.sell_volume += volume
+            else:
+                self.buy_volume += volume
@@ -18,11 +18,36 @@
 import enum
 
 
+# Instruments are traded in ETF/future pairs. The instrument ids of pair n
+# are 2n for the future and 2n + 1 for the ETF, so that pair zero is made up
+# of the two members of the Instrument enumeration.
 class Instrument(enum.IntEnum):
     FUTURE = 0
     ETF = 1
 
 
+def etf_instrument(pair: int) -> int:
+    """Return the instrument id of the ETF in the given ETF/future pair."""
+    return 2 * pair + 1
+
+
+def future_instrument(pair: int) -> int:
+    """Return the instrument id of the future in the given ETF/future pair."""
+    return 2 * pair
+
+
+def instrument_pair(instrument: int) -> int:
+    """Return the ETF/future pair to which the given instrument id belongs."""
+    return instrument >> 1
+
+
+class OrderEvent(enum.IntEnum):
+    ADD = 0  # An order was placed in an order book
+    MODIFY = 1  # The volume of an order was reduced without losing its place in the queue
+    DELETE = 2  # An order was removed from an order book before it was filled
+    EXECUTE = 3  # Some or all of the volume of an order traded
+
+
 class Side(enum.IntEnum):
     SELL = 0
     BUY = 1
@@ -88,6 +113,9 @@ class IExecutionConnection:
         """Send an order filled message to the auto-trader."""
         raise NotImplementedError()
 
+    def send_order_id(self, client_order_id: int, order_id: int) -> None:
+        """Send the order events order id of a newly placed order to the auto-trader."""
+
     def send_order_status(self, client_order_id: int, fill_volume: int, remaining_volume: int, fees: int) -> None:
         """Send an order status message to the auto-trader."""
         raise NotImplementedError()
@@ -1,55 +1,92 @@
-import asyncio
+import heapq
+import itertools
 
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from .timer import Timer
 
 MAX_UNHEDGED_LOTS: int = 10
-UNHEDGED_LOTS_TIME_LIMIT: int = 60
+UNHEDGED_LOTS_TIME_LIMIT: float = 60.0
 
 
 class UnhedgedLots:
     """Keep track of unhedged lots and call a callback if unhedged lots are held for too long."""
 
-    def __init__(self, callback: Callable[[], Any]):
+    def __init__(self, callback: Callable[[float], Any], factory: "UnhedgedLotsFactory"):
         """Initialise a new instance of the UnhedgedLots class."""
-        self.callback: Callable[[], None] = callback
+        self.callback: Callable[[float], Any] = callback
+        self.deadline: Optional[float] = None
+        self.factory: UnhedgedLotsFactory = factory
         self.relative_position: int = 0
-        self.timer_handle: Optional[asyncio.TimerHandle] = None
 
     @property
     def unhedged_lot_count(self) -> int:
         """Return the number of unhedged lots."""
-        if self.relative_position > MAX_UNHEDGED_LOTS:
-            return self.relative_position - MAX_UNHEDGED_LOTS
-        elif self.relative_position < -MAX_UNHEDGED_LOTS:
-            return self.relative_position + MAX_UNHEDGED_LOTS
+        lots_limit: int = self.factory.lots_limit
+        if self.relative_position > lots_limit:
+            return self.relative_position - lots_limit
+        elif self.relative_position < -lots_limit:
+            return self.relative_position + lots_limit
         return 0
 
-    def apply_position_delta(self, delta: int) -> None:
-        """Apply the given position delta to this unhedged lots instance."""
+    def apply_position_delta(self, now: float, delta: int) -> None:
+        """Apply the given position delta to this unhedged lots instance.
+
+        The time given is the simulation time at which the position changed.
+        """
+        lots_limit: int = self.factory.lots_limit
         new_relative_position: int = self.relative_position + delta
 
         if delta > 0:
-            if self.relative_position < -MAX_UNHEDGED_LOTS <= new_relative_position:
-                self.timer_handle.cancel()
+            if self.relative_position < -lots_limit <= new_relative_position:
+                self.deadline = None
 
-            if new_relative_position > MAX_UNHEDGED_LOTS >= self.relative_position:
-                self.timer_handle = asyncio.get_running_loop().call_later(UNHEDGED_LOTS_TIME_LIMIT, self.callback)
+            if new_relative_position > lots_limit >= self.relative_position:
+                self.factory.schedule(self, now)
         elif delta < 0:
-            if self.relative_position > MAX_UNHEDGED_LOTS >= new_relative_position:
-                self.timer_handle.cancel()
+            if self.relative_position > lots_limit >= new_relative_position:
+                self.deadline = None
 
-            if new_relative_position < -MAX_UNHEDGED_LOTS <= self.relative_position:
-                self.timer_handle = asyncio.get_running_loop().call_later(UNHEDGED_LOTS_TIME_LIMIT, self.callback)
+            if new_relative_position < -lots_limit <= self.relative_position:
+                self.factory.schedule(self, now)
 
         self.relative_position = new_relative_position
 
 
 class UnhedgedLotsFactory:
-    """A factory class for UnhedgedLots instances."""
+    """A factory class for UnhedgedLots instances.
 
-    def __init__(self):
+    The factory keeps the deadlines of all the UnhedgedLots instances it
+    creates in a single heap, ordered by simulation time, which is checked
+    on each tick of the given timer. A deadline that is cancelled is left in
+    the heap and ignored when it reaches the top.
+    """
+
+    def __init__(self, timer: Timer, lots_limit: int = MAX_UNHEDGED_LOTS,
+                 time_limit: float = UNHEDGED_LOTS_TIME_LIMIT):
         """Initialise a new instance of the UnhedgedLotsFactory class."""
+        self.__deadlines: List[Tuple[float, int, UnhedgedLots]] = list()
+        self.__sequence: Iterator[int] = itertools.count()
+
+        self.lots_limit: int = lots_limit
+        self.time_limit: float = time_limit
 
-    def create(self, callback: Callable[[], Any]) -> UnhedgedLots:
+        timer.timer_ticked.append(self.on_timer_tick)
+
+    def create(self, callback: Callable[[float], Any]) -> UnhedgedLots:
         """Return a new instance of the UnhedgedLots class."""
-        return UnhedgedLots(callback)
+        return UnhedgedLots(callback, self)
+
+    def on_timer_tick(self, timer: Timer, now: float, tick_number: int) -> None:
+        """Called on each timer tick to call the callbacks of expired unhedged lots."""
+        deadlines = self.__deadlines
+        while deadlines and deadlines[0][0] <= now:
+            deadline, _, unhedged_lots = heapq.heappop(deadlines)
+            if unhedged_lots.deadline == deadline:
+                unhedged_lots.deadline = None
+                unhedged_lots.callback(now)
+
+    def schedule(self, unhedged_lots: UnhedgedLots, now: float) -> None:
+        """Set the deadline of an UnhedgedLots instance that now holds too many unhedged lots."""
+        unhedged_lots.deadline = now + self.time_limit
+        heapq.heappush(self.__deadlines, (unhedged_lots.deadline, next(self.__sequence), unhedged_lots))
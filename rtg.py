@@ -16,25 +16,33 @@
 #     License along with Ready Trader Go.  If not, see
 #     <https://www.gnu.org/licenses/>.
 import argparse
+import importlib.util
 import multiprocessing
+import multiprocessing.pool
 import pathlib
 import subprocess
 import sys
-import time
 import traceback
 import os
 import shutil
-import pandas as pd
 import json
 
 import ready_trader_go.exchange
 import ready_trader_go.trader
-from ready_trader_go.modified_event_source import ModifiedRecordedEventSource
+from ready_trader_go.profiling import PROFILERS
 
-try:
-    from ready_trader_go.hud.__main__ import main as hud_main, replay as hud_replay
-except ImportError:
-    hud_main = hud_replay = None
+
+def load_heads_up_display():
+    """Return the heads-up display's main and replay functions, or None if PySide6 is not installed.
+
+    The heads-up display is only imported when it is needed, because importing
+    PySide6 is slow and processes forked after it is imported inherit it.
+    """
+    try:
+        from ready_trader_go.hud.__main__ import main, replay
+    except ImportError:
+        return None
+    return main, replay
 
 
 def no_heads_up_display() -> None:
@@ -45,7 +53,8 @@ def no_heads_up_display() -> None:
 
 def replay(args) -> None:
     """Replay a match from a file."""
-    if hud_replay is None:
+    hud = load_heads_up_display()
+    if hud is None:
         no_heads_up_display()
         return
 
@@ -54,9 +63,18 @@ def replay(args) -> None:
         print("'%s' is not a regular file" % str(path), file=sys.stderr)
         return
 
+    _, hud_replay = hud
     hud_replay(path)
 
 
+def wait_for_exchange(exchange: multiprocessing.pool.AsyncResult, ready) -> bool:
+    """Wait until the exchange simulator is accepting connections and return True, or return False if it stopped."""
+    while not ready.wait(0.01):
+        if exchange.ready():
+            return False
+    return True
+
+
 def on_error(name: str, error: Exception) -> None:
     print("%s threw an exception: %s" % (name, error), file=sys.stderr)
     traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
@@ -98,13 +116,19 @@ def run(args) -> None:
             print("'%s': configuration file is missing: %s" % (auto_trader, auto_trader.with_suffix(".json")))
             return
 
-    with multiprocessing.Pool(len(args.autotrader) + 2, maxtasksperchild=1) as pool:
-        exchange = pool.apply_async(ready_trader_go.exchange.main,
+    # If the heads-up display can be shown, the market waits for it to connect
+    wait_for_heads_up_display: bool = importlib.util.find_spec("PySide6") is not None
+
+    with multiprocessing.Manager() as manager, multiprocessing.Pool(len(args.autotrader) + 2,
+                                                                    maxtasksperchild=1) as pool:
+        ready = manager.Event()
+        exchange = pool.apply_async(ready_trader_go.exchange.main, (args.profile, ready, wait_for_heads_up_display),
                                     error_callback=lambda e: on_error("The exchange simulator", e))
 
-        # Give the exchange simulator a chance to start up.
-        time.sleep(0.5)
-        
+        if not wait_for_exchange(exchange, ready):
+            erase_trader_files_from_home(args)
+            return
+
         for path_ in args.autotrader:
             path = path_.with_suffix(".py")
 
@@ -116,10 +140,12 @@ def run(args) -> None:
                 pool.apply_async(subprocess.run, ([resolved],), {"check": True, "cwd": resolved.parent},
                                  error_callback=lambda e: on_error("Auto-trader '%s'" % path, e))
 
-        if hud_main is None:
+        hud = load_heads_up_display()
+        if hud is None:
             no_heads_up_display()
             exchange.get()
         else:
+            hud_main, _ = hud
             hud_main(args.host, args.port)
 
     erase_trader_files_from_home(args)
@@ -143,13 +169,16 @@ def test(args) -> None:
             print("'%s': configuration file is missing: %s" % (auto_trader, auto_trader.with_suffix(".json")))
             return
 
-    with multiprocessing.Pool(len(args.autotrader) + 2, maxtasksperchild=1) as pool:
-        exchange = pool.apply_async(ready_trader_go.exchange.main,
+    with multiprocessing.Manager() as manager, multiprocessing.Pool(len(args.autotrader) + 2,
+                                                                    maxtasksperchild=1) as pool:
+        ready = manager.Event()
+        exchange = pool.apply_async(ready_trader_go.exchange.main, (args.profile, ready),
                                     error_callback=lambda e: on_error("The exchange simulator", e))
 
-        # Give the exchange simulator a chance to start up.
-        time.sleep(0.5)
-        
+        if not wait_for_exchange(exchange, ready):
+            erase_trader_files_from_home(args)
+            return
+
         for path_ in args.autotrader:
             path = path_.with_suffix(".py")
 
@@ -202,11 +231,49 @@ def test(args) -> None:
     erase_trader_files_from_home(args)
 
 def debug_competitor(args) -> None:
-    tick_size = 1.00
-    etf_clamp = 0.002
-    # do nothing
-    with args.filename.open("r", newline="") as csv_file:
-        ModifiedRecordedEventSource.from_csv(csv_file, etf_clamp, tick_size)
+    """Print the analytics of each team in a match, or the trades of a single team."""
+    from ready_trader_go.match_analytics import MatchLog
+    from ready_trader_go.types import Instrument, Side
+
+    path: pathlib.Path = args.filename
+    if not path.is_file():
+        print("'%s' is not a regular file" % str(path), file=sys.stderr)
+        return
+
+    match_log = MatchLog.from_file(str(path), args.etf_clamp, args.tick_size)
+
+    if args.team is None:
+        print("%-24s %12s %6s %6s %6s %6s %6s %10s %10s %8s %12s" % ("Team", "ProfitOrLoss", "Etf", "Future",
+                                                                  "Fills", "Maker", "Taker", "Fees", "Edge",
+                                                                  "Queue", "MaxDrawdown"))
+        for team in match_log.teams:
+            analytics = match_log.team(team)
+            print("%-24s %12.2f %6d %6d %6d %6d %6d %10.2f %10.2f %8.3f %12.2f"
+                  % (team, analytics.profit_or_loss[-1] / 100.0, analytics.etf_position[-1],
+                     analytics.future_position[-1], analytics.fill_count, analytics.maker_volume,
+                     analytics.taker_volume, analytics.total_fees[-1] / 100.0, analytics.spread_capture / 100.0,
+                     analytics.median_queue_time, analytics.max_drawdown / 100.0))
+        return
+
+    try:
+        analytics = match_log.team(args.team)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return
+
+    fills = analytics.fills
+    print("%10s %8s %-10s %4s %6s %10s %8s %8s %8s %8s" % ("Time", "OrderId", "Instrument", "Side", "Volume",
+                                                        "Price", "Position", "Edge", "Queue", "Fee"))
+    for i in range(analytics.fill_count):
+        print("%10.3f %8d %-10s %4s %6d %10.2f %8d %8.2f %8.3f %8.2f"
+              % (fills.time[i], fills.order_id[i], Instrument(fills.instrument[i]).name, Side(fills.side[i]).name,
+                 fills.volume[i], fills.price[i] / 100.0, fills.position[i], fills.edge[i] / 100.0,
+                 fills.queue_time[i], fills.fee[i] / 100.0))
+    print()
+    print("Profit or loss %.2f, maximum drawdown %.2f, fees %.2f, hedged volume %d"
+          % (analytics.profit_or_loss[-1] / 100.0, analytics.max_drawdown / 100.0,
+             analytics.total_fees[-1] / 100.0, analytics.hedged_volume))
+
 
 def main() -> None:
     """Process command line arguments and execute the given command."""
@@ -222,6 +289,8 @@ def main() -> None:
                             help="host name of the exchange simulator (default '127.0.0.1')")
     run_parser.add_argument("--port", default=12347,
                             help="port number of the exchange simulator (default 12347)")
+    run_parser.add_argument("--profile", choices=PROFILERS,
+                            help="profile the exchange simulator for the duration of the match")
     run_parser.add_argument("autotrader", nargs="*", type=pathlib.Path,
                             help="auto-traders to include in the match")
     run_parser.set_defaults(func=run)
@@ -234,6 +303,8 @@ def main() -> None:
                             help="host name of the exchange simulator (default '127.0.0.1')")
     test_parser.add_argument("--port", default=12347,
                             help="port number of the exchange simulator (default 12347)")
+    test_parser.add_argument("--profile", choices=PROFILERS,
+                            help="profile the exchange simulator for the duration of the match")
     test_parser.add_argument("autotrader", nargs="*", type=pathlib.Path,
                             help="auto-traders to include in the match, the first one should be the folder of the strategy being tested")
     test_parser.set_defaults(func=test)
@@ -247,10 +318,18 @@ def main() -> None:
                                type=pathlib.Path)
     replay_parser.set_defaults(func=replay)
 
-    debug_parser = subparsers.add_parser("debug")
-
-    debug_parser.add_argument("filename", nargs="?", default=pathlib.Path("match_events.csv"), help="csv file of the match", type=pathlib.Path)
-
+    debug_parser = subparsers.add_parser("debug",
+                                         description="Print the trading statistics of each team in a match.",
+                                         help="print the trading statistics of each team in a match")
+    debug_parser.add_argument("--team",
+                              help="print every trade made by the given team instead")
+    debug_parser.add_argument("--etf-clamp", default=0.002, type=float,
+                              help="ETF clamp used to value each account (default 0.002)")
+    debug_parser.add_argument("--tick-size", default=1.00, type=float,
+                              help="tick size of the instruments (default 1.00)")
+    debug_parser.add_argument("filename", nargs="?", default=pathlib.Path("match_events.csv"),
+                              help="name of the match events file (default 'match_events.csv')",
+                              type=pathlib.Path)
     debug_parser.set_defaults(func=debug_competitor)
 
     args = parser.parse_args()
@@ -0,0 +1,123 @@
+# Copyright 2021 Optiver Asia Pacific Pty. Ltd.
+#
+# This file is part of Ready Trader Go.
+#
+#     Ready Trader Go is free software: you can redistribute it and/or
+#     modify it under the terms of the GNU Affero General Public License
+#     as published by the Free Software Foundation, either version 3 of
+#     the License, or (at your option) any later version.
+#
+#     Ready Trader Go is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU Affero General Public License for more details.
+#
+#     You should have received a copy of the GNU Affero General Public
+#     License along with Ready Trader Go.  If not, see
+#     <https://www.gnu.org/licenses/>.
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+
+from typing import Dict, List, Tuple
+
+from ready_trader_go.base_auto_trader import BaseAutoTrader
+from ready_trader_go.information import OrderEventPublisher
+from ready_trader_go.order_book import Order, OrderBook
+from ready_trader_go.pubsub import PublisherFactory, SubscriberFactory
+from ready_trader_go.timer_wheel import TimerWheel
+from ready_trader_go.types import Instrument, Lifespan, Side
+
+ORDERS_PER_BOOK = 300
+SNAPSHOT_INTERVAL = 4
+
+
+class FakeTimer:
+    """Stands in for a Timer whose ticks are driven by the test."""
+
+    def __init__(self):
+        self.timer_ticked = list()
+
+
+class Reader(BaseAutoTrader):
+    """An autotrader that only counts lost information messages."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__(loop, {"TeamName": "reader", "Secret": "secret", "Parameters": {}})
+        self.errors: int = 0
+
+    def error_received(self, exc: Exception) -> None:
+        super().error_received(exc)
+        self.errors += 1
+
+
+class OrderEventsSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".dat")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_reader_rebuilds_deep_books_from_snapshot(self):
+        asyncio.run(self.__run())
+
+    async def __run(self):
+        loop = asyncio.get_running_loop()
+        rnd = random.Random(42)
+        books = [OrderBook(Instrument.FUTURE, 0.0, 0.0), OrderBook(Instrument.ETF, 0.0, 0.0)]
+        timer = FakeTimer()
+        publisher = OrderEventPublisher(TimerWheel(loop, 1.0), PublisherFactory("mmap", self.path), books, timer,
+                                        SNAPSHOT_INTERVAL)
+        publisher.start()
+        await asyncio.sleep(0)
+
+        orders: List[Order] = list()
+
+        def add_order(book: OrderBook) -> None:
+            side = rnd.choice((Side.BUY, Side.SELL))
+            price = rnd.randrange(100, 150) * 100 if side == Side.BUY else rnd.randrange(151, 200) * 100
+            order = Order(len(orders), book.instrument, Lifespan.GOOD_FOR_DAY, side, price, rnd.randrange(1, 10))
+            book.insert(0.0, order)
+            orders.append(order)
+
+        for book in books:
+            for _ in range(ORDERS_PER_BOOK):
+                add_order(book)
+        await asyncio.sleep(0)
+
+        # The reader joins after the orders are resting, so it has to rebuild the books from a snapshot while the
+        # books keep changing
+        reader = Reader(loop)
+        subscriber = SubscriberFactory("mmap", self.path).create(reader)
+        for tick in range(1, 4 * SNAPSHOT_INTERVAL):
+            for book in books:
+                add_order(book)
+                resting = [o for o in orders if o.instrument == book.instrument and o.remaining_volume]
+                book.cancel(0.0, rnd.choice(resting))
+            await asyncio.sleep(0)
+            for callback in timer.timer_ticked:
+                callback(timer, float(tick), tick)
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        self.assertEqual(reader.errors, 0)
+        for book in books:
+            mbo_book = reader.mbo_books[book.instrument]
+            self.assertTrue(mbo_book.up_to_date)
+            for side, levels in ((Side.SELL, mbo_book.asks), (Side.BUY, mbo_book.bids)):
+                expected: Dict[int, List[Tuple[int, int]]] = dict()
+                for order in book.orders(side):
+                    expected.setdefault(order.price, list()).append((order.order_id, order.remaining_volume))
+                    self.assertEqual(mbo_book.orders[order.order_id], (side, order.price))
+                self.assertEqual({price: list(level.items()) for price, level in levels.items() if level}, expected)
+            self.assertEqual(len(mbo_book.orders), sum(1 for side in Side for _ in book.orders(side)))
+
+        subscriber.close()
+        await asyncio.sleep(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
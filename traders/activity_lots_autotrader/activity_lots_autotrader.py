@@ -48,15 +48,13 @@ class AutoTrader(BaseAutoTrader):
         self.current_max_bid_hedge = 0
         self.current_min_ask_hedge = 0
         self.fut_mid_price_hist = []
-        self.bids = set()
-        self.asks = set()
         self.delta = config["Parameters"]["delta"]
         self.margin_adjustment = config["Parameters"]["margin_adjustment"]
         self.margin = 0
         self.preferred_lots_low = config["Parameters"]["preferred_lots_low"]
         self.preferred_lots_high = config["Parameters"]["preferred_lots_high"]
         self.lots_traded = self.lot_size
-        self.ask_id = self.ask_price = self.bid_id = self.bid_price = self.position = 0
+        self.ask_id = self.ask_price = self.bid_id = self.bid_price = 0
 
     def on_error_message(self, client_order_id: int, error_message: bytes) -> None:
         """Called when the exchange detects an error.
@@ -65,7 +63,7 @@ class AutoTrader(BaseAutoTrader):
         will identify that order, otherwise the client_order_id will be zero.
         """
         self.logger.warning("error with order %d: %s", client_order_id, error_message.decode())
-        if client_order_id != 0 and (client_order_id in self.bids or client_order_id in self.asks):
+        if client_order_id != 0 and client_order_id in self.state.orders:
             self.on_order_status_message(client_order_id, 0, 0, 0)
 
     def on_hedge_filled_message(self, client_order_id: int, price: int, volume: int) -> None:
@@ -124,7 +122,8 @@ class AutoTrader(BaseAutoTrader):
             #calculate lot size
             #need to think about something more involved
             #this might be very bad, locks algorithm into trend
-            available_lots = POSITION_LIMIT-self.position
+            position = self.state.etf_position
+            available_lots = POSITION_LIMIT-position
             if len(self.fut_mid_price_hist) == self.hist_length:
                 lots_weight = np.average(self.fut_mid_price_hist, weights=self.weights)-np.average(self.fut_mid_price_hist)
                 if lots_weight > 0: #should by more
@@ -136,21 +135,19 @@ class AutoTrader(BaseAutoTrader):
                 else:
                     self.lots_traded = available_lots
 
-            make_bid = (self.bid_id == 0 and new_bid_price != 0 and self.position + self.lots_traded < POSITION_LIMIT) and new_bid_price < self.current_min_ask_hedge
+            make_bid = (self.bid_id == 0 and new_bid_price != 0 and position + self.lots_traded < POSITION_LIMIT) and new_bid_price < self.current_min_ask_hedge
 
-            make_ask = (self.ask_id == 0 and new_ask_price != 0 and self.position - self.lots_traded > -POSITION_LIMIT) and new_ask_price > self.current_max_bid_hedge
+            make_ask = (self.ask_id == 0 and new_ask_price != 0 and position - self.lots_traded > -POSITION_LIMIT) and new_ask_price > self.current_max_bid_hedge
 
             if make_bid:
                 self.bid_id = next(self.order_ids)
                 self.bid_price = new_bid_price
                 self.send_insert_order(self.bid_id, Side.BUY, new_bid_price, self.lots_traded, Lifespan.GOOD_FOR_DAY)
-                self.bids.add(self.bid_id)
 
             if make_ask:
                 self.ask_id = next(self.order_ids)
                 self.ask_price = new_ask_price
                 self.send_insert_order(self.ask_id, Side.SELL, new_ask_price, self.lots_traded, Lifespan.GOOD_FOR_DAY)
-                self.asks.add(self.ask_id)
 
     def on_order_filled_message(self, client_order_id: int, price: int, volume: int) -> None:
         """Called when one of your orders is filled, partially or fully.
@@ -161,12 +158,13 @@ class AutoTrader(BaseAutoTrader):
         """
         self.logger.info("received order filled for order %d with price %d and volume %d", client_order_id,
                          price, volume)
-        if client_order_id in self.bids:
-            self.position += volume
+        # The state has already applied the fill to the position
+        order = self.state.orders.get(client_order_id)
+        if order is None:
+            return
+        if order.side == Side.BUY:
             self.send_hedge_order(next(self.order_ids), Side.ASK, MIN_BID_NEAREST_TICK, volume)
-
-        elif client_order_id in self.asks:
-            self.position -= volume
+        else:
             self.send_hedge_order(next(self.order_ids), Side.BID, MAX_ASK_NEAREST_TICK, volume)
 
     def on_order_status_message(self, client_order_id: int, fill_volume: int, remaining_volume: int,
@@ -188,10 +186,6 @@ class AutoTrader(BaseAutoTrader):
             elif client_order_id == self.ask_id:
                 self.ask_id = 0
 
-            # It could be either a bid or an ask
-            self.bids.discard(client_order_id)
-            self.asks.discard(client_order_id)
-
     def on_trade_ticks_message(self, instrument: int, sequence_number: int, ask_prices: List[int],
                                ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
         """Called periodically when there is trading activity on the market.
@@ -22,6 +22,7 @@ import math
 from typing import List, Dict, Any, Tuple
 
 from ready_trader_go import BaseAutoTrader, Instrument, Lifespan, MAXIMUM_ASK, MINIMUM_BID, Side
+from ready_trader_go.trader_state import LocalBook
 
 
 LOT_SIZE = 10
@@ -62,21 +63,12 @@ class AutoTrader(BaseAutoTrader):
         self.hedge_bid_price = self.hedge_bid_size = self.hedge_bid_id = 0
         self.hedge_ask_price = self.hedge_ask_size = self.hedge_ask_id = 0
 
-        self.etf_position = 0
-        self.fut_position = 0
         self.profit = 0
         self.fees = 0
 
-        self.etf_order_book_sequence_number = -2 
-        self.fut_order_book_sequence_number = -1 
-        self.etf_ask_prices = [] 
-        self.etf_ask_volumes = []
-        self.etf_bid_prices = [] 
-        self.etf_bid_volumes = [] 
-        self.fut_ask_prices = [] 
-        self.fut_ask_volumes = []
-        self.fut_bid_prices = []
-        self.fut_bid_volumes = [] 
+        # The books and positions are kept up to date in the state before each callback
+        self.etf_book: LocalBook = self.state.book(Instrument.ETF)
+        self.fut_book: LocalBook = self.state.book(Instrument.FUTURE)
 
         # parameters to tweak
         self.min_profitability = config["Parameters"]["min_profitability"] 
@@ -109,16 +101,12 @@ class AutoTrader(BaseAutoTrader):
 
         # if volume = 0 the order wasn't filled
         if client_order_id == self.hedge_bid_id:
-            self.fut_position += volume
-
             # even if we haven't filled the order we just delete it 
             self.hedge_bid_id = 0
             self.hedge_bid_size = 0
             self.hedge_bid_price = 0
 
         elif client_order_id == self.hedge_ask_id:
-            self.fut_position -= volume
-
             self.hedge_ask_id = 0
             self.hedge_ask_size = 0
             self.hedge_ask_price = 0
@@ -137,12 +125,7 @@ class AutoTrader(BaseAutoTrader):
         self.logger.info("received order book for instrument %d with sequence number %d", instrument,
                          sequence_number)
 
-        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.etf_position, self.fut_position))
-
-        if instrument == Instrument.ETF:
-            self.update_etf_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
-        else:
-            self.update_fut_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
+        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.state.etf_position, self.state.future_position))
          
         self.update_bid_and_ask()
 
@@ -184,8 +167,6 @@ class AutoTrader(BaseAutoTrader):
                 self.bid_original_size = 0
             # order was partially or fully filled
             else:
-                amount_filled = self.bid_size - remaining_volume
-                self.etf_position += amount_filled 
                 self.bid_size = remaining_volume
 
                 # if order has been fully filled
@@ -206,8 +187,6 @@ class AutoTrader(BaseAutoTrader):
                 self.ask_price = 0
                 self.ask_original_size = 0
             else:
-                amount_filled = self.ask_size - remaining_volume
-                self.etf_position -= amount_filled 
                 self.ask_size = remaining_volume
 
                 if self.ask_size == 0:
@@ -244,27 +223,10 @@ class AutoTrader(BaseAutoTrader):
 
         # TODO: Update bid/ask prices based on this information
 
-    def update_etf_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-
-        self.etf_order_book_sequence_number = sequence_number 
-        self.etf_ask_prices = ask_prices
-        self.etf_ask_volumes = ask_volumes
-        self.etf_bid_prices = bid_prices
-        self.etf_bid_volumes = bid_volumes
-        
-    def update_fut_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-        self.fut_order_book_sequence_number = sequence_number 
-        self.fut_ask_prices = ask_prices
-        self.fut_ask_volumes = ask_volumes
-        self.fut_bid_prices = bid_prices
-        self.fut_bid_volumes = bid_volumes
-        
     def update_bid_and_ask(self) -> None:
         # if we don't have order book information or it's not synchronized we don't
         # want to touch our bid/ask prices
-        if self.etf_order_book_sequence_number != self.fut_order_book_sequence_number:
+        if self.etf_book.sequence_number != self.fut_book.sequence_number:
             return 
 
         self.check_conditions()
@@ -284,8 +246,8 @@ class AutoTrader(BaseAutoTrader):
         elif self.bid_size > 0:
 
             # TODO: Calculate the effective heding price and not just take the best ask price
-            pl = self.bid_size * self.fut_ask_prices[0] - self.bid_size * self.bid_price
-            new_pl = new_bid_size * self.fut_ask_prices[0] - new_bid_size * new_bid_price
+            pl = self.bid_size * self.fut_book.ask_prices[0] - self.bid_size * self.bid_price
+            new_pl = new_bid_size * self.fut_book.ask_prices[0] - new_bid_size * new_bid_price
 
             # TODO: Change this if we won't immediately hedge our orders or we want to account
             # for cancellation penalty
@@ -295,7 +257,7 @@ class AutoTrader(BaseAutoTrader):
             # outstanding bid is still profitable
             # but has the price drifted so much that the order no longer makes sense?
             else:
-                if self.etf_order_book_sequence_number >= self.bid_sequence_number + self.drift_delay and self.bid_price != new_bid_price:
+                if self.etf_book.sequence_number >= self.bid_sequence_number + self.drift_delay and self.bid_price != new_bid_price:
                     self.send_cancel_order(self.bid_id)
 
         # see if we should place a new bid given that we don't have any outstanding one
@@ -304,9 +266,9 @@ class AutoTrader(BaseAutoTrader):
             self.bid_price = new_bid_price
             self.bid_size = new_bid_size
             self.bid_original_size = self.bid_size
-            self.bid_sequence_number = self.etf_order_book_sequence_number
+            self.bid_sequence_number = self.etf_book.sequence_number
             self.logger.info("Inserting ETF | BUY | seq number {0} | order number {1} | size {2} | price {3}".format(self.bid_sequence_number, self.bid_id, self.bid_size, self.bid_price))
-            assert self.etf_position + self.bid_size <= POSITION_LIMIT
+            assert self.state.etf_position + self.bid_size <= POSITION_LIMIT
             self.send_insert_order(self.bid_id, Side.BUY, self.bid_price, self.bid_size, Lifespan.GOOD_FOR_DAY)
 
 
@@ -317,14 +279,14 @@ class AutoTrader(BaseAutoTrader):
         # see if we should cancel the ask order
         elif self.ask_size > 0:
 
-            pl = -self.ask_size * self.fut_bid_prices[0] + self.ask_size * self.ask_price
-            new_pl = -new_ask_size * self.fut_bid_prices[0] + new_ask_size * new_ask_price
+            pl = -self.ask_size * self.fut_book.bid_prices[0] + self.ask_size * self.ask_price
+            new_pl = -new_ask_size * self.fut_book.bid_prices[0] + new_ask_size * new_ask_price
 
             if pl < 0 or pl * (1 + self.cancellation_penalty) < new_pl:
                 self.send_cancel_order(self.ask_id)
 
             else:
-                if self.etf_order_book_sequence_number >= self.ask_sequence_number + self.drift_delay and self.ask_price != new_ask_price:
+                if self.etf_book.sequence_number >= self.ask_sequence_number + self.drift_delay and self.ask_price != new_ask_price:
                     self.send_cancel_order(self.ask_id)
 
         elif new_ask_size > 0 and new_ask_price > 0:
@@ -332,38 +294,38 @@ class AutoTrader(BaseAutoTrader):
             self.ask_price = new_ask_price
             self.ask_size = new_ask_size
             self.ask_original_size = self.ask_size
-            self.ask_sequence_number = self.etf_order_book_sequence_number
+            self.ask_sequence_number = self.etf_book.sequence_number
             self.logger.info("Inserting ETF | SELL | seq number {0} | order number {1} | size {2} | price {3}".format(self.ask_sequence_number, self.ask_id, self.ask_size, self.ask_price))
-            assert self.etf_position - self.ask_size >= -POSITION_LIMIT
+            assert self.state.etf_position - self.ask_size >= -POSITION_LIMIT
             self.send_insert_order(self.ask_id, Side.SELL, self.ask_price, self.ask_size, Lifespan.GOOD_FOR_DAY)
 
     def check_conditions(self) -> None:
-        assert (abs(self.etf_position) <= POSITION_LIMIT and abs(self.fut_position) <= POSITION_LIMIT)
-        assert (self.etf_position + self.bid_size <= POSITION_LIMIT and self.etf_position - self.ask_size >= -POSITION_LIMIT)
+        assert (abs(self.state.etf_position) <= POSITION_LIMIT and abs(self.state.future_position) <= POSITION_LIMIT)
+        assert (self.state.etf_position + self.bid_size <= POSITION_LIMIT and self.state.etf_position - self.ask_size >= -POSITION_LIMIT)
         assert (self.bid_size > 0 and self.bid_price > 0) or (self.bid_size == 0 and self.bid_price == 0)
         assert (self.ask_size > 0 and self.ask_price > 0) or (self.ask_size == 0 and self.ask_price == 0)
 
 
     def calculate_bid_size(self) -> int:
         # how much more (ETF) we can buy 
-        max_buy = POSITION_LIMIT - self.etf_position 
+        max_buy = POSITION_LIMIT - self.state.etf_position 
         bid_size = math.floor(max_buy * self.order_size_ratio)
-        assert abs(self.etf_position + bid_size) <= POSITION_LIMIT
+        assert abs(self.state.etf_position + bid_size) <= POSITION_LIMIT
         assert bid_size >= 0
         return bid_size
 
     def calculate_ask_size(self) -> int:
         # how much more (ETF) we can sell
-        max_sell = POSITION_LIMIT + self.etf_position
+        max_sell = POSITION_LIMIT + self.state.etf_position
         ask_size = math.floor(max_sell * self.order_size_ratio)
-        assert abs(self.etf_position - ask_size) <= POSITION_LIMIT
+        assert abs(self.state.etf_position - ask_size) <= POSITION_LIMIT
         assert ask_size >= 0
         return ask_size
         
     # the price is given in number of tick sizes
     def calculate_bid_price(self, bid_size) -> int:
         # TODO: adjust the best_bid_price based on the ETF order-book depth
-        best_bid_price = self.etf_bid_prices[0] 
+        best_bid_price = self.etf_book.bid_prices[0] 
 
         if best_bid_price == 0:
             return 0
@@ -371,7 +333,7 @@ class AutoTrader(BaseAutoTrader):
         price_above_best_bid = (best_bid_price + TICK_SIZE_IN_CENTS) // TICK_SIZE_IN_CENTS * TICK_SIZE_IN_CENTS
 
         # TODO: Get the effective price based on the order size, although it won't change much probably
-        taker_price = self.fut_ask_prices[0]
+        taker_price = self.fut_book.ask_prices[0]
         maker_price = taker_price / (1 + self.min_profitability)
 
         if self.adjust_order_enabled:
@@ -383,14 +345,14 @@ class AutoTrader(BaseAutoTrader):
         return maker_price
 
     def calculate_ask_price(self, ask_size) -> int:
-        best_ask_price = self.etf_ask_prices[0] 
+        best_ask_price = self.etf_book.ask_prices[0] 
 
         if best_ask_price == 0:
             return 0
 
         price_below_best_ask = (best_ask_price - TICK_SIZE_IN_CENTS) // TICK_SIZE_IN_CENTS * TICK_SIZE_IN_CENTS
 
-        taker_price = self.fut_bid_prices[0]
+        taker_price = self.fut_book.bid_prices[0]
         maker_price = taker_price * (1 + self.min_profitability) 
 
         if self.adjust_order_enabled:
@@ -402,7 +364,7 @@ class AutoTrader(BaseAutoTrader):
 
     def update_hedges(self) -> None:
         # the actual current market exposure
-        current_delta = self.etf_position + self.fut_position
+        current_delta = self.state.etf_position + self.state.future_position
 
         if self.hedge_ask_id != 0 or self.hedge_bid_id != 0:
             return
@@ -413,7 +375,7 @@ class AutoTrader(BaseAutoTrader):
             self.hedge_ask_size = current_delta
             self.hedge_ask_price = MIN_BID_NEAREST_TICK
             self.logger.info("Inserting FUT SELL order {0} with size {1} and price {2}".format(self.hedge_ask_id, self.hedge_ask_size, self.hedge_ask_price))
-            assert abs(self.fut_position - self.hedge_ask_size) <= POSITION_LIMIT
+            assert abs(self.state.future_position - self.hedge_ask_size) <= POSITION_LIMIT
             self.send_hedge_order(self.hedge_ask_id, Side.SELL, self.hedge_ask_price, self.hedge_ask_size)
 
         if current_delta < 0 and self.hedge_bid_id == 0:
@@ -421,5 +383,5 @@ class AutoTrader(BaseAutoTrader):
             self.hedge_bid_size = -current_delta
             self.hedge_bid_price = MAX_ASK_NEAREST_TICK 
             self.logger.info("Inserting FUT BUY order {0} with size {1} and price {2}".format(self.hedge_bid_id, self.hedge_bid_size, self.hedge_bid_price))
-            assert abs(self.fut_position + self.hedge_bid_size) <= POSITION_LIMIT
+            assert abs(self.state.future_position + self.hedge_bid_size) <= POSITION_LIMIT
             self.send_hedge_order(self.hedge_bid_id, Side.BUY, self.hedge_bid_price, self.hedge_bid_size)
@@ -22,6 +22,7 @@ import math
 from typing import List, Dict, Any, Tuple
 
 from ready_trader_go import BaseAutoTrader, Instrument, Lifespan, MAXIMUM_ASK, MINIMUM_BID, Side
+from ready_trader_go.trader_state import LocalBook
 
 
 LOT_SIZE = 10
@@ -71,22 +72,13 @@ class AutoTrader(BaseAutoTrader):
         self.last_hedged_sequence_number = 0
         self.first_hedged_sequence_number = -1
 
-        self.etf_position = 0
-        self.fut_position = 0
         self.profit = 0
         self.fees = 0
         self.true_price = 0
 
-        self.etf_order_book_sequence_number = -2 
-        self.fut_order_book_sequence_number = -1 
-        self.etf_ask_prices = [] 
-        self.etf_ask_volumes = []
-        self.etf_bid_prices = [] 
-        self.etf_bid_volumes = [] 
-        self.fut_ask_prices = [] 
-        self.fut_ask_volumes = []
-        self.fut_bid_prices = []
-        self.fut_bid_volumes = [] 
+        # The books and positions are kept up to date in the state before each callback
+        self.etf_book: LocalBook = self.state.book(Instrument.ETF)
+        self.fut_book: LocalBook = self.state.book(Instrument.FUTURE)
 
         self.last_etf_traded_prices = []
 
@@ -124,16 +116,12 @@ class AutoTrader(BaseAutoTrader):
 
         # if volume = 0 the order wasn't filled
         if client_order_id == self.hedge_bid_id:
-            self.fut_position += volume
-
             # even if we haven't filled the order we just delete it 
             self.hedge_bid_id = 0
             self.hedge_bid_size = 0
             self.hedge_bid_price = 0
 
         elif client_order_id == self.hedge_ask_id:
-            self.fut_position -= volume
-
             self.hedge_ask_id = 0
             self.hedge_ask_size = 0
             self.hedge_ask_price = 0
@@ -151,26 +139,21 @@ class AutoTrader(BaseAutoTrader):
         # self.logger.info("received order book for instrument %d with sequence number %d", instrument,
         #                  sequence_number)
 
-        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.etf_position, self.fut_position))
-
-        if instrument == Instrument.ETF:
-            self.update_etf_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
-        else:
-            self.update_fut_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
+        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.state.etf_position, self.state.future_position))
          
-        if abs(self.etf_position - self.fut_position) <= 10:
+        if abs(self.state.etf_position - self.state.future_position) <= 10:
             self.last_hedged_sequence_number = sequence_number
 
         # we might need to add this again if we get kicked out for not hedging
-        # if abs(self.etf_position - self.fut_position) <= 10 and self.first_hedged_sequence_number == -1:
+        # if abs(self.state.etf_position - self.state.future_position) <= 10 and self.first_hedged_sequence_number == -1:
         #     self.first_hedged_sequence_number = sequence_number
-        # elif abs(self.etf_position - self.fut_position) <= 10 and self.first_hedged_sequence_number + self.sequence_numbers_to_be_sure_we_are_hedged <= sequence_number:
+        # elif abs(self.state.etf_position - self.state.future_position) <= 10 and self.first_hedged_sequence_number + self.sequence_numbers_to_be_sure_we_are_hedged <= sequence_number:
         #     self.last_hedged_sequence_number = sequence_number
         #     self.first_hedged_sequence_number = -1
 
         self.check_conditions()
 
-        if self.bid_size == 0 and self.ask_size == 0 and self.etf_position == 0:
+        if self.bid_size == 0 and self.ask_size == 0 and self.state.etf_position == 0:
             self.initialize_bid_and_ask()
         else:
             self.update_bid()
@@ -182,7 +165,7 @@ class AutoTrader(BaseAutoTrader):
     def refresh_bid_and_ask_quotes(self) -> None:
         # if we don't have order book information or it's not synchronized we don't
         # want to touch our bid/ask prices
-        if self.etf_order_book_sequence_number != self.fut_order_book_sequence_number:
+        if self.etf_book.sequence_number != self.fut_book.sequence_number:
             return 
 
         self.check_conditions()
@@ -198,7 +181,7 @@ class AutoTrader(BaseAutoTrader):
         # see if we should cancel the outstanding bid
         if self.bid_size > 0:
             # self.drift_delay is set to 0 such that we will cancel very quickly
-            if self.etf_order_book_sequence_number >= self.bid_sequence_number + self.drift_delay and self.bid_price != new_bid_price:
+            if self.etf_book.sequence_number >= self.bid_sequence_number + self.drift_delay and self.bid_price != new_bid_price:
                 self.send_cancel_order(self.bid_id)
         # see if we should place a new bid given that we don't have any outstanding one
         elif new_bid_size > 0 and new_bid_price > 0:
@@ -206,15 +189,15 @@ class AutoTrader(BaseAutoTrader):
             self.bid_price = new_bid_price
             self.bid_size = new_bid_size
             self.bid_original_size = self.bid_size
-            self.bid_sequence_number = self.etf_order_book_sequence_number
+            self.bid_sequence_number = self.etf_book.sequence_number
             self.logger.info("Inserting ETF | BUY | seq number {0} | order number {1} | size {2} | price {3}".format(self.bid_sequence_number, self.bid_id, self.bid_size, self.bid_price))
-            assert self.etf_position + self.bid_size <= POSITION_LIMIT
+            assert self.state.etf_position + self.bid_size <= POSITION_LIMIT
             self.send_insert_order(self.bid_id, Side.BUY, self.bid_price, self.bid_size, Lifespan.GOOD_FOR_DAY)
 
 
         # see if we should cancel the ask order
         if self.ask_size > 0:
-            if self.etf_order_book_sequence_number >= self.ask_sequence_number + self.drift_delay and self.ask_price != new_ask_price:
+            if self.etf_book.sequence_number >= self.ask_sequence_number + self.drift_delay and self.ask_price != new_ask_price:
                 self.send_cancel_order(self.ask_id)
         # see if we should place a new ask given that we don't have any outstanding one
         elif new_ask_size > 0 and new_ask_price > 0:
@@ -222,9 +205,9 @@ class AutoTrader(BaseAutoTrader):
             self.ask_price = new_ask_price
             self.ask_size = new_ask_size
             self.ask_original_size = self.ask_size
-            self.ask_sequence_number = self.etf_order_book_sequence_number
+            self.ask_sequence_number = self.etf_book.sequence_number
             self.logger.info("Inserting ETF | SELL | seq number {0} | order number {1} | size {2} | price {3}".format(self.ask_sequence_number, self.ask_id, self.ask_size, self.ask_price))
-            assert self.etf_position - self.ask_size >= -POSITION_LIMIT
+            assert self.state.etf_position - self.ask_size >= -POSITION_LIMIT
             self.send_insert_order(self.ask_id, Side.SELL, self.ask_price, self.ask_size, Lifespan.GOOD_FOR_DAY)
 
     def on_order_filled_message(self, client_order_id: int, price: int, volume: int) -> None:
@@ -264,8 +247,6 @@ class AutoTrader(BaseAutoTrader):
                 self.bid_original_size = 0
             # order was partially or fully filled
             else:
-                amount_filled = self.bid_size - remaining_volume
-                self.etf_position += amount_filled 
                 self.bid_size = remaining_volume
 
                 # if order has been fully filled
@@ -289,8 +270,6 @@ class AutoTrader(BaseAutoTrader):
                 self.ask_price = 0
                 self.ask_original_size = 0
             else:
-                amount_filled = self.ask_size - remaining_volume
-                self.etf_position -= amount_filled 
                 self.ask_size = remaining_volume
 
                 if self.ask_size == 0:
@@ -337,7 +316,7 @@ class AutoTrader(BaseAutoTrader):
 
         self.check_conditions()
 
-        if self.bid_size == 0 and self.ask_size == 0 and self.etf_position == 0:
+        if self.bid_size == 0 and self.ask_size == 0 and self.state.etf_position == 0:
             self.initialize_bid_and_ask()
         else:
             if self.bid_size == 0:
@@ -348,27 +327,10 @@ class AutoTrader(BaseAutoTrader):
 
         self.check_conditions()
 
-    def update_etf_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-
-        self.etf_order_book_sequence_number = sequence_number 
-        self.etf_ask_prices = ask_prices
-        self.etf_ask_volumes = ask_volumes
-        self.etf_bid_prices = bid_prices
-        self.etf_bid_volumes = bid_volumes
-        
-    def update_fut_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-        self.fut_order_book_sequence_number = sequence_number 
-        self.fut_ask_prices = ask_prices
-        self.fut_ask_volumes = ask_volumes
-        self.fut_bid_prices = bid_prices
-        self.fut_bid_volumes = bid_volumes
-
     def initialize_bid_and_ask(self) -> None:
         assert self.bid_size == 0 and self.ask_size == 0
 
-        if self.etf_order_book_sequence_number != self.fut_order_book_sequence_number:
+        if self.etf_book.sequence_number != self.fut_book.sequence_number:
             return
 
         new_bid_size = 50 
@@ -381,24 +343,24 @@ class AutoTrader(BaseAutoTrader):
         self.bid_price = new_bid_price
         self.bid_size = new_bid_size
         self.bid_original_size = self.bid_size
-        self.bid_sequence_number = self.etf_order_book_sequence_number
+        self.bid_sequence_number = self.etf_book.sequence_number
         self.logger.info("Inserting ETF | BUY | seq number {0} | order number {1} | size {2} | price {3}".format(self.bid_sequence_number, self.bid_id, self.bid_size, self.bid_price))
-        assert self.etf_position + self.bid_size <= POSITION_LIMIT
+        assert self.state.etf_position + self.bid_size <= POSITION_LIMIT
         self.send_insert_order(self.bid_id, Side.BUY, self.bid_price, self.bid_size, Lifespan.GOOD_FOR_DAY)
 
         self.ask_id = next(self.order_ids)
         self.ask_price = new_ask_price
         self.ask_size = new_ask_size
         self.ask_original_size = self.ask_size
-        self.ask_sequence_number = self.etf_order_book_sequence_number
+        self.ask_sequence_number = self.etf_book.sequence_number
         self.logger.info("Inserting ETF | SELL | seq number {0} | order number {1} | size {2} | price {3}".format(self.ask_sequence_number, self.ask_id, self.ask_size, self.ask_price))
-        assert self.etf_position - self.ask_size >= -POSITION_LIMIT
+        assert self.state.etf_position - self.ask_size >= -POSITION_LIMIT
         self.send_insert_order(self.ask_id, Side.SELL, self.ask_price, self.ask_size, Lifespan.GOOD_FOR_DAY)
         
     # def update_bid_and_ask(self, bid_volume_filled, ask_volume_filled) -> None:
     #     # if we don't have order book information or it's not synchronized we don't
     #     # want to touch our bid/ask prices
-    #     if self.etf_order_book_sequence_number != self.fut_order_book_sequence_number:
+    #     if self.etf_book.sequence_number != self.fut_book.sequence_number:
     #         return 
 
     #     self.check_conditions()
@@ -418,7 +380,7 @@ class AutoTrader(BaseAutoTrader):
     #     elif self.bid_size > 0:
 
     #         # self.drift_delay is set to 0 such that we will cancel very quickly
-    #         if self.etf_order_book_sequence_number >= self.bid_sequence_number + self.drift_delay and self.bid_price != new_bid_price:
+    #         if self.etf_book.sequence_number >= self.bid_sequence_number + self.drift_delay and self.bid_price != new_bid_price:
     #             self.send_cancel_order(self.bid_id)
 
     #     # see if we should place a new bid given that we don't have any outstanding one
@@ -427,9 +389,9 @@ class AutoTrader(BaseAutoTrader):
     #         self.bid_price = new_bid_price
     #         self.bid_size = new_bid_size
     #         self.bid_original_size = self.bid_size
-    #         self.bid_sequence_number = self.etf_order_book_sequence_number
+    #         self.bid_sequence_number = self.etf_book.sequence_number
     #         self.logger.info("Inserting ETF | BUY | seq number {0} | order number {1} | size {2} | price {3}".format(self.bid_sequence_number, self.bid_id, self.bid_size, self.bid_price))
-    #         assert self.etf_position + self.bid_size <= POSITION_LIMIT
+    #         assert self.state.etf_position + self.bid_size <= POSITION_LIMIT
     #         self.send_insert_order(self.bid_id, Side.BUY, self.bid_price, self.bid_size, Lifespan.GOOD_FOR_DAY)
 
 
@@ -440,7 +402,7 @@ class AutoTrader(BaseAutoTrader):
     #     # see if we should cancel the ask order
     #     elif self.ask_size > 0:
 
-    #         if self.etf_order_book_sequence_number >= self.ask_sequence_number + self.drift_delay and self.ask_price != new_ask_price:
+    #         if self.etf_book.sequence_number >= self.ask_sequence_number + self.drift_delay and self.ask_price != new_ask_price:
     #             self.send_cancel_order(self.ask_id)
 
     #     elif new_ask_size > 0 and new_ask_price > 0:
@@ -448,16 +410,16 @@ class AutoTrader(BaseAutoTrader):
     #         self.ask_price = new_ask_price
     #         self.ask_size = new_ask_size
     #         self.ask_original_size = self.ask_size
-    #         self.ask_sequence_number = self.etf_order_book_sequence_number
+    #         self.ask_sequence_number = self.etf_book.sequence_number
     #         self.logger.info("Inserting ETF | SELL | seq number {0} | order number {1} | size {2} | price {3}".format(self.ask_sequence_number, self.ask_id, self.ask_size, self.ask_price))
-    #         assert self.etf_position - self.ask_size >= -POSITION_LIMIT
+    #         assert self.state.etf_position - self.ask_size >= -POSITION_LIMIT
     #         self.send_insert_order(self.ask_id, Side.SELL, self.ask_price, self.ask_size, Lifespan.GOOD_FOR_DAY)
 
     def update_bid(self) -> None:
         new_bid_size = self.calculate_bid_size()
-        # new_bid_size = -self.etf_position + self.ask_size
-        # -self.etf_position + self.ask_size < 0
-        # => self.ask_size < self.etf_position
+        # new_bid_size = -self.state.etf_position + self.ask_size
+        # -self.state.etf_position + self.ask_size < 0
+        # => self.ask_size < self.state.etf_position
         # ???
         new_bid_price = self.calculate_bid_price()
 
@@ -469,7 +431,7 @@ class AutoTrader(BaseAutoTrader):
             self.send_amend_order(self.bid_id, new_bid_size)
         # see if we should cancel the bid
         elif self.bid_size > 0:
-            if self.bid_price != new_bid_price and self.bid_sequence_number + self.cancelling_delay <= self.etf_order_book_sequence_number:
+            if self.bid_price != new_bid_price and self.bid_sequence_number + self.cancelling_delay <= self.etf_book.sequence_number:
                 self.logger.info("Cancelling BID with id {0}".format(self.bid_id))
                 self.send_cancel_order(self.bid_id)
         # see if we should place a new bid given that we don't have any outstanding one
@@ -478,14 +440,14 @@ class AutoTrader(BaseAutoTrader):
             self.bid_price = new_bid_price
             self.bid_size = new_bid_size
             self.bid_original_size = self.bid_size
-            self.bid_sequence_number = self.etf_order_book_sequence_number
+            self.bid_sequence_number = self.etf_book.sequence_number
             self.logger.info("Inserting ETF | BUY | seq number {0} | order number {1} | size {2} | price {3}".format(self.bid_sequence_number, self.bid_id, self.bid_size, self.bid_price))
-            assert self.etf_position + self.bid_size <= POSITION_LIMIT
+            assert self.state.etf_position + self.bid_size <= POSITION_LIMIT
             self.send_insert_order(self.bid_id, Side.BUY, self.bid_price, self.bid_size, Lifespan.GOOD_FOR_DAY)
 
     def update_ask(self) -> None:
         new_ask_size = self.calculate_ask_size()
-        # new_ask_size = (-1) * (-self.etf_position - self.bid_size)
+        # new_ask_size = (-1) * (-self.state.etf_position - self.bid_size)
         new_ask_price = self.calculate_ask_price()
 
         # see if we should amend the ask order
@@ -493,34 +455,34 @@ class AutoTrader(BaseAutoTrader):
             self.send_amend_order(self.ask_id, new_ask_size)
         # see if we should cancel the ask order
         elif self.ask_size > 0:
-            if self.ask_price != new_ask_price and self.ask_sequence_number + self.cancelling_delay <= self.etf_order_book_sequence_number:
+            if self.ask_price != new_ask_price and self.ask_sequence_number + self.cancelling_delay <= self.etf_book.sequence_number:
                 self.send_cancel_order(self.ask_id)
         elif new_ask_size > 0 and new_ask_price > 0:
             self.ask_id = next(self.order_ids)
             self.ask_price = new_ask_price
             self.ask_size = new_ask_size
             self.ask_original_size = self.ask_size
-            self.ask_sequence_number = self.etf_order_book_sequence_number
+            self.ask_sequence_number = self.etf_book.sequence_number
             self.logger.info("Inserting ETF | SELL | seq number {0} | order number {1} | size {2} | price {3}".format(self.ask_sequence_number, self.ask_id, self.ask_size, self.ask_price))
-            assert self.etf_position - self.ask_size >= -POSITION_LIMIT
+            assert self.state.etf_position - self.ask_size >= -POSITION_LIMIT
             self.send_insert_order(self.ask_id, Side.SELL, self.ask_price, self.ask_size, Lifespan.GOOD_FOR_DAY)
 
     def check_conditions(self) -> None:
-        assert (abs(self.etf_position) <= POSITION_LIMIT and abs(self.fut_position) <= POSITION_LIMIT)
-        assert (self.etf_position + self.bid_size <= POSITION_LIMIT and self.etf_position - self.ask_size >= -POSITION_LIMIT)
+        assert (abs(self.state.etf_position) <= POSITION_LIMIT and abs(self.state.future_position) <= POSITION_LIMIT)
+        assert (self.state.etf_position + self.bid_size <= POSITION_LIMIT and self.state.etf_position - self.ask_size >= -POSITION_LIMIT)
         assert (self.bid_size > 0 and self.bid_price > 0) or (self.bid_size == 0 and self.bid_price == 0)
         assert (self.ask_size > 0 and self.ask_price > 0) or (self.ask_size == 0 and self.ask_price == 0)
-        assert (self.bid_size - self.ask_size + self.etf_position == 0)
+        assert (self.bid_size - self.ask_size + self.state.etf_position == 0)
 
     def calculate_bid_size(self) -> int:
-        bid_size = max(0, -self.etf_position + self.ask_size)
-        assert abs(self.etf_position + bid_size) <= POSITION_LIMIT
+        bid_size = max(0, -self.state.etf_position + self.ask_size)
+        assert abs(self.state.etf_position + bid_size) <= POSITION_LIMIT
         assert bid_size >= 0
         return bid_size
 
     def calculate_ask_size(self) -> int:
-        ask_size = max(0, (-1) * (-self.etf_position - self.bid_size))
-        assert abs(self.etf_position - ask_size) <= POSITION_LIMIT
+        ask_size = max(0, (-1) * (-self.state.etf_position - self.bid_size))
+        assert abs(self.state.etf_position - ask_size) <= POSITION_LIMIT
         assert ask_size >= 0
         return ask_size
 
@@ -559,7 +521,7 @@ class AutoTrader(BaseAutoTrader):
 
         # we assume the true price calculation is just based on the mid price
         else:
-            self.true_price = (self.fut_ask_prices[0] + self.fut_bid_prices[0]) * 0.5
+            self.true_price = (self.fut_book.ask_prices[0] + self.fut_book.bid_prices[0]) * 0.5
             self.logger.info("True Price calculated is {0}".format(self.true_price))
 
 
@@ -567,7 +529,7 @@ class AutoTrader(BaseAutoTrader):
 
     # the price is given in number of tick sizes
     def calculate_bid_price(self) -> int:
-        if self.fut_ask_prices[0] == 0 or self.fut_bid_prices[0] == 0:
+        if self.fut_book.ask_prices[0] == 0 or self.fut_book.bid_prices[0] == 0:
             return 0
 
         true_price = self.calculate_true_price()
@@ -577,7 +539,7 @@ class AutoTrader(BaseAutoTrader):
         return one_below_true_price
 
     def calculate_ask_price(self) -> int:
-        if self.fut_ask_prices[0] == 0 or self.fut_bid_prices[0] == 0:
+        if self.fut_book.ask_prices[0] == 0 or self.fut_book.bid_prices[0] == 0:
             return 0
 
         true_price = self.calculate_true_price()
@@ -588,9 +550,9 @@ class AutoTrader(BaseAutoTrader):
 
     def update_hedges_if_necessary(self) -> None:
         # the actual current market exposure
-        current_delta = self.etf_position + self.fut_position
+        current_delta = self.state.etf_position + self.state.future_position
 
-        if self.hedge_ask_id != 0 or self.hedge_bid_id != 0 or self.last_hedged_sequence_number + self.sequence_number_heding_delay > self.etf_order_book_sequence_number:
+        if self.hedge_ask_id != 0 or self.hedge_bid_id != 0 or self.last_hedged_sequence_number + self.sequence_number_heding_delay > self.etf_book.sequence_number:
             return
 
         # TODO: Check that we haven't sent the hedge order already
@@ -599,7 +561,7 @@ class AutoTrader(BaseAutoTrader):
             self.hedge_ask_size = current_delta
             self.hedge_ask_price = MIN_BID_NEAREST_TICK
             self.logger.info("Inserting FUT SELL order {0} with size {1} and price {2}".format(self.hedge_ask_id, self.hedge_ask_size, self.hedge_ask_price))
-            assert abs(self.fut_position - self.hedge_ask_size) <= POSITION_LIMIT
+            assert abs(self.state.future_position - self.hedge_ask_size) <= POSITION_LIMIT
             self.send_hedge_order(self.hedge_ask_id, Side.SELL, self.hedge_ask_price, self.hedge_ask_size)
 
         if current_delta < 0:
@@ -607,5 +569,5 @@ class AutoTrader(BaseAutoTrader):
             self.hedge_bid_size = -current_delta
             self.hedge_bid_price = MAX_ASK_NEAREST_TICK 
             self.logger.info("Inserting FUT BUY order {0} with size {1} and price {2}".format(self.hedge_bid_id, self.hedge_bid_size, self.hedge_bid_price))
-            assert abs(self.fut_position + self.hedge_bid_size) <= POSITION_LIMIT
+            assert abs(self.state.future_position + self.hedge_bid_size) <= POSITION_LIMIT
             self.send_hedge_order(self.hedge_bid_id, Side.BUY, self.hedge_bid_price, self.hedge_bid_size)
@@ -22,6 +22,7 @@ import math
 from typing import List, Dict, Any, Tuple
 
 from ready_trader_go import BaseAutoTrader, Instrument, Lifespan, MAXIMUM_ASK, MINIMUM_BID, Side
+from ready_trader_go.trader_state import LocalBook
 
 
 LOT_SIZE = 10
@@ -61,25 +62,16 @@ class AutoTrader(BaseAutoTrader):
         self.last_hedged_sequence_number = 0
         self.first_hedged_sequence_number = -1
 
-        self.etf_position = 0
-        self.fut_position = 0
         self.profit = 0
         self.fees = 0
         self.true_price = 0
 
-        self.etf_order_book_sequence_number = -2 
-        self.fut_order_book_sequence_number = -1 
-        self.etf_ask_prices = [] 
-        self.etf_ask_volumes = []
-        self.etf_bid_prices = [] 
-        self.etf_bid_volumes = [] 
-        self.fut_ask_prices = []
-        self.fut_ask_volumes = []
-        self.fut_bid_prices = []
-        self.fut_bid_volumes = [] 
-
         self.last_30_etf_trades = []
 
+        # The books and positions are kept up to date in the state before each callback
+        self.etf_book: LocalBook = self.state.book(Instrument.ETF)
+        self.fut_book: LocalBook = self.state.book(Instrument.FUTURE)
+
         # parameters to tweak
         self.true_price_calculation = "MID_PRICE"
         self.depth_long = 30 
@@ -116,16 +108,12 @@ class AutoTrader(BaseAutoTrader):
 
         # if volume = 0 the order wasn't filled
         if client_order_id == self.hedge_bid_id:
-            self.fut_position += volume
-
             # even if we haven't filled the order we just delete it 
             self.hedge_bid_id = 0
             self.hedge_bid_size = 0
             self.hedge_bid_price = 0
 
         elif client_order_id == self.hedge_ask_id:
-            self.fut_position -= volume
-
             self.hedge_ask_id = 0
             self.hedge_ask_size = 0
             self.hedge_ask_price = 0
@@ -145,19 +133,14 @@ class AutoTrader(BaseAutoTrader):
         self.logger.info("received order book for instrument %d with sequence number %d", instrument,
                          sequence_number)
 
-        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.etf_position, self.fut_position))
-
-        if instrument == Instrument.ETF:
-            self.update_etf_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
-        else:
-            self.update_fut_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
+        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.state.etf_position, self.state.future_position))
          
-        if abs(self.etf_position - self.fut_position) <= 10:
+        if abs(self.state.etf_position - self.state.future_position) <= 10:
             self.last_hedged_sequence_number = sequence_number
 
         self.check_conditions()
 
-        if self.bid_size == 0 and self.ask_size == 0 and self.etf_position == 0:
+        if self.bid_size == 0 and self.ask_size == 0 and self.state.etf_position == 0:
             self.initialize_bid_and_ask()
         else:
             self.update_bid()
@@ -199,8 +182,6 @@ class AutoTrader(BaseAutoTrader):
                 self.bid_original_size = 0
             # order was partially or fully filled
             else:
-                amount_filled = self.bid_size - remaining_volume
-                self.etf_position += amount_filled 
                 self.bid_size = remaining_volume
 
                 # if order has been fully filled
@@ -224,8 +205,6 @@ class AutoTrader(BaseAutoTrader):
                 self.ask_price = 0
                 self.ask_original_size = 0
             else:
-                amount_filled = self.ask_size - remaining_volume
-                self.etf_position -= amount_filled 
                 self.ask_size = remaining_volume
 
                 if self.ask_size == 0:
@@ -242,7 +221,7 @@ class AutoTrader(BaseAutoTrader):
             # we shouldn't receive order status updates of some other order
             assert False
 
-        self.logger.info("ETF position is {2}, outstanding bid size {0} and ask size {1}".format(self.bid_size, self.ask_size, self.etf_position))
+        self.logger.info("ETF position is {2}, outstanding bid size {0} and ask size {1}".format(self.bid_size, self.ask_size, self.state.etf_position))
         self.check_conditions()
         self.update_hedges_if_necessary()
 
@@ -273,7 +252,7 @@ class AutoTrader(BaseAutoTrader):
 
         self.check_conditions()
 
-        if self.bid_size == 0 and self.ask_size == 0 and self.etf_position == 0:
+        if self.bid_size == 0 and self.ask_size == 0 and self.state.etf_position == 0:
             self.initialize_bid_and_ask()
         else:
             if self.bid_size == 0:
@@ -318,7 +297,7 @@ class AutoTrader(BaseAutoTrader):
             self.send_amend_order(self.bid_id, new_bid_size)
         # see if we should cancel the bid
         elif self.bid_size > 0:
-            if self.bid_price != new_bid_price and self.bid_sequence_number + self.cancelling_delay <= self.etf_order_book_sequence_number:
+            if self.bid_price != new_bid_price and self.bid_sequence_number + self.cancelling_delay <= self.etf_book.sequence_number:
                 self.logger.info("Cancelling BID with id {0}".format(self.bid_id))
                 self.send_cancel_order(self.bid_id)
         # see if we should place a new bid given that we don't have any outstanding one
@@ -339,21 +318,21 @@ class AutoTrader(BaseAutoTrader):
             self.send_amend_order(self.ask_id, new_ask_size)
         # see if we should cancel the ask order
         elif self.ask_size > 0:
-            if self.ask_price != new_ask_price and self.ask_sequence_number + self.cancelling_delay <= self.etf_order_book_sequence_number:
+            if self.ask_price != new_ask_price and self.ask_sequence_number + self.cancelling_delay <= self.etf_book.sequence_number:
                 self.send_cancel_order(self.ask_id)
         elif new_ask_size > 0 and new_ask_price > 0:
             self.place_ask(price=new_ask_price, size=new_ask_size)
 
     def update_hedges_if_necessary(self) -> None:
         # the actual current market exposure
-        current_delta = self.etf_position + self.fut_position
+        current_delta = self.state.etf_position + self.state.future_position
 
         # if we already have an outstanding hedge order we wait until it gets executed
         if self.hedge_ask_id != 0 or self.hedge_bid_id != 0:
             return
             
         # if we don't have to hedge yet we don't do it
-        if self.last_hedged_sequence_number + self.sequence_number_hedging_delay > self.etf_order_book_sequence_number:
+        if self.last_hedged_sequence_number + self.sequence_number_hedging_delay > self.etf_book.sequence_number:
             return
 
         # TODO: Check that we haven't sent the hedge order already
@@ -364,14 +343,14 @@ class AutoTrader(BaseAutoTrader):
             self.place_hedge_buy(price=MAX_ASK_NEAREST_TICK, size=-current_delta)
 
     def calculate_bid_size(self) -> int:
-        bid_size = max(0, -self.etf_position + self.ask_size)
-        assert abs(self.etf_position + bid_size) <= POSITION_LIMIT
+        bid_size = max(0, -self.state.etf_position + self.ask_size)
+        assert abs(self.state.etf_position + bid_size) <= POSITION_LIMIT
         assert bid_size >= 0
         return bid_size
 
     def calculate_ask_size(self) -> int:
-        ask_size = max(0, (-1) * (-self.etf_position - self.bid_size))
-        assert abs(self.etf_position - ask_size) <= POSITION_LIMIT
+        ask_size = max(0, (-1) * (-self.state.etf_position - self.bid_size))
+        assert abs(self.state.etf_position - ask_size) <= POSITION_LIMIT
         assert ask_size >= 0
         return ask_size
 
@@ -384,8 +363,8 @@ class AutoTrader(BaseAutoTrader):
 
         # the average price at which we can buy `order_size` lots
         for i in range(5):
-            available_volume_here = min(order_size - volume, self.etf_ask_volumes[i])
-            effective_buy_price += self.etf_ask_prices[i] * available_volume_here
+            available_volume_here = min(order_size - volume, self.etf_book.ask_volumes[i])
+            effective_buy_price += self.etf_book.ask_prices[i] * available_volume_here
             volume += available_volume_here
             if volume >= order_size:
                 assert volume == order_size 
@@ -396,8 +375,8 @@ class AutoTrader(BaseAutoTrader):
         volume = 0
         effective_sell_price = 0
         for i in range(5):
-            available_volume_here = min(order_size - volume, self.etf_bid_volumes[i])
-            effective_sell_price += self.etf_bid_prices[i] * available_volume_here
+            available_volume_here = min(order_size - volume, self.etf_book.bid_volumes[i])
+            effective_sell_price += self.etf_book.bid_prices[i] * available_volume_here
             volume += available_volume_here
             if volume >= order_size:
                 assert volume == order_size 
@@ -439,7 +418,7 @@ class AutoTrader(BaseAutoTrader):
 
         sigma_squared = self.calculate_sigma_squared() 
         gamma = self.gamma
-        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_order_book_sequence_number) / self.sequence_number_hedging_delay
+        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_book.sequence_number) / self.sequence_number_hedging_delay
         kappa = self.volume_adjustment_constant * self.calculate_volume_etf()
 
         delta = gamma * sigma_squared * t_diff + 2 * math.log(1 + gamma / kappa) / gamma
@@ -451,10 +430,10 @@ class AutoTrader(BaseAutoTrader):
         assert self.market_data_ready()
 
         s = self.calculate_true_price()
-        q = self.etf_position
+        q = self.state.etf_position
         sigma_squared = self.calculate_sigma_squared() 
         gamma = self.gamma
-        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_order_book_sequence_number) / self.sequence_number_hedging_delay
+        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_book.sequence_number) / self.sequence_number_hedging_delay
 
         r = s - q * gamma * sigma_squared * t_diff
 
@@ -462,7 +441,7 @@ class AutoTrader(BaseAutoTrader):
 
     def calculate_true_price(self, order_size=10) -> float:
         # true price is the midprice of the future + the difference now times some lag factor
-        fut_midprice = (self.fut_ask_prices[0] + self.fut_bid_prices[0]) * 0.5
+        fut_midprice = (self.fut_book.ask_prices[0] + self.fut_book.bid_prices[0]) * 0.5
 
         self.true_price = fut_midprice 
 
@@ -510,9 +489,9 @@ class AutoTrader(BaseAutoTrader):
         self.bid_price = price 
         self.bid_size = size 
         self.bid_original_size = self.bid_size
-        self.bid_sequence_number = self.etf_order_book_sequence_number
+        self.bid_sequence_number = self.etf_book.sequence_number
         self.logger.info("Inserting ETF | BUY | seq number {0} | order number {1} | size {2} | price {3}".format(self.bid_sequence_number, self.bid_id, self.bid_size, self.bid_price))
-        assert self.etf_position + self.bid_size <= POSITION_LIMIT
+        assert self.state.etf_position + self.bid_size <= POSITION_LIMIT
         self.send_insert_order(self.bid_id, Side.BUY, self.bid_price, self.bid_size, Lifespan.GOOD_FOR_DAY)
 
     def place_ask(self, price, size) -> None:
@@ -520,9 +499,9 @@ class AutoTrader(BaseAutoTrader):
         self.ask_price = price 
         self.ask_size = size 
         self.ask_original_size = self.ask_size
-        self.ask_sequence_number = self.etf_order_book_sequence_number
+        self.ask_sequence_number = self.etf_book.sequence_number
         self.logger.info("Inserting ETF | SELL | seq number {0} | order number {1} | size {2} | price {3}".format(self.ask_sequence_number, self.ask_id, self.ask_size, self.ask_price))
-        assert self.etf_position - self.ask_size >= -POSITION_LIMIT
+        assert self.state.etf_position - self.ask_size >= -POSITION_LIMIT
         self.send_insert_order(self.ask_id, Side.SELL, self.ask_price, self.ask_size, Lifespan.GOOD_FOR_DAY)
 
     def place_hedge_bid(self, price, size):
@@ -530,7 +509,7 @@ class AutoTrader(BaseAutoTrader):
         self.hedge_bid_size = size 
         self.hedge_bid_price = price 
         self.logger.info("Inserting FUT BUY order {0} with size {1} and price {2}".format(self.hedge_bid_id, self.hedge_bid_size, self.hedge_bid_price))
-        assert abs(self.fut_position + self.hedge_bid_size) <= POSITION_LIMIT
+        assert abs(self.state.future_position + self.hedge_bid_size) <= POSITION_LIMIT
         self.send_hedge_order(self.hedge_bid_id, Side.BUY, self.hedge_bid_price, self.hedge_bid_size)
 
     def place_hedge_ask(self, price, size):
@@ -538,49 +517,33 @@ class AutoTrader(BaseAutoTrader):
         self.hedge_ask_size = size 
         self.hedge_ask_price = price 
         self.logger.info("Inserting FUT SELL order {0} with size {1} and price {2}".format(self.hedge_ask_id, self.hedge_ask_size, self.hedge_ask_price))
-        assert abs(self.fut_position - self.hedge_ask_size) <= POSITION_LIMIT
+        assert abs(self.state.future_position - self.hedge_ask_size) <= POSITION_LIMIT
         self.send_hedge_order(self.hedge_ask_id, Side.SELL, self.hedge_ask_price, self.hedge_ask_size)
 
     # these conditions have to be fulfilled at all times
     def check_conditions(self) -> None:
-        assert (abs(self.etf_position) <= POSITION_LIMIT and abs(self.fut_position) <= POSITION_LIMIT)
-        assert (self.etf_position + self.bid_size <= POSITION_LIMIT and self.etf_position - self.ask_size >= -POSITION_LIMIT)
+        assert (abs(self.state.etf_position) <= POSITION_LIMIT and abs(self.state.future_position) <= POSITION_LIMIT)
+        assert (self.state.etf_position + self.bid_size <= POSITION_LIMIT and self.state.etf_position - self.ask_size >= -POSITION_LIMIT)
         assert (self.bid_size > 0 and self.bid_price > 0) or (self.bid_size == 0 and self.bid_price == 0)
         assert (self.ask_size > 0 and self.ask_price > 0) or (self.ask_size == 0 and self.ask_price == 0)
-        assert (self.bid_size - self.ask_size + self.etf_position == 0)
+        assert (self.bid_size - self.ask_size + self.state.etf_position == 0)
 
     # unless this function returns true we won't place any bid/asks 
     def market_data_ready(self) -> bool:
-        if self.etf_order_book_sequence_number != self.fut_order_book_sequence_number:
+        if self.etf_book.sequence_number != self.fut_book.sequence_number:
             return False
-        if self.etf_bid_volumes[0] == 0 or self.etf_bid_prices[0] == 0:
+        if self.etf_book.bid_volumes[0] == 0 or self.etf_book.bid_prices[0] == 0:
             return False
-        if self.etf_ask_volumes[0] == 0 or self.etf_ask_prices[0] == 0:
+        if self.etf_book.ask_volumes[0] == 0 or self.etf_book.ask_prices[0] == 0:
             return False
-        if self.fut_bid_volumes[0] == 0 or self.fut_bid_prices[0] == 0:
+        if self.fut_book.bid_volumes[0] == 0 or self.fut_book.bid_prices[0] == 0:
             return False
-        if self.fut_ask_volumes[0] == 0 or self.fut_ask_prices[0] == 0:
+        if self.fut_book.ask_volumes[0] == 0 or self.fut_book.ask_prices[0] == 0:
             return False
         if len(self.last_30_etf_trades) == 0:
             return False
         return True
 
-    def update_etf_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-        self.etf_order_book_sequence_number = sequence_number 
-        self.etf_ask_prices = ask_prices
-        self.etf_ask_volumes = ask_volumes
-        self.etf_bid_prices = bid_prices
-        self.etf_bid_volumes = bid_volumes
-        
-    def update_fut_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-        self.fut_order_book_sequence_number = sequence_number 
-        self.fut_ask_prices = ask_prices
-        self.fut_ask_volumes = ask_volumes
-        self.fut_bid_prices = bid_prices
-        self.fut_bid_volumes = bid_volumes
-
     def log_outstanding_offers(self):
         if self.bid_size > 0:
             self.logger.info("ETF outstanding BUY at price={0} and volume={1} and id={2}".format(self.bid_price, self.bid_size))
@@ -23,6 +23,7 @@ from typing import List, Dict, Any, Tuple, Set
 
 from ready_trader_go import BaseAutoTrader, Instrument, Lifespan, MAXIMUM_ASK, MINIMUM_BID, Side
 from ready_trader_go.order_book import OrderBook
+from ready_trader_go.trader_state import LocalBook
 
 
 LOT_SIZE = 10
@@ -87,23 +88,13 @@ class AutoTrader(BaseAutoTrader):
         self.last_hedged_sequence_number = 0
         self.first_hedged_sequence_number = -1
 
-        self.etf_position = 0
-        self.fut_position = 0
         self.profit = 0
         self.fees = 0
         self.true_price = 0
 
-        self.etf_order_book_sequence_number = -2 
-        self.fut_order_book_sequence_number = -1 
-
-        self.etf_ask_prices = [] 
-        self.etf_ask_volumes = []
-        self.etf_bid_prices = [] 
-        self.etf_bid_volumes = [] 
-        self.fut_ask_prices = []
-        self.fut_ask_volumes = []
-        self.fut_bid_prices = []
-        self.fut_bid_volumes = [] 
+        # The books and positions are kept up to date in the state before each callback
+        self.etf_book: LocalBook = self.state.book(Instrument.ETF)
+        self.fut_book: LocalBook = self.state.book(Instrument.FUTURE)
 
         self.last_30_etf_trades = []
 
@@ -139,14 +130,12 @@ class AutoTrader(BaseAutoTrader):
 
         # if volume = 0 the order wasn't filled
         if client_order_id in self.hedge_bid_ids:
-            self.fut_position += volume
             # even if we haven't filled the order we just delete it 
             self.total_hedge_bid_size -= self.hedge_bids[client_order_id].volume
             del self.hedge_bids[client_order_id]
             self.hedge_bid_ids.remove(client_order_id)
 
         elif client_order_id in self.hedge_ask_ids:
-            self.fut_position -= volume
             # even if we haven't filled it we just delete it
             self.total_hedge_ask_size -= self.hedge_asks[client_order_id].volume
             del self.hedge_asks[client_order_id]
@@ -167,14 +156,9 @@ class AutoTrader(BaseAutoTrader):
         self.logger.info("received order book for instrument %d with sequence number %d", instrument,
                          sequence_number)
 
-        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.etf_position, self.fut_position))
-
-        if instrument == Instrument.ETF:
-            self.update_etf_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
-        else:
-            self.update_fut_order_book_data(sequence_number, ask_prices, ask_volumes, bid_prices, bid_volumes)
+        self.logger.info("Balance is {0} ETF and {1} FUT".format(self.state.etf_position, self.state.future_position))
          
-        if abs(self.etf_position - self.fut_position) <= 10:
+        if abs(self.state.etf_position - self.state.future_position) <= 10:
             self.last_hedged_sequence_number = sequence_number
 
         self.check_conditions()
@@ -182,7 +166,7 @@ class AutoTrader(BaseAutoTrader):
         # if we don't have order book information or it's not synchronized we don't
         # want to touch our bids/asks
         if self.market_data_ready():
-            if not self.bid_ids and not self.ask_ids and self.etf_position == 0:
+            if not self.bid_ids and not self.ask_ids and self.state.etf_position == 0:
                 self.initialize_bid_and_ask()
             else:
                 self.update_bids()
@@ -235,7 +219,6 @@ class AutoTrader(BaseAutoTrader):
 
                 amount_filled = self.bids[client_order_id].remaining_volume - remaining_volume 
                 self.total_bid_size -= amount_filled
-                self.etf_position += amount_filled
                 self.bids[client_order_id].remaining_volume = remaining_volume
 
                 # if order has been fully filled
@@ -265,7 +248,6 @@ class AutoTrader(BaseAutoTrader):
 
                 amount_filled = self.asks[client_order_id].remaining_volume - remaining_volume
                 self.total_ask_size -= amount_filled
-                self.etf_position -= amount_filled 
                 self.asks[client_order_id].remaining_volume = remaining_volume
 
                 # if order has been fully filled
@@ -315,7 +297,7 @@ class AutoTrader(BaseAutoTrader):
         # if we don't have order book information or it's not synchronized we don't
         # want to touch our bids/asks
         if self.market_data_ready():
-            if not self.bid_ids and not self.ask_ids and self.etf_position == 0:
+            if not self.bid_ids and not self.ask_ids and self.state.etf_position == 0:
                 self.initialize_bid_and_ask()
             else:
                 self.update_bids()
@@ -343,8 +325,8 @@ class AutoTrader(BaseAutoTrader):
 
         self.check_conditions()
 
-        if self.total_bid_size + self.etf_position <= POSITION_LIMIT:
-            assert self.etf_position - self.total_ask_size - amount_filled >= -POSITION_LIMIT
+        if self.total_bid_size + self.state.etf_position <= POSITION_LIMIT:
+            assert self.state.etf_position - self.total_ask_size - amount_filled >= -POSITION_LIMIT
 
             new_bid_price = self.calculate_bid_price()
             new_ask_price = self.calculate_ask_price()
@@ -352,7 +334,7 @@ class AutoTrader(BaseAutoTrader):
             self.place_ask(price=new_ask_price, size=amount_filled)
 
         else:
-            new_total_bid_size = 100 - self.etf_position
+            new_total_bid_size = 100 - self.state.etf_position
             new_bid_size = new_total_bid_size - self.total_bid_size 
             assert new_bid_size >= 0
             new_ask_size = 100
@@ -369,8 +351,8 @@ class AutoTrader(BaseAutoTrader):
 
         self.check_conditions()
 
-        if -self.total_ask_size + self.etf_position >= -POSITION_LIMIT:
-            assert self.etf_position + self.total_bid_size + amount_filled <= POSITION_LIMIT
+        if -self.total_ask_size + self.state.etf_position >= -POSITION_LIMIT:
+            assert self.state.etf_position + self.total_bid_size + amount_filled <= POSITION_LIMIT
 
             new_bid_price = self.calculate_bid_price()
             new_ask_price = self.calculate_ask_price()
@@ -378,7 +360,7 @@ class AutoTrader(BaseAutoTrader):
             self.place_ask(price=new_ask_price, size=amount_filled)
 
         else:
-            new_total_ask_size = -100 + self.etf_position
+            new_total_ask_size = -100 + self.state.etf_position
             new_ask_size = new_total_ask_size  - self.total_ask_size
             new_bid_size = 100
             new_bid_price = self.calculate_bid_price()
@@ -399,7 +381,7 @@ class AutoTrader(BaseAutoTrader):
 
         # first we cancel all outdated bids
         for order_id, bid in self.bids.items():
-            if bid.price != new_bid_price and bid.sequence_number + self.cancelling_delay <= self.etf_order_book_sequence_number:
+            if bid.price != new_bid_price and bid.sequence_number + self.cancelling_delay <= self.etf_book.sequence_number:
                 self.logger.info("Cancelling BID with id {0} of remaining volume {1}".format(bid.order_id, bid.remaining_volume))
                 self.send_cancel_order(bid.order_id)
 
@@ -424,7 +406,7 @@ class AutoTrader(BaseAutoTrader):
 
         # first we cancel all outdated asks
         for order_id, ask in self.asks.items():
-            if ask.price != new_ask_price and ask.sequence_number + self.cancelling_delay <= self.etf_order_book_sequence_number:
+            if ask.price != new_ask_price and ask.sequence_number + self.cancelling_delay <= self.etf_book.sequence_number:
                 self.logger.info("Cancelling ASK with id {0} of remaining volume {1}".format(ask.order_id, ask.remaining_volume))
                 self.send_cancel_order(ask.order_id)
 
@@ -440,14 +422,14 @@ class AutoTrader(BaseAutoTrader):
 
     def update_hedges_if_necessary(self) -> None:
         # the actual current market exposure
-        current_delta = self.etf_position + self.fut_position
+        current_delta = self.state.etf_position + self.state.future_position
 
         # if we already have an outstanding hedge order we wait until it gets executed
         if self.hedge_bids or self.hedge_asks:
             return
             
         # if we don't have to hedge yet we don't do it
-        if self.last_hedged_sequence_number + self.sequence_number_hedging_delay > self.etf_order_book_sequence_number:
+        if self.last_hedged_sequence_number + self.sequence_number_hedging_delay > self.etf_book.sequence_number:
             return
 
         if current_delta > 0:
@@ -457,13 +439,13 @@ class AutoTrader(BaseAutoTrader):
             self.place_hedge_buy(price=MAX_ASK_NEAREST_TICK, size=-current_delta)
 
     def calculate_bid_size(self) -> int:
-        bid_size = max(0, -self.etf_position + self.total_ask_size - self.total_bid_size)
-        assert abs(self.etf_position + self.total_bid_size + bid_size) <= POSITION_LIMIT
+        bid_size = max(0, -self.state.etf_position + self.total_ask_size - self.total_bid_size)
+        assert abs(self.state.etf_position + self.total_bid_size + bid_size) <= POSITION_LIMIT
         return bid_size
 
     def calculate_ask_size(self) -> int:
-        ask_size = max(0, self.etf_position - self.total_bid_size - self.total_ask_size)
-        assert abs(self.etf_position - self.total_ask_size - ask_size) <= POSITION_LIMIT
+        ask_size = max(0, self.state.etf_position - self.total_bid_size - self.total_ask_size)
+        assert abs(self.state.etf_position - self.total_ask_size - ask_size) <= POSITION_LIMIT
         return ask_size
 
     def calculate_effective_etf_midprice(self, order_size) -> float:
@@ -475,8 +457,8 @@ class AutoTrader(BaseAutoTrader):
 
         # the average price at which we can buy `order_size` lots
         for i in range(5):
-            available_volume_here = min(order_size - volume, self.etf_ask_volumes[i])
-            effective_buy_price += self.etf_ask_prices[i] * available_volume_here
+            available_volume_here = min(order_size - volume, self.etf_book.ask_volumes[i])
+            effective_buy_price += self.etf_book.ask_prices[i] * available_volume_here
             volume += available_volume_here
             if volume >= order_size:
                 assert volume == order_size 
@@ -487,8 +469,8 @@ class AutoTrader(BaseAutoTrader):
         volume = 0
         effective_sell_price = 0
         for i in range(5):
-            available_volume_here = min(order_size - volume, self.etf_bid_volumes[i])
-            effective_sell_price += self.etf_bid_prices[i] * available_volume_here
+            available_volume_here = min(order_size - volume, self.etf_book.bid_volumes[i])
+            effective_sell_price += self.etf_book.bid_prices[i] * available_volume_here
             volume += available_volume_here
             if volume >= order_size:
                 assert volume == order_size 
@@ -531,7 +513,7 @@ class AutoTrader(BaseAutoTrader):
 
         sigma_squared = self.calculate_sigma_squared() 
         gamma = self.gamma
-        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_order_book_sequence_number) / self.sequence_number_hedging_delay
+        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_book.sequence_number) / self.sequence_number_hedging_delay
         kappa = self.volume_adjustment_constant * self.calculate_volume_etf()
 
         delta = gamma * sigma_squared * t_diff + 2 * math.log(1 + gamma / kappa) / gamma
@@ -543,10 +525,10 @@ class AutoTrader(BaseAutoTrader):
         assert self.market_data_ready()
 
         s = self.calculate_true_price()
-        q = self.etf_position
+        q = self.state.etf_position
         sigma_squared = self.calculate_sigma_squared() 
         gamma = self.gamma
-        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_order_book_sequence_number) / self.sequence_number_hedging_delay
+        t_diff = 1 - (self.last_hedged_sequence_number + self.sequence_number_hedging_delay - self.etf_book.sequence_number) / self.sequence_number_hedging_delay
 
         r = s - q * gamma * sigma_squared * t_diff
 
@@ -554,7 +536,7 @@ class AutoTrader(BaseAutoTrader):
 
     def calculate_true_price(self) -> float:
         # true price is the midprice of the future + the difference now times some lag factor
-        fut_midprice = (self.fut_ask_prices[0] + self.fut_bid_prices[0]) * 0.5
+        fut_midprice = (self.fut_book.ask_prices[0] + self.fut_book.bid_prices[0]) * 0.5
 
         self.true_price = fut_midprice 
 
@@ -598,7 +580,7 @@ class AutoTrader(BaseAutoTrader):
     # Helper functions
         
     def place_bid(self, price, size) -> None:
-        bid = CustomOrder(order_id=next(self.order_ids), side=Side.BUY, price=price, volume=size, sequence_number=self.etf_order_book_sequence_number)
+        bid = CustomOrder(order_id=next(self.order_ids), side=Side.BUY, price=price, volume=size, sequence_number=self.etf_book.sequence_number)
         self.bid_ids.add(bid.order_id)
         self.bids[bid.order_id] = bid
         self.total_bid_size += size
@@ -606,7 +588,7 @@ class AutoTrader(BaseAutoTrader):
         self.send_insert_order(client_order_id=bid.order_id, side=bid.side, price=bid.price, volume=bid.volume, lifespan=Lifespan.GOOD_FOR_DAY)
 
     def place_ask(self, price, size) -> None:
-        ask = CustomOrder(order_id=next(self.order_ids), side=Side.SELL, price=price, volume=size, sequence_number=self.etf_order_book_sequence_number)
+        ask = CustomOrder(order_id=next(self.order_ids), side=Side.SELL, price=price, volume=size, sequence_number=self.etf_book.sequence_number)
         self.ask_ids.add(ask.order_id)
         self.asks[ask.order_id] = ask
         self.total_ask_size += size
@@ -614,7 +596,7 @@ class AutoTrader(BaseAutoTrader):
         self.send_insert_order(client_order_id=ask.order_id, side=ask.side, price=ask.price, volume=ask.volume, lifespan=Lifespan.GOOD_FOR_DAY)
 
     def place_hedge_bid(self, price, size):
-        hedge_bid = CustomOrder(order_id=next(self.order_ids), side=Side.BUY, price=price, volume=size, sequence_number=self.etf_order_book_sequence_number)
+        hedge_bid = CustomOrder(order_id=next(self.order_ids), side=Side.BUY, price=price, volume=size, sequence_number=self.etf_book.sequence_number)
         self.hedge_bid_ids.add(hedge_bid.order_id)
         self.hedge_asks[hedge_bid.order_id] = hedge_bid
         self.total_hedge_bid_size += size
@@ -622,7 +604,7 @@ class AutoTrader(BaseAutoTrader):
         self.send_hedge_order(client_order_id=hedge_bid.order_id, side=hedge_bid.side, price=hedge_bid.price, volume=hedge_bid.volume)
 
     def place_hedge_ask(self, price, size):
-        hedge_ask = CustomOrder(order_id=next(self.order_ids), side=Side.SELL, price=price, volume=size, sequence_number=self.etf_order_book_sequence_number)
+        hedge_ask = CustomOrder(order_id=next(self.order_ids), side=Side.SELL, price=price, volume=size, sequence_number=self.etf_book.sequence_number)
         self.hedge_ask_ids.add(hedge_ask.order_id)
         self.hedge_asks[hedge_ask.order_id] = hedge_ask
         self.total_hedge_ask_size += size
@@ -631,10 +613,10 @@ class AutoTrader(BaseAutoTrader):
 
     # these conditions have to be fulfilled at all times
     def check_conditions(self) -> None:
-        assert (abs(self.etf_position) <= POSITION_LIMIT and abs(self.fut_position) <= POSITION_LIMIT)
-        assert (self.etf_position + self.total_bid_size <= POSITION_LIMIT and self.etf_position - self.total_ask_size >= -POSITION_LIMIT)
-        assert (self.etf_position + self.total_bid_size <= POSITION_LIMIT and self.etf_position - self.total_ask_size >= -POSITION_LIMIT)
-        assert (self.total_bid_size - self.total_ask_size + self.etf_position == 0)
+        assert (abs(self.state.etf_position) <= POSITION_LIMIT and abs(self.state.future_position) <= POSITION_LIMIT)
+        assert (self.state.etf_position + self.total_bid_size <= POSITION_LIMIT and self.state.etf_position - self.total_ask_size >= -POSITION_LIMIT)
+        assert (self.state.etf_position + self.total_bid_size <= POSITION_LIMIT and self.state.etf_position - self.total_ask_size >= -POSITION_LIMIT)
+        assert (self.total_bid_size - self.total_ask_size + self.state.etf_position == 0)
         for order_id, bid in self.bids.items():
             assert bid.remaining_volume > 0 and bid.volume > 0
         for order_id, ask in self.asks.items():
@@ -642,36 +624,20 @@ class AutoTrader(BaseAutoTrader):
 
     # unless this function returns true we won't place any bid/asks 
     def market_data_ready(self) -> bool:
-        if self.etf_order_book_sequence_number != self.fut_order_book_sequence_number:
+        if self.etf_book.sequence_number != self.fut_book.sequence_number:
             return False
-        if self.etf_bid_volumes[0] == 0 or self.etf_bid_prices[0] == 0:
+        if self.etf_book.bid_volumes[0] == 0 or self.etf_book.bid_prices[0] == 0:
             return False
-        if self.etf_ask_volumes[0] == 0 or self.etf_ask_prices[0] == 0:
+        if self.etf_book.ask_volumes[0] == 0 or self.etf_book.ask_prices[0] == 0:
             return False
-        if self.fut_bid_volumes[0] == 0 or self.fut_bid_prices[0] == 0:
+        if self.fut_book.bid_volumes[0] == 0 or self.fut_book.bid_prices[0] == 0:
             return False
-        if self.fut_ask_volumes[0] == 0 or self.fut_ask_prices[0] == 0:
+        if self.fut_book.ask_volumes[0] == 0 or self.fut_book.ask_prices[0] == 0:
             return False
         if len(self.last_30_etf_trades) == 0:
             return False
         return True
 
-    def update_etf_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-        self.etf_order_book_sequence_number = sequence_number 
-        self.etf_ask_prices = ask_prices
-        self.etf_ask_volumes = ask_volumes
-        self.etf_bid_prices = bid_prices
-        self.etf_bid_volumes = bid_volumes
-        
-    def update_fut_order_book_data(self, sequence_number: int, ask_prices: List[int],
-                                     ask_volumes: List[int], bid_prices: List[int], bid_volumes: List[int]) -> None:
-        self.fut_order_book_sequence_number = sequence_number 
-        self.fut_ask_prices = ask_prices
-        self.fut_ask_volumes = ask_volumes
-        self.fut_bid_prices = bid_prices
-        self.fut_bid_volumes = bid_volumes
-
     def log_outstanding_offers(self):
         active_bids = "ETF active bids " 
         active_asks = "ETF active asks "